@@ -0,0 +1,180 @@
+"""
+Benchmark: modo multi-llamada vs modo fusionado de analyze_image.
+
+Mide por documento la latencia, el número de llamadas a Gemini, los tokens
+consumidos y (si hay valores esperados) la precisión de los campos
+extraídos.
+
+Uso:
+    python benchmarks/compare_modes.py --images ./muestras \\
+        --expected ./muestras/expected.json --out resultados.json
+
+`expected.json` (opcional) mapea nombre de archivo -> campos esperados:
+    {"licencia_ca.jpg": {"name": "John Doe", "id_number": "D1234567",
+                         "country": "US", "dates": {"expiration": "01/15/2030"}}}
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import google.generativeai as genai
+
+from hades_core.analyzer import analyze_image, ANALYSIS_MODES
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+class GeminiUsageMeter:
+    """Cuenta llamadas y tokens de GenerativeModel.generate_content"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._original = genai.GenerativeModel.generate_content
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    def install(self):
+        meter = self
+        original = self._original
+
+        def generate_content(model_self, *args, **kwargs):
+            response = original(model_self, *args, **kwargs)
+            usage = getattr(response, "usage_metadata", None)
+            with meter._lock:
+                meter.calls += 1
+                if usage:
+                    meter.prompt_tokens += usage.prompt_token_count or 0
+                    meter.output_tokens += usage.candidates_token_count or 0
+            return response
+
+        genai.GenerativeModel.generate_content = generate_content
+
+    def uninstall(self):
+        genai.GenerativeModel.generate_content = self._original
+
+
+def field_accuracy(result: dict, expected: dict) -> float:
+    """Fracción de campos esperados que coinciden con el resultado"""
+    checks = []
+    extracted = result.get("extracted_data", {})
+
+    if "name" in expected:
+        checks.append((extracted.get("name") or "").lower() == expected["name"].lower())
+    if "id_number" in expected:
+        checks.append(extracted.get("id_number") == expected["id_number"])
+    if "country" in expected:
+        checks.append(result.get("country", {}).get("code") == expected["country"])
+    for date_type, display in expected.get("dates", {}).items():
+        found = result.get("dates", {}).get(date_type) or {}
+        checks.append(found.get("display") == display)
+
+    return sum(checks) / len(checks) if checks else None
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(rows):
+    latencies = [r["latency_ms"] for r in rows]
+    accuracies = [r["accuracy"] for r in rows if r["accuracy"] is not None]
+    return {
+        "documents": len(rows),
+        "latency_ms_mean": round(statistics.mean(latencies), 1),
+        "latency_ms_p50": round(_percentile(latencies, 50), 1),
+        "latency_ms_p95": round(_percentile(latencies, 95), 1),
+        "calls_per_doc": round(statistics.mean(r["calls"] for r in rows), 2),
+        "prompt_tokens_per_doc": round(statistics.mean(r["prompt_tokens"] for r in rows)),
+        "output_tokens_per_doc": round(statistics.mean(r["output_tokens"] for r in rows)),
+        "accuracy": round(statistics.mean(accuracies), 3) if accuracies else None,
+        "partial_results": sum(1 for r in rows if r["partial"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara modos de análisis multi vs fused")
+    parser.add_argument("--images", required=True, help="Carpeta con imágenes de documentos")
+    parser.add_argument("--expected", help="JSON con campos esperados por archivo")
+    parser.add_argument("--api-key", default=os.getenv("GEMINI_API_KEY"))
+    parser.add_argument("--runs", type=int, default=1, help="Repeticiones por documento y modo")
+    parser.add_argument("--modes", nargs="+", default=list(ANALYSIS_MODES), choices=ANALYSIS_MODES)
+    parser.add_argument("--out", help="Guardar resultados detallados en JSON")
+    args = parser.parse_args()
+
+    if not args.api_key:
+        parser.error("Falta GEMINI_API_KEY (variable de entorno o --api-key)")
+
+    images = sorted(
+        p for p in Path(args.images).iterdir()
+        if p.suffix.lower() in IMAGE_EXTENSIONS
+    )
+    if not images:
+        parser.error(f"No hay imágenes en {args.images}")
+
+    expected = {}
+    if args.expected:
+        with open(args.expected, encoding="utf-8") as f:
+            expected = json.load(f)
+
+    meter = GeminiUsageMeter()
+    meter.install()
+    rows = {mode: [] for mode in args.modes}
+
+    try:
+        for image_path in images:
+            image_bytes = image_path.read_bytes()
+            for mode in args.modes:
+                for _ in range(args.runs):
+                    meter.reset()
+                    start = time.perf_counter()
+                    result = analyze_image(
+                        image_bytes,
+                        gemini_api_key=args.api_key,
+                        config={"mode": mode}
+                    )
+                    latency_ms = (time.perf_counter() - start) * 1000
+                    data = result.to_dict()
+
+                    row = {
+                        "image": image_path.name,
+                        "latency_ms": round(latency_ms, 1),
+                        "calls": meter.calls,
+                        "prompt_tokens": meter.prompt_tokens,
+                        "output_tokens": meter.output_tokens,
+                        "accuracy": field_accuracy(data, expected.get(image_path.name, {})),
+                        "partial": result.metadata.get("partial", False),
+                        "semaforo": data["semaforo"],
+                    }
+                    rows[mode].append(row)
+                    print(f"{mode:6} {image_path.name:30} {row['latency_ms']:>8.0f} ms  "
+                          f"{row['calls']} llamadas  {row['prompt_tokens'] + row['output_tokens']} tokens")
+    finally:
+        meter.uninstall()
+
+    summary = {mode: summarize(mode_rows) for mode, mode_rows in rows.items() if mode_rows}
+
+    print("\nRESUMEN")
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "rows": rows}, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark: detector de país/idioma de una pasada (Aho–Corasick) vs búsqueda
+anterior (`cue in text` por cada pista de cada país e idioma).
+
+Genera documentos sintéticos de un país conocido (pistas propias + pistas
+genéricas como "pasaporte" + texto de relleno) y mide:
+- throughput (documentos/s y MB/s) de ambos detectores
+- aciertos de país (el anterior devolvía el primer país del diccionario)
+- coincidencia de idioma (translation.detect_language) y del sesgo de
+  meses de Hades Lite, que deben ser idénticos
+
+Uso:
+    python benchmarks/cue_detection.py --docs 5000 --seed 7 --repeat 3
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hades_core.cues import (
+    COUNTRY_CUES,
+    LANGUAGE_KEYWORDS,
+    MONTH_KEYWORDS,
+    country_candidates,
+    language_counts,
+    month_language,
+    scan_cues,
+)
+
+
+# ============================================================
+# DETECTORES ANTERIORES (referencia)
+# ============================================================
+
+def legacy_country(text):
+    text_lower = text.lower()
+    for country_code, cues in COUNTRY_CUES.items():
+        if any(cue in text_lower for cue in cues):
+            return country_code
+    return None
+
+
+def legacy_language_counts(text):
+    text_lower = text.lower()
+    return {
+        lang: sum(1 for kw in keywords if kw in text_lower)
+        for lang, keywords in LANGUAGE_KEYWORDS.items()
+    }
+
+
+def legacy_month_language(text):
+    t = text.lower()
+    score_es = sum(1 for m in dict.fromkeys(MONTH_KEYWORDS["ES"]) if m in t)
+    score_en = sum(1 for m in dict.fromkeys(MONTH_KEYWORDS["EN"]) if m in t)
+    return "ES" if score_es >= score_en and score_es > 0 else ("EN" if score_en > 0 else None)
+
+
+def legacy_all(text):
+    return legacy_country(text), legacy_language_counts(text), legacy_month_language(text)
+
+
+def single_pass_all(text):
+    scan_cues.cache_clear()  # Medir el recorrido, no la caché
+    return country_candidates(text), language_counts(text), month_language(text)
+
+
+# ============================================================
+# CORPUS
+# ============================================================
+
+GENERIC = ["pasaporte", "passport", "documento de identidad", "cédula de identidad", "dni", "id card"]
+FILLER = [
+    "NOMBRE", "APELLIDO", "FECHA DE NACIMIENTO", "SEXO M", "NACIONALIDAD", "DOMICILIO",
+    "NAME", "SURNAME", "DATE OF BIRTH", "ISSUE DATE", "EXPIRATION", "ADDRESS 123 MAIN ST",
+    "12 ENE 2030", "15 MAR 1988", "JUN 03 2031", "01/02/2025", "FIRMA", "SIGNATURE",
+    "JUAN PEREZ", "MARIA LOPEZ", "JOHN DOE", "NGUYEN VAN A", "online", "marine", "causa",
+    "data de emissão", "validade", "ngày sinh", "họ và tên", "nome",
+]
+
+
+def build_corpus(docs, seed):
+    """(texto, país esperado) reproducibles a partir de la semilla"""
+    rng = random.Random(seed)
+    shared = {cue for cues in COUNTRY_CUES.values() for cue in cues if
+              sum(cue in other for other in COUNTRY_CUES.values()) > 1}
+    corpus = []
+    countries = list(COUNTRY_CUES)
+    for _ in range(docs):
+        country = rng.choice(countries)
+        own = [cue for cue in COUNTRY_CUES[country] if cue not in shared] or COUNTRY_CUES[country]
+        parts = rng.sample(own, min(len(own), rng.randint(1, 3)))
+        parts += rng.sample(GENERIC, rng.randint(0, 2))
+        parts += [rng.choice(FILLER) for _ in range(rng.randint(5, 40))]
+        rng.shuffle(parts)
+        text = "\n".join(part.upper() if rng.random() < 0.5 else part for part in parts)
+        corpus.append((text, country))
+    return corpus
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def _time(detector, corpus, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text, _ in corpus:
+            detector(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detector de país/idioma: una pasada vs anterior")
+    parser.add_argument("--docs", type=int, default=5000, help="Documentos del corpus")
+    parser.add_argument("--seed", type=int, default=7, help="Semilla del corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se toma la mejor)")
+    args = parser.parse_args()
+
+    cues = sum(len(v) for v in COUNTRY_CUES.values()) + sum(len(v) for v in LANGUAGE_KEYWORDS.values())
+    corpus = build_corpus(args.docs, args.seed)
+    megabytes = sum(len(text.encode("utf-8")) for text, _ in corpus) / 1e6
+
+    legacy_hits = single_hits = 0
+    language_diff = month_diff = 0
+    for text, expected in corpus:
+        legacy_hits += legacy_country(text) == expected
+        candidates = country_candidates(text)
+        single_hits += bool(candidates) and candidates[0][0] == expected
+        language_diff += language_counts(text) != legacy_language_counts(text)
+        month_diff += month_language(text) != legacy_month_language(text)
+
+    legacy = _time(legacy_all, corpus, args.repeat)
+    single = _time(single_pass_all, corpus, args.repeat)
+
+    print(f"Documentos:          {len(corpus)} ({megabytes:.2f} MB, {cues} pistas de país/idioma)")
+    print(f"País correcto:       anterior {legacy_hits}/{len(corpus)}, una pasada {single_hits}/{len(corpus)}")
+    print(f"Idioma distinto:     {language_diff}   Meses distinto: {month_diff}")
+    print(f"Anterior:            {legacy * 1000:.1f} ms ({len(corpus) / legacy:.0f} docs/s, {megabytes / legacy:.2f} MB/s)")
+    print(f"Una pasada:          {single * 1000:.1f} ms ({len(corpus) / single:.0f} docs/s, {megabytes / single:.2f} MB/s)")
+    print(f"Aceleración:         {legacy / single:.2f}x")
+
+    sys.exit(1 if language_diff or month_diff else 0)
+
+
+if __name__ == "__main__":
+    main()
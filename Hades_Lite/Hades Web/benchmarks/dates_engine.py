@@ -0,0 +1,235 @@
+"""
+Benchmark: motor de fechas de una pasada vs motor anterior (8 regex por línea).
+
+Genera un corpus sintético de textos OCR (INE, licencias de EE.UU., cédulas,
+pasaportes, ruido de OCR), compara campo por campo el resultado de
+process_dates_by_type con el del motor anterior y mide el tiempo de ambos.
+Termina con código 1 si algún documento difiere.
+
+Uso:
+    python benchmarks/dates_engine.py --docs 5000 --seed 7 --repeat 3
+"""
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hades_core.dates.dates import (
+    DateType,
+    process_dates_by_type,
+    extract_dates_from_text,
+)
+
+
+# ============================================================
+# MOTOR ANTERIOR (referencia)
+# ============================================================
+
+def legacy_process_dates_by_type(text, country_hint=None):
+    """Copia del process_dates_by_type anterior (sin cambios)"""
+    keywords_expiration = ["vencimiento", "vence", "expiración", "expiracion", "vigencia",
+                          "valid thru", "expires", "expiration"]
+    keywords_issue = ["emision", "expedicion", "issue", "issued", "fecha de emision"]
+    keywords_birth = ["fecha de nacimiento", "dob", "date of birth", "nacimiento"]
+
+    result = {
+        "birth": None,
+        "issue": None,
+        "expiration": None
+    }
+
+    # El motor anterior escaneaba el texto completo y descartaba el resultado:
+    # se mantiene la llamada para medir el mismo costo
+    extract_dates_from_text(text, country_hint)
+
+    for line in text.splitlines():
+        line_lower = line.lower()
+        line_dates = extract_dates_from_text(line, country_hint)
+
+        for date_info in line_dates:
+            if any(kw in line_lower for kw in keywords_expiration) and not result["expiration"]:
+                date_info.date_type = DateType.EXPIRATION
+                result["expiration"] = date_info
+            elif any(kw in line_lower for kw in keywords_issue) and not result["issue"]:
+                date_info.date_type = DateType.ISSUE
+                result["issue"] = date_info
+            elif any(kw in line_lower for kw in keywords_birth) and not result["birth"]:
+                date_info.date_type = DateType.BIRTH
+                result["birth"] = date_info
+
+    return result
+
+
+# ============================================================
+# CORPUS
+# ============================================================
+
+MONTHS_ES = ["ENE", "FEB", "MAR", "ABR", "MAY", "JUN", "JUL", "AGO", "SEP", "OCT", "NOV", "DIC",
+             "enero", "marzo", "septiembre", "diciembre"]
+MONTHS_EN = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC",
+             "January", "March", "September", "December"]
+
+NAMES = ["JUAN PEREZ GARCIA", "MARIA FERNANDA LOPEZ", "JOHN A DOE", "ANA SOFIA RAMIREZ",
+         "ROBERT SMITH JR", "LUZ ELENA GOMEZ"]
+
+
+def _date(rng):
+    d, m, y = rng.randint(1, 31), rng.randint(1, 12), rng.randint(1940, 2040)
+    yy = y % 100
+    return rng.choice([
+        f"{d:02d}/{m:02d}/{y}",
+        f"{m:02d}/{d:02d}/{y}",
+        f"{d}/{m}/{yy:02d}",
+        f"{d:02d}-{m:02d}-{y}",
+        f"{m}-{d}-{yy:02d}",
+        f"{y}-{m:02d}-{d:02d}",
+        f"{y}/{m}/{d}",
+        f"{d:02d}.{m:02d}.{y}",
+        f"{d:02d} {m:02d} {y}",
+        f"{d:02d}  {m:02d}  {yy:02d}",
+        f"{d} de {rng.choice(MONTHS_ES)} de {y}",
+        f"{d:02d} {rng.choice(MONTHS_ES)} {y}",
+        f"{d:02d}{rng.choice(MONTHS_ES)}{y}",
+        f"{d:02d} {rng.choice(MONTHS_EN)} {y}",
+        f"{rng.choice(MONTHS_EN)} {d:02d} {y}",
+        f"{rng.choice(MONTHS_EN)} {d} {yy:02d}",
+        f"{d:02d}/{m:02d}/{y} {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{y + 10}",
+        f"{m:02d}-{d:02d}-{y}",
+    ])
+
+
+def _mx_ine(rng):
+    return [
+        "INSTITUTO NACIONAL ELECTORAL",
+        "CREDENCIAL PARA VOTAR",
+        f"NOMBRE {rng.choice(NAMES)}",
+        f"FECHA DE NACIMIENTO {_date(rng)}",
+        f"CLAVE DE ELECTOR PRGRJN90031209H{rng.randint(100, 999)}",
+        f"EMISION {rng.randint(2010, 2024)} VIGENCIA {rng.randint(2025, 2035)}",
+        f"VIGENCIA {_date(rng)}",
+    ]
+
+
+def _us_dl(rng):
+    return [
+        rng.choice(["CALIFORNIA", "TEXAS", "FLORIDA"]) + " DRIVER LICENSE",
+        f"DL D{rng.randint(1000000, 9999999)}",
+        f"EXP {_date(rng)}",
+        f"4b EXPIRES {_date(rng)}",
+        f"DOB {_date(rng)}",
+        f"4a ISS {_date(rng)}  CLASS C",
+        f"ISSUED {_date(rng)} DD {rng.randint(10**9, 10**10)}",
+        rng.choice(NAMES),
+    ]
+
+
+def _co_cedula(rng):
+    return [
+        "REPUBLICA DE COLOMBIA",
+        "CEDULA DE CIUDADANIA",
+        f"NUMERO {rng.randint(10**7, 10**10)}",
+        f"FECHA Y LUGAR DE NACIMIENTO {_date(rng)} BOGOTA D.C.",
+        f"FECHA Y LUGAR DE EXPEDICION {_date(rng)} MEDELLIN",
+        f"ESTATURA 1.{rng.randint(50, 95)} G.S. RH O+",
+    ]
+
+
+def _passport(rng):
+    return [
+        "PASAPORTE / PASSPORT",
+        f"Apellidos / Surname {rng.choice(NAMES)}",
+        f"Fecha de nacimiento / Date of birth {_date(rng)}",
+        f"Fecha de emision / Date of issue {_date(rng)}",
+        f"Fecha de expiracion / Date of expiry {_date(rng)}",
+        f"Vence / Expires: {_date(rng)} {_date(rng)}",
+        f"P<MEX{rng.choice(NAMES).replace(' ', '<')}<<<<<<<<<<",
+    ]
+
+
+def _noise(rng):
+    return [
+        f"REF {rng.randint(1, 99)} {rng.randint(1, 99)} {rng.randint(1, 9999)}",
+        f"{_date(rng)}{rng.choice(['', 'X', ' 99'])}",
+        f"vigencia{_date(rng)}",
+        f"{rng.choice(MONTHS_EN)}{rng.randint(1, 31)} {rng.randint(10, 2030)}",
+        "",
+        "\t",
+    ]
+
+
+TEMPLATES = [_mx_ine, _us_dl, _co_cedula, _passport]
+LINE_BREAKS = ["\n", "\n", "\n", "\r\n", "\r", "\x0c", " "]
+
+
+def build_corpus(docs, seed):
+    """Documentos (texto, país) reproducibles a partir de la semilla"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(docs):
+        lines = rng.choice(TEMPLATES)(rng)
+        lines += rng.sample(_noise(rng), rng.randint(0, 3))
+        rng.shuffle(lines)
+        if rng.random() < 0.3:
+            lines = [line.lower() if rng.random() < 0.5 else line.title() for line in lines]
+        text = ""
+        for line in lines:
+            text += line + rng.choice(LINE_BREAKS)
+        country = rng.choice(["MX", "US", "CO", "CA", None])
+        corpus.append((text, country))
+    return corpus
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def _snapshot(result):
+    return {key: asdict(info) if info else None for key, info in result.items()}
+
+
+def _time(engine, corpus, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text, country in corpus:
+            engine(text, country)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Motor de fechas: una pasada vs anterior")
+    parser.add_argument("--docs", type=int, default=5000, help="Documentos del corpus")
+    parser.add_argument("--seed", type=int, default=7, help="Semilla del corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se toma la mejor)")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.docs, args.seed)
+
+    mismatches = 0
+    for text, country in corpus:
+        if _snapshot(process_dates_by_type(text, country)) != _snapshot(legacy_process_dates_by_type(text, country)):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"DIFERENCIA ({country}):\n{text!r}\n")
+
+    legacy = _time(legacy_process_dates_by_type, corpus, args.repeat)
+    single = _time(process_dates_by_type, corpus, args.repeat)
+
+    print(f"Documentos:        {len(corpus)}")
+    print(f"Resultados iguales: {len(corpus) - mismatches}/{len(corpus)}")
+    print(f"Motor anterior:    {legacy * 1000:.1f} ms ({legacy / len(corpus) * 1e6:.1f} µs/doc)")
+    print(f"Una pasada:        {single * 1000:.1f} ms ({single / len(corpus) * 1e6:.1f} µs/doc)")
+    print(f"Aceleración:       {legacy / single:.2f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
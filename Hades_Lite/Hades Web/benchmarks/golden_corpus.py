@@ -0,0 +1,509 @@
+"""
+Corpus dorado: regresión de precisión y throughput del análisis, sin red.
+
+Reproduce un corpus de documentos grabados (texto OCR y respuestas de
+Gemini) a través de `analyze_image`. `GenerativeModel.generate_content` se
+reemplaza por un stub que devuelve la respuesta grabada según el prompt
+(OCR, visión forense, traducción o fusionado), así que los prompts, el
+parseo y todo el post-proceso determinista se ejecutan igual que en
+producción.
+
+Reporta:
+- tiempos por etapa del pipeline (p50/p95, de metadata["stages"])
+- documentos/s de las etapas deterministas (país, fechas, extracción,
+  forense) sobre el texto grabado
+- precisión por campo (nombre, id, fechas, país, semáforo) contra las
+  etiquetas doradas
+y lo guarda en JSON para comparar corridas (--baseline).
+
+Formato del corpus: un JSON por documento en la carpeta:
+    {
+      "id": "mx_ine_01",
+      "image": "mx_ine_01.jpg",          (opcional; si falta, imagen en blanco)
+      "responses": {                      (respuesta grabada por tipo de llamada)
+        "ocr": "...", "vision": "...", "translation": "...",
+        "fused": {...}                    (solo modo fusionado)
+      },
+      "latency_ms": {"ocr": 1800, ...},   (opcional, para --replay-latency)
+      "golden": {"name": "...", "id_number": "...", "country": "MX",
+                 "semaforo": "verde", "dates": {"birth": "12/03/1990"}}
+    }
+
+Uso:
+    python benchmarks/golden_corpus.py --corpus benchmarks/golden --out run.json
+    python benchmarks/golden_corpus.py --corpus benchmarks/golden \\
+        --baseline run.json --fail-on-regression
+
+    # Grabar un corpus nuevo con la API real (revisar "golden" a mano):
+    python benchmarks/golden_corpus.py --record --images ./muestras --corpus ./corpus
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import google.generativeai as genai
+from PIL import Image
+
+from hades_core.analyzer import analyze_image, ANALYSIS_MODES
+from hades_core.country import detect_country
+from hades_core.dates.dates import process_dates_by_type
+from hades_core.extraction import extract_all_data
+from hades_core.forensics import FORENSIC_PROMPT, analyze_document_authenticity, score_visual_analysis
+from hades_core.fused import FUSED_PROMPT
+from hades_core.ocr import OCR_PROMPT
+from hades_core.translation import detect_language, should_translate
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+# Campos evaluados (las fechas se evalúan por tipo: dates.birth, ...)
+FIELDS = ("name", "id_number", "country", "semaforo")
+
+DETERMINISTIC_STAGES = ("country", "dates", "extraction", "forensics")
+
+
+# ============================================================
+# STUB DE GEMINI
+# ============================================================
+
+def call_kind(contents) -> Optional[str]:
+    """Tipo de llamada según el prompt: ocr, vision, fused o translation"""
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    texts = [p if isinstance(p, str) else p.get("text", "") for p in parts if isinstance(p, (str, dict))]
+    for text in texts:
+        if text == FUSED_PROMPT:
+            return "fused"
+        if text == OCR_PROMPT:
+            return "ocr"
+        if text == FORENSIC_PROMPT:
+            return "vision"
+        if "Traduce el siguiente texto" in text:
+            return "translation"
+    return None
+
+
+class RecordedResponse:
+    """Respuesta grabada con la interfaz que usa hades_core (`text`)"""
+
+    def __init__(self, text: str, usage: Optional[Dict] = None):
+        self.text = text
+        self.usage_metadata = None
+        if usage:
+            self.usage_metadata = type("Usage", (), {
+                "prompt_token_count": usage.get("prompt_tokens", 0),
+                "candidates_token_count": usage.get("output_tokens", 0),
+                "total_token_count": usage.get("total_tokens", 0),
+            })()
+
+
+class ReplayGemini:
+    """
+    Reemplaza generate_content por las respuestas del documento actual.
+
+    Las etapas corren en hilos, pero los documentos se procesan de a uno:
+    `load(entry)` antes de cada `analyze_image`. Una llamada sin respuesta
+    grabada falla (la etapa queda en error y el resultado es parcial).
+    """
+
+    def __init__(self, replay_latency: float = 0.0):
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._original = (genai.GenerativeModel.generate_content, genai.configure)
+        self.load({})
+
+    def load(self, entry: Dict):
+        with self._lock:
+            self.entry = entry
+            self.calls = []
+
+    def install(self):
+        replay = self
+
+        def generate_content(model_self, contents, *args, **kwargs):
+            kind = call_kind(contents)
+            with replay._lock:
+                replay.calls.append(kind)
+                response = replay.entry.get("responses", {}).get(kind)
+                latency_ms = replay.entry.get("latency_ms", {}).get(kind, 0)
+            if replay.replay_latency and latency_ms:
+                time.sleep(latency_ms / 1000 * replay.replay_latency)
+            if response is None:
+                raise Exception(f"Sin respuesta grabada para la llamada '{kind}'")
+            if not isinstance(response, str):
+                response = json.dumps(response, ensure_ascii=False)
+            return RecordedResponse(response, replay.entry.get("usage", {}).get(kind))
+
+        genai.GenerativeModel.generate_content = generate_content
+        genai.configure = lambda *args, **kwargs: None
+
+    def uninstall(self):
+        genai.GenerativeModel.generate_content, genai.configure = self._original
+
+
+class RecordingGemini:
+    """Envuelve la API real y guarda texto y latencia de cada llamada"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._original = genai.GenerativeModel.generate_content
+        self.reset()
+
+    def reset(self):
+        self.responses = {}
+        self.latency_ms = {}
+
+    def install(self):
+        recorder = self
+        original = self._original
+
+        def generate_content(model_self, contents, *args, **kwargs):
+            start = time.perf_counter()
+            response = original(model_self, contents, *args, **kwargs)
+            elapsed = round((time.perf_counter() - start) * 1000)
+            kind = call_kind(contents)
+            if kind:
+                text = response.text
+                with recorder._lock:
+                    recorder.responses[kind] = json.loads(text) if kind == "fused" else text
+                    recorder.latency_ms[kind] = elapsed
+            return response
+
+        genai.GenerativeModel.generate_content = generate_content
+
+    def uninstall(self):
+        genai.GenerativeModel.generate_content = self._original
+
+
+# ============================================================
+# CORPUS Y PRECISIÓN
+# ============================================================
+
+def load_corpus(corpus_dir: Path) -> List[Dict]:
+    entries = []
+    for path in sorted(corpus_dir.glob("*.json")):
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+        entry.setdefault("id", path.stem)
+        entry["_dir"] = path.parent
+        entries.append(entry)
+    return entries
+
+
+def _blank_image() -> bytes:
+    bio = io.BytesIO()
+    Image.new("RGB", (64, 40), "white").save(bio, format="PNG")
+    return bio.getvalue()
+
+
+def image_bytes_for(entry: Dict) -> bytes:
+    if entry.get("image"):
+        return (entry["_dir"] / entry["image"]).read_bytes()
+    return _blank_image()
+
+
+def _normalize(value) -> Optional[str]:
+    if value is None:
+        return None
+    return " ".join(str(value).split()).lower()
+
+
+def predicted_fields(data: Dict) -> Dict:
+    """Campos evaluables de AnalysisResult.to_dict()"""
+    extracted = data.get("extracted_data") or {}
+    return {
+        "name": extracted.get("name"),
+        "id_number": extracted.get("id_number"),
+        "country": (data.get("country") or {}).get("code"),
+        "semaforo": data.get("semaforo"),
+        "dates": {
+            date_type: (info or {}).get("display")
+            for date_type, info in (data.get("dates") or {}).items()
+        },
+    }
+
+
+def compare_fields(predicted: Dict, golden: Dict) -> Dict[str, bool]:
+    """Campo -> acierto, solo para los campos etiquetados"""
+    checks = {}
+    for field in FIELDS:
+        if field in golden:
+            checks[field] = _normalize(predicted.get(field)) == _normalize(golden[field])
+    for date_type, display in (golden.get("dates") or {}).items():
+        checks[f"dates.{date_type}"] = _normalize(predicted["dates"].get(date_type)) == _normalize(display)
+    return checks
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+# ============================================================
+# EJECUCIÓN
+# ============================================================
+
+def run_pipeline(entries: List[Dict], mode: str, replay: ReplayGemini) -> List[Dict]:
+    """Cada documento por analyze_image con respuestas grabadas"""
+    rows = []
+    for entry in entries:
+        replay.load(entry)
+        start = time.perf_counter()
+        result = analyze_image(image_bytes_for(entry), gemini_api_key="replay", config={"mode": mode})
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        predicted = predicted_fields(result.to_dict())
+        checks = compare_fields(predicted, entry.get("golden", {}))
+        rows.append({
+            "id": entry["id"],
+            "latency_ms": latency_ms,
+            "stages": result.metadata.get("stages", {}),
+            "partial": result.metadata.get("partial", False),
+            "gemini_calls": list(replay.calls),
+            "predicted": predicted,
+            "checks": checks,
+            "mismatches": {
+                field: {"expected": _golden_value(entry["golden"], field), "got": _predicted_value(predicted, field)}
+                for field, ok in checks.items() if not ok
+            },
+        })
+    return rows
+
+
+def _golden_value(golden, field):
+    return golden["dates"][field[6:]] if field.startswith("dates.") else golden[field]
+
+
+def _predicted_value(predicted, field):
+    return predicted["dates"].get(field[6:]) if field.startswith("dates.") else predicted[field]
+
+
+def deterministic_stage(entry: Dict, mode: str):
+    """Etapas deterministas del pipeline sobre el texto grabado (sin hilos)"""
+    responses = entry.get("responses", {})
+    if mode == "fused":
+        fused = responses.get("fused") or {}
+        if isinstance(fused, str):
+            fused = json.loads(fused)
+        text = fused.get("transcription", "")
+        translated = fused.get("translation_es") or text
+        analysis = (fused.get("forensics") or {}).get("analysis", "")
+    else:
+        text = responses.get("ocr", "")
+        translated = responses.get("translation", text) if should_translate(text) else text
+        analysis = responses.get("vision", "")
+
+    def country():
+        return detect_country(text)
+
+    def dates(country_code):
+        return process_dates_by_type(text, country_hint=country_code)
+
+    def extraction(country_code):
+        detect_language(text)
+        return extract_all_data(translated, country=country_code)
+
+    def forensics():
+        score, details = score_visual_analysis(analysis)
+        return analyze_document_authenticity(text, visual=(score, details, analysis))
+
+    return country, dates, extraction, forensics
+
+
+def run_deterministic(entries: List[Dict], mode: str, repeat: int) -> Dict:
+    """Throughput de las etapas deterministas (documentos/s y µs por etapa)"""
+    stages = [deterministic_stage(entry, mode) for entry in entries]
+    totals = dict.fromkeys(DETERMINISTIC_STAGES, 0.0)
+    best_total = None
+    for _ in range(repeat):
+        run_total = 0.0
+        for country, dates, extraction, forensics in stages:
+            t0 = time.perf_counter()
+            code = country()
+            t1 = time.perf_counter()
+            dates(code)
+            t2 = time.perf_counter()
+            extraction(code)
+            t3 = time.perf_counter()
+            forensics()
+            t4 = time.perf_counter()
+            for name, elapsed in zip(DETERMINISTIC_STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3)):
+                totals[name] += elapsed
+            run_total += t4 - t0
+        best_total = run_total if best_total is None else min(best_total, run_total)
+
+    runs = len(entries) * repeat
+    return {
+        "documents": len(entries),
+        "repeat": repeat,
+        "docs_per_sec": round(len(entries) / best_total, 1) if best_total else None,
+        "stage_us_per_doc": {name: round(total / runs * 1e6, 1) for name, total in totals.items()},
+    }
+
+
+def summarize(rows: List[Dict], deterministic: Dict, mode: str) -> Dict:
+    stage_ms = {}
+    for row in rows:
+        for name, stage in row["stages"].items():
+            stage_ms.setdefault(name, []).append(stage["elapsed_ms"])
+
+    field_checks = {}
+    for row in rows:
+        for field, ok in row["checks"].items():
+            field_checks.setdefault(field, []).append(ok)
+    all_checks = [ok for checks in field_checks.values() for ok in checks]
+
+    latencies = [row["latency_ms"] for row in rows]
+    return {
+        "mode": mode,
+        "documents": len(rows),
+        "partial_results": sum(1 for row in rows if row["partial"]),
+        "pipeline_ms": {
+            "mean": round(statistics.mean(latencies), 2),
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+        } if latencies else {},
+        "stages_ms": {
+            name: {"p50": round(_percentile(values, 50), 2), "p95": round(_percentile(values, 95), 2)}
+            for name, values in stage_ms.items()
+        },
+        "deterministic": deterministic,
+        "accuracy": {
+            field: round(sum(checks) / len(checks), 4) for field, checks in sorted(field_checks.items())
+        },
+        "accuracy_overall": round(sum(all_checks) / len(all_checks), 4) if all_checks else None,
+    }
+
+
+def compare_reports(summary: Dict, baseline: Dict, tolerance: float = 0.0) -> List[str]:
+    """Regresiones de precisión respecto a una corrida anterior"""
+    regressions = []
+    for field, value in baseline.get("accuracy", {}).items():
+        current = summary["accuracy"].get(field)
+        if current is not None and current < value - tolerance:
+            regressions.append(f"{field}: {value:.4f} -> {current:.4f}")
+    if summary["partial_results"] > baseline.get("partial_results", 0):
+        regressions.append(
+            f"partial_results: {baseline.get('partial_results', 0)} -> {summary['partial_results']}"
+        )
+    return regressions
+
+
+def run_corpus(corpus_dir: Path, mode: str = "multi", repeat: int = 20, replay_latency: float = 0.0) -> Dict:
+    """Corre el corpus completo y devuelve el reporte (summary + rows)"""
+    entries = load_corpus(corpus_dir)
+    if not entries:
+        raise ValueError(f"No hay documentos en {corpus_dir}")
+
+    replay = ReplayGemini(replay_latency=replay_latency)
+    replay.install()
+    try:
+        rows = run_pipeline(entries, mode, replay)
+    finally:
+        replay.uninstall()
+
+    deterministic = run_deterministic(entries, mode, repeat)
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "corpus": str(corpus_dir),
+        "summary": summarize(rows, deterministic, mode),
+        "rows": rows,
+    }
+
+
+def record_corpus(images_dir: Path, corpus_dir: Path, api_key: str, mode: str):
+    """Graba respuestas reales; "golden" se llena con el resultado actual para revisar"""
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    recorder = RecordingGemini()
+    recorder.install()
+    try:
+        for image_path in sorted(p for p in images_dir.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS):
+            recorder.reset()
+            result = analyze_image(image_path.read_bytes(), gemini_api_key=api_key, config={"mode": mode})
+            predicted = predicted_fields(result.to_dict())
+            entry = {
+                "id": image_path.stem,
+                "image": os.path.relpath(image_path, corpus_dir),
+                "responses": recorder.responses,
+                "latency_ms": recorder.latency_ms,
+                "golden": {
+                    **{field: predicted[field] for field in FIELDS if predicted[field] is not None},
+                    "dates": {k: v for k, v in predicted["dates"].items() if v},
+                },
+            }
+            out = corpus_dir / f"{image_path.stem}.json"
+            with open(out, "w", encoding="utf-8") as f:
+                json.dump(entry, f, indent=2, ensure_ascii=False)
+            print(f"Grabado {out} ({', '.join(recorder.responses)}) - revisar 'golden'")
+    finally:
+        recorder.uninstall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Corpus dorado: precisión y throughput sin red")
+    parser.add_argument("--corpus", default=str(Path(__file__).resolve().parent / "golden"),
+                        help="Carpeta con un JSON por documento")
+    parser.add_argument("--mode", default="multi", choices=ANALYSIS_MODES)
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones de las etapas deterministas")
+    parser.add_argument("--replay-latency", type=float, default=0.0,
+                        help="Escala de la latencia grabada (0 = respuestas instantáneas)")
+    parser.add_argument("--out", help="Guardar el reporte en JSON")
+    parser.add_argument("--baseline", help="Reporte anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="Caída de precisión tolerada")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Código de salida 1 si hay regresión")
+    parser.add_argument("--record", action="store_true", help="Grabar un corpus con la API real")
+    parser.add_argument("--images", help="Carpeta de imágenes (solo --record)")
+    parser.add_argument("--api-key", default=os.getenv("GEMINI_API_KEY"))
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.images or not args.api_key:
+            parser.error("--record requiere --images y GEMINI_API_KEY (o --api-key)")
+        record_corpus(Path(args.images), Path(args.corpus), args.api_key, args.mode)
+        return
+
+    report = run_corpus(Path(args.corpus), args.mode, args.repeat, args.replay_latency)
+    summary = report["summary"]
+
+    for row in report["rows"]:
+        status = "OK" if not row["mismatches"] and not row["partial"] else "FALLA"
+        print(f"{status:5} {row['id']:30} {row['latency_ms']:>8.1f} ms  {len(row['gemini_calls'])} llamadas")
+        for field, diff in row["mismatches"].items():
+            print(f"      {field}: esperado {diff['expected']!r}, obtenido {diff['got']!r}")
+
+    print("\nRESUMEN")
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+        print(f"Reporte guardado en {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["summary"]
+        regressions = compare_reports(summary, baseline, args.tolerance)
+        speed = summary["deterministic"]["docs_per_sec"]
+        base_speed = baseline.get("deterministic", {}).get("docs_per_sec")
+        if speed and base_speed:
+            print(f"\nThroughput determinista: {base_speed} -> {speed} docs/s ({speed / base_speed:.2f}x)")
+        if regressions:
+            print("REGRESIONES:\n  " + "\n  ".join(regressions))
+            if args.fail_on_regression:
+                sys.exit(1)
+        else:
+            print("Sin regresiones de precisión")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,14 @@ Módulo de autenticación.
 """
 
 from .keycloak import verify_token, has_role, security
-from .dependencies import get_current_user, require_role, require_admin, require_analyst
+from .dependencies import get_current_user, get_websocket_user, require_role, require_admin, require_analyst
 
 __all__ = [
     "verify_token",
     "has_role",
     "security",
     "get_current_user",
+    "get_websocket_user",
     "require_role",
     "require_admin",
     "require_analyst"
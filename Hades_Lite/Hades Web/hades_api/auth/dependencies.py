@@ -3,7 +3,7 @@ Dependencias de autenticación para FastAPI
 MODO DESARROLLO: Autenticación deshabilitada temporalmente
 """
 
-from fastapi import Depends, HTTPException, status, Security
+from fastapi import Depends, HTTPException, Query, status, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, Dict
 
@@ -36,6 +36,15 @@ async def get_current_user(
     print("[DEV MODE] Using mock user authentication")
     return DEV_USER
 
+async def get_websocket_user(
+    token: Optional[str] = Query(None, description="Token de acceso (los navegadores no envían headers en WebSocket)")
+) -> Dict:
+    """
+    MODO DESARROLLO: Retorna usuario mock sin validación
+    """
+    print("[DEV MODE] Using mock user authentication (websocket)")
+    return DEV_USER
+
 async def require_analyst(current_user: Dict = Depends(get_current_user)) -> Dict:
     """
     MODO DESARROLLO: Siempre permite acceso
@@ -24,6 +24,10 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Pool de conexiones (por engine: el síncrono y el asíncrono de las rutas)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # Segundos esperando una conexión libre
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -36,6 +40,7 @@ class Settings(BaseSettings):
     
     # Gemini (opcional - se puede configurar desde UI)
     GEMINI_API_KEY: Optional[str] = None
+    ANALYSIS_MODE: str = "multi"  # "multi" (OCR/visión/traducción por separado) o "fused" (una llamada)
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
@@ -46,14 +51,53 @@ class Settings(BaseSettings):
     # Google Drive (opcional en .env, se puede usar st.secrets)
     GOOGLE_SA_JSON_B64: Optional[str] = None
     GOOGLE_DRIVE_FOLDER_ID: Optional[str] = "1eexrVXQYRZLk9hnJwLVYJp5PkYnjx2bt"
+    DRIVE_FOLDER_CACHE_TTL: int = 3600  # Segundos que se cachea el ID de cada carpeta por fecha
     
     # Async Processing (Toggle)
     ASYNC_PROCESSING: bool = False  # True = Celery, False = Sync
     
+    # Almacén de imágenes para el worker (solo se encola la clave)
+    BLOB_STORE_BACKEND: str = "local"  # "local" o "s3"
+    BLOB_STORE_PATH: str = "/tmp/hades_blobs"  # Debe ser compartido con el worker
+    BLOB_S3_BUCKET: Optional[str] = None
+    BLOB_S3_PREFIX: str = "hades/"
+    BLOB_S3_ENDPOINT_URL: Optional[str] = None  # MinIO / R2 / etc.
+    BLOB_ORPHAN_TTL_HOURS: int = 24  # Blobs de jobs que nunca terminaron
+    
+    # Métricas del worker (GET /metrics, formato Prometheus)
+    METRICS_QUEUES: str = "ocr,forensics,drive,celery"  # Colas de Celery a medir
+    
+    # Eventos de estado (SSE / WebSocket sobre Redis pub/sub)
+    EVENTS_HEARTBEAT_SECONDS: int = 15  # Keep-alive para proxies
+    EVENTS_MAX_SECONDS: int = 900  # Duración máxima de una conexión
+    
+    # Subida múltiple (POST /jobs/batch)
+    BATCH_MAX_FILES: int = 10
+    
+    # Modo síncrono: pool acotado fuera del event loop
+    SYNC_MAX_CONCURRENCY: int = 4  # Análisis simultáneos
+    SYNC_MAX_QUEUE: int = 8  # Análisis en espera antes de responder 503
+    SYNC_RETRY_AFTER: int = 30  # Segundos sugeridos en Retry-After
+    
+    # Rollups del panel de administración (services/rollups.py)
+    ROLLUP_MAX_AGE_SECONDS: int = 300  # Antigüedad máxima antes de recalcular al leer
+    ROLLUP_WINDOW_DAYS: int = 2  # Días hacia atrás que se recalculan en cada actualización
+    
+    # Reutilización de resultados por contenido de imagen
+    DEDUPE_ENABLED: bool = True
+    # Distancia máxima (bits de 256) para casi-duplicados; 0 = solo SHA-256 exacto.
+    # Opcional: documentos distintos de la misma plantilla quedan a 0-3 bits.
+    DEDUPE_PHASH_MAX_DISTANCE: int = 0
+    DEDUPE_PHASH_SCAN_LIMIT: int = 500
+    
     @property
     def cors_origins_list(self) -> list[str]:
         """Parse CORS origins from comma-separated string"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
+    
+    @property
+    def metrics_queues_list(self) -> list[str]:
+        return [queue.strip() for queue in self.METRICS_QUEUES.split(",") if queue.strip()]
 
 
 settings = Settings()
@@ -2,20 +2,41 @@
 Configuración de la base de datos.
 
 SQLAlchemy setup y session management.
+
+Dos engines sobre la misma base:
+- Síncrono (psycopg2): worker de Celery, migraciones, subidas (los objetos
+  del job se comparten con el pool de análisis) y Streamlit.
+- Asíncrono (asyncpg): rutas de lectura de la API, sin bloquear el event
+  loop. Se crea en el primer uso: el worker no lo necesita.
 """
 
-from sqlalchemy import create_engine
+from pathlib import Path
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
+try:
+    import greenlet  # noqa: F401  (requerido por sqlalchemy.ext.asyncio)
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    ASYNC_DB_AVAILABLE = True
+except ImportError:
+    ASYNC_DB_AVAILABLE = False
+
+
+# Pool de conexiones (igual para ambos engines)
+POOL_OPTIONS = {
+    "pool_pre_ping": True,
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+}
+
+
 # Engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+engine = create_engine(settings.DATABASE_URL, **POOL_OPTIONS)
 
 # Session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -24,6 +45,84 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def async_database_url(url: str) -> str:
+    """URL equivalente con driver asíncrono (asyncpg / aiosqlite)"""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    """Engine asíncrono de las rutas (se crea en el primer uso)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        if not ASYNC_DB_AVAILABLE:
+            raise RuntimeError("SQLAlchemy asíncrono no disponible (pip install 'sqlalchemy[asyncio]' asyncpg)")
+        _async_engine = create_async_engine(async_database_url(settings.DATABASE_URL), **POOL_OPTIONS)
+        _async_session_factory = async_sessionmaker(
+            _async_engine,
+            autoflush=False,
+            expire_on_commit=False  # Las rutas devuelven los objetos después del commit
+        )
+    return _async_engine
+
+
+def async_session() -> "AsyncSession":
+    """Sesión asíncrona nueva (usar con `async with`)"""
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def dispose_async_engine():
+    """Cierra las conexiones del engine asíncrono (apagado de la API)"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+def _pool_stats(pool) -> Dict[str, Any]:
+    stats = {"pool": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+        })
+    return stats
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Uso de los pools de conexiones (health check)"""
+    stats = {"sync": _pool_stats(engine.pool)}
+    if _async_engine is not None:
+        stats["async"] = _pool_stats(_async_engine.sync_engine.pool)
+    return stats
+
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+def run_migrations():
+    """
+    Aplica los scripts SQL de `migrations/` en orden.
+    
+    `create_all` solo crea tablas nuevas; los cambios a tablas existentes
+    (columnas, índices) van en scripts idempotentes (IF NOT EXISTS).
+    """
+    for script in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        with engine.begin() as conn:
+            conn.execute(text(script.read_text(encoding="utf-8")))
+
+
 def get_db():
     """
     Dependency para obtener sesión de DB.
@@ -38,3 +137,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency para obtener sesión asíncrona de DB.
+    
+    Uso:
+        @app.get("/items")
+        async def get_items(db: AsyncSession = Depends(get_async_db)):
+            return (await db.execute(select(Item))).scalars().all()
+    
+    Los servicios síncronos se llaman con `await db.run_sync(servicio, ...)`.
+    """
+    async with async_session() as db:
+        yield db
@@ -7,11 +7,13 @@ FastAPI application con autenticación Keycloak.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routes import health, jobs, admin, export
-from .database import engine, Base
+from .database import engine, Base, dispose_async_engine, run_migrations
 from .config import settings
+from .services.pagination import NEXT_CURSOR_HEADER
 
-# Crear tablas
+# Crear tablas y aplicar migraciones
 Base.metadata.create_all(bind=engine)
+run_migrations()
 
 # App
 app = FastAPI(
@@ -29,6 +31,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # El cursor de la página siguiente viaja en un header: sin exponerlo el
+    # navegador no lo deja leer
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Routers
@@ -49,4 +54,5 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Evento de cierre"""
+    await dispose_async_engine()
     print(f"👋 {settings.APP_NAME} detenido")
@@ -0,0 +1,11 @@
+-- Huella de la imagen para reutilizar resultados (services/result_cache.py).
+-- create_all no agrega columnas a tablas existentes.
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS perceptual_hash VARCHAR(64);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS analysis_version VARCHAR;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS cache_hit BOOLEAN NOT NULL DEFAULT FALSE;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS reused_from_job_id UUID;
+
+CREATE INDEX IF NOT EXISTS ix_jobs_content_hash_version ON jobs (content_hash, analysis_version);
+CREATE INDEX IF NOT EXISTS ix_jobs_perceptual_hash ON jobs (perceptual_hash);
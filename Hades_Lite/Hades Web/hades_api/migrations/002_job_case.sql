@@ -0,0 +1,5 @@
+-- Jobs agrupados en casos (POST /jobs/batch). La tabla cases la crea create_all.
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS case_id UUID REFERENCES cases (id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS ix_jobs_case_id ON jobs (case_id);
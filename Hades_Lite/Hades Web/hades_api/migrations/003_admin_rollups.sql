@@ -0,0 +1,26 @@
+-- Panel de administración (services/rollups.py). Las tablas job_daily_stats
+-- y rollup_state las crea create_all.
+
+-- Ventana de recálculo de rollups por fecha de finalización
+CREATE INDEX IF NOT EXISTS ix_jobs_completed_at ON jobs (completed_at);
+
+-- Búsqueda de email con ILIKE '%texto%' (GET /admin/jobs?user_email=).
+-- Crear la extensión puede requerir permisos que el usuario de la API no
+-- tiene: en ese caso la API arranca igual (la búsqueda recorre la tabla)
+-- y un DBA debe ejecutar una vez `CREATE EXTENSION pg_trgm;` en la base.
+-- El índice se crea en el siguiente arranque.
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+EXCEPTION WHEN insufficient_privilege THEN
+    RAISE NOTICE 'pg_trgm no instalada (sin permisos): ejecutar CREATE EXTENSION pg_trgm como DBA';
+END
+$$;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+        CREATE INDEX IF NOT EXISTS ix_jobs_user_email_trgm ON jobs USING gin (user_email gin_trgm_ops);
+    END IF;
+END
+$$;
@@ -0,0 +1,41 @@
+-- Resultado en JSONB sin textos largos (services/job_results.py). La tabla
+-- job_result_texts la crea create_all.
+
+-- json -> jsonb (solo la primera vez: reescribe la tabla)
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'jobs' AND column_name = 'result') = 'json' THEN
+        ALTER TABLE jobs ALTER COLUMN result TYPE jsonb USING result::jsonb;
+    END IF;
+END $$;
+
+-- Filtros del panel (id_type, vencido, ...) con contención `result @> ...`
+CREATE INDEX IF NOT EXISTS ix_jobs_result_gin ON jobs USING gin (result);
+
+-- Textos con lz4 si el servidor lo soporta (PostgreSQL 14+); si no, pglz
+DO $$
+BEGIN
+    IF current_setting('server_version_num')::int >= 140000 THEN
+        ALTER TABLE job_result_texts ALTER COLUMN ocr_text SET COMPRESSION lz4;
+        ALTER TABLE job_result_texts ALTER COLUMN ocr_text_translated SET COMPRESSION lz4;
+        ALTER TABLE job_result_texts ALTER COLUMN visual_analysis SET COMPRESSION lz4;
+    END IF;
+EXCEPTION WHEN others THEN
+    RAISE NOTICE 'job_result_texts sin lz4: %', SQLERRM;
+END $$;
+
+-- Mover los textos de jobs anteriores (todo resultado trae ocr_text; el
+-- índice GIN resuelve `?` y después de la primera vez no hay filas)
+INSERT INTO job_result_texts (job_id, ocr_text, ocr_text_translated, visual_analysis)
+SELECT id,
+       result ->> 'ocr_text',
+       result ->> 'ocr_text_translated',
+       result -> 'forensics' ->> 'visual_analysis'
+FROM jobs
+WHERE result ? 'ocr_text'
+ON CONFLICT (job_id) DO NOTHING;
+
+UPDATE jobs
+SET result = (result - 'ocr_text' - 'ocr_text_translated') #- '{forensics,visual_analysis}'
+WHERE result ? 'ocr_text';
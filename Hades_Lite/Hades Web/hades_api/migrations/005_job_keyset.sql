@@ -0,0 +1,5 @@
+-- Paginación por cursor (created_at, id) de GET /jobs y GET /admin/jobs
+-- (services/pagination.py).
+
+CREATE INDEX IF NOT EXISTS ix_jobs_created_at_id ON jobs (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_jobs_user_created_at_id ON jobs (user_id, created_at, id);
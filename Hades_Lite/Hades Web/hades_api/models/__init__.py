@@ -2,6 +2,8 @@
 Modelos de base de datos.
 """
 
-from .job import Job, JobStatus
+from .job import Job, JobStatus, JobResultText
+from .case import Case, CaseStatus
+from .rollup import JobDailyStat, RollupState
 
-__all__ = ["Job", "JobStatus"]
+__all__ = ["Job", "JobStatus", "JobResultText", "Case", "CaseStatus", "JobDailyStat", "RollupState"]
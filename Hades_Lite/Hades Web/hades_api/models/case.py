@@ -0,0 +1,69 @@
+"""
+Modelo de Caso: varios documentos de una misma verificación.
+
+Ej: frente y reverso de la identificación + comprobante de domicilio.
+"""
+
+from sqlalchemy import Column, String, DateTime, JSON, Boolean, Integer, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+import enum
+
+from ..database import Base
+
+
+class CaseStatus(str, enum.Enum):
+    """Estados posibles de un caso"""
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    COMPLETED = "completed"  # Todos los documentos completados
+    PARTIAL = "partial"      # Terminó con algún documento fallido
+    FAILED = "failed"        # Todos los documentos fallaron
+
+
+class Case(Base):
+    """
+    Modelo de Caso de verificación.
+    
+    Agrupa los jobs subidos juntos en POST /jobs/batch. El semáforo del
+    caso es el peor de sus documentos y se exporta a Drive una sola vez.
+    """
+    __tablename__ = "cases"
+    
+    # ID
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    
+    # Usuario (de Keycloak)
+    user_id = Column(String, nullable=False, index=True)
+    user_email = Column(String, nullable=True)
+    user_name = Column(String, nullable=True)
+    
+    # Estado
+    status = Column(
+        SQLEnum(CaseStatus),
+        default=CaseStatus.QUEUED,
+        nullable=False,
+        index=True
+    )
+    total_jobs = Column(Integer, nullable=False, default=0)
+    
+    # Resultado agregado
+    semaforo = Column(String, nullable=True, index=True)  # Peor de los documentos
+    score = Column(Integer, nullable=True)  # Máximo de los documentos
+    summary = Column(JSON, nullable=True)
+    
+    # Exportación a Drive (una por caso)
+    exported_to_drive = Column(Boolean, default=False)
+    drive_file_id = Column(String, nullable=True)
+    drive_url = Column(String, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    completed_at = Column(DateTime, nullable=True)
+    
+    # Celery chord ID (para tracking asíncrono)
+    celery_task_id = Column(String, nullable=True)
+    
+    def __repr__(self):
+        return f"<Case {self.id} - {self.status}>"
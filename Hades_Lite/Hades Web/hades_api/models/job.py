@@ -2,8 +2,9 @@
 Modelo de Job para análisis de documentos.
 """
 
-from sqlalchemy import Column, String, DateTime, JSON, Boolean, Integer, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, JSON, Boolean, Integer, Index, ForeignKey, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
 import enum
@@ -26,6 +27,13 @@ class Job(Base):
     Representa un análisis de documento en el sistema.
     """
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Búsqueda de resultados reutilizables (ver services/result_cache.py)
+        Index("ix_jobs_content_hash_version", "content_hash", "analysis_version"),
+        # Paginación por cursor (ver services/pagination.py)
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index("ix_jobs_user_created_at_id", "user_id", "created_at", "id"),
+    )
     
     # ID
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -43,8 +51,15 @@ class Job(Base):
         index=True
     )
     
-    # Resultado del análisis (JSON completo)
-    result = Column(JSON, nullable=True)
+    # Resultado del análisis sin los textos largos (JSONB en PostgreSQL).
+    # Los textos van en job_result_texts: ver services/job_results.py
+    result = Column(JSONB().with_variant(JSON(), "sqlite"), nullable=True)
+    result_texts = relationship(
+        "JobResultText",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
     
     # Exportación a Drive
     exported_to_drive = Column(Boolean, default=False)
@@ -61,11 +76,26 @@ class Job(Base):
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     started_at = Column(DateTime, nullable=True)
-    completed_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True, index=True)  # Ventana de rollups
     
     # Error (si falla)
     error_message = Column(String, nullable=True)
     
+    # Huella de la imagen (deduplicación de re-subidas)
+    content_hash = Column(String(64), nullable=True)  # SHA-256
+    perceptual_hash = Column(String(64), nullable=True, index=True)  # dHash 256 bits
+    analysis_version = Column(String, nullable=True)  # hades_core.__version__/modo
+    cache_hit = Column(Boolean, default=False, nullable=False)
+    reused_from_job_id = Column(UUID(as_uuid=True), nullable=True)
+    
+    # Caso al que pertenece (subida múltiple, ver models/case.py)
+    case_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("cases.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
+    )
+    
     # Celery task ID (para tracking asíncrono)
     celery_task_id = Column(String, nullable=True)
     
@@ -74,3 +104,27 @@ class Job(Base):
     
     def __repr__(self):
         return f"<Job {self.id} - {self.status}>"
+
+
+class JobResultText(Base):
+    """
+    Textos largos del resultado de un job (OCR, traducción, análisis visual).
+    
+    Separados de `jobs.result` para que listas, filtros e índices GIN no
+    carguen ni indexen varios KB de texto por fila. PostgreSQL los comprime
+    y guarda fuera de línea (TOAST); solo se leen al pedir el resultado
+    completo.
+    """
+    __tablename__ = "job_result_texts"
+    
+    job_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("jobs.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    ocr_text = Column(Text, nullable=True)
+    ocr_text_translated = Column(Text, nullable=True)
+    visual_analysis = Column(Text, nullable=True)  # result["forensics"]["visual_analysis"]
+    
+    def __repr__(self):
+        return f"<JobResultText {self.job_id}>"
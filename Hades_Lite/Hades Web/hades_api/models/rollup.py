@@ -0,0 +1,47 @@
+"""
+Tablas de resumen (rollups) para el panel de administración.
+
+Ver services/rollups.py: se recalculan por ventana de días en lugar de
+agregar la tabla jobs completa en cada carga del panel.
+"""
+
+from sqlalchemy import Column, String, Date, DateTime, Integer, BigInteger, Enum as SQLEnum
+
+from ..database import Base
+from .job import JobStatus
+
+
+class JobDailyStat(Base):
+    """
+    Jobs terminados por día × estado × país × semáforo × usuario.
+
+    El día es el de `completed_at` (UTC). País, semáforo y email usan ""
+    cuando el job no los tiene (forman parte de la clave primaria).
+    """
+    __tablename__ = "job_daily_stats"
+
+    # Dimensiones
+    day = Column(Date, primary_key=True)
+    status = Column(SQLEnum(JobStatus), primary_key=True)
+    country = Column(String, primary_key=True, default="")
+    semaforo = Column(String, primary_key=True, default="")
+    user_email = Column(String, primary_key=True, default="")
+    user_name = Column(String, nullable=True)
+
+    # Métricas
+    jobs = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+    score_count = Column(Integer, nullable=False, default=0)
+    cache_hits = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<JobDailyStat {self.day} {self.status} {self.country} {self.semaforo} {self.user_email}: {self.jobs}>"
+
+
+class RollupState(Base):
+    """Última actualización de los rollups (una sola fila, id=1)"""
+    __tablename__ = "rollup_state"
+
+    id = Column(Integer, primary_key=True)
+    refreshed_at = Column(DateTime, nullable=True)
+    rebuilt_at = Column(DateTime, nullable=True)
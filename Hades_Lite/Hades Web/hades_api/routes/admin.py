@@ -2,15 +2,18 @@
 Endpoints del panel de administración.
 """
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import Optional, List
 
 from ..auth.dependencies import require_admin
-from ..database import get_db
-from ..models.job import Job, JobStatus
+from ..database import get_async_db
+from ..models.job import Job
 from ..schemas.job import JobListItem
+from ..services.job_results import list_select, result_filter
+from ..services.pagination import NEXT_CURSOR_HEADER, fetch_page
+from ..services.rollups import ensure_fresh, refresh_rollups, rollup_stats, rollup_users
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -18,93 +21,94 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 @router.get("/stats")
 async def get_stats(
     current_user: dict = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Estadísticas generales del sistema.
     
     Solo para admins.
     
+    Se leen de los rollups (services/rollups.py), actualizados cada
+    ROLLUP_MAX_AGE_SECONDS como máximo; los jobs en curso se cuentan en vivo.
+    
     Retorna:
     - Total de jobs
     - Jobs por estado
     - Jobs por país
     - Jobs por semáforo
     - Jobs por usuario
+    - Aciertos del caché de resultados
     """
-    # Total de jobs
-    total_jobs = db.query(func.count(Job.id)).scalar()
-    
-    # Por estado
-    jobs_by_status = db.query(
-        Job.status,
-        func.count(Job.id)
-    ).group_by(Job.status).all()
-    
-    # Por país
-    jobs_by_country = db.query(
-        Job.country_detected,
-        func.count(Job.id)
-    ).filter(Job.country_detected.isnot(None)).group_by(Job.country_detected).all()
-    
-    # Por semáforo
-    jobs_by_semaforo = db.query(
-        Job.semaforo,
-        func.count(Job.id)
-    ).filter(Job.semaforo.isnot(None)).group_by(Job.semaforo).all()
-    
-    # Por usuario (top 10)
-    jobs_by_user = db.query(
-        Job.user_email,
-        func.count(Job.id).label("count")
-    ).filter(Job.user_email.isnot(None)).group_by(Job.user_email).order_by(
-        func.count(Job.id).desc()
-    ).limit(10).all()
-    
-    # Score promedio
-    avg_score = db.query(func.avg(Job.score)).filter(Job.score.isnot(None)).scalar()
+    await db.run_sync(ensure_fresh)
+    return await db.run_sync(rollup_stats)
+
+
+@router.post("/rollups/rebuild")
+async def rebuild_rollups(
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Reconstruye los rollups desde la tabla jobs completa.
     
-    return {
-        "total_jobs": total_jobs,
-        "by_status": {str(status): count for status, count in jobs_by_status},
-        "by_country": {country: count for country, count in jobs_by_country},
-        "by_semaforo": {semaforo: count for semaforo, count in jobs_by_semaforo},
-        "by_user": [{"email": email, "count": count} for email, count in jobs_by_user],
-        "avg_score": round(avg_score, 2) if avg_score else 0
-    }
+    Solo para admins. Normalmente no hace falta: el worker los reconstruye
+    a diario.
+    """
+    summary = await db.run_sync(_rebuild)
+    return {"message": "Rollups reconstruidos", **summary}
+
+
+def _rebuild(db: Session) -> dict:
+    summary = refresh_rollups(db, full=True)
+    db.commit()
+    return summary
 
 
 @router.get("/jobs", response_model=List[JobListItem])
 async def get_all_jobs(
-    skip: int = Query(default=0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(default=None, description="Cursor de la página (header X-Next-Cursor)"),
+    skip: int = Query(default=0, ge=0, deprecated=True),
     limit: int = Query(default=50, ge=1, le=100),
     country: Optional[str] = Query(default=None),
     semaforo: Optional[str] = Query(default=None),
     status: Optional[str] = Query(default=None),
     user_email: Optional[str] = Query(default=None),
+    id_type: Optional[str] = Query(default=None, description="Tipo de documento extraído"),
+    expired: Optional[bool] = Query(default=None, description="Documento vencido según la fecha de expiración"),
     current_user: dict = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Ver todos los jobs del sistema con filtros.
     
-    Solo para admins.
+    Solo para admins. Paginación por cursor como GET /jobs.
     """
-    # Query base
-    query = db.query(Job)
+    # Query base (solo las columnas de la lista)
+    query = list_select()
     
     # Filtros
     if country:
-        query = query.filter(Job.country_detected == country)
+        query = query.where(Job.country_detected == country)
     if semaforo:
-        query = query.filter(Job.semaforo == semaforo)
+        query = query.where(Job.semaforo == semaforo)
     if status:
-        query = query.filter(Job.status == status)
+        query = query.where(Job.status == status)
     if user_email:
-        query = query.filter(Job.user_email.ilike(f"%{user_email}%"))
+        # Índice trigram (migrations/003): ILIKE '%texto%' sin recorrer la tabla
+        pattern = user_email.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.where(Job.user_email.ilike(f"%{pattern}%", escape="\\"))
+    if id_type or expired is not None:
+        # Índice GIN sobre result (migrations/004): contención JSONB
+        query = query.where(*result_filter(id_type=id_type, expired=expired))
     
-    # Ordenar y paginar
-    jobs = query.order_by(Job.created_at.desc()).offset(skip).limit(limit).all()
+    # Ordenar y paginar (cursor por índice, ver services/pagination.py)
+    try:
+        jobs, next_cursor = await fetch_page(db, query, cursor, limit, skip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     return jobs
 
@@ -112,30 +116,12 @@ async def get_all_jobs(
 @router.get("/users")
 async def get_users_stats(
     current_user: dict = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Estadísticas de usuarios.
+    Estadísticas de usuarios (jobs terminados, desde los rollups).
     
     Solo para admins.
     """
-    users = db.query(
-        Job.user_email,
-        Job.user_name,
-        func.count(Job.id).label("total_jobs"),
-        func.count(func.nullif(Job.status == JobStatus.COMPLETED, False)).label("completed"),
-        func.count(func.nullif(Job.status == JobStatus.FAILED, False)).label("failed")
-    ).filter(Job.user_email.isnot(None)).group_by(
-        Job.user_email, Job.user_name
-    ).order_by(func.count(Job.id).desc()).all()
-    
-    return [
-        {
-            "email": email,
-            "name": name,
-            "total_jobs": total,
-            "completed": completed,
-            "failed": failed
-        }
-        for email, name, total, completed, failed in users
-    ]
+    await db.run_sync(ensure_fresh)
+    return await db.run_sync(rollup_users)
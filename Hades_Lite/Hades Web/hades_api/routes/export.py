@@ -3,12 +3,16 @@ Endpoints para exportación a Google Drive.
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 import uuid
 
 from ..auth.dependencies import get_current_user
-from ..database import get_db
+from ..database import get_async_db
 from ..models.job import Job
+from ..services.job_results import full_result
 from ..services.drive import export_result_to_drive, validate_folder, DRIVE_FOLDER_ID
 
 router = APIRouter(prefix="/export", tags=["export"])
@@ -18,15 +22,17 @@ router = APIRouter(prefix="/export", tags=["export"])
 async def export_job_to_drive(
     job_id: uuid.UUID,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Exporta manualmente un job a Google Drive.
     
     Útil si la exportación automática falló o se desactivó.
     """
-    # Buscar job
-    job = db.query(Job).filter(Job.id == job_id).first()
+    # Buscar job (con los textos del resultado)
+    job = (await db.execute(
+        select(Job).options(joinedload(Job.result_texts)).where(Job.id == job_id)
+    )).scalars().first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Job no encontrado")
@@ -53,10 +59,11 @@ async def export_job_to_drive(
             detail="Job no tiene resultado para exportar"
         )
     
-    # Exportar
+    # Exportar (bloqueante: fuera del event loop)
     try:
-        success, file_id, web_link, error = export_result_to_drive(
-            job.result,
+        success, file_id, web_link, error = await run_in_threadpool(
+            export_result_to_drive,
+            full_result(job),
             job.user_email or current_user.get("email", "unknown"),
             str(job.id)
         )
@@ -71,7 +78,7 @@ async def export_job_to_drive(
         job.exported_to_drive = True
         job.drive_file_id = file_id
         job.drive_url = web_link
-        db.commit()
+        await db.commit()
         
         return {
             "message": "Exportado exitosamente a Google Drive",
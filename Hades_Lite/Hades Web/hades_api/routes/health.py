@@ -2,9 +2,14 @@
 Endpoints de health check.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import Response
 from datetime import datetime
 
+from ..database import pool_stats
+from ..services import task_metrics
+from ..services.analysis_pool import analysis_pool
+
 router = APIRouter(tags=["health"])
 
 
@@ -18,10 +23,30 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "service": "hades-api"
+        "service": "hades-api",
+        "analysis_pool": analysis_pool.stats(),
+        "database_pool": pool_stats()
     }
 
 
+@router.get("/metrics")
+def metrics():
+    """
+    Métricas del worker en formato de texto de Prometheus.
+    
+    Profundidad de las colas de Celery y duración/estado de las tareas,
+    para decidir el autoescalado de cada tipo de worker (ocr, forensics,
+    drive). Ver services/task_metrics.py.
+    """
+    if not task_metrics.REDIS_AVAILABLE:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="redis no está instalado")
+    try:
+        snapshot = task_metrics.collect()
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Redis no disponible: {e}")
+    return Response(content=task_metrics.render(snapshot), media_type=task_metrics.CONTENT_TYPE)
+
+
 @router.get("/")
 async def root():
     """
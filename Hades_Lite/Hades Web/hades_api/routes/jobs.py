@@ -2,17 +2,47 @@
 Endpoints para gestión de jobs.
 """
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Header
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import asyncio
+import time
+from fastapi import (
+    APIRouter, Depends, UploadFile, File, HTTPException, Query, Header,
+    Request, Response, WebSocket, WebSocketDisconnect
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional, Tuple
 import uuid
 from datetime import datetime
 
-from ..auth.dependencies import get_current_user, require_analyst
-from ..database import get_db
+from ..auth.dependencies import get_current_user, get_websocket_user, require_analyst
+from ..database import async_session, get_async_db, get_db
 from ..models.job import Job, JobStatus
-from ..schemas.job import JobCreate, JobResponse, JobResult, JobListItem
+from ..models.case import Case, CaseStatus
+from ..schemas.job import JobCreate, JobResponse, JobResult, JobListItem, CaseResponse, JobStatusItem
 from ..config import settings
+from ..services.analysis_pool import analysis_pool, PoolSaturated
+from ..services.blob_store import get_blob_store, new_upload_key
+from ..services.cases import aggregate_case, case_jobs, case_progress, export_case
+from ..services.job_events import (
+    EventSubscription,
+    case_channel,
+    job_channel,
+    job_event,
+    sse_message,
+    status_select,
+)
+from ..services.job_results import full_result, list_select, store_result
+from ..services.pagination import NEXT_CURSOR_HEADER, fetch_page
+from ..services.result_cache import (
+    analysis_version,
+    content_hash,
+    perceptual_hash,
+    find_cached_job,
+    apply_cached_result,
+)
 
 # Importar hades_core
 import sys
@@ -23,10 +53,107 @@ from hades_core.analyzer import analyze_image
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
+def _pool_saturated_error() -> HTTPException:
+    """503 con Retry-After cuando el pool síncrono está lleno."""
+    return HTTPException(
+        status_code=503,
+        detail="Servidor ocupado analizando otros documentos. Intenta de nuevo en unos segundos.",
+        headers={"Retry-After": str(settings.SYNC_RETRY_AFTER)}
+    )
+
+
+async def _export_to_drive(job: Job, result_dict: dict, user_email: Optional[str], db: Session):
+    """Exporta el resultado a Drive en el pool (no falla el job si Drive falla)."""
+    try:
+        from ..services.drive import export_result_to_drive
+        
+        success, file_id, web_link, error = await analysis_pool.run(
+            export_result_to_drive,
+            result_dict,
+            user_email or "unknown",
+            str(job.id)
+        )
+        
+        if success:
+            job.exported_to_drive = True
+            job.drive_file_id = file_id
+            job.drive_url = web_link
+            db.commit()
+            
+    except Exception as e:
+        # No fallar si Drive falla, solo loggear
+        print(f"Error exportando a Drive: {e}")
+
+
+async def _run_analysis(contents: bytes, api_key: str):
+    """Analiza la imagen en el pool (no bloquea el event loop ni toca la DB)."""
+    result = await analysis_pool.run(
+        analyze_image,
+        contents,
+        gemini_api_key=api_key,
+        config={"auto_translate": True, "mode": settings.ANALYSIS_MODE}
+    )
+    print(f"[DEBUG] Analysis completed. Country: {result.country_code}, Name: {result.name}")
+    return result
+
+
+def _store_analysis(job: Job, result) -> dict:
+    """Guarda el resultado en el job (sin commit)."""
+    # Convertir a dict
+    result_dict = result.to_dict()
+    
+    # Actualizar job
+    job.status = JobStatus.COMPLETED
+    job.completed_at = datetime.utcnow()
+    store_result(job, result_dict)
+    
+    # Extraer metadata para búsquedas
+    job.country_detected = result.country_code
+    job.semaforo = result.semaforo.value if result.semaforo else None
+    job.score = result.score
+    job.name_extracted = result.name
+    job.id_number_extracted = result.id_number
+    return result_dict
+
+
+async def _analyze_job_sync(job: Job, contents: bytes, api_key: str, db: Session) -> dict:
+    """Analiza la imagen en el pool y guarda el resultado en el job."""
+    result_dict = _store_analysis(job, await _run_analysis(contents, api_key))
+    db.commit()
+    return result_dict
+
+
+async def _read_image(image: UploadFile) -> bytes:
+    """Lee y valida una imagen subida (tamaño y tipo)."""
+    # Validar tamaño
+    contents = await image.read()
+    if len(contents) > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Imagen muy grande. Máximo: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
+        )
+    
+    # Validar tipo
+    if not image.content_type.startswith("image/"):
+        raise HTTPException(
+            status_code=400,
+            detail="El archivo debe ser una imagen"
+        )
+    return contents
+
+
+async def _perceptual_hash(contents: bytes) -> Optional[str]:
+    """dHash de la subida, solo si el casi-duplicado está habilitado"""
+    if settings.DEDUPE_PHASH_MAX_DISTANCE <= 0:
+        return None
+    return await run_in_threadpool(perceptual_hash, contents)
+
+
 @router.post("/", response_model=JobResponse, status_code=201)
 async def create_job(
     image: UploadFile = File(..., description="Imagen del documento"),
     auto_export: bool = Query(default=True, description="Exportar automáticamente a Drive"),
+    force_reanalysis: bool = Query(default=False, description="Ignorar resultados previos de la misma imagen"),
     current_user: dict = Depends(require_analyst),
     db: Session = Depends(get_db),
     gemini_api_key: Optional[str] = Header(None, alias="X-Gemini-API-Key")
@@ -36,53 +163,79 @@ async def create_job(
     
     Proceso:
     1. Valida la imagen
-    2. Crea el job en DB
-    3. Procesa la imagen (sync o async según ASYNC_PROCESSING)
-    4. Actualiza el resultado
+    2. Busca un resultado previo de la misma imagen (SHA-256 / dHash)
+    3. Crea el job en DB
+    4. Reutiliza el resultado o procesa la imagen (sync o async según
+       ASYNC_PROCESSING)
+    5. Actualiza el resultado
     
     Requiere rol: hades_analyst o hades_admin
     """
-    # Validar tamaño
-    contents = await image.read()
-    if len(contents) > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"Imagen muy grande. Máximo: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
-        )
+    contents = await _read_image(image)
     
-    # Validar tipo
-    if not image.content_type.startswith("image/"):
-        raise HTTPException(
-            status_code=400,
-            detail="El archivo debe ser una imagen"
-        )
+    # Huella de la imagen (el dHash decodifica la imagen: fuera del event loop)
+    sha256 = content_hash(contents)
+    phash = await _perceptual_hash(contents)
+    version = analysis_version()
+    
+    cached = None
+    if settings.DEDUPE_ENABLED and not force_reanalysis:
+        cached = find_cached_job(db, current_user["user_id"], sha256, phash, version)
+    
+    # Modo síncrono: rechazar antes de crear el job si no hay capacidad
+    if not cached and not settings.ASYNC_PROCESSING and analysis_pool.is_saturated():
+        raise _pool_saturated_error()
     
     # Crear job en DB
     job = Job(
         user_id=current_user["user_id"],
         user_email=current_user.get("email"),
         user_name=current_user.get("name"),
-        status=JobStatus.QUEUED
+        status=JobStatus.QUEUED,
+        content_hash=sha256,
+        perceptual_hash=phash,
+        analysis_version=version
     )
     db.add(job)
     db.commit()
     db.refresh(job)
     
+    # ============================================================
+    # CACHÉ: misma imagen ya analizada con esta versión del motor
+    # ============================================================
+    if cached:
+        apply_cached_result(job, cached)
+        db.commit()
+        print(f"[{job.id}] Resultado reutilizado del job {cached.id}")
+        
+        if auto_export:
+            await _export_to_drive(job, full_result(job), current_user.get("email"), db)
+        
+        db.refresh(job)
+        return job
+    
     # PROCESAMIENTO: Sync vs Async (TOGGLE)
     if settings.ASYNC_PROCESSING:
         # ============================================================
         # MODO ASÍNCRONO (Celery)
         # ============================================================
+        blob_key = None
         try:
-            from hades_worker.tasks import process_image_task
+            from hades_worker.celery_app import PRIORITY_INTERACTIVE
+            from hades_worker.tasks import analysis_pipeline
+            
+            # Guardar la imagen en el almacén: por el broker solo viaja la clave
+            blob_store = get_blob_store()
+            blob_key = await run_in_threadpool(blob_store.put, new_upload_key(str(job.id)), contents)
             
-            # Enviar tarea a Celery
-            task = process_image_task.delay(
+            # Enviar a Celery: cadena OCR -> forense, con prioridad interactiva
+            task = analysis_pipeline(
                 job_id=str(job.id),
-                image_bytes=contents,
+                blob_key=blob_key,
                 auto_export=auto_export,
-                user_email=current_user.get("email")
-            )
+                user_email=current_user.get("email"),
+                priority=PRIORITY_INTERACTIVE
+            ).apply_async()
             
             # Guardar task_id para tracking
             job.celery_task_id = task.id
@@ -92,7 +245,9 @@ async def create_job(
             print(f"[{job.id}] Enviado a Celery. Task ID: {task.id}")
             
         except Exception as e:
-            # Si falla Celery, marcar como fallido
+            # Si falla Celery, marcar como fallido (y no dejar el blob huérfano)
+            if blob_key:
+                get_blob_store().delete(blob_key)
             job.status = JobStatus.FAILED
             job.error_message = f"Error enviando a Celery: {str(e)}"
             job.completed_at = datetime.utcnow()
@@ -124,57 +279,23 @@ async def create_job(
             print(f"[DEBUG] Using API key (first 10 chars): {api_key_to_use[:10]}...")
             print(f"[DEBUG] Starting image analysis...")
             
-            result = analyze_image(
-                contents,
-                gemini_api_key=api_key_to_use,
-                config={"auto_translate": True}
-            )
-            
-            print(f"[DEBUG] Analysis completed. Country: {result.country_code}, Name: {result.name}")
-
-            
-            # Convertir a dict
-            result_dict = result.to_dict()
-            
-            # Actualizar job
-            job.status = JobStatus.COMPLETED
-            job.completed_at = datetime.utcnow()
-            job.result = result_dict
-            
-            # Extraer metadata para búsquedas
-            job.country_detected = result.country_code
-            job.semaforo = result.semaforo.value if result.semaforo else None
-            job.score = result.score
-            job.name_extracted = result.name
-            job.id_number_extracted = result.id_number
-            
-            db.commit()
+            result_dict = await _analyze_job_sync(job, contents, api_key_to_use, db)
             
             # Exportar a Drive (si auto_export)
             if auto_export:
-                try:
-                    from ..services.drive import export_result_to_drive
-                    
-                    success, file_id, web_link, error = export_result_to_drive(
-                        result_dict,
-                        current_user.get("email", "unknown"),
-                        str(job.id)
-                    )
-                    
-                    if success:
-                        job.exported_to_drive = True
-                        job.drive_file_id = file_id
-                        job.drive_url = web_link
-                        db.commit()
-                        
-                except Exception as e:
-                    # No fallar si Drive falla, solo loggear
-                    print(f"Error exportando a Drive: {e}")
+                await _export_to_drive(job, result_dict, current_user.get("email"), db)
             
             db.refresh(job)
             
+        except PoolSaturated:
+            # Se llenó entre la validación y el envío: liberar el job y pedir reintento
+            db.delete(job)
+            db.commit()
+            raise _pool_saturated_error()
+        
         except Exception as e:
-            # Marcar como fallido
+            # Marcar como fallido (descartando una transacción a medias)
+            db.rollback()
             job.status = JobStatus.FAILED
             job.error_message = str(e)
             job.completed_at = datetime.utcnow()
@@ -184,19 +305,348 @@ async def create_job(
     return job
 
 
+def _case_response(case: Case, jobs: List[Job]) -> CaseResponse:
+    """Caso con el estado de sus jobs (sin cargar resultados completos)."""
+    return CaseResponse(
+        id=case.id,
+        status=case.status.value if hasattr(case.status, "value") else case.status,
+        total_jobs=case.total_jobs,
+        semaforo=case.semaforo,
+        score=case.score,
+        summary=case.summary,
+        exported_to_drive=bool(case.exported_to_drive),
+        drive_url=case.drive_url,
+        created_at=case.created_at,
+        completed_at=case.completed_at,
+        progress=case_progress(case, jobs),
+        jobs=[JobStatusItem.model_validate(job) for job in jobs]
+    )
+
+
+@router.post("/batch", response_model=CaseResponse, status_code=201)
+async def create_batch(
+    images: List[UploadFile] = File(..., description="Imágenes del caso (ej: frente, reverso, comprobante)"),
+    auto_export: bool = Query(default=True, description="Exportar el caso a Drive al terminar"),
+    force_reanalysis: bool = Query(default=False, description="Ignorar resultados previos de las mismas imágenes"),
+    current_user: dict = Depends(require_analyst),
+    db: Session = Depends(get_db),
+    gemini_api_key: Optional[str] = Header(None, alias="X-Gemini-API-Key")
+):
+    """
+    Crea un caso con varios documentos en una sola llamada.
+    
+    Proceso:
+    1. Valida todas las imágenes
+    2. Crea el caso y sus jobs en una sola transacción
+    3. Procesa los documentos en paralelo (chord de Celery en modo
+       asíncrono, pool acotado en modo síncrono)
+    4. Al terminar todos: semáforo del caso (el peor) y una sola
+       exportación a Drive por caso
+    
+    El progreso se consulta con GET /jobs/batch/{case_id}.
+    
+    Requiere rol: hades_analyst o hades_admin
+    """
+    if not images:
+        raise HTTPException(status_code=400, detail="No se recibieron imágenes")
+    if len(images) > settings.BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Demasiadas imágenes. Máximo por caso: {settings.BATCH_MAX_FILES}"
+        )
+    
+    uploads = [await _read_image(image) for image in images]
+    
+    # Huellas y resultados reutilizables
+    version = analysis_version()
+    fingerprints = []
+    for contents in uploads:
+        sha256 = content_hash(contents)
+        phash = await _perceptual_hash(contents)
+        cached = None
+        if settings.DEDUPE_ENABLED and not force_reanalysis:
+            cached = find_cached_job(db, current_user["user_id"], sha256, phash, version)
+        fingerprints.append((sha256, phash, cached))
+    
+    api_key_to_use = gemini_api_key or settings.GEMINI_API_KEY
+    pending = sum(1 for _, _, cached in fingerprints if not cached)
+    if not settings.ASYNC_PROCESSING and pending:
+        if not api_key_to_use:
+            raise HTTPException(
+                status_code=400,
+                detail="Gemini API Key no configurada. Por favor configúrala en Configuración."
+            )
+        if analysis_pool.free_slots() < pending:
+            raise _pool_saturated_error()
+    
+    # Caso + jobs en una sola transacción
+    case = Case(
+        user_id=current_user["user_id"],
+        user_email=current_user.get("email"),
+        user_name=current_user.get("name"),
+        status=CaseStatus.QUEUED,
+        total_jobs=len(uploads)
+    )
+    db.add(case)
+    db.flush()
+    
+    jobs = []
+    for sha256, phash, cached in fingerprints:
+        job = Job(
+            user_id=current_user["user_id"],
+            user_email=current_user.get("email"),
+            user_name=current_user.get("name"),
+            status=JobStatus.QUEUED,
+            case_id=case.id,
+            content_hash=sha256,
+            perceptual_hash=phash,
+            analysis_version=version
+        )
+        db.add(job)
+        jobs.append(job)
+    db.flush()
+    
+    for job, (_, _, cached) in zip(jobs, fingerprints):
+        if cached:
+            apply_cached_result(job, cached)
+    db.commit()
+    
+    to_process = [
+        (job, contents)
+        for job, contents, (_, _, cached) in zip(jobs, uploads, fingerprints)
+        if not cached
+    ]
+    
+    if settings.ASYNC_PROCESSING and to_process:
+        # ============================================================
+        # MODO ASÍNCRONO: chord (una cadena por documento + cierre del caso)
+        # ============================================================
+        blob_keys = []
+        try:
+            from celery import chord
+            from hades_worker.celery_app import PRIORITY_BULK
+            from hades_worker.tasks import analysis_pipeline, finalize_case_task
+            
+            blob_store = get_blob_store()
+            header = []
+            for job, contents in to_process:
+                blob_key = await run_in_threadpool(blob_store.put, new_upload_key(str(job.id)), contents)
+                blob_keys.append(blob_key)
+                # El export es por caso, no por documento; los lotes ceden
+                # el paso a los análisis individuales en las colas
+                header.append(analysis_pipeline(
+                    job_id=str(job.id),
+                    blob_key=blob_key,
+                    auto_export=False,
+                    in_batch=True,
+                    priority=PRIORITY_BULK
+                ))
+            
+            async_result = chord(header)(finalize_case_task.s(
+                case_id=str(case.id),
+                auto_export=auto_export,
+                user_email=current_user.get("email")
+            ))
+            case.celery_task_id = async_result.id
+            case.status = CaseStatus.PROCESSING
+            db.commit()
+            
+            print(f"[case {case.id}] {len(header)} documentos enviados a Celery")
+            
+        except Exception as e:
+            for blob_key in blob_keys:
+                get_blob_store().delete(blob_key)
+            for job, _ in to_process:
+                job.status = JobStatus.FAILED
+                job.error_message = f"Error enviando a Celery: {str(e)}"
+                job.completed_at = datetime.utcnow()
+            aggregate_case(case, jobs)
+            db.commit()
+    
+    else:
+        # ============================================================
+        # MODO SÍNCRONO: documentos en paralelo en el pool acotado
+        # ============================================================
+        # La sesión no se comparte entre corrutinas: primero se analizan
+        # todos los documentos (sin DB) y después se guardan en un commit
+        now = datetime.utcnow()
+        for job, _ in to_process:
+            job.status = JobStatus.PROCESSING
+            job.started_at = now
+        db.commit()
+        
+        results = await asyncio.gather(
+            *(_run_analysis(contents, api_key_to_use) for _, contents in to_process),
+            return_exceptions=True
+        )
+        for (job, _), result in zip(to_process, results):
+            if isinstance(result, BaseException):
+                job.status = JobStatus.FAILED
+                job.error_message = str(result)
+                job.completed_at = datetime.utcnow()
+            else:
+                _store_analysis(job, result)
+        db.commit()
+    
+    # Cerrar el caso si ya terminó (síncrono o todo desde caché)
+    if case.status != CaseStatus.PROCESSING:
+        if aggregate_case(case, jobs):
+            db.commit()
+            if auto_export and case.status != CaseStatus.FAILED:
+                try:
+                    await analysis_pool.run(export_case, case, jobs, current_user.get("email"))
+                except Exception as e:
+                    print(f"[case {case.id}] Error exportando a Drive: {e}")
+        db.commit()
+    
+    db.refresh(case)
+    return _case_response(case, case_jobs(db, case.id, with_result=False))
+
+
+@router.get("/batch/{case_id}", response_model=CaseResponse)
+async def get_batch(
+    case_id: uuid.UUID,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Progreso y resultado agregado de un caso.
+    
+    Una sola llamada para todos los documentos (no carga los resultados
+    completos; cada job se consulta con GET /jobs/{job_id}).
+    """
+    case = (await db.execute(select(Case).where(Case.id == case_id))).scalars().first()
+    
+    if not case:
+        raise HTTPException(status_code=404, detail="Caso no encontrado")
+    
+    # Verificar permisos
+    is_admin = "hades_admin" in current_user.get("roles", [])
+    if not is_admin and case.user_id != current_user["user_id"]:
+        raise HTTPException(
+            status_code=403,
+            detail="No tienes permiso para ver este caso"
+        )
+    
+    return _case_response(case, await db.run_sync(case_jobs, case.id, False))
+
+
+async def _case_snapshot(case_id: uuid.UUID) -> Optional[Tuple[str, CaseResponse]]:
+    """(dueño, estado actual) del caso en una sesión propia, o None si no existe."""
+    async with async_session() as db:
+        case = (await db.execute(select(Case).where(Case.id == case_id))).scalars().first()
+        if not case:
+            return None
+        return case.user_id, _case_response(case, await db.run_sync(case_jobs, case.id, False))
+
+
+@router.websocket("/batch/{case_id}/ws")
+async def case_events(
+    websocket: WebSocket,
+    case_id: uuid.UUID,
+    current_user: dict = Depends(get_websocket_user)
+):
+    """
+    Progreso de un caso por WebSocket (vista de subida múltiple).
+    
+    Mensajes (JSON):
+    - `snapshot`: el caso como en GET /jobs/batch/{case_id}
+    - `job`: transición de un documento del caso
+    - `case`: estado del caso; el de cierre trae final=true y la conexión
+      se cierra después
+    - `ping`: keep-alive
+    
+    Códigos de cierre: 4403 sin permiso, 4404 caso no encontrado, 1011
+    canal de eventos no disponible (volver a GET /jobs/batch/{case_id}).
+    """
+    await websocket.accept()
+    
+    snapshot = await _case_snapshot(case_id)
+    if snapshot is None:
+        await websocket.close(code=4404)
+        return
+    
+    # Verificar permisos
+    is_admin = "hades_admin" in current_user.get("roles", [])
+    if not is_admin and snapshot[0] != current_user["user_id"]:
+        await websocket.close(code=4403)
+        return
+    
+    try:
+        async with EventSubscription([case_channel(case_id)]) as subscription:
+            # Releer después de suscribirse: no se pierde ninguna transición
+            _, case = await _case_snapshot(case_id)
+            await websocket.send_json({"type": "snapshot", "case": case.model_dump(mode="json")})
+            if case.completed_at:
+                await websocket.close()
+                return
+            
+            deadline = time.monotonic() + settings.EVENTS_MAX_SECONDS
+            while time.monotonic() < deadline:
+                event = await subscription.next_event(timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                if event is None:
+                    await websocket.send_json({"type": "ping"})
+                    continue
+                await websocket.send_json(event)
+                if event["type"] == "case" and event.get("final"):
+                    break
+            await websocket.close()
+    
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"[case {case_id}] Error en canal de eventos: {e}")
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+
+
 @router.get("/{job_id}", response_model=JobResult)
 async def get_job(
     job_id: uuid.UUID,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtiene el resultado completo de un job.
     
     Solo puede ver sus propios jobs (excepto admins).
     """
-    # Buscar job
-    job = db.query(Job).filter(Job.id == job_id).first()
+    # Buscar job (con sus textos en la misma consulta)
+    job = (await db.execute(
+        select(Job).options(joinedload(Job.result_texts)).where(Job.id == job_id)
+    )).scalars().first()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    
+    # Verificar permisos
+    is_admin = "hades_admin" in current_user.get("roles", [])
+    if not is_admin and job.user_id != current_user["user_id"]:
+        raise HTTPException(
+            status_code=403,
+            detail="No tienes permiso para ver este job"
+        )
+    
+    response = JobResult.model_validate(job)
+    response.result = full_result(job)
+    return response
+
+
+@router.get("/{job_id}/status", response_model=JobStatusItem)
+async def get_job_status(
+    job_id: uuid.UUID,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Estado de un job (sin el resultado completo).
+    
+    Para clientes que consultan periódicamente: no carga la columna
+    `result`. GET /jobs/{job_id}/events evita consultar.
+    """
+    job = (await db.execute(status_select().where(Job.id == job_id))).scalars().first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Job no encontrado")
@@ -212,31 +662,112 @@ async def get_job(
     return job
 
 
+async def _job_snapshot(job_id: uuid.UUID) -> Optional[dict]:
+    """Evento con el estado actual del job, leído en una sesión propia."""
+    async with async_session() as db:
+        job = (await db.execute(status_select().where(Job.id == job_id))).scalars().first()
+        return job_event(job) if job else None
+
+
+@router.get("/{job_id}/events")
+async def get_job_events(
+    job_id: uuid.UUID,
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Transiciones de estado de un job por Server-Sent Events.
+    
+    Envía el estado actual y después cada cambio publicado por el worker
+    (evento `status`) hasta que el job termina (final=true). Si el canal de
+    eventos no está disponible envía un evento `error` y cierra: el cliente
+    debe volver a GET /jobs/{job_id}/status.
+    
+    No usa la sesión de la petición: FastAPI la cierra después del último
+    fragmento del stream y cada cliente retendría una conexión del pool
+    hasta EVENTS_MAX_SECONDS. La lectura usa una sesión propia y corta.
+    """
+    async with async_session() as db:
+        job = (await db.execute(status_select().where(Job.id == job_id))).scalars().first()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    
+    # Verificar permisos
+    is_admin = "hades_admin" in current_user.get("roles", [])
+    if not is_admin and job.user_id != current_user["user_id"]:
+        raise HTTPException(
+            status_code=403,
+            detail="No tienes permiso para ver este job"
+        )
+    
+    async def stream():
+        try:
+            async with EventSubscription([job_channel(job_id)]) as subscription:
+                # Releer después de suscribirse: no se pierde ninguna transición
+                event = await _job_snapshot(job_id)
+                if event is None:
+                    return
+                yield sse_message(event)
+                if event["final"]:
+                    return
+                
+                deadline = time.monotonic() + settings.EVENTS_MAX_SECONDS
+                while time.monotonic() < deadline:
+                    event = await subscription.next_event(timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                    if event is None:
+                        if await request.is_disconnected():
+                            return
+                        yield ": keep-alive\n\n"
+                        continue
+                    yield sse_message(event)
+                    if event.get("final"):
+                        return
+        
+        except Exception as e:
+            print(f"[{job_id}] Error en canal de eventos: {e}")
+            yield sse_message({"type": "error", "detail": "Canal de eventos no disponible"}, name="error")
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/", response_model=List[JobListItem])
 async def list_jobs(
-    skip: int = Query(default=0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(default=None, description="Cursor de la página (header X-Next-Cursor)"),
+    skip: int = Query(default=0, ge=0, deprecated=True),
     limit: int = Query(default=50, ge=1, le=100),
     country: Optional[str] = Query(default=None, description="Filtrar por país"),
     semaforo: Optional[str] = Query(default=None, description="Filtrar por semáforo"),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Lista los jobs del usuario actual.
     
-    Soporta paginación y filtros.
+    Soporta paginación y filtros. Más recientes primero; si hay más páginas
+    el header X-Next-Cursor trae el `cursor` de la siguiente.
     """
-    # Query base
-    query = db.query(Job).filter(Job.user_id == current_user["user_id"])
+    # Query base (solo las columnas de la lista)
+    query = list_select().where(Job.user_id == current_user["user_id"])
     
     # Filtros
     if country:
-        query = query.filter(Job.country_detected == country)
+        query = query.where(Job.country_detected == country)
     if semaforo:
-        query = query.filter(Job.semaforo == semaforo)
+        query = query.where(Job.semaforo == semaforo)
     
-    # Ordenar y paginar
-    jobs = query.order_by(Job.created_at.desc()).offset(skip).limit(limit).all()
+    # Ordenar y paginar (cursor por índice, ver services/pagination.py)
+    try:
+        jobs, next_cursor = await fetch_page(db, query, cursor, limit, skip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     return jobs
 
@@ -245,7 +776,7 @@ async def list_jobs(
 async def delete_job(
     job_id: uuid.UUID,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Elimina un job.
@@ -253,16 +784,16 @@ async def delete_job(
     Solo puede eliminar sus propios jobs.
     """
     # Buscar job
-    job = db.query(Job).filter(
+    job = (await db.execute(select(Job).where(
         Job.id == job_id,
         Job.user_id == current_user["user_id"]
-    ).first()
+    ))).scalars().first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Job no encontrado")
     
-    # Eliminar
-    db.delete(job)
-    db.commit()
+    # Eliminar (los textos del resultado se borran en cascada en la DB)
+    await db.delete(job)
+    await db.commit()
     
     return {"message": "Job eliminado exitosamente"}
@@ -2,6 +2,6 @@
 Schemas Pydantic.
 """
 
-from .job import JobCreate, JobResponse, JobResult, JobListItem
+from .job import JobCreate, JobResponse, JobResult, JobListItem, JobStatusItem, CaseResponse
 
-__all__ = ["JobCreate", "JobResponse", "JobResult", "JobListItem"]
+__all__ = ["JobCreate", "JobResponse", "JobResult", "JobListItem", "JobStatusItem", "CaseResponse"]
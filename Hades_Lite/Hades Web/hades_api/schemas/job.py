@@ -4,7 +4,7 @@ Schemas Pydantic para Jobs.
 
 from pydantic import BaseModel, UUID4, Field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 class JobCreate(BaseModel):
@@ -43,6 +43,10 @@ class JobResult(BaseModel):
     name_extracted: Optional[str] = None
     id_number_extracted: Optional[str] = None
     
+    # Caché por contenido
+    cache_hit: bool = False
+    reused_from_job_id: Optional[UUID4] = None
+    
     # Timestamps
     created_at: datetime
     started_at: Optional[datetime] = None
@@ -67,3 +71,32 @@ class JobListItem(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class JobStatusItem(BaseModel):
+    """Schema de estado de un job (sin resultado completo)"""
+    id: UUID4
+    status: str
+    semaforo: Optional[str] = None
+    score: Optional[int] = None
+    error_message: Optional[str] = None
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class CaseResponse(BaseModel):
+    """Schema de un caso (subida múltiple) con el progreso de sus jobs"""
+    id: UUID4
+    status: str
+    total_jobs: int
+    semaforo: Optional[str] = None
+    score: Optional[int] = None
+    summary: Optional[Dict[str, Any]] = None
+    exported_to_drive: bool = False
+    drive_url: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    progress: Dict[str, Any]
+    jobs: List[JobStatusItem]
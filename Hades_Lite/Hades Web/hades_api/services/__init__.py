@@ -2,6 +2,6 @@
 Servicios de la API.
 """
 
-from . import drive
+from . import drive, analysis_pool, result_cache, blob_store
 
-__all__ = ["drive"]
+__all__ = ["drive", "analysis_pool", "result_cache", "blob_store"]
@@ -0,0 +1,152 @@
+"""
+Pool acotado para el procesamiento síncrono de jobs.
+
+En modo síncrono (ASYNC_PROCESSING=false) el análisis hace varias llamadas
+bloqueantes a Gemini y la subida a Drive. Ejecutarlas directamente dentro
+de un endpoint `async def` congela el event loop de uvicorn (incluido
+/health). Este pool las ejecuta en hilos dedicados, con un tope de
+concurrencia y una cola acotada: si se llena, el endpoint responde 503 con
+Retry-After en lugar de acumular trabajo.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from ..config import settings
+
+
+class PoolSaturated(Exception):
+    """El pool no tiene capacidad (workers + cola) para otro job."""
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+
+class AnalysisPool:
+    """
+    ThreadPoolExecutor con capacidad acotada y métricas de espera en cola.
+
+    Args:
+        max_workers: Análisis ejecutándose a la vez
+        max_queue: Análisis esperando turno antes de rechazar con 503
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, history: int = 200):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="hades-analysis"
+        )
+        self._lock = threading.Lock()
+
+        # Estado
+        self._pending = 0   # En cola + ejecutándose
+        self._running = 0
+
+        # Métricas
+        self._queue_wait_ms = deque(maxlen=history)
+        self._run_ms = deque(maxlen=history)
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def free_slots(self) -> int:
+        """Jobs que aún se pueden aceptar (workers + cola)."""
+        with self._lock:
+            return max(0, self.capacity - self._pending)
+
+    def is_saturated(self) -> bool:
+        """True si un nuevo job sería rechazado."""
+        with self._lock:
+            return self._pending >= self.capacity
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta `fn(*args, **kwargs)` en el pool sin bloquear el event loop.
+
+        Raises:
+            PoolSaturated: Si workers y cola están llenos
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected += 1
+                raise PoolSaturated()
+            self._pending += 1
+            self.submitted += 1
+
+        enqueued_at = time.perf_counter()
+
+        def _task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._queue_wait_ms.append((started_at - enqueued_at) * 1000)
+            ok = False
+            try:
+                value = fn(*args, **kwargs)
+                ok = True
+                return value
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_ms.append((time.perf_counter() - started_at) * 1000)
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        future = self._executor.submit(_task)
+        # Liberar el cupo cuando el hilo termina (aunque el cliente cancele)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas del pool (para /health y monitoreo)."""
+        with self._lock:
+            waits = list(self._queue_wait_ms)
+            runs = list(self._run_ms)
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "queue_wait_ms": {
+                    "p50": _percentile(waits, 50),
+                    "p95": _percentile(waits, 95),
+                    "max": round(max(waits), 1) if waits else 0.0,
+                },
+                "run_ms": {
+                    "p50": _percentile(runs, 50),
+                    "p95": _percentile(runs, 95),
+                },
+            }
+
+
+# Instancia única del proceso
+analysis_pool = AnalysisPool(
+    max_workers=settings.SYNC_MAX_CONCURRENCY,
+    max_queue=settings.SYNC_MAX_QUEUE
+)
@@ -0,0 +1,163 @@
+"""
+Almacén de blobs para entregar imágenes al worker de Celery.
+
+Antes la API encolaba `image_bytes` en la tarea: con Redis como broker y
+serializador json, una imagen de varios MB se copiaba (inflada) en Redis y
+en el backend de resultados, y el serializador json ni siquiera acepta
+bytes. Ahora la imagen se escribe una vez en el almacén y solo se encola
+su clave; el worker la lee por streaming y la borra al terminar.
+
+Backends:
+- local: directorio compartido entre API y worker (volumen de Docker)
+- s3: cualquier almacén compatible con S3 (requiere boto3)
+"""
+
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from ..config import settings
+
+try:
+    import boto3
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+    boto3 = None
+
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class BlobNotFound(Exception):
+    """La clave no existe (ya procesada y borrada, o expirada)."""
+
+
+class LocalBlobStore:
+    """Blobs como archivos en un directorio compartido."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Clave de blob inválida: {key}")
+        return path
+
+    def put(self, key: str, data: bytes) -> str:
+        """Escritura atómica (archivo temporal + rename)."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return key
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return open(self._path(key), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+
+    def delete(self, key: str):
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def delete_older_than(self, max_age_seconds: float) -> int:
+        """Borra blobs huérfanos (jobs que nunca terminaron). Retorna cuántos."""
+        cutoff = time.time() - max_age_seconds
+        deleted = 0
+        for path in self.root.rglob("*"):
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                deleted += 1
+        return deleted
+
+
+class S3BlobStore:
+    """Blobs en un bucket compatible con S3 (AWS, MinIO, R2...)."""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        if not BOTO3_AVAILABLE:
+            raise ImportError("boto3 no está instalado. Instala con: pip install boto3")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def put(self, key: str, data: bytes) -> str:
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+        return key
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"]
+        except self.client.exceptions.NoSuchKey:
+            raise BlobNotFound(key)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def delete_older_than(self, max_age_seconds: float) -> int:
+        cutoff = time.time() - max_age_seconds
+        deleted = 0
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                if obj["LastModified"].timestamp() < cutoff:
+                    self.client.delete_object(Bucket=self.bucket, Key=obj["Key"])
+                    deleted += 1
+        return deleted
+
+
+def read_blob(store, key: str) -> bytes:
+    """Lee un blob por bloques (sin cargar copias intermedias)."""
+    buffer = bytearray()
+    stream = store.open(key)
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer.extend(chunk)
+    finally:
+        stream.close()
+    return bytes(buffer)
+
+
+def new_upload_key(job_id: str) -> str:
+    """Clave única por job (no por contenido: cada job borra la suya)."""
+    return f"uploads/{job_id}/{uuid.uuid4().hex}"
+
+
+_store = None
+
+
+def get_blob_store():
+    """Instancia del backend configurado (perezosa, una por proceso)."""
+    global _store
+    if _store is None:
+        if settings.BLOB_STORE_BACKEND == "s3":
+            _store = S3BlobStore(
+                bucket=settings.BLOB_S3_BUCKET,
+                prefix=settings.BLOB_S3_PREFIX,
+                endpoint_url=settings.BLOB_S3_ENDPOINT_URL
+            )
+        else:
+            _store = LocalBlobStore(settings.BLOB_STORE_PATH)
+    return _store
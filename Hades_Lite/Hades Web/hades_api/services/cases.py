@@ -0,0 +1,138 @@
+"""
+Agregación de casos (varios documentos de una misma verificación).
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session, defer, selectinload
+
+from ..models.case import Case, CaseStatus
+from ..models.job import Job, JobStatus
+from .job_results import full_result
+
+
+# Orden de gravedad del semáforo (el caso toma el peor)
+SEMAFORO_SEVERITY = {"verde": 0, "amarillo": 1, "rojo": 2}
+
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED)
+
+
+def case_jobs(db: Session, case_id, with_result: bool = True) -> List[Job]:
+    """
+    Jobs del caso, en orden de subida.
+
+    `with_result=True` carga también los textos del resultado (una consulta
+    para todos los jobs); `with_result=False` no carga `result`.
+    """
+    if with_result:
+        query = db.query(Job).options(selectinload(Job.result_texts))
+    else:
+        query = db.query(Job).options(defer(Job.result))
+    return query.filter(Job.case_id == case_id).order_by(Job.created_at).all()
+
+
+def case_progress(case: Case, jobs: List[Job]) -> Dict[str, Any]:
+    """Progreso del caso (sin cargar resultados completos)"""
+    counts = {status.value: 0 for status in JobStatus}
+    for job in jobs:
+        counts[_status_value(job.status)] += 1
+    finished = counts[JobStatus.COMPLETED.value] + counts[JobStatus.FAILED.value]
+    return {
+        "total": case.total_jobs,
+        "finished": finished,
+        "by_status": counts,
+        "percent": round(100 * finished / case.total_jobs) if case.total_jobs else 100,
+    }
+
+
+def _status_value(status) -> str:
+    return status.value if hasattr(status, "value") else str(status)
+
+
+def aggregate_case(case: Case, jobs: List[Job]) -> bool:
+    """
+    Actualiza estado, semáforo y resumen del caso a partir de sus jobs.
+
+    Returns:
+        True si el caso terminó (todos sus documentos completados o fallidos)
+    """
+    finished = [job for job in jobs if job.status in FINISHED_STATUSES]
+    completed = [job for job in jobs if job.status == JobStatus.COMPLETED]
+
+    if len(finished) < case.total_jobs:
+        case.status = CaseStatus.PROCESSING if finished or any(
+            job.status == JobStatus.PROCESSING for job in jobs
+        ) else CaseStatus.QUEUED
+        return False
+
+    if len(completed) == len(jobs):
+        case.status = CaseStatus.COMPLETED
+    elif completed:
+        case.status = CaseStatus.PARTIAL
+    else:
+        case.status = CaseStatus.FAILED
+
+    semaforos = [job.semaforo for job in completed if job.semaforo in SEMAFORO_SEVERITY]
+    case.semaforo = max(semaforos, key=SEMAFORO_SEVERITY.get) if semaforos else None
+    scores = [job.score for job in completed if job.score is not None]
+    case.score = max(scores) if scores else None
+
+    case.summary = {
+        "documents": [
+            {
+                "job_id": str(job.id),
+                "status": _status_value(job.status),
+                "semaforo": job.semaforo,
+                "score": job.score,
+                "country": job.country_detected,
+                "name": job.name_extracted,
+                "id_number": job.id_number_extracted,
+                "error": job.error_message,
+            }
+            for job in jobs
+        ],
+        # Nombres distintos entre documentos del mismo caso son una alerta
+        "names": sorted({job.name_extracted for job in completed if job.name_extracted}),
+    }
+    case.completed_at = datetime.utcnow()
+    return True
+
+
+def build_case_export(case: Case, jobs: List[Job]) -> Dict[str, Any]:
+    """Documento único para Drive con el caso y todos sus resultados"""
+    return {
+        "case_id": str(case.id),
+        "status": _status_value(case.status),
+        "semaforo": case.semaforo,
+        "score": case.score,
+        "summary": case.summary,
+        "documents": [
+            {"job_id": str(job.id), "result": full_result(job)}
+            for job in jobs if job.status == JobStatus.COMPLETED
+        ],
+        "exported_at": datetime.utcnow().isoformat(),
+    }
+
+
+def export_case(
+    case: Case,
+    jobs: List[Job],
+    user_email: Optional[str],
+    raise_retryable: bool = False
+) -> None:
+    """Exporta el caso a Drive (bloqueante: llamar desde worker o pool)"""
+    from .drive import export_result_to_drive
+
+    success, file_id, web_link, error = export_result_to_drive(
+        build_case_export(case, jobs),
+        user_email or "unknown",
+        f"case_{case.id}",
+        raise_retryable=raise_retryable
+    )
+    if success:
+        case.exported_to_drive = True
+        case.drive_file_id = file_id
+        case.drive_url = web_link
+    else:
+        print(f"[case {case.id}] Error exportando a Drive: {error}")
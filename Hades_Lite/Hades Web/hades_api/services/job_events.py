@@ -0,0 +1,210 @@
+"""
+Eventos de estado de jobs y casos (Redis pub/sub).
+
+La UI y los integradores consultaban GET /jobs/{job_id} en bucle hasta que
+cambiaba el estado, y cada consulta cargaba la columna `result` completa.
+Ahora el worker publica cada transición en Redis y la API la reenvía:
+
+- SSE: GET /jobs/{job_id}/events
+- WebSocket: /jobs/batch/{case_id}/ws (todos los documentos de un caso)
+
+Publicar es best-effort: si Redis no responde el job sigue su curso y el
+cliente puede consultar GET /jobs/{job_id}/status, que no carga `result`.
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Query, Session, load_only
+
+from ..config import settings
+from ..models.job import Job, JobStatus
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+    aioredis = None
+
+
+CHANNEL_PREFIX = "hades:events"
+
+FINAL_STATUSES = (JobStatus.COMPLETED.value, JobStatus.FAILED.value)
+
+
+def job_channel(job_id) -> str:
+    return f"{CHANNEL_PREFIX}:job:{job_id}"
+
+
+def case_channel(case_id) -> str:
+    return f"{CHANNEL_PREFIX}:case:{case_id}"
+
+
+def _status_value(status) -> str:
+    return status.value if hasattr(status, "value") else str(status)
+
+
+def _status_columns():
+    return load_only(
+        Job.id,
+        Job.user_id,
+        Job.case_id,
+        Job.status,
+        Job.semaforo,
+        Job.score,
+        Job.error_message,
+        Job.created_at,
+        Job.completed_at,
+    )
+
+
+def status_query(db: Session) -> Query:
+    """Jobs con solo las columnas de estado (sin el JSON de `result`)"""
+    return db.query(Job).options(_status_columns())
+
+
+def status_select() -> Select:
+    """Como `status_query`, para sesiones asíncronas"""
+    return select(Job).options(_status_columns())
+
+
+def job_event(job: Job, final: Optional[bool] = None) -> Dict:
+    """
+    Evento de estado de un job.
+
+    `final` indica que no habrá más transiciones (por defecto: completado o
+    fallido). El worker lo publica en False cuando un fallo se reintentará.
+    """
+    status = _status_value(job.status)
+    return {
+        "type": "job",
+        "job_id": str(job.id),
+        "case_id": str(job.case_id) if job.case_id else None,
+        "status": status,
+        "semaforo": job.semaforo,
+        "score": job.score,
+        "error_message": job.error_message,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "final": status in FINAL_STATUSES if final is None else final,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+def case_event(case, progress: Optional[Dict] = None) -> Dict:
+    """Evento de estado de un caso (el cierre lo publica con final=True)"""
+    return {
+        "type": "case",
+        "case_id": str(case.id),
+        "status": _status_value(case.status),
+        "semaforo": case.semaforo,
+        "score": case.score,
+        "progress": progress,
+        "exported_to_drive": bool(case.exported_to_drive),
+        "drive_url": case.drive_url,
+        "final": case.completed_at is not None,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+def sse_message(event: Dict, name: str = "status") -> str:
+    """Formatea un evento para text/event-stream"""
+    return f"event: {name}\ndata: {json.dumps(event)}\n\n"
+
+
+# ============================================================
+# PUBLICACIÓN (worker)
+# ============================================================
+
+_client = None
+
+
+def _redis():
+    """Cliente síncrono (perezoso, uno por proceso)"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=2,
+            socket_connect_timeout=2
+        )
+    return _client
+
+
+def publish(channels: Iterable[str], event: Dict) -> bool:
+    """Publica un evento; nunca lanza excepción. Retorna si se publicó."""
+    if not REDIS_AVAILABLE:
+        return False
+    data = json.dumps(event)
+    try:
+        client = _redis()
+        for channel in channels:
+            client.publish(channel, data)
+        return True
+    except Exception as e:
+        print(f"[events] No se pudo publicar evento {event.get('type')}: {e}")
+        return False
+
+
+def publish_job(job: Job, final: Optional[bool] = None) -> bool:
+    """Publica el estado del job en su canal y en el de su caso"""
+    channels = [job_channel(job.id)]
+    if job.case_id:
+        channels.append(case_channel(job.case_id))
+    return publish(channels, job_event(job, final))
+
+
+def publish_case(case, progress: Optional[Dict] = None) -> bool:
+    return publish([case_channel(case.id)], case_event(case, progress))
+
+
+# ============================================================
+# SUSCRIPCIÓN (API)
+# ============================================================
+
+class EventSubscription:
+    """
+    Suscripción asíncrona a uno o más canales.
+
+    Uso: suscribirse primero y leer el estado actual de la DB después, así
+    no se pierde una transición ocurrida entre ambas cosas.
+
+        async with EventSubscription([job_channel(job_id)]) as subscription:
+            ...
+            event = await subscription.next_event(timeout=15)
+    """
+
+    def __init__(self, channels: List[str]):
+        self.channels = channels
+        self._client = None
+        self._pubsub = None
+
+    async def __aenter__(self) -> "EventSubscription":
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis no está instalado. Instala con: pip install redis")
+        self._client = aioredis.from_url(settings.REDIS_URL)
+        try:
+            self._pubsub = self._client.pubsub()
+            await self._pubsub.subscribe(*self.channels)
+        except Exception:
+            await self._client.aclose()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        try:
+            await self._pubsub.unsubscribe(*self.channels)
+            await self._pubsub.aclose()
+        finally:
+            await self._client.aclose()
+
+    async def next_event(self, timeout: float) -> Optional[Dict]:
+        """Siguiente evento, o None si no llegó ninguno en `timeout` segundos"""
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message["data"])
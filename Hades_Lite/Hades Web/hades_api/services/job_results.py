@@ -0,0 +1,125 @@
+"""
+Almacenamiento del resultado de un job.
+
+`jobs.result` guardaba el JSON completo (OCR, traducción, análisis forense y
+fechas) y cada lectura de un job, lista o filtro del panel cargaba y
+deserializaba varios KB de texto por fila. Ahora:
+
+- `jobs.result` es JSONB y contiene solo los campos estructurados (país,
+  fechas, datos extraídos, forense sin texto libre, metadata). Lleva un
+  índice GIN (migrations/004) para filtrar con `@>` sin recorrer la tabla.
+- Los textos largos van en job_result_texts (TOAST comprimido) y solo se
+  leen al pedir el resultado completo (GET /jobs/{id}, exportaciones).
+- Las listas cargan solo las columnas que muestran (`list_select`).
+
+`store_result` separa y `full_result` reconstruye el mismo dict que
+devuelve `AnalysisResult.to_dict()`.
+"""
+
+import copy
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import load_only
+
+from ..models.job import Job, JobResultText
+
+
+# Ruta dentro de `result` -> columna de job_result_texts
+TEXT_FIELDS = {
+    ("ocr_text",): "ocr_text",
+    ("ocr_text_translated",): "ocr_text_translated",
+    ("forensics", "visual_analysis"): "visual_analysis",
+}
+
+
+def split_result(result: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Separa los textos largos del resultado (no modifica `result`).
+
+    Returns:
+        (resultado sin textos, {columna: texto}); solo se separan textos
+        presentes (los None y ausentes quedan como estaban)
+    """
+    slim = dict(result)
+    texts = {}
+    for path, column in TEXT_FIELDS.items():
+        parent = slim
+        for key in path[:-1]:
+            child = parent.get(key)
+            if not isinstance(child, dict):
+                parent = None
+                break
+            # Copiar cada nivel: el dict original no se toca
+            child = dict(child)
+            parent[key] = child
+            parent = child
+        if parent is not None and isinstance(parent.get(path[-1]), str):
+            texts[column] = parent.pop(path[-1])
+    return slim, texts
+
+
+def merge_result(result: Optional[Dict[str, Any]], texts: Optional[JobResultText]) -> Optional[Dict[str, Any]]:
+    """Resultado completo: `result` (copia) con los textos de job_result_texts"""
+    if result is None:
+        return None
+    merged = copy.deepcopy(result)
+    if texts is None:
+        return merged
+    top = {}
+    for path, column in TEXT_FIELDS.items():
+        value = getattr(texts, column)
+        if value is None:
+            continue
+        if len(path) == 1:
+            top[path[0]] = value
+        elif isinstance(merged.get(path[0]), dict):
+            merged[path[0]][path[1]] = value
+    # Los textos van primero, como en AnalysisResult.to_dict()
+    return {**top, **merged}
+
+
+def store_result(job: Job, result: Dict[str, Any]):
+    """Guarda el resultado en el job (la sesión del job hace commit)"""
+    slim, texts = split_result(result)
+    job.result = slim
+    if job.result_texts is None:
+        job.result_texts = JobResultText(**texts)
+    else:
+        for column in TEXT_FIELDS.values():
+            setattr(job.result_texts, column, texts.get(column))
+
+
+def full_result(job: Job) -> Optional[Dict[str, Any]]:
+    """Resultado completo del job (lee job_result_texts si no está cargada)"""
+    return merge_result(job.result, job.result_texts)
+
+
+def list_select() -> Select:
+    """Jobs con solo las columnas de las listas (schemas.job.JobListItem, historial de Streamlit)"""
+    return select(Job).options(load_only(
+        Job.id,
+        Job.user_id,
+        Job.status,
+        Job.country_detected,
+        Job.semaforo,
+        Job.score,
+        Job.name_extracted,
+        Job.created_at,
+        Job.completed_at,
+    ))
+
+
+def result_filter(id_type: Optional[str] = None, expired: Optional[bool] = None) -> list:
+    """
+    Condiciones sobre `jobs.result` para los filtros del panel.
+
+    Usan contención JSONB (`@>`), que resuelve el índice GIN
+    ix_jobs_result_gin sin leer el JSON de cada fila. Solo PostgreSQL.
+    """
+    conditions = []
+    if id_type:
+        conditions.append(Job.result.contains({"extracted_data": {"id_type": id_type}}))
+    if expired is not None:
+        conditions.append(Job.result.contains({"dates": {"expiration": {"is_expired": expired}}}))
+    return conditions
@@ -0,0 +1,91 @@
+"""
+Paginación por cursor (keyset) de las listas de jobs.
+
+Con OFFSET la base recorre y descarta todas las filas anteriores a la
+página: cada página cuesta más que la anterior. El cursor guarda la última
+fila entregada, (created_at, id), y la página siguiente empieza justo
+después por el índice (ver migrations/005):
+
+    WHERE (created_at, id) < (:created_at, :id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit + 1
+
+La fila extra solo indica si hay más páginas. El cursor es opaco para el
+cliente (base64 de la fila) y viaja en el header X-Next-Cursor.
+"""
+
+import base64
+import uuid
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+
+from ..models.job import Job
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(job: Job) -> str:
+    """Cursor que apunta justo después de `job`"""
+    raw = f"{job.created_at.isoformat()}|{job.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    (created_at, id) del cursor.
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, job_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(job_id)
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {cursor!r}") from e
+
+
+def keyset_page(stmt: Select, cursor: Optional[str], limit: int) -> Select:
+    """
+    Ordena `stmt` por (created_at, id) descendente y lo limita a una página.
+
+    Pide `limit + 1` filas: pasar el resultado a `split_page`.
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    if cursor:
+        stmt = stmt.where(tuple_(Job.created_at, Job.id) < decode_cursor(cursor))
+    return stmt.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Job], limit: int) -> Tuple[List[Job], Optional[str]]:
+    """(filas de la página, cursor de la siguiente o None si es la última)"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1])
+
+
+async def fetch_page(db, stmt: Select, cursor: Optional[str], limit: int, skip: int = 0) -> Tuple[List[Job], Optional[str]]:
+    """
+    Ejecuta una página en una sesión asíncrona.
+
+    `skip` (OFFSET) se mantiene por compatibilidad con clientes anteriores;
+    con cursor no hace falta.
+
+    Returns:
+        (jobs de la página, cursor de la siguiente o None)
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    stmt = keyset_page(stmt, cursor, limit)
+    if skip:
+        stmt = stmt.offset(skip)
+    rows = (await db.execute(stmt)).scalars().all()
+    return split_page(rows, limit)
@@ -0,0 +1,162 @@
+"""
+Caché de resultados por contenido de imagen.
+
+Los analistas suelen volver a subir la misma imagen (reintento tras un
+fallo de Drive, revisión de un colega). Cada subida creaba un Job nuevo y
+pagaba un análisis completo en Gemini. Aquí se calcula al subir:
+
+- SHA-256 de los bytes (duplicado exacto)
+- dHash perceptual de 256 bits (casi-duplicado: recompresión, reescalado)
+
+y si hay un Job COMPLETED con la misma huella y la misma versión de
+análisis, su resultado se reutiliza al instante.
+
+Por defecto solo se reutiliza el duplicado exacto, venga de quien venga
+(los mismos bytes dan el mismo análisis). El dHash solo mira la forma de la
+imagen: dos documentos de la misma plantilla (otro número, otro nombre de
+igual longitud, otras fechas) quedan a 0-3 bits, así que el casi-duplicado
+es opcional (DEDUPE_PHASH_MAX_DISTANCE > 0) y se limita a los jobs del
+mismo usuario.
+
+Los resultados parciales (`metadata.partial`: una etapa de Gemini falló o
+expiró y el job quedó en AMARILLO) nunca se reutilizan.
+"""
+
+import hashlib
+import io
+from datetime import datetime
+from typing import Optional
+
+from PIL import Image, ImageOps
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.job import Job, JobStatus
+from .job_results import full_result, store_result
+
+# Importar hades_core
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+import hades_core
+
+
+# Lado del dHash: HASH_SIZE x HASH_SIZE bits
+HASH_SIZE = 16
+
+
+def analysis_version(mode: Optional[str] = None) -> str:
+    """Versión del motor + modo: un cambio invalida los resultados cacheados"""
+    return f"{hades_core.__version__}/{mode or settings.ANALYSIS_MODE}"
+
+
+def content_hash(image_bytes: bytes) -> str:
+    """SHA-256 hexadecimal de los bytes subidos"""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def perceptual_hash(image_bytes: bytes) -> Optional[str]:
+    """
+    dHash de 256 bits (hex de 64 caracteres).
+
+    Compara la luminancia de píxeles vecinos en una miniatura de
+    (HASH_SIZE + 1) x HASH_SIZE, así que es estable ante recompresión JPEG
+    y cambios de resolución. None si la imagen no se puede abrir.
+    """
+    try:
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(image_bytes)))
+        image = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    except Exception:
+        return None
+
+    pixels = list(image.getdata())
+    bits = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{bits:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def hamming_distance(a: str, b: str) -> int:
+    """Bits distintos entre dos hashes hexadecimales"""
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def find_cached_job(
+    db: Session,
+    user_id: str,
+    sha256: str,
+    phash: Optional[str],
+    version: str
+) -> Optional[Job]:
+    """
+    Busca un Job completado y no parcial reutilizable para esta imagen.
+
+    Primero por SHA-256 exacto (índice), de cualquier usuario; después, solo
+    si DEDUPE_PHASH_MAX_DISTANCE > 0, por dHash con distancia de Hamming
+    <= DEDUPE_PHASH_MAX_DISTANCE entre los últimos DEDUPE_PHASH_SCAN_LIMIT
+    jobs completados de `user_id`.
+    """
+    base = db.query(Job).filter(
+        Job.status == JobStatus.COMPLETED,
+        Job.analysis_version == version,
+        Job.result.isnot(None),
+        Job.result[("metadata", "partial")].as_boolean().isnot(True)
+    )
+
+    exact = base.filter(Job.content_hash == sha256).order_by(Job.completed_at.desc()).first()
+    if exact or not phash or settings.DEDUPE_PHASH_MAX_DISTANCE <= 0:
+        return exact
+
+    candidates = base.filter(
+        Job.user_id == user_id,
+        Job.perceptual_hash.isnot(None)
+    ).order_by(
+        Job.completed_at.desc()
+    ).limit(settings.DEDUPE_PHASH_SCAN_LIMIT).all()
+
+    best, best_distance = None, settings.DEDUPE_PHASH_MAX_DISTANCE + 1
+    for candidate in candidates:
+        distance = hamming_distance(phash, candidate.perceptual_hash)
+        if distance < best_distance:
+            best, best_distance = candidate, distance
+    return best
+
+
+def apply_cached_result(job: Job, source: Job):
+    """Completa `job` con el resultado de `source` (sin llamar a Gemini)"""
+    now = datetime.utcnow()
+    result = full_result(source)
+    result.setdefault("metadata", {})["cache"] = {
+        "hit": True,
+        "source_job_id": str(source.id),
+        "exact": source.content_hash == job.content_hash,
+    }
+
+    job.status = JobStatus.COMPLETED
+    job.started_at = now
+    job.completed_at = now
+    store_result(job, result)
+    job.cache_hit = True
+    job.reused_from_job_id = source.id
+
+    job.country_detected = source.country_detected
+    job.semaforo = source.semaforo
+    job.score = source.score
+    job.name_extracted = source.name_extracted
+    job.id_number_extracted = source.id_number_extracted
+
+
+def cache_stats(db: Session) -> dict:
+    """Tasa de aciertos del caché (panel de administración)"""
+    total, hits = db.query(
+        func.count(Job.id),
+        func.count(func.nullif(Job.cache_hit == True, False))  # noqa: E712
+    ).filter(Job.status == JobStatus.COMPLETED).one()
+    return {
+        "completed_jobs": total,
+        "cache_hits": hits,
+        "hit_rate": round(hits / total, 4) if total else 0.0,
+    }
@@ -0,0 +1,212 @@
+"""
+Rollups del panel de administración.
+
+GET /admin/stats agregaba la tabla jobs completa (varios GROUP BY, COUNT y
+AVG) en cada carga. Ahora los jobs terminados se resumen en
+job_daily_stats (día × estado × país × semáforo × usuario) y el panel lee
+ese resumen; solo los jobs en curso (pocos, por índice de estado) se
+cuentan en vivo.
+
+Actualización incremental: se recalculan los días desde la última
+actualización (con un margen de ROLLUP_WINDOW_DAYS). La hace el worker
+periódicamente (Celery beat) y, si los rollups están viejos, la primera
+lectura del panel (modo síncrono sin worker). Una reconstrucción completa
+diaria corrige cambios en días viejos (ej: jobs eliminados).
+
+La construcción inicial (recorre toda la tabla jobs) nunca se hace dentro
+de una petición: la encola el worker al arrancar, o un admin con
+POST /admin/rollups/rebuild.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.job import Job, JobStatus
+from ..models.rollup import JobDailyStat, RollupState
+
+
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED)
+IN_FLIGHT_STATUSES = (JobStatus.QUEUED, JobStatus.PROCESSING)
+
+
+def _aggregate_select(since: Optional[datetime] = None):
+    """SELECT que agrupa jobs terminados con las columnas de JobDailyStat"""
+    day = func.date(Job.completed_at)
+    country = func.coalesce(Job.country_detected, "")
+    semaforo = func.coalesce(Job.semaforo, "")
+    email = func.coalesce(Job.user_email, "")
+    query = select(
+        day,
+        Job.status,
+        country,
+        semaforo,
+        email,
+        func.max(Job.user_name),
+        func.count(Job.id),
+        func.coalesce(func.sum(Job.score), 0),
+        func.count(Job.score),
+        func.count(func.nullif(Job.cache_hit == True, False)),  # noqa: E712
+    ).where(
+        Job.status.in_(FINISHED_STATUSES),
+        Job.completed_at.isnot(None)
+    ).group_by(day, Job.status, country, semaforo, email)
+    if since is not None:
+        query = query.where(Job.completed_at >= since)
+    return query
+
+
+def refresh_rollups(db: Session, full: bool = False) -> Dict[str, Any]:
+    """
+    Recalcula los rollups (en la transacción de `db`; el llamador hace commit).
+
+    Args:
+        db: Sesión de DB
+        full: Reconstruir todos los días (si no, solo desde la última
+            actualización menos ROLLUP_WINDOW_DAYS)
+
+    Returns:
+        Dict con el primer día recalculado y las filas escritas
+    """
+    now = datetime.utcnow()
+
+    # Bloquea la fila de estado: dos actualizaciones no se pisan
+    state = db.query(RollupState).filter(RollupState.id == 1).with_for_update().first()
+    if state is None:
+        state = RollupState(id=1)
+        db.add(state)
+        full = True
+
+    if full or state.refreshed_at is None:
+        since_day = None
+        db.query(JobDailyStat).delete(synchronize_session=False)
+    else:
+        since_day = min(state.refreshed_at, now).date() - timedelta(days=settings.ROLLUP_WINDOW_DAYS - 1)
+        db.query(JobDailyStat).filter(JobDailyStat.day >= since_day).delete(synchronize_session=False)
+
+    since = datetime.combine(since_day, datetime.min.time()) if since_day else None
+    columns = [
+        JobDailyStat.day, JobDailyStat.status, JobDailyStat.country, JobDailyStat.semaforo,
+        JobDailyStat.user_email, JobDailyStat.user_name, JobDailyStat.jobs,
+        JobDailyStat.score_sum, JobDailyStat.score_count, JobDailyStat.cache_hits,
+    ]
+    written = db.execute(insert(JobDailyStat).from_select(columns, _aggregate_select(since))).rowcount
+
+    state.refreshed_at = now
+    if since_day is None:
+        state.rebuilt_at = now
+    db.flush()
+
+    return {"since": since_day.isoformat() if since_day else None, "rows": written}
+
+
+def ensure_fresh(db: Session) -> bool:
+    """
+    Actualiza los rollups si tienen más de ROLLUP_MAX_AGE_SECONDS.
+
+    Solo de forma incremental: si aún no se construyeron, no hace nada (ver
+    el docstring del módulo). Nunca lanza excepción: si falla, el panel
+    muestra los rollups que haya. Retorna si se actualizaron.
+    """
+    state = db.query(RollupState).filter(RollupState.id == 1).first()
+    if state is None or state.rebuilt_at is None:
+        return False
+    max_age = timedelta(seconds=settings.ROLLUP_MAX_AGE_SECONDS)
+    if state and state.refreshed_at and datetime.utcnow() - state.refreshed_at < max_age:
+        return False
+    try:
+        refresh_rollups(db)
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"[rollups] Error actualizando rollups: {e}")
+        return False
+
+
+def rollup_stats(db: Session) -> Dict[str, Any]:
+    """Estadísticas generales: rollups + jobs en curso contados en vivo"""
+    by_status = {
+        status.value: jobs
+        for status, jobs in db.query(JobDailyStat.status, func.sum(JobDailyStat.jobs)).group_by(JobDailyStat.status)
+    }
+    for status, count in db.query(Job.status, func.count(Job.id)).filter(
+        Job.status.in_(IN_FLIGHT_STATUSES)
+    ).group_by(Job.status):
+        by_status[status.value] = count
+
+    by_country = dict(
+        db.query(JobDailyStat.country, func.sum(JobDailyStat.jobs))
+        .filter(JobDailyStat.country != "")
+        .group_by(JobDailyStat.country)
+    )
+    by_semaforo = dict(
+        db.query(JobDailyStat.semaforo, func.sum(JobDailyStat.jobs))
+        .filter(JobDailyStat.semaforo != "")
+        .group_by(JobDailyStat.semaforo)
+    )
+    by_user = (
+        db.query(JobDailyStat.user_email, func.sum(JobDailyStat.jobs).label("count"))
+        .filter(JobDailyStat.user_email != "")
+        .group_by(JobDailyStat.user_email)
+        .order_by(func.sum(JobDailyStat.jobs).desc())
+        .limit(10)
+        .all()
+    )
+
+    score_sum, score_count = db.query(
+        func.sum(JobDailyStat.score_sum), func.sum(JobDailyStat.score_count)
+    ).one()
+    completed, cache_hits = db.query(
+        func.sum(JobDailyStat.jobs), func.sum(JobDailyStat.cache_hits)
+    ).filter(JobDailyStat.status == JobStatus.COMPLETED).one()
+    completed, cache_hits = int(completed or 0), int(cache_hits or 0)
+
+    state = db.query(RollupState).filter(RollupState.id == 1).first()
+
+    return {
+        "total_jobs": sum(int(count) for count in by_status.values()),
+        "by_status": {status: int(count) for status, count in by_status.items()},
+        "by_country": {country: int(count) for country, count in by_country.items()},
+        "by_semaforo": {semaforo: int(count) for semaforo, count in by_semaforo.items()},
+        "by_user": [{"email": email, "count": int(count)} for email, count in by_user],
+        "avg_score": round(float(score_sum) / float(score_count), 2) if score_count else 0,
+        "result_cache": {
+            "completed_jobs": completed,
+            "cache_hits": cache_hits,
+            "hit_rate": round(cache_hits / completed, 4) if completed else 0.0,
+        },
+        "refreshed_at": state.refreshed_at.isoformat() if state and state.refreshed_at else None,
+    }
+
+
+def rollup_users(db: Session) -> List[Dict[str, Any]]:
+    """Jobs terminados por usuario (completados / fallidos)"""
+    completed = func.sum(JobDailyStat.jobs).filter(JobDailyStat.status == JobStatus.COMPLETED)
+    failed = func.sum(JobDailyStat.jobs).filter(JobDailyStat.status == JobStatus.FAILED)
+    users = (
+        db.query(
+            JobDailyStat.user_email,
+            func.max(JobDailyStat.user_name),
+            func.sum(JobDailyStat.jobs),
+            completed,
+            failed,
+        )
+        .filter(JobDailyStat.user_email != "")
+        .group_by(JobDailyStat.user_email)
+        .order_by(func.sum(JobDailyStat.jobs).desc())
+        .all()
+    )
+    return [
+        {
+            "email": email,
+            "name": name,
+            "total_jobs": int(total or 0),
+            "completed": int(done or 0),
+            "failed": int(fail or 0),
+        }
+        for email, name, total, done, fail in users
+    ]
@@ -0,0 +1,158 @@
+"""
+Métricas del worker para autoescalado (GET /metrics, texto de Prometheus).
+
+- Profundidad de cada cola de Celery: mensajes pendientes en Redis,
+  sumando las listas por prioridad ("ocr", "ocr:3", ...; ver
+  broker_transport_options en hades_worker/celery_app.py).
+- Duración y estado final de cada tarea: el worker los registra al
+  terminar cada una (señal task_postrun) en hashes de Redis, así la API
+  los expone agregados de todos los procesos sin un endpoint por worker.
+
+Registrar es best-effort, como los eventos de estado: si Redis no
+responde la tarea sigue su curso.
+"""
+
+from typing import Dict, List, Optional
+
+from ..config import settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+
+METRICS_PREFIX = "hades:metrics"
+
+# Límites (segundos) del histograma de duración
+DURATION_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Separador de las listas por prioridad de kombu (igual que celery_app.py)
+PRIORITY_SEP = ":"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def task_key(task_name: str) -> str:
+    return f"{METRICS_PREFIX}:task:{task_name}"
+
+
+def queue_keys(queue: str) -> List[str]:
+    """Listas de Redis de una cola (una por nivel de prioridad)"""
+    return [queue] + [f"{queue}{PRIORITY_SEP}{priority}" for priority in range(1, 10)]
+
+
+_client = None
+
+
+def _redis():
+    """Cliente síncrono (perezoso, uno por proceso)"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=2,
+            socket_connect_timeout=2
+        )
+    return _client
+
+
+def record_task(task_name: str, queue: str, state: str, seconds: float, client=None) -> bool:
+    """Registra una ejecución de tarea; nunca lanza excepción"""
+    if client is None and not REDIS_AVAILABLE:
+        return False
+    try:
+        client = client or _redis()
+        key = task_key(task_name)
+        pipe = client.pipeline(transaction=False)
+        pipe.sadd(f"{METRICS_PREFIX}:tasks", task_name)
+        pipe.hset(key, "queue", queue)
+        for bound in DURATION_BUCKETS:
+            if seconds <= bound:
+                pipe.hincrby(key, f"le:{bound}", 1)
+        pipe.hincrby(key, "count", 1)
+        pipe.hincrbyfloat(key, "sum", seconds)
+        pipe.hincrby(key, f"state:{state}", 1)
+        pipe.execute()
+        return True
+    except Exception as e:
+        print(f"[metrics] No se pudo registrar {task_name}: {e}")
+        return False
+
+
+def collect(client=None, queues: Optional[List[str]] = None) -> Dict:
+    """
+    Lee profundidad de colas y estadísticas de tareas.
+
+    Returns:
+        {"queues": {cola: mensajes}, "tasks": {tarea: {campo: valor}}}
+    """
+    client = client or _redis()
+    queues = queues if queues is not None else settings.metrics_queues_list
+
+    pipe = client.pipeline(transaction=False)
+    for queue in queues:
+        for key in queue_keys(queue):
+            pipe.llen(key)
+    lengths = pipe.execute()
+    depths = {}
+    per_queue = len(queue_keys(""))
+    for i, queue in enumerate(queues):
+        depths[queue] = sum(lengths[i * per_queue:(i + 1) * per_queue])
+
+    names = sorted(_text(name) for name in client.smembers(f"{METRICS_PREFIX}:tasks"))
+    pipe = client.pipeline(transaction=False)
+    for name in names:
+        pipe.hgetall(task_key(name))
+    tasks = {
+        name: {_text(field): _text(value) for field, value in data.items()}
+        for name, data in zip(names, pipe.execute())
+    }
+    return {"queues": depths, "tasks": tasks}
+
+
+def _text(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def _labels(**labels) -> str:
+    inner = ",".join(f'{name}="{value}"' for name, value in labels.items())
+    return "{" + inner + "}"
+
+
+def render(snapshot: Dict) -> str:
+    """Snapshot de `collect` en formato de texto de Prometheus"""
+    lines = [
+        "# HELP hades_queue_depth Mensajes pendientes por cola de Celery",
+        "# TYPE hades_queue_depth gauge",
+    ]
+    for queue, depth in snapshot["queues"].items():
+        lines.append(f"hades_queue_depth{_labels(queue=queue)} {depth}")
+
+    lines += [
+        "# HELP hades_task_duration_seconds Duración de las tareas del worker",
+        "# TYPE hades_task_duration_seconds histogram",
+    ]
+    for name, data in snapshot["tasks"].items():
+        queue = data.get("queue", "")
+        for bound in DURATION_BUCKETS:
+            count = int(data.get(f"le:{bound}", 0))
+            lines.append(f"hades_task_duration_seconds_bucket{_labels(task=name, queue=queue, le=bound)} {count}")
+        total = int(data.get("count", 0))
+        lines.append(f"hades_task_duration_seconds_bucket{_labels(task=name, queue=queue, le='+Inf')} {total}")
+        lines.append(f"hades_task_duration_seconds_sum{_labels(task=name, queue=queue)} {float(data.get('sum', 0))}")
+        lines.append(f"hades_task_duration_seconds_count{_labels(task=name, queue=queue)} {total}")
+
+    lines += [
+        "# HELP hades_tasks_total Tareas terminadas por estado final",
+        "# TYPE hades_tasks_total counter",
+    ]
+    for name, data in snapshot["tasks"].items():
+        queue = data.get("queue", "")
+        for field, value in sorted(data.items()):
+            if field.startswith("state:"):
+                lines.append(f"hades_tasks_total{_labels(task=name, queue=queue, state=field[6:])} {int(value)}")
+
+    return "\n".join(lines) + "\n"
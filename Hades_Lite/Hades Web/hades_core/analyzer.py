@@ -4,7 +4,8 @@ Módulo principal de análisis de documentos.
 Integra OCR, detección de país, fechas, extracción de datos, traducción y análisis forense.
 """
 
-from typing import Dict, Optional
+import time
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 from .ocr import extract_text_from_image
@@ -12,7 +13,84 @@ from .country import detect_country, get_country_name
 from .dates.dates import process_dates_by_type, DateInfo
 from .extraction import extract_all_data, ExtractedData
 from .translation import translate_to_spanish, detect_language, should_translate
-from .forensics import analyze_document_authenticity, SemaforoLevel
+from .forensics import (
+    analyze_document_authenticity,
+    gemini_vision_forensic_analysis,
+    GEMINI_AVAILABLE,
+    score_visual_analysis,
+    SemaforoLevel,
+)
+from .fused import fused_document_analysis, FUSED_MODEL
+from .pipeline import STATUS_OK, Stage, StageOutcome, run_stages
+from .preprocess import prepare_image
+
+
+# Timeouts por etapa (segundos). Se pueden sobreescribir con
+# config["stage_timeouts"]; "ocr_timeout" se mantiene por compatibilidad.
+DEFAULT_STAGE_TIMEOUTS = {
+    "ocr": 30,
+    "vision": 60,
+    "translation": 30,
+    "fused": 60,
+}
+
+# Modos de análisis: "multi" (OCR, visión y traducción por separado) o
+# "fused" (una sola llamada multimodal con salida JSON)
+ANALYSIS_MODES = ("multi", "fused")
+
+# Etapas del primer tramo cuando el análisis se reparte en dos tareas
+# (`run_ocr_stages`): las llamadas de texto a Gemini. El pre-procesamiento
+# no viaja entre tareas (se repite; es barato frente a Gemini).
+OCR_STAGES = ("fused", "ocr", "translation")
+
+
+def failed_stages(stages: Dict[str, Dict], names=OCR_STAGES) -> Dict[str, str]:
+    """
+    Etapas de `names` que terminaron con error o timeout.
+
+    Args:
+        stages: Estados por etapa, como `metadata["stages"]` o la salida
+            de `run_ocr_stages`
+        names: Etapas a revisar
+
+    Returns:
+        Dict nombre -> error (vacío si todas terminaron bien)
+    """
+    return {
+        name: data.get("error") or data["status"]
+        for name, data in stages.items()
+        if name in names and data["status"] != STATUS_OK
+        and not (name == "fused" and _fused_recovered(stages))
+    }
+
+
+def _fused_recovered(stages: Dict[str, Dict]) -> bool:
+    """La llamada fusionada falló pero el OCR del modo "multi" la reemplazó"""
+    return stages.get("ocr", {}).get("status") == STATUS_OK
+
+
+def _ocr_text(done: Dict) -> str:
+    ocr = done.get("ocr")
+    return ocr[0] if ocr else ""
+
+
+def _replay_stage(stage: Stage, data: Dict) -> Stage:
+    """Etapa que devuelve (o vuelve a fallar con) el resultado de otra tarea"""
+    def replay(done):
+        if data["status"] != STATUS_OK:
+            raise Exception(data.get("error"))
+        return data["value"]
+    return Stage(stage.name, replay)
+
+
+def _outcome_from_dict(name: str, data: Dict) -> StageOutcome:
+    return StageOutcome(
+        name,
+        data["status"],
+        data.get("value"),
+        error=data.get("error"),
+        elapsed_ms=data.get("elapsed_ms", 0.0)
+    )
 
 
 class AnalysisResult:
@@ -34,6 +112,7 @@ class AnalysisResult:
         self.score = 0
         self.warnings = []
         self.metadata = {}
+        self.prepared_image = None  # PreparedImage (no se serializa)
         
     def to_dict(self) -> Dict:
         """Convierte el resultado a diccionario para API"""
@@ -76,28 +155,214 @@ class AnalysisResult:
         }
 
 
+def _build_stages(image_bytes: bytes, gemini_api_key: Optional[str], config: Dict) -> List[Stage]:
+    """Grafo de etapas de `analyze_image` (ver su docstring para `config`)"""
+    timeouts = {**DEFAULT_STAGE_TIMEOUTS, **config.get("stage_timeouts", {})}
+    if "ocr_timeout" in config:
+        timeouts["ocr"] = config["ocr_timeout"]
+    auto_translate = config.get("auto_translate", True)
+    mode = config.get("mode", "multi")
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Modo de análisis desconocido: {mode}")
+
+    preprocess = config.get("preprocess", True)
+    targets = config.get("preprocess_targets")
+
+    # --- Etapas (cada una recibe los resultados de las previas) ---
+
+    def stage_preprocess(done):
+        # Una sola decodificación; las versiones por etapa se cachean
+        return prepare_image(image_bytes, crop=config.get("crop", False))
+
+    def image_for(done, stage):
+        """(bytes, mime_type) para la etapa; mime None = imagen sin procesar"""
+        prepared = done.get("preprocess")
+        if prepared is None:
+            return image_bytes, None
+        # El forense recibe una copia sin pérdida: re-comprimir a JPEG
+        # borra los niveles de error que mira el ELA
+        if stage == "forensics" and config.get("forensics_lossless", True):
+            return prepared.ela_copy(long_edge=(targets or {}).get("forensics"))
+        return prepared.for_stage(stage, targets)
+
+    def stage_ocr(done):
+        data, mime_type = image_for(done, "ocr")
+        return extract_text_from_image(
+            data,
+            api_key=gemini_api_key,
+            timeout=timeouts["ocr"],
+            mime_type=mime_type
+        )
+
+    def stage_vision(done):
+        # Solo necesita la imagen: corre en paralelo con el OCR
+        data, mime_type = image_for(done, "forensics")
+        return gemini_vision_forensic_analysis(data, gemini_api_key, mime_type=mime_type)
+
+    # Modo fusionado: una llamada, las etapas derivan de su JSON. Si la
+    # llamada falla, expira o su JSON no sirve, cada etapa derivada corre
+    # su versión del modo "multi".
+
+    def stage_fused(done):
+        data, mime_type = image_for(done, "ocr")
+        return fused_document_analysis(
+            data,
+            api_key=gemini_api_key,
+            timeout=timeouts["fused"],
+            mime_type=mime_type
+        )
+
+    def _fused_data(done):
+        return done["fused"][0]
+
+    def stage_fused_ocr(done):
+        if "fused" not in done:
+            return stage_ocr(done)
+        data = _fused_data(done)
+        return data["transcription"], done["fused"][1]
+
+    def stage_fused_vision(done):
+        if "fused" not in done:
+            return stage_vision(done)
+        forensics = _fused_data(done).get("forensics", {})
+        analysis = forensics.get("analysis", "")
+        score, details = score_visual_analysis(analysis)
+        details.extend(f"Hallazgo: {f}" for f in forensics.get("findings", []))
+        return score, details, analysis
+
+    def stage_fused_translation(done):
+        if "fused" not in done:
+            return stage_translation(done)
+        data = _fused_data(done)
+        text = data["transcription"]
+        if not text or not auto_translate:
+            return None
+        language = data.get("language") or detect_language(text)
+        if language == "es":
+            return language, text, None
+        return language, data["translation_es"] or text, {
+            "source_lang": language,
+            "target_lang": "es",
+            "translated": True,
+            "model": FUSED_MODEL
+        }
+
+    def stage_country(done):
+        text = _ocr_text(done)
+        return detect_country(text) if text else None
+
+    def stage_translation(done):
+        text = _ocr_text(done)
+        if not text or not auto_translate:
+            return None
+        language = detect_language(text)
+        if not should_translate(text):
+            return language, text, None
+        translated_text, translation_metadata = translate_to_spanish(
+            text,
+            source_lang=language,
+            api_key=gemini_api_key
+        )
+        return language, translated_text, translation_metadata
+
+    def stage_dates(done):
+        # Usar texto original (CON PRESERVACIÓN)
+        text = _ocr_text(done)
+        if not text:
+            return {}
+        return process_dates_by_type(text, country_hint=done.get("country"))
+
+    def stage_extraction(done):
+        # Usar texto traducido si está disponible
+        translation = done.get("translation")
+        text = (translation[1] if translation else "") or _ocr_text(done)
+        if not text:
+            return None
+        return extract_all_data(text, country=done.get("country"))
+
+    def stage_forensics(done):
+        visual = done.get("vision")
+        if visual is None and GEMINI_AVAILABLE:
+            visual = (0, ["Análisis visual no disponible (error o timeout)"], "")
+        return analyze_document_authenticity(
+            _ocr_text(done),
+            image_bytes,
+            api_key=gemini_api_key,
+            visual=visual
+        )
+
+    image_deps = ["preprocess"] if preprocess else []
+    stages = [Stage("preprocess", stage_preprocess)] if preprocess else []
+
+    if mode == "fused" and GEMINI_AVAILABLE:
+        stages += [
+            Stage("fused", stage_fused, deps=image_deps, timeout=timeouts["fused"]),
+            # Los timeouts solo cuentan si hay que recurrir al modo "multi"
+            Stage("ocr", stage_fused_ocr, deps=["fused"], timeout=timeouts["ocr"]),
+            Stage("vision", stage_fused_vision, deps=["fused"], timeout=timeouts["vision"]),
+            Stage("translation", stage_fused_translation, deps=["fused", "ocr"],
+                  timeout=timeouts["translation"]),
+        ]
+    else:
+        stages += [
+            Stage("ocr", stage_ocr, deps=image_deps, timeout=timeouts["ocr"]),
+            Stage("translation", stage_translation, deps=["ocr"], timeout=timeouts["translation"]),
+        ]
+        if GEMINI_AVAILABLE:
+            stages.append(Stage("vision", stage_vision, deps=image_deps, timeout=timeouts["vision"]))
+
+    # Post-proceso determinista (común a ambos modos). Sin Gemini el
+    # forense se limita al análisis de texto.
+    vision_deps = ["vision"] if any(s.name == "vision" for s in stages) else []
+    stages += [
+        Stage("country", stage_country, deps=["ocr"]),
+        Stage("dates", stage_dates, deps=["ocr", "country"]),
+        Stage("extraction", stage_extraction, deps=["translation", "country"]),
+        Stage("forensics", stage_forensics, deps=["ocr"] + vision_deps),
+    ]
+
+    return stages
+
+
 def analyze_image(
     image_bytes: bytes,
     gemini_api_key: Optional[str] = None,
-    config: Optional[Dict] = None
+    config: Optional[Dict] = None,
+    partial: Optional[Dict] = None
 ) -> AnalysisResult:
     """
     Analiza una imagen de documento completa.
     
     Esta es la función principal del motor de análisis.
     
-    Proceso:
+    Proceso (grafo de etapas, ver `pipeline.run_stages`):
+    0. Pre-procesamiento - orientación EXIF, recorte y versiones reducidas
+       por etapa (ver `preprocess.py`), una sola vez por documento
     1. OCR - Extrae texto con Gemini Vision
+       (en paralelo con el análisis visual forense, que solo usa la imagen)
     2. Detección de país
     3. Traducción automática (si necesario)
     4. Procesamiento de fechas (CON PRESERVACIÓN)
     5. Extracción de nombres e IDs
-    6. Análisis forense completo
+    6. Análisis forense completo (texto + resultado visual)
+
+    Cada etapa tiene timeout propio; si una falla o lo excede, el resultado
+    es parcial y los tiempos/estados quedan en `metadata["stages"]`.
+    En modo "fused", si la llamada fusionada falla, OCR, visión y traducción
+    se repiten en modo "multi" y el cambio queda en `metadata["fallback"]`.
     
     Args:
         image_bytes: Bytes de la imagen a analizar
         gemini_api_key: API key de Gemini (opcional si está en entorno)
-        config: Configuración adicional (opcional)
+        config: Configuración adicional (opcional): auto_translate,
+            ocr_timeout, stage_timeouts, max_workers, mode ("multi" |
+            "fused", ver ANALYSIS_MODES), preprocess, crop (recorte
+            heurístico al documento, desactivado por defecto),
+            preprocess_targets (lado largo por etapa), forensics_lossless
+            (copia sin pérdida para el forense, activado por defecto)
+        partial: Salida de `run_ocr_stages` para el mismo documento y
+            config. Esas etapas no se vuelven a ejecutar (el worker corre
+            el OCR y el resto del análisis en tareas distintas)
         
     Returns:
         AnalysisResult con todos los datos del análisis
@@ -112,96 +377,97 @@ def analyze_image(
     """
     result = AnalysisResult()
     config = config or {}
-    
-    # 1. OCR - Extraer texto
-    try:
-        ocr_text, ocr_metadata = extract_text_from_image(
-            image_bytes,
-            api_key=gemini_api_key,
-            timeout=config.get("ocr_timeout", 30)
-        )
-        result.ocr_text = ocr_text
-        result.metadata["ocr"] = ocr_metadata
-    except Exception as e:
-        result.warnings.append(f"Error en OCR: {str(e)}")
-        result.ocr_text = ""
-    
-    # 2. Detectar país
-    if result.ocr_text:
-        result.country_code = detect_country(result.ocr_text)
+    stages = _build_stages(image_bytes, gemini_api_key, config)
+    replayed = (partial or {}).get("stages", {})
+    stages = [_replay_stage(s, replayed[s.name]) if s.name in replayed else s for s in stages]
+
+    started = time.perf_counter()
+    outcomes = run_stages(stages, max_workers=config.get("max_workers", 4))
+    total_ms = round((time.perf_counter() - started) * 1000, 1)
+    if partial:
+        # Estados y tiempos de las etapas ejecutadas en la otra tarea
+        for name, data in replayed.items():
+            if name in outcomes:
+                outcomes[name] = _outcome_from_dict(name, data)
+        total_ms = round(total_ms + partial.get("pipeline_ms", 0), 1)
+
+    def failed(name: str, label: str) -> bool:
+        outcome = outcomes.get(name)
+        if outcome is None or outcome.ok:
+            return False
+        result.warnings.append(f"Error en {label}: {outcome.error}")
+        return True
+
+    # 0. Pre-procesamiento (si falla, las etapas usan la imagen original)
+    if not failed("preprocess", "pre-procesamiento de imagen") and "preprocess" in outcomes:
+        result.prepared_image = outcomes["preprocess"].value
+        result.metadata["image"] = result.prepared_image.stats()
+
+    # 1. OCR
+    if not failed("ocr", "OCR"):
+        result.ocr_text, result.metadata["ocr"] = outcomes["ocr"].value
+
+    # 2. País
+    if not failed("country", "detección de país"):
+        result.country_code = outcomes["country"].value
         if result.country_code:
             result.country_name = get_country_name(result.country_code)
-    
-    # 3. Traducción automática (si necesario)
-    if result.ocr_text and config.get("auto_translate", True):
-        try:
-            result.language_detected = detect_language(result.ocr_text)
-            
-            if should_translate(result.ocr_text):
-                translated_text, translation_metadata = translate_to_spanish(
-                    result.ocr_text,
-                    source_lang=result.language_detected,
-                    api_key=gemini_api_key
-                )
-                result.ocr_text_translated = translated_text
+
+    # 3. Traducción
+    if not failed("translation", "traducción"):
+        translation = outcomes["translation"].value
+        if translation:
+            language, translated_text, translation_metadata = translation
+            result.language_detected = language
+            result.ocr_text_translated = translated_text
+            if translation_metadata is not None:
                 result.was_translated = translation_metadata.get("translated", False)
                 result.metadata["translation"] = translation_metadata
-            else:
-                result.ocr_text_translated = result.ocr_text
-                result.was_translated = False
-        except Exception as e:
-            result.warnings.append(f"Error en traducción: {str(e)}")
-            result.ocr_text_translated = result.ocr_text
-    
-    # 4. Procesar fechas (CON PRESERVACIÓN) - usar texto original
-    if result.ocr_text:
-        try:
-            dates_dict = process_dates_by_type(
-                result.ocr_text,
-                country_hint=result.country_code
-            )
-            result.dates = dates_dict
-            
-            # Agregar warnings de fechas ambiguas
-            for date_type, date_info in dates_dict.items():
-                if date_info and date_info.is_ambiguous:
-                    result.warnings.extend(date_info.warnings)
-                    
-        except Exception as e:
-            result.warnings.append(f"Error procesando fechas: {str(e)}")
-    
-    # 5. Extracción de nombres e IDs - usar texto traducido si está disponible
-    text_for_extraction = result.ocr_text_translated or result.ocr_text
-    if text_for_extraction:
-        try:
-            extracted_data = extract_all_data(
-                text_for_extraction,
-                country=result.country_code
-            )
+    elif result.ocr_text:
+        result.ocr_text_translated = result.ocr_text
+
+    # 4. Fechas
+    if not failed("dates", "procesando fechas"):
+        result.dates = outcomes["dates"].value or {}
+        # Agregar warnings de fechas ambiguas
+        for date_type, date_info in result.dates.items():
+            if date_info and date_info.is_ambiguous:
+                result.warnings.extend(date_info.warnings)
+
+    # 5. Nombres e IDs
+    if not failed("extraction", "extrayendo datos"):
+        extracted_data = outcomes["extraction"].value
+        if extracted_data:
             result.name = extracted_data.name
             result.id_number = extracted_data.id_number
             result.id_type = extracted_data.id_type
             result.metadata["extraction_confidence"] = extracted_data.confidence
-        except Exception as e:
-            result.warnings.append(f"Error extrayendo datos: {str(e)}")
-    
-    # 6. Análisis forense completo
-    try:
-        forensic_result = analyze_document_authenticity(
-            result.ocr_text,
-            image_bytes,
-            api_key=gemini_api_key
-        )
+
+    # 6. Forense
+    fallback = "fused" in outcomes and not outcomes["fused"].ok
+    if fallback:
+        # Las etapas derivadas corrieron en modo "multi"
+        result.metadata["fallback"] = {
+            "from": "fused",
+            "to": "multi",
+            "reason": outcomes["fused"].error or outcomes["fused"].status,
+        }
+    failed("vision", "análisis visual forense")
+    if not failed("forensics", "análisis forense"):
+        forensic_result = outcomes["forensics"].value
         result.forensic_result = forensic_result
         result.semaforo = forensic_result.semaforo
         result.score = forensic_result.score
         result.warnings.extend(forensic_result.warnings)
-    except Exception as e:
-        result.warnings.append(f"Error en análisis forense: {str(e)}")
+    else:
         result.semaforo = SemaforoLevel.AMARILLO
         result.score = 50
-    
+
     # 7. Metadata final
+    result.metadata["mode"] = "fused" if "fused" in outcomes and not fallback else "multi"
+    result.metadata["stages"] = {name: o.to_dict() for name, o in outcomes.items()}
+    result.metadata["pipeline_ms"] = total_ms
+    result.metadata["partial"] = bool(failed_stages(result.metadata["stages"], outcomes))
     result.metadata["analysis_timestamp"] = datetime.now().isoformat()
     result.metadata["country_detected"] = result.country_code is not None
     result.metadata["dates_found"] = len([d for d in result.dates.values() if d is not None])
@@ -209,3 +475,45 @@ def analyze_image(
     result.metadata["id_extracted"] = result.id_number is not None
     
     return result
+
+
+def run_ocr_stages(
+    image_bytes: bytes,
+    gemini_api_key: Optional[str] = None,
+    config: Optional[Dict] = None
+) -> Dict[str, Any]:
+    """
+    Primer tramo del análisis: OCR y traducción (o la llamada fusionada).
+    
+    El resto (análisis visual, país, fechas, extracción y forense) lo hace
+    `analyze_image(..., partial=<esta salida>)`, normalmente en otra tarea
+    del worker: un timeout de Gemini en una etapa no retiene al worker de
+    la otra.
+    
+    Args:
+        image_bytes: Bytes de la imagen a analizar
+        gemini_api_key: API key de Gemini (opcional si está en entorno)
+        config: Misma configuración que se pasará a `analyze_image`
+        
+    Returns:
+        Dict serializable a JSON: {"stages": {nombre: {"status",
+        "elapsed_ms", "error"?, "value"}}, "pipeline_ms": float}
+    """
+    config = config or {}
+    stages = [
+        s for s in _build_stages(image_bytes, gemini_api_key, config)
+        if s.name in OCR_STAGES or s.name == "preprocess"
+    ]
+
+    started = time.perf_counter()
+    outcomes = run_stages(stages, max_workers=config.get("max_workers", 4))
+    total_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    return {
+        "stages": {
+            name: {**outcome.to_dict(), "value": outcome.value}
+            for name, outcome in outcomes.items()
+            if name in OCR_STAGES
+        },
+        "pipeline_ms": total_ms,
+    }
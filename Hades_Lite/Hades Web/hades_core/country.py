@@ -1,59 +1,22 @@
 """
 Módulo de detección de país para documentos.
 
-Copiado de Hades Ultimate sin cambios.
+Pistas copiadas de Hades Ultimate; la búsqueda está en cues.py (compartida
+con Hades Lite).
 """
 
-from typing import Optional
+from typing import List, Optional, Tuple
 
-# Diccionario de pistas por país (copiado de Hades Ultimate)
-COUNTRY_CUES = {
-    "GT": ["guatemala", "guatemalteca", "republica de guatemala", "identificacion consular", 
-           "documento personal de identificación", "pasaporte guatemala", "país emisor: gtm", 
-           "registro nacional de las personas"],
-    "PH": ["pasaporte", "republic of the philippines", "republika ng pilipinas", 
-           "código de país: phl", "filipino"],
-    "MX": ["ine", "instituto nacional electoral", "credencial para votar", "clave de elector", 
-           "curp", "rfc", "licencia de conducir", "pasaporte", "matrícula consular", 
-           "estados unidos mexicanos", "clave del país de expedición: mex"],
-    "HN": ["registro nacional de las personas", "pasaporte", "honduras"],
-    "CO": ["cédula de ciudadanía", "cedula de ciudadania", "pasaporte", "republica de colombia"],
-    "PE": ["dni", "documento nacional de identidad", "pasaporte", "peru", "república del perú"],
-    "NI": ["consejo supremo electoral", "pasaporte", "nicaragua"],
-    "SV": ["documento único de identidad", "dui", "pasaporte", "el salvador"],
-    "EC": ["cédula de ciudadanía", "pasaporte", "ecuador"],
-    "DO": ["república dominicana", "pasaporte"],
-    "VE": ["matrícula consular", "venezuela"],
-    "US": ["united states", "usa", "state of", "driver license", "dl class", "id card", 
-           "department of motor vehicles", "dmv", "ssn", "uscis", "passport of the united states"],
-    "ES": ["dni", "nif", "número de soporte", "ministerio del interior", "reino de españa", 
-           "pasaporte español"],
-    "AR": ["dni", "registro nacional de las personas", "república argentina", "republica argentina"],
-    "BR": ["cpf", "rg", "carteira de identidade", "carteira nacional de habilitação", "cnh", 
-           "registro geral", "documento de identidade", "passaporte", "república federativa do brasil"],
-    "CL": ["rut", "rol único tributario", "cédula de identidad", "pasaporte", "república de chile"],
-    "PY": ["cédula de identidad civil", "pasaporte", "república del paraguay"],
-    "UY": ["cédula de identidad", "documento de identidad", "pasaporte", 
-           "república oriental del uruguay"],
-    "BO": ["cédula de identidad", "pasaporte", "estado plurinacional de bolivia"],
-    "CR": ["cédula de identidad", "documento de identidad", "pasaporte", "república de costa rica"],
-    "PA": ["cédula de identidad personal", "pasaporte", "república de panamá"],
-    "CU": ["carné de identidad", "pasaporte", "república de cuba"],
-    "HT": ["carte d'identité nationale", "pasaporte", "république d'haïti"],
-    "JM": ["national id", "electoral id", "passport", "jamaica"],
-    "TT": ["national id card", "passport", "trinidad and tobago"],
-    "PK": ["cnic", "computerized national identity card", "national identity card", "passport",
-           "tarjeta de identidad nacional", "pakistan"],
-    "IL": ["teudat zehut", "תעודת זהות", "israeli id", "passport", "state of israel", "מדינת ישראל"],
-    "VN": ["căn cước công dân", "chứng minh nhân dân", "giấy chứng minh nhân dân",
-           "giấy tờ tùy thân", "hộ chiếu", "social insurance book", "republic of vietnam", "vietnam"],
-}
+from .cues import best_country, country_candidates
 
 
 def detect_country(text: str) -> Optional[str]:
     """
     Detecta el país de origen de un documento basándose en palabras clave.
     
+    Gana el país con mayor puntaje (ver cues.py), no el primero del
+    diccionario con alguna pista.
+    
     Args:
         text: Texto OCR del documento
         
@@ -63,13 +26,20 @@ def detect_country(text: str) -> Optional[str]:
     if not text:
         return None
     
-    text_lower = text.lower()
-    
-    for country_code, cues in COUNTRY_CUES.items():
-        if any(cue in text_lower for cue in cues):
-            return country_code
+    return best_country(text)
+
+
+def detect_country_candidates(text: str) -> List[Tuple[str, float]]:
+    """
+    Países candidatos con su puntaje, de mayor a menor.
     
-    return None
+    Args:
+        text: Texto OCR del documento
+        
+    Returns:
+        Lista de (código de país, puntaje); vacía si no hay pistas
+    """
+    return country_candidates(text)
 
 
 def get_country_name(country_code: str) -> str:
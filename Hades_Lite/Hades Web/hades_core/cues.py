@@ -0,0 +1,256 @@
+"""
+Detección de país e idioma por palabras clave (Aho–Corasick).
+
+Antes cada detector recorría sus listas con `any(cue in text_lower ...)`:
+detect_country devolvía el primer país del diccionario con alguna pista (un
+"pasaporte" mexicano salía como PH) y cada detector repetía su propio
+recorrido del texto. Ahora todas las pistas (países, idiomas y meses) forman
+un solo autómata construido al importar, y una pasada lineal sobre el texto
+produce puntajes para todos los candidatos.
+
+Puntaje de país: suma de los pesos de las pistas distintas encontradas. El
+peso de una pista es 1 / (países que la comparten), así "pasaporte" casi no
+decide y "instituto nacional electoral" sí. Las pistas de país deben
+aparecer como palabras completas ("ine" no coincide dentro de "line").
+
+Las pistas de idioma conservan la semántica anterior (subcadena, pistas
+distintas contadas una vez).
+
+Este módulo solo usa la biblioteca estándar y no importa nada de
+hades_core: Hades Lite (escritorio) lo carga por ruta de archivo.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+# Diccionario de pistas por país (copiado de Hades Ultimate). El orden
+# desempata países con el mismo puntaje.
+COUNTRY_CUES = {
+    "GT": ["guatemala", "guatemalteca", "republica de guatemala", "identificacion consular",
+           "documento personal de identificación", "pasaporte guatemala", "país emisor: gtm",
+           "registro nacional de las personas"],
+    "PH": ["pasaporte", "republic of the philippines", "republika ng pilipinas",
+           "código de país: phl", "filipino"],
+    "MX": ["ine", "instituto nacional electoral", "credencial para votar", "clave de elector",
+           "curp", "rfc", "licencia de conducir", "pasaporte", "matrícula consular",
+           "estados unidos mexicanos", "clave del país de expedición: mex"],
+    "HN": ["registro nacional de las personas", "pasaporte", "honduras"],
+    "CO": ["cédula de ciudadanía", "cedula de ciudadania", "pasaporte", "republica de colombia"],
+    "PE": ["dni", "documento nacional de identidad", "pasaporte", "peru", "república del perú"],
+    "NI": ["consejo supremo electoral", "pasaporte", "nicaragua"],
+    "SV": ["documento único de identidad", "dui", "pasaporte", "el salvador"],
+    "EC": ["cédula de ciudadanía", "pasaporte", "ecuador"],
+    "DO": ["república dominicana", "pasaporte"],
+    "VE": ["matrícula consular", "venezuela"],
+    "US": ["united states", "usa", "state of", "driver license", "dl class", "id card",
+           "department of motor vehicles", "dmv", "ssn", "uscis", "passport of the united states"],
+    "ES": ["dni", "nif", "número de soporte", "ministerio del interior", "reino de españa",
+           "pasaporte español"],
+    "AR": ["dni", "registro nacional de las personas", "república argentina", "republica argentina"],
+    "BR": ["cpf", "rg", "carteira de identidade", "carteira nacional de habilitação", "cnh",
+           "registro geral", "documento de identidade", "passaporte", "república federativa do brasil"],
+    "CL": ["rut", "rol único tributario", "cédula de identidad", "pasaporte", "república de chile"],
+    "PY": ["cédula de identidad civil", "pasaporte", "república del paraguay"],
+    "UY": ["cédula de identidad", "documento de identidad", "pasaporte",
+           "república oriental del uruguay"],
+    "BO": ["cédula de identidad", "pasaporte", "estado plurinacional de bolivia"],
+    "CR": ["cédula de identidad", "documento de identidad", "pasaporte", "república de costa rica"],
+    "PA": ["cédula de identidad personal", "pasaporte", "república de panamá"],
+    "CU": ["carné de identidad", "pasaporte", "república de cuba"],
+    "HT": ["carte d'identité nationale", "pasaporte", "république d'haïti"],
+    "JM": ["national id", "electoral id", "passport", "jamaica"],
+    "TT": ["national id card", "passport", "trinidad and tobago"],
+    "PK": ["cnic", "computerized national identity card", "national identity card", "passport",
+           "tarjeta de identidad nacional", "pakistan"],
+    "IL": ["teudat zehut", "תעודת זהות", "israeli id", "passport", "state of israel", "מדינת ישראל"],
+    "VN": ["căn cước công dân", "chứng minh nhân dân", "giấy chứng minh nhân dân",
+           "giấy tờ tùy thân", "hộ chiếu", "social insurance book", "republic of vietnam", "vietnam"],
+}
+
+# Palabras clave de idioma (translation.detect_language). El orden desempata.
+LANGUAGE_KEYWORDS = {
+    "es": ["nombre", "apellido", "fecha", "nacimiento", "expedición", "vencimiento"],
+    "en": ["name", "surname", "date", "birth", "issue", "expiration", "license"],
+    "pt": ["nome", "sobrenome", "data", "nascimento", "emissão", "validade"],
+    "vi": ["họ", "tên", "ngày", "sinh", "cấp", "hết hạn"],
+}
+
+# Meses (sesgo de idioma para normalizar fechas en Hades Lite)
+MONTH_KEYWORDS = {
+    "ES": ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+           "septiembre", "setiembre", "octubre", "noviembre", "diciembre",
+           "ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "sep", "oct", "nov", "dic"],
+    "EN": ["january", "february", "march", "april", "may", "june", "july", "august",
+           "september", "october", "november", "december",
+           "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+           "ene", "abr", "ago", "dic"],
+}
+
+
+class CueAutomaton:
+    """
+    Autómata Aho–Corasick sobre texto en minúsculas.
+
+    Cada pista lleva una o más etiquetas (tipo, valor, peso, palabra_completa).
+    `scan` recorre el texto una vez y devuelve, por tipo, el puntaje de cada
+    valor (cada pista distinta cuenta una sola vez).
+
+    Las transiciones se precalculan completas (DFA): el recorrido es un
+    diccionario por carácter, sin seguir enlaces de fallo.
+    """
+
+    def __init__(self, entries: List[Tuple[str, str, str, float, bool]]):
+        """
+        Args:
+            entries: (pista, tipo, valor, peso, palabra_completa)
+        """
+        self._cues: List[Tuple[str, List[Tuple[str, str, float, bool]]]] = []
+        cue_ids: Dict[str, int] = {}
+        for cue, kind, value, weight, whole_word in entries:
+            cue = cue.lower()
+            if cue not in cue_ids:
+                cue_ids[cue] = len(self._cues)
+                self._cues.append((cue, []))
+            self._cues[cue_ids[cue]][1].append((kind, value, weight, whole_word))
+
+        # Trie
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[int]] = [[]]
+        for cue_id, (cue, _) in enumerate(self._cues):
+            state = 0
+            for ch in cue:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(cue_id)
+
+        # Enlaces de fallo (BFS) y transiciones completas
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            output[state] = output[state] + output[fail[state]]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                queue.append(nxt)
+
+        self._delta = delta
+        self._output = [tuple(ids) for ids in output]
+        self._word_cues = {
+            cue_id for cue_id, (_, labels) in enumerate(self._cues)
+            if any(whole_word for *_, whole_word in labels)
+        }
+
+    def scan(self, text: str) -> Dict[str, Dict[str, float]]:
+        """Tipo -> {valor: puntaje} para las pistas presentes en el texto"""
+        text = (text or "").lower()
+        delta = self._delta
+        output = self._output
+
+        # Única pasada: solo se guardan las posiciones con alguna pista
+        hits = []
+        state = 0
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if output[state]:
+                hits.append((i, state))
+
+        found = set()
+        as_word = set()
+        for end, state in hits:
+            for cue_id in output[state]:
+                found.add(cue_id)
+                if cue_id in self._word_cues and cue_id not in as_word:
+                    if _is_word(text, end - len(self._cues[cue_id][0]) + 1, end + 1):
+                        as_word.add(cue_id)
+
+        scores: Dict[str, Dict[str, float]] = {}
+        for cue_id in found:
+            for kind, value, weight, whole_word in self._cues[cue_id][1]:
+                if whole_word and cue_id not in as_word:
+                    continue
+                kind_scores = scores.setdefault(kind, {})
+                kind_scores[value] = kind_scores.get(value, 0.0) + weight
+        return scores
+
+
+def _is_word(text: str, start: int, end: int) -> bool:
+    """La coincidencia text[start:end] no está pegada a letras o dígitos"""
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+def _build_entries() -> List[Tuple[str, str, str, float, bool]]:
+    sharing: Dict[str, int] = {}
+    for cues in COUNTRY_CUES.values():
+        for cue in set(cues):
+            sharing[cue] = sharing.get(cue, 0) + 1
+
+    entries = []
+    for country, cues in COUNTRY_CUES.items():
+        for cue in dict.fromkeys(cues):
+            entries.append((cue, "country", country, 1.0 / sharing[cue], True))
+    for lang, keywords in LANGUAGE_KEYWORDS.items():
+        for keyword in keywords:
+            entries.append((keyword, "language", lang, 1.0, False))
+    for lang, months in MONTH_KEYWORDS.items():
+        for month in months:
+            entries.append((month, "month", lang, 1.0, False))
+    return entries
+
+
+AUTOMATON = CueAutomaton(_build_entries())
+
+
+@lru_cache(maxsize=256)
+def scan_cues(text: str) -> Dict[str, Dict[str, float]]:
+    """
+    Una pasada sobre el texto con todas las pistas.
+
+    Se cachea por texto: el análisis detecta país e idioma del mismo OCR en
+    etapas distintas y ambas comparten el recorrido. No modificar el dict.
+    """
+    return AUTOMATON.scan(text)
+
+
+def _ranked(scores: Dict[str, float], order) -> List[Tuple[str, float]]:
+    """Candidatos de mayor a menor puntaje; empates según `order`"""
+    rank = {value: i for i, value in enumerate(order)}
+    return sorted(scores.items(), key=lambda item: (-item[1], rank[item[0]]))
+
+
+def country_candidates(text: str) -> List[Tuple[str, float]]:
+    """Países con alguna pista en el texto, ordenados por puntaje"""
+    if not text:
+        return []
+    return _ranked(scan_cues(text).get("country", {}), COUNTRY_CUES)
+
+
+def best_country(text: str) -> Optional[str]:
+    """País con mayor puntaje, o None si no hay pistas"""
+    candidates = country_candidates(text)
+    return candidates[0][0] if candidates else None
+
+
+def language_counts(text: str) -> Dict[str, int]:
+    """Palabras clave distintas encontradas por idioma (todos los idiomas)"""
+    found = scan_cues(text).get("language", {}) if text else {}
+    return {lang: int(found.get(lang, 0)) for lang in LANGUAGE_KEYWORDS}
+
+
+def month_language(text: str) -> Optional[str]:
+    """
+    Idioma sugerido por los nombres de meses: "ES", "EN" o None.
+
+    Empate a favor de ES (como _detect_language_bias en Hades Lite).
+    """
+    found = scan_cues(text).get("month", {}) if text else {}
+    score_es, score_en = found.get("ES", 0), found.get("EN", 0)
+    return "ES" if score_es >= score_en and score_es > 0 else ("EN" if score_en > 0 else None)
@@ -8,9 +8,11 @@ from .dates import (
     DateInfo,
     DateType,
     DateFormat,
+    DateSpan,
     analyze_date,
     extract_dates_from_text,
     process_dates_by_type,
+    scan_dates,
     detect_date_format,
     parse_date
 )
@@ -19,9 +21,11 @@ __all__ = [
     "DateInfo",
     "DateType",
     "DateFormat",
+    "DateSpan",
     "analyze_date",
     "extract_dates_from_text",
     "process_dates_by_type",
+    "scan_dates",
     "detect_date_format",
     "parse_date"
 ]
@@ -7,9 +7,10 @@ CAMBIO PRINCIPAL vs Hades Ultimate:
 """
 
 import re
+from bisect import bisect_right
 from datetime import datetime, date
 from typing import Optional, Dict, List, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
 
@@ -88,6 +89,129 @@ _DATE_RE_TXT_EN_DMY = re.compile(r'\b(\d{1,2})\s+([A-Za-z]{3,})\s+(\d{2,4})\b',
 _DATE_RE_TXT_EN_MDY = re.compile(r'\b([A-Za-z]{3,})\s+(\d{1,2})\s+(\d{2,4})\b', re.IGNORECASE)
 
 
+# Orden de prioridad de los patrones: dentro de una línea, las fechas se
+# clasifican en este orden (todas las de NUM_A, luego las de ISO...)
+_DATE_PATTERNS = [
+    ("num_a", _DATE_RE_NUM_A),
+    ("iso", _DATE_RE_ISO),
+    ("dmy_h", _DATE_RE_DMY_H),
+    ("dot", _DATE_RE_DD_MM_YYYY_DOT),
+    ("space", _DATE_RE_DD_MM_YYYY_SPACE),
+    ("txt_es", _DATE_RE_TXT_ES),
+    ("txt_en_dmy", _DATE_RE_TXT_EN_DMY),
+    ("txt_en_mdy", _DATE_RE_TXT_EN_MDY),
+]
+
+# Espacio que no cruza líneas (los saltos que reconoce str.splitlines)
+_INLINE_SPACE = r'[^\S\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]'
+
+
+def _build_scanner() -> re.Pattern:
+    """
+    Combina los 8 patrones en un solo regex que se evalúa una vez por
+    inicio de palabra: cada patrón es un lookahead opcional con grupo
+    nombrado, así que un match indica todos los patrones que empiezan ahí.
+
+    Todos los patrones empiezan con \b seguido de un carácter de palabra,
+    por lo que sus matches solo pueden empezar en inicios de palabra.
+    """
+    parts = []
+    for name, pattern in _DATE_PATTERNS:
+        body = pattern.pattern
+        assert body.startswith(r'\b')
+        body = body[2:].replace(r'\s', _INLINE_SPACE)
+        if pattern.flags & re.IGNORECASE:
+            body = f"(?i:{body})"
+        parts.append(f"(?:(?=(?P<{name}>{body})))?")
+    # Descartar posiciones donde ningún patrón coincide (condicionales anidados)
+    guard = "".join(f"(?({name})|" for name, _ in _DATE_PATTERNS) + "(?!)" + ")" * len(_DATE_PATTERNS)
+    return re.compile(r'\b(?=\w)' + "".join(parts) + guard)
+
+
+_DATE_SCANNER = _build_scanner()
+
+# Palabras clave por tipo, en orden de precedencia de clasificación
+_DATE_KEYWORDS = [
+    (DateType.EXPIRATION, ["vencimiento", "vence", "expiración", "expiracion", "vigencia",
+                           "valid thru", "expires", "expiration"]),
+    (DateType.ISSUE, ["emision", "expedicion", "issue", "issued", "fecha de emision"]),
+    (DateType.BIRTH, ["fecha de nacimiento", "dob", "date of birth", "nacimiento"]),
+]
+
+# Lookahead por posición: encuentra palabras clave aunque se solapen
+_KEYWORD_SCANNER = re.compile("(?=" + "|".join(
+    f"(?P<{date_type.value}>{'|'.join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True))})"
+    for date_type, keywords in _DATE_KEYWORDS
+) + ")")
+
+
+@dataclass
+class DateSpan:
+    """Fecha candidata encontrada por el escáner (una por posición en el texto)"""
+    start: int
+    end: int
+    line: int                       # Índice de línea (como text.splitlines())
+    text: str
+    patterns: List[str] = field(default_factory=list)  # Patrones que la reconocen
+
+
+def _line_starts(text: str) -> List[int]:
+    """Offset de inicio de cada línea (mismas líneas que str.splitlines)"""
+    starts, offset = [], 0
+    for line in text.splitlines(keepends=True):
+        starts.append(offset)
+        offset += len(line)
+    return starts
+
+
+def scan_dates(text: str) -> Tuple[List[DateSpan], List[Tuple[int, int, int]]]:
+    """
+    Recorre el texto una sola vez y devuelve las fechas candidatas.
+
+    Reproduce exactamente lo que encontraban los 8 patrones aplicados
+    línea por línea (incluidos los solapamientos entre patrones), pero cada
+    posición se reporta una sola vez.
+
+    Returns:
+        (spans sin duplicados en orden de aparición,
+         orden de clasificación: lista de (prioridad, inicio, índice de span))
+    """
+    line_starts = _line_starts(text)
+    names = [name for name, _ in _DATE_PATTERNS]
+    last_end = dict.fromkeys(names, -1)
+    spans: Dict[Tuple[int, int], DateSpan] = {}
+    order: List[Tuple[int, int, int]] = []
+
+    for match in _DATE_SCANNER.finditer(text):
+        start = match.start()
+        for priority, (name, value) in enumerate(zip(names, match.group(*names))):
+            # Como finditer por patrón: sin solaparse con su match anterior
+            if value is None or start < last_end[name]:
+                continue
+            end = start + len(value)
+            last_end[name] = end
+            span = spans.get((start, end))
+            if span is None:
+                span = DateSpan(start, end, bisect_right(line_starts, start) - 1, value)
+                spans[(start, end)] = span
+            span.patterns.append(name)
+            order.append((priority, start, end))
+
+    index = {key: i for i, key in enumerate(spans)}
+    return list(spans.values()), [(priority, start, index[(start, end)]) for priority, start, end in order]
+
+
+def _keyword_lines(text: str) -> Dict[int, set]:
+    """Línea -> tipos de fecha cuyas palabras clave aparecen en ella"""
+    lowered = text.lower()
+    line_starts = _line_starts(lowered)
+    index: Dict[int, set] = {}
+    for match in _KEYWORD_SCANNER.finditer(lowered):
+        line = bisect_right(line_starts, match.start()) - 1
+        index.setdefault(line, set()).add(match.lastgroup)
+    return index
+
+
 def _coerce_year(y: int) -> int:
     """Convierte años de 2 dígitos a 4 dígitos"""
     if y < 100:
@@ -261,38 +385,42 @@ def process_dates_by_type(text: str, country_hint: Optional[str] = None) -> Dict
     CAMBIO vs Hades Ultimate:
     - Retorna DateInfo en lugar de strings reformateados
     - Preserva el formato original del OCR
-    """
-    keywords_expiration = ["vencimiento", "vence", "expiración", "expiracion", "vigencia", 
-                          "valid thru", "expires", "expiration"]
-    keywords_issue = ["emision", "expedicion", "issue", "issued", "fecha de emision"]
-    keywords_birth = ["fecha de nacimiento", "dob", "date of birth", "nacimiento"]
     
+    Una sola pasada (scan_dates) en lugar de los 8 patrones por línea; cada
+    fecha distinta se analiza una vez. Resultado idéntico al motor anterior
+    (ver benchmarks/dates_engine.py).
+    """
     result = {
         "birth": None,
         "issue": None,
         "expiration": None
     }
     
-    # Extraer todas las fechas
-    all_dates = extract_dates_from_text(text, country_hint)
-    
-    # Clasificar por contexto
-    for line in text.splitlines():
-        line_lower = line.lower()
-        
-        # Buscar fechas en esta línea
-        line_dates = extract_dates_from_text(line, country_hint)
+    spans, order = scan_dates(text)
+    if not spans:
+        return result
+    keyword_lines = _keyword_lines(text)
+    
+    # Por línea, en el orden del motor anterior: prioridad de patrón y posición
+    by_line: Dict[int, List[int]] = {}
+    for _, _, span_index in sorted(order):
+        by_line.setdefault(spans[span_index].line, []).append(span_index)
+    
+    analyzed: Dict[str, DateInfo] = {}
+    for line in sorted(by_line):
+        line_types = keyword_lines.get(line)
+        if not line_types:
+            continue
         
-        for date_info in line_dates:
-            # Clasificar según keywords
-            if any(kw in line_lower for kw in keywords_expiration) and not result["expiration"]:
-                date_info.date_type = DateType.EXPIRATION
-                result["expiration"] = date_info
-            elif any(kw in line_lower for kw in keywords_issue) and not result["issue"]:
-                date_info.date_type = DateType.ISSUE
-                result["issue"] = date_info
-            elif any(kw in line_lower for kw in keywords_birth) and not result["birth"]:
-                date_info.date_type = DateType.BIRTH
-                result["birth"] = date_info
+        for span_index in by_line[line]:
+            # Clasificar según keywords (el primer tipo libre en orden de precedencia)
+            for date_type, _ in _DATE_KEYWORDS:
+                if date_type.value in line_types and not result[date_type.value]:
+                    date_str = spans[span_index].text
+                    if date_str not in analyzed:
+                        analyzed[date_str] = analyze_date(date_str, country_hint)
+                    info = analyzed[date_str]
+                    result[date_type.value] = replace(info, date_type=date_type, warnings=list(info.warnings))
+                    break
     
     return result
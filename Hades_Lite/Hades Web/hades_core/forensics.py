@@ -4,7 +4,6 @@ Módulo de análisis forense de documentos.
 Análisis completo con Gemini Vision para detectar falsificación.
 """
 
-import os
 import base64
 import io
 from typing import Dict, List, Tuple, Optional
@@ -18,6 +17,45 @@ except ImportError:
     GEMINI_AVAILABLE = False
     genai = None
 
+from .gemini import default_api_key, generate_content
+
+
+# Prompt forense avanzado (también lo usa el modo fusionado)
+FORENSIC_PROMPT = (
+    "Actúa como un experto forense en documentos de identidad. "
+    "Analiza esta imagen con técnicas forenses profesionales.\n\n"
+    "ANÁLISIS FORENSE REQUERIDO:\n"
+    "1. ELEMENTOS DE SEGURIDAD:\n"
+    "   - Hologramas, marcas de agua, microimpresiones\n"
+    "   - Tintas especiales, guilloches (patrones de líneas)\n"
+    "   - Elementos táctiles (relieve, textura)\n\n"
+    "2. ANÁLISIS DE IMPRESIÓN:\n"
+    "   - Calidad de impresión (offset profesional vs casera)\n"
+    "   - Resolución y nitidez de texto/imágenes\n"
+    "   - Alineación de capas (registro de color)\n"
+    "   - Bordes de texto (limpios vs borrosos)\n\n"
+    "3. DETECCIÓN DE MANIPULACIÓN DIGITAL:\n"
+    "   - Clonación de áreas (stamp/clone tool)\n"
+    "   - Bordes irregulares en foto o texto\n"
+    "   - Inconsistencias de iluminación/sombras\n"
+    "   - Artefactos de compresión JPEG sospechosos\n"
+    "   - Transiciones de color no naturales\n\n"
+    "4. TIPOGRAFÍA Y LAYOUT:\n"
+    "   - Fuentes oficiales vs genéricas (Arial, Times)\n"
+    "   - Espaciado y kerning profesional\n"
+    "   - Alineación y márgenes estándar\n\n"
+    "5. FOTOGRAFÍA:\n"
+    "   - Calidad profesional vs casera\n"
+    "   - Fondo uniforme y apropiado\n"
+    "   - Iluminación frontal consistente\n"
+    "   - Proporciones faciales correctas\n\n"
+    "INSTRUCCIONES:\n"
+    "- Evalúa cada categoría con score de 0-10 (10=muy sospechoso, 0=auténtico)\n"
+    "- Menciona evidencia específica para scores >5\n"
+    "- Sé directo y técnico, sin ambigüedades\n"
+    "- Si detectas manipulación, especifica el tipo exacto"
+)
+
 
 class SemaforoLevel(Enum):
     """Nivel del semáforo de autenticidad"""
@@ -53,9 +91,104 @@ class ForensicResult:
         }
 
 
+def score_visual_analysis(visual_analysis: str) -> Tuple[int, List[str]]:
+    """
+    Calcula el score de riesgo a partir del análisis visual en texto libre.
+    
+    Usado tanto por el análisis visual dedicado como por el modo fusionado,
+    para que ambos puntúen igual.
+    
+    Args:
+        visual_analysis: Análisis forense devuelto por Gemini
+        
+    Returns:
+        Tupla de (score_visual, detalles)
+    """
+    analysis_lower = visual_analysis.lower()
+    
+    # Analizar respuesta y calcular score
+    score_visual = 0
+    detalles = []
+
+    # Red flags con pesos
+    red_flags = {
+        # Manipulación digital (peso alto)
+        "manipulación": 30,
+        "manipulacion": 30,
+        "editado": 30,
+        "photoshop": 40,
+        "clonación": 40,
+        "clonacion": 40,
+        "alterado": 30,
+        "retocado": 25,
+
+        # Falsificación directa (peso muy alto)
+        "falso": 45,
+        "falsificación": 45,
+        "falsificacion": 45,
+        "no auténtico": 40,
+        "fraudulento": 45,
+
+        # Inconsistencias (peso medio-alto)
+        "inconsistente": 25,
+        "sospechoso": 25,
+        "irregular": 20,
+        "anómalo": 25,
+        "anomalo": 25,
+
+        # Calidad (peso medio)
+        "borroso": 15,
+        "pixelado": 15,
+        "baja calidad": 20,
+        "amateur": 20,
+        "casera": 25,
+
+        # Elementos faltantes (peso alto)
+        "sin holograma": 35,
+        "falta marca de agua": 35,
+        "ausencia de": 30,
+        "no se observa": 25,
+
+        # Tipografía (peso medio)
+        "fuente genérica": 20,
+        "fuente generica": 20,
+        "arial": 15,
+        "times new roman": 15,
+
+        # Bordes y transiciones (peso medio-alto)
+        "bordes irregulares": 30,
+        "transición abrupta": 25,
+        "transicion abrupta": 25,
+        "recorte sospechoso": 30,
+    }
+
+    for keyword, penalty in red_flags.items():
+        if keyword in analysis_lower:
+            score_visual += penalty
+            detalles.append(f"Detectado: '{keyword}' (+{penalty} puntos)")
+
+    # Señales positivas (bonificación)
+    positive_signals = [
+        "auténtico", "autentico", "legítimo", "legitimo",
+        "genuino", "profesional", "oficial"
+    ]
+    if any(word in analysis_lower for word in positive_signals):
+        if score_visual == 0:
+            detalles.append("Documento aparenta autenticidad")
+        else:
+            score_visual = max(0, score_visual - 10)
+            detalles.append("Señales mixtas detectadas (-10 puntos)")
+
+    # Cap a 50 para evitar falsos positivos
+    score_visual = min(score_visual, 50)
+    
+    return score_visual, detalles
+
+
 def gemini_vision_forensic_analysis(
     image_bytes: bytes,
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    mime_type: Optional[str] = None
 ) -> Tuple[int, List[str], str]:
     """
     Análisis forense avanzado con Gemini Vision.
@@ -70,6 +203,8 @@ def gemini_vision_forensic_analysis(
     Args:
         image_bytes: Bytes de la imagen
         api_key: API key de Gemini (opcional si está en entorno)
+        mime_type: Si se indica, los bytes ya vienen pre-procesados y se
+            envían tal cual
         
     Returns:
         Tupla de (score_adicional, detalles, análisis_completo)
@@ -77,64 +212,26 @@ def gemini_vision_forensic_analysis(
     if not GEMINI_AVAILABLE:
         return 0, ["Gemini Vision no disponible"], ""
     
-    # Configurar API key
-    if api_key is None:
-        api_key = os.getenv("GEMINI_API_KEY")
-    
-    if not api_key:
+    # Verificar API key (explícita o del entorno)
+    if not default_api_key(api_key):
         return 0, ["API key de Gemini no disponible"], ""
     
     try:
-        # Preparar imagen
-        image = Image.open(io.BytesIO(image_bytes))
-        image = ImageOps.exif_transpose(image)
-        bio = io.BytesIO()
-        image.save(bio, format="PNG")
-        bio.seek(0)
-        
-        # Prompt forense avanzado
-        prompt = (
-            "Actúa como un experto forense en documentos de identidad. "
-            "Analiza esta imagen con técnicas forenses profesionales.\n\n"
-            "ANÁLISIS FORENSE REQUERIDO:\n"
-            "1. ELEMENTOS DE SEGURIDAD:\n"
-            "   - Hologramas, marcas de agua, microimpresiones\n"
-            "   - Tintas especiales, guilloches (patrones de líneas)\n"
-            "   - Elementos táctiles (relieve, textura)\n\n"
-            "2. ANÁLISIS DE IMPRESIÓN:\n"
-            "   - Calidad de impresión (offset profesional vs casera)\n"
-            "   - Resolución y nitidez de texto/imágenes\n"
-            "   - Alineación de capas (registro de color)\n"
-            "   - Bordes de texto (limpios vs borrosos)\n\n"
-            "3. DETECCIÓN DE MANIPULACIÓN DIGITAL:\n"
-            "   - Clonación de áreas (stamp/clone tool)\n"
-            "   - Bordes irregulares en foto o texto\n"
-            "   - Inconsistencias de iluminación/sombras\n"
-            "   - Artefactos de compresión JPEG sospechosos\n"
-            "   - Transiciones de color no naturales\n\n"
-            "4. TIPOGRAFÍA Y LAYOUT:\n"
-            "   - Fuentes oficiales vs genéricas (Arial, Times)\n"
-            "   - Espaciado y kerning profesional\n"
-            "   - Alineación y márgenes estándar\n\n"
-            "5. FOTOGRAFÍA:\n"
-            "   - Calidad profesional vs casera\n"
-            "   - Fondo uniforme y apropiado\n"
-            "   - Iluminación frontal consistente\n"
-            "   - Proporciones faciales correctas\n\n"
-            "INSTRUCCIONES:\n"
-            "- Evalúa cada categoría con score de 0-10 (10=muy sospechoso, 0=auténtico)\n"
-            "- Menciona evidencia específica para scores >5\n"
-            "- Sé directo y técnico, sin ambigüedades\n"
-            "- Si detectas manipulación, especifica el tipo exacto"
-        )
-        
-        # Configurar Gemini
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        # Preparar imagen (si no viene pre-procesada)
+        if mime_type:
+            image_part = {"mime_type": mime_type, "data": image_bytes}
+        else:
+            image = Image.open(io.BytesIO(image_bytes))
+            image = ImageOps.exif_transpose(image)
+            bio = io.BytesIO()
+            image.save(bio, format="PNG")
+            image_part = {"mime_type": "image/png", "data": bio.getvalue()}
         
-        # Generar análisis
-        response = model.generate_content(
-            [{"mime_type": "image/png", "data": bio.getvalue()}, {"text": prompt}],
+        # Generar análisis (cliente cacheado por key, con cuota)
+        response = generate_content(
+            'gemini-1.5-flash',
+            [image_part, {"text": FORENSIC_PROMPT}],
+            api_key=api_key,
             generation_config={"temperature": 0.1, "top_p": 0.9, "max_output_tokens": 2048},
             request_options={"timeout": 60}
         )
@@ -143,83 +240,7 @@ def gemini_vision_forensic_analysis(
             return 0, ["Gemini no devolvió análisis"], ""
         
         visual_analysis = response.text.strip()
-        analysis_lower = visual_analysis.lower()
-        
-        # Analizar respuesta y calcular score
-        score_visual = 0
-        detalles = []
-        
-        # Red flags con pesos
-        red_flags = {
-            # Manipulación digital (peso alto)
-            "manipulación": 30,
-            "manipulacion": 30,
-            "editado": 30,
-            "photoshop": 40,
-            "clonación": 40,
-            "clonacion": 40,
-            "alterado": 30,
-            "retocado": 25,
-            
-            # Falsificación directa (peso muy alto)
-            "falso": 45,
-            "falsificación": 45,
-            "falsificacion": 45,
-            "no auténtico": 40,
-            "fraudulento": 45,
-            
-            # Inconsistencias (peso medio-alto)
-            "inconsistente": 25,
-            "sospechoso": 25,
-            "irregular": 20,
-            "anómalo": 25,
-            "anomalo": 25,
-            
-            # Calidad (peso medio)
-            "borroso": 15,
-            "pixelado": 15,
-            "baja calidad": 20,
-            "amateur": 20,
-            "casera": 25,
-            
-            # Elementos faltantes (peso alto)
-            "sin holograma": 35,
-            "falta marca de agua": 35,
-            "ausencia de": 30,
-            "no se observa": 25,
-            
-            # Tipografía (peso medio)
-            "fuente genérica": 20,
-            "fuente generica": 20,
-            "arial": 15,
-            "times new roman": 15,
-            
-            # Bordes y transiciones (peso medio-alto)
-            "bordes irregulares": 30,
-            "transición abrupta": 25,
-            "transicion abrupta": 25,
-            "recorte sospechoso": 30,
-        }
-        
-        for keyword, penalty in red_flags.items():
-            if keyword in analysis_lower:
-                score_visual += penalty
-                detalles.append(f"Detectado: '{keyword}' (+{penalty} puntos)")
-        
-        # Señales positivas (bonificación)
-        positive_signals = [
-            "auténtico", "autentico", "legítimo", "legitimo",
-            "genuino", "profesional", "oficial"
-        ]
-        if any(word in analysis_lower for word in positive_signals):
-            if score_visual == 0:
-                detalles.append("Documento aparenta autenticidad")
-            else:
-                score_visual = max(0, score_visual - 10)
-                detalles.append("Señales mixtas detectadas (-10 puntos)")
-        
-        # Cap a 50 para evitar falsos positivos
-        score_visual = min(score_visual, 50)
+        score_visual, detalles = score_visual_analysis(visual_analysis)
         
         return score_visual, detalles, visual_analysis
         
@@ -230,7 +251,8 @@ def gemini_vision_forensic_analysis(
 def analyze_document_authenticity(
     ocr_text: str,
     image_bytes: bytes = None,
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    visual: Optional[Tuple[int, List[str], str]] = None
 ) -> ForensicResult:
     """
     Analiza la autenticidad de un documento.
@@ -241,6 +263,8 @@ def analyze_document_authenticity(
         ocr_text: Texto extraído del documento
         image_bytes: Bytes de la imagen (para análisis visual)
         api_key: API key de Gemini (opcional)
+        visual: Resultado ya calculado de `gemini_vision_forensic_analysis`
+            (si se ejecutó en paralelo con el OCR). Evita repetir la llamada.
         
     Returns:
         ForensicResult con el análisis completo
@@ -263,11 +287,11 @@ def analyze_document_authenticity(
             result.warnings.append(f"Documento contiene: '{word}'")
     
     # 2. Análisis visual con Gemini Vision (si hay imagen)
-    if image_bytes and GEMINI_AVAILABLE:
-        visual_score, visual_details, visual_analysis = gemini_vision_forensic_analysis(
-            image_bytes,
-            api_key
-        )
+    if visual is None and image_bytes and GEMINI_AVAILABLE:
+        visual = gemini_vision_forensic_analysis(image_bytes, api_key)
+
+    if visual is not None:
+        visual_score, visual_details, visual_analysis = visual
         
         score += visual_score
         result.details.extend(visual_details)
@@ -0,0 +1,155 @@
+"""
+Modo de análisis fusionado: una sola llamada multimodal a Gemini.
+
+El modo clásico ("multi") sube la imagen dos veces (OCR y análisis visual
+forense) y puede hacer una tercera llamada de texto para traducir. El modo
+fusionado pide todo en una única solicitud con salida JSON estructurada
+(response_schema): transcripción, idioma, traducción al español y hallazgos
+forenses. Fechas, extracción de datos y país se siguen calculando con los
+módulos deterministas sobre la transcripción.
+"""
+
+import io
+import json
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from .ocr import OCR_PROMPT
+from .forensics import FORENSIC_PROMPT
+
+try:
+    import google.generativeai as genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+    genai = None
+
+from .gemini import default_api_key, generate_content
+
+
+FUSED_MODEL = "gemini-2.5-flash"
+
+# Esquema de la respuesta (subconjunto OpenAPI que acepta Gemini)
+FUSED_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "transcription": {"type": "STRING"},
+        "language": {"type": "STRING"},
+        "translation_es": {"type": "STRING"},
+        "forensics": {
+            "type": "OBJECT",
+            "properties": {
+                "security_elements": {"type": "INTEGER"},
+                "print_quality": {"type": "INTEGER"},
+                "digital_manipulation": {"type": "INTEGER"},
+                "typography": {"type": "INTEGER"},
+                "photo": {"type": "INTEGER"},
+                "manipulation_detected": {"type": "BOOLEAN"},
+                "findings": {"type": "ARRAY", "items": {"type": "STRING"}},
+                "analysis": {"type": "STRING"},
+            },
+            "required": ["manipulation_detected", "findings", "analysis"],
+        },
+    },
+    "required": ["transcription", "language", "translation_es", "forensics"],
+}
+
+FUSED_PROMPT = (
+    "Analiza esta imagen de documento de identificación y responde SOLO con "
+    "el JSON del esquema indicado.\n\n"
+    "transcription:\n" + OCR_PROMPT.strip() + "\n\n"
+    "language: código ISO 639-1 del idioma principal del documento "
+    "(es, en, pt, vi...).\n\n"
+    "translation_es: la transcripción traducida al español, manteniendo "
+    "formato, fechas y números de ID exactamente como aparecen. Si el "
+    "documento ya está en español, repite la transcripción.\n\n"
+    "forensics:\n" + FORENSIC_PROMPT + "\n"
+    "- Los campos numéricos son el score 0-10 de cada categoría\n"
+    "- 'analysis' es tu análisis forense completo en español\n"
+)
+
+
+def _usage(response) -> Dict:
+    """Tokens consumidos por una respuesta de Gemini (si están disponibles)"""
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return {}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", 0),
+        "output_tokens": getattr(usage, "candidates_token_count", 0),
+        "total_tokens": getattr(usage, "total_token_count", 0),
+    }
+
+
+def fused_document_analysis(
+    image_bytes: bytes,
+    api_key: Optional[str] = None,
+    timeout: int = 60,
+    mime_type: Optional[str] = None
+) -> Tuple[Dict, Dict]:
+    """
+    OCR + idioma + traducción + forense en una sola llamada a Gemini.
+
+    Args:
+        image_bytes: Bytes de la imagen
+        api_key: API key de Gemini (opcional si está en entorno)
+        timeout: Timeout en segundos
+        mime_type: Si se indica, los bytes ya vienen pre-procesados y se
+            envían tal cual
+
+    Returns:
+        Tupla de (datos, metadata). `datos` sigue FUSED_SCHEMA.
+
+    Raises:
+        Exception: Si Gemini no está disponible o la respuesta no es JSON válido
+    """
+    if not GEMINI_AVAILABLE:
+        raise ImportError("google-generativeai no está instalado")
+
+    if not default_api_key(api_key):
+        raise ValueError("API key de Gemini no proporcionada")
+
+    if mime_type:
+        image = {"mime_type": mime_type, "data": image_bytes}
+    else:
+        try:
+            image = Image.open(io.BytesIO(image_bytes))
+            image = ImageOps.exif_transpose(image)
+        except Exception as e:
+            raise ValueError(f"Error al cargar imagen: {e}")
+
+    response = generate_content(
+        FUSED_MODEL,
+        [FUSED_PROMPT, image],
+        api_key=api_key,
+        generation_config={
+            "temperature": 0.1,
+            "response_mime_type": "application/json",
+            "response_schema": FUSED_SCHEMA,
+        },
+        request_options={"timeout": timeout}
+    )
+
+    if not response or not response.text:
+        raise Exception("Gemini no devolvió respuesta")
+
+    try:
+        data = json.loads(response.text)
+    except json.JSONDecodeError as e:
+        raise Exception(f"Respuesta fusionada no es JSON válido: {e}")
+
+    data.setdefault("transcription", "")
+    data.setdefault("language", "unknown")
+    data.setdefault("translation_es", data["transcription"])
+    data.setdefault("forensics", {})
+
+    metadata = {
+        "model": FUSED_MODEL,
+        "mode": "fused",
+        "success": True,
+        "char_count": len(data["transcription"]),
+        "image_bytes": len(image_bytes),
+        **_usage(response),
+    }
+    return data, metadata
@@ -0,0 +1,413 @@
+"""
+Clientes de Gemini por API key y reparto de cuota entre keys.
+
+Antes cada llamada hacía `genai.configure(api_key=...)` (estado global del
+SDK) y construía un `GenerativeModel` nuevo. Con X-Gemini-API-Key por
+request, dos análisis simultáneos con keys distintas se pisaban la
+configuración global.
+
+Ahora:
+- `GeminiRegistry` guarda un cliente por API key y un `GenerativeModel`
+  por (key, modelo). Nunca se toca `genai.configure`.
+- `KeyPool` elige la key de cada llamada con token buckets por key (RPM y
+  TPM). Los buckets viven en Redis (un script Lua los descuenta de forma
+  atómica), así todos los procesos del worker y la API respetan la misma
+  cuota; sin Redis se usan buckets locales del proceso.
+- `generate_content` junta ambos: espera cuota, llama y ajusta los tokens
+  reales (usage_metadata) contra la estimación.
+
+Configuración (variables de entorno):
+    GEMINI_API_KEYS        Keys del pool, separadas por comas (se suma
+                           GEMINI_API_KEY si está definida)
+    GEMINI_RPM             Solicitudes por minuto por key (0 = sin límite)
+    GEMINI_TPM             Tokens por minuto por key (0 = sin límite)
+    GEMINI_QUOTA_MAX_WAIT  Segundos máximos esperando cuota (def. 60)
+    GEMINI_QUOTA_REDIS_URL Redis de los buckets (por defecto REDIS_URL)
+"""
+
+import hashlib
+import itertools
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+    genai = None
+    glm = None
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+
+# Tokens que Gemini cuenta por imagen (para estimar antes de la llamada)
+IMAGE_TOKENS = 258
+
+
+class QuotaExceeded(Exception):
+    """Ninguna key del pool tuvo cuota dentro de GEMINI_QUOTA_MAX_WAIT"""
+
+
+def env_api_keys() -> List[str]:
+    """Keys del entorno: GEMINI_API_KEYS (pool) y GEMINI_API_KEY, sin repetir"""
+    raw = ",".join(os.getenv(var) or "" for var in ("GEMINI_API_KEYS", "GEMINI_API_KEY"))
+    return list(dict.fromkeys(key.strip() for key in raw.split(",") if key.strip()))
+
+
+def default_api_key(api_key: Optional[str] = None) -> Optional[str]:
+    """API key explícita o la primera del entorno (None si no hay)"""
+    if api_key:
+        return api_key
+    keys = env_api_keys()
+    return keys[0] if keys else None
+
+
+def resolve_api_key(api_key: Optional[str] = None) -> str:
+    """Como `default_api_key`, pero falla si no hay ninguna"""
+    api_key = default_api_key(api_key)
+    if not api_key:
+        raise ValueError("API key de Gemini no proporcionada. Define GEMINI_API_KEY en el entorno o pásala como parámetro.")
+    return api_key
+
+
+def key_id(api_key: str) -> str:
+    """Identificador corto de una key (para Redis y logs; no expone la key)"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+# ============================================================
+# CLIENTES Y MODELOS
+# ============================================================
+
+class GeminiRegistry:
+    """
+    Un cliente de la API por key y un `GenerativeModel` por (key, modelo).
+
+    Thread-safe: el cliente gRPC se comparte entre hilos y el modelo no
+    guarda estado entre llamadas (la configuración de generación va en cada
+    `generate_content`).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[str, object] = {}
+        self._models: Dict[Tuple[str, str], object] = {}
+
+    def client(self, api_key: str):
+        """Cliente de GenerativeService con esta key"""
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+                self._clients[api_key] = client
+            return client
+
+    def model(self, model_name: str, api_key: Optional[str] = None):
+        """`GenerativeModel` ligado al cliente de la key (sin genai.configure)"""
+        if not GEMINI_AVAILABLE:
+            raise ImportError("google-generativeai no está instalado. Instala con: pip install google-generativeai")
+        api_key = resolve_api_key(api_key)
+        cache_key = (api_key, model_name)
+        model = self._models.get(cache_key)
+        if model is None:
+            client = self.client(api_key)
+            with self._lock:
+                model = self._models.get(cache_key)
+                if model is None:
+                    model = genai.GenerativeModel(model_name)
+                    # El SDK usaría el cliente global de genai.configure
+                    model._client = client
+                    self._models[cache_key] = model
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._models.clear()
+
+
+registry = GeminiRegistry()
+
+
+# ============================================================
+# TOKEN BUCKETS
+# ============================================================
+
+# Cada bucket: (nombre, capacidad, recarga por segundo, costo). Se descuentan
+# todos o ninguno; devuelve los segundos a esperar (0 = descontado). Con
+# force=1 se descuenta aunque quede negativo (ajuste de tokens reales; un
+# costo negativo devuelve tokens sin pasar de la capacidad).
+_TAKE_SCRIPT = """
+local EPSILON = 1e-6
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local force = ARGV[1] == '1'
+local n = #KEYS
+local tokens = {}
+local wait = 0
+for i = 1, n do
+    local capacity = tonumber(ARGV[2 + (i - 1) * 3])
+    local rate = tonumber(ARGV[3 + (i - 1) * 3])
+    local cost = tonumber(ARGV[4 + (i - 1) * 3])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    tokens[i] = level
+    if not force and cost > level + EPSILON then
+        wait = math.max(wait, (cost - level) / rate)
+    end
+end
+if wait == 0 then
+    for i = 1, n do
+        local capacity = tonumber(ARGV[2 + (i - 1) * 3])
+        local cost = tonumber(ARGV[4 + (i - 1) * 3])
+        tokens[i] = math.min(capacity, tokens[i] - cost)
+    end
+end
+for i = 1, n do
+    local capacity = tonumber(ARGV[2 + (i - 1) * 3])
+    local rate = tonumber(ARGV[3 + (i - 1) * 3])
+    redis.call('HSET', KEYS[i], 'tokens', tostring(tokens[i]), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[i], math.ceil(capacity / rate) + 60)
+end
+return tostring(wait)
+"""
+
+Bucket = Tuple[str, float, float, float]
+
+# Tolerancia de redondeo: tras esperar lo indicado el saldo puede quedar
+# apenas por debajo del costo
+EPSILON = 1e-6
+
+
+class LocalBuckets:
+    """Token buckets en memoria (un proceso); misma semántica que el script"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, buckets: Sequence[Bucket], force: bool = False) -> float:
+        with self._lock:
+            now = self._clock()
+            levels = []
+            wait = 0.0
+            for name, capacity, rate, cost in buckets:
+                level, ts = self._state.get(name, (capacity, now))
+                level = min(capacity, level + max(0.0, now - ts) * rate)
+                levels.append(level)
+                if not force and cost > level + EPSILON:
+                    wait = max(wait, (cost - level) / rate)
+            if wait == 0:
+                levels = [min(capacity, level - cost) for level, (_, capacity, _, cost) in zip(levels, buckets)]
+            for level, (name, *_) in zip(levels, buckets):
+                self._state[name] = (level, now)
+            return wait
+
+
+class RedisBuckets:
+    """Token buckets en Redis, compartidos por todos los procesos"""
+
+    def __init__(self, client):
+        self._client = client
+        self._script = client.register_script(_TAKE_SCRIPT)
+
+    def take(self, buckets: Sequence[Bucket], force: bool = False) -> float:
+        args = ["1" if force else "0"]
+        for _, capacity, rate, cost in buckets:
+            args += [capacity, rate, cost]
+        return float(self._script(keys=[name for name, *_ in buckets], args=args))
+
+
+# ============================================================
+# POOL DE KEYS
+# ============================================================
+
+class KeyPool:
+    """
+    Reparte las llamadas entre varias keys respetando RPM/TPM por key.
+
+    `acquire` recorre las keys en orden rotativo y toma la primera con
+    cuota; si ninguna tiene, espera lo mínimo que indiquen los buckets.
+    Una key que no es del pool (la de un usuario por X-Gemini-API-Key) se
+    usa sola, con su propio bucket.
+
+    Si los buckets compartidos (Redis) fallan, las llamadas usan buckets
+    locales durante `retry_after` segundos y después se vuelve a intentar
+    Redis: una caída pasajera no deja la cuota sin compartir para siempre.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        rpm: int = 0,
+        tpm: int = 0,
+        max_wait: float = 60.0,
+        buckets=None,
+        sleep=time.sleep,
+        retry_after: float = 30.0
+    ):
+        self.keys = list(dict.fromkeys(key for key in keys if key))
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_wait = max_wait
+        self.buckets = buckets or LocalBuckets()
+        self.retry_after = retry_after
+        self._sleep = sleep
+        self._next = itertools.count()
+        self._local = LocalBuckets()
+        self._shared_down_until = None
+
+    @property
+    def limited(self) -> bool:
+        return bool(self.rpm or self.tpm)
+
+    def _buckets(self, api_key: str, tokens: float) -> List[Bucket]:
+        prefix = f"hades:gemini:quota:{key_id(api_key)}"
+        buckets = []
+        if self.rpm:
+            buckets.append((f"{prefix}:rpm", float(self.rpm), self.rpm / 60.0, 1.0))
+        if self.tpm:
+            buckets.append((f"{prefix}:tpm", float(self.tpm), self.tpm / 60.0, min(float(tokens), self.tpm)))
+        return buckets
+
+    def _take_buckets(self, buckets: Sequence[Bucket], force: bool = False) -> float:
+        """Descuenta en los buckets compartidos o, si fallan, en los locales"""
+        down_until = self._shared_down_until
+        if down_until is None or time.monotonic() >= down_until:
+            try:
+                wait = self.buckets.take(buckets, force=force)
+            except Exception as e:
+                # Redis caído: buckets locales hasta el próximo reintento
+                if down_until is None:
+                    print(f"[gemini] Buckets de cuota no disponibles ({e}); usando buckets locales")
+                self._shared_down_until = time.monotonic() + self.retry_after
+            else:
+                if down_until is not None:
+                    print("[gemini] Buckets de cuota compartidos disponibles de nuevo")
+                    self._shared_down_until = None
+                return wait
+        return self._local.take(buckets, force=force)
+
+    def _take(self, api_key: str, tokens: float, force: bool = False) -> float:
+        buckets = self._buckets(api_key, tokens)
+        if not buckets:
+            return 0.0
+        return self._take_buckets(buckets, force=force)
+
+    def acquire(self, estimated_tokens: int = 0, api_key: Optional[str] = None) -> str:
+        """
+        Key con cuota para una llamada (descuenta 1 solicitud y los tokens
+        estimados).
+
+        Args:
+            estimated_tokens: Tokens estimados de la llamada (entrada + salida)
+            api_key: Key pedida por el llamador. Si es del pool se reparte
+                entre todo el pool; si no, se espera por su cuota
+
+        Raises:
+            QuotaExceeded: Si no hay cuota dentro de `max_wait` segundos
+        """
+        keys = [api_key] if api_key and api_key not in self.keys else self.keys
+        if not keys:
+            raise ValueError("API key de Gemini no proporcionada. Define GEMINI_API_KEY en el entorno o pásala como parámetro.")
+        if not self.limited:
+            return keys[next(self._next) % len(keys)]
+
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            start = next(self._next)
+            shortest = None
+            for i in range(len(keys)):
+                key = keys[(start + i) % len(keys)]
+                wait = self._take(key, estimated_tokens)
+                if wait <= 0:
+                    return key
+                shortest = wait if shortest is None else min(shortest, wait)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise QuotaExceeded(f"Cuota de Gemini agotada en {len(keys)} key(s) tras {self.max_wait:.0f}s")
+            self._sleep(min(shortest, remaining))
+
+    def settle(self, api_key: str, estimated_tokens: int, actual_tokens: int):
+        """Ajusta el bucket TPM con los tokens reales de la respuesta"""
+        if self.tpm and actual_tokens and actual_tokens != estimated_tokens:
+            prefix = f"hades:gemini:quota:{key_id(api_key)}"
+            bucket = (f"{prefix}:tpm", float(self.tpm), self.tpm / 60.0, float(actual_tokens - estimated_tokens))
+            self._take_buckets([bucket], force=True)
+
+
+def _pool_from_env() -> KeyPool:
+    keys = env_api_keys()
+    rpm = int(os.getenv("GEMINI_RPM") or 0)
+    tpm = int(os.getenv("GEMINI_TPM") or 0)
+    max_wait = float(os.getenv("GEMINI_QUOTA_MAX_WAIT") or 60)
+    buckets = None
+    redis_url = os.getenv("GEMINI_QUOTA_REDIS_URL") or os.getenv("REDIS_URL")
+    if (rpm or tpm) and REDIS_AVAILABLE and redis_url:
+        buckets = RedisBuckets(redis.Redis.from_url(redis_url, socket_timeout=2))
+    return KeyPool(keys, rpm=rpm, tpm=tpm, max_wait=max_wait, buckets=buckets)
+
+
+_pool: Optional[KeyPool] = None
+_pool_lock = threading.Lock()
+
+
+def key_pool() -> KeyPool:
+    """Pool de keys del proceso (configurado por entorno en el primer uso)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _pool_from_env()
+        return _pool
+
+
+def estimate_tokens(contents, max_output_tokens: int = 1024) -> int:
+    """Tokens aproximados: ~4 caracteres por token, IMAGE_TOKENS por imagen"""
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    tokens = max_output_tokens
+    for part in parts:
+        if isinstance(part, dict) and "text" in part:
+            part = part["text"]
+        tokens += len(part) // 4 if isinstance(part, str) else IMAGE_TOKENS
+    return tokens
+
+
+def generate_content(model_name: str, contents, api_key: Optional[str] = None, **kwargs):
+    """
+    `GenerativeModel.generate_content` con cliente cacheado y cuota por key.
+
+    Args:
+        model_name: Modelo de Gemini
+        contents: Contenido de la solicitud (prompt, imagen, ...)
+        api_key: Key del llamador (ver `KeyPool.acquire`); si no, una del pool
+        **kwargs: generation_config, request_options, ...
+
+    Raises:
+        QuotaExceeded: Si ninguna key tuvo cuota a tiempo
+    """
+    pool = key_pool()
+    config = kwargs.get("generation_config") or {}
+    if isinstance(config, dict):
+        max_output = config.get("max_output_tokens") or 1024
+    else:
+        max_output = getattr(config, "max_output_tokens", None) or 1024
+    estimated = estimate_tokens(contents, max_output)
+    key = pool.acquire(estimated, api_key=api_key)
+
+    response = registry.model(model_name, key).generate_content(contents, **kwargs)
+
+    usage = getattr(response, "usage_metadata", None)
+    pool.settle(key, estimated, getattr(usage, "total_token_count", 0) if usage else 0)
+    return response
@@ -4,7 +4,6 @@ Módulo de OCR usando Google Gemini Vision.
 Extraído y simplificado de Hades Ultimate.
 """
 
-import os
 import base64
 from typing import Optional, Tuple
 from PIL import Image
@@ -17,10 +16,34 @@ except ImportError:
     GEMINI_AVAILABLE = False
     genai = None
 
+from .gemini import generate_content, registry, resolve_api_key
+
+
+# Prompt para OCR (copiado de Hades Ultimate)
+OCR_PROMPT = """
+Extrae TODO el texto visible en esta imagen de documento de identificación.
+
+INSTRUCCIONES:
+1. Transcribe EXACTAMENTE todo el texto tal como aparece
+2. Mantén el formato original (saltos de línea, espaciado)
+3. Incluye TODAS las fechas exactamente como están escritas
+4. No reformatees ni interpretes nada
+5. Si hay texto en múltiples idiomas, transcríbelo todo
+
+IMPORTANTE: Las fechas deben copiarse EXACTAMENTE como aparecen.
+Ejemplo: Si dice "01/15/2024", escribe "01/15/2024" (NO lo cambies a "15/01/2024")
+
+Formato de salida:
+[Transcripción exacta del documento]
+"""
+
 
 def configure_gemini(api_key: Optional[str] = None):
     """
-    Configura la API de Gemini.
+    Valida la API key de Gemini y prepara su cliente.
+    
+    Ya no llama a `genai.configure` (estado global del SDK): cada key tiene
+    su cliente en `gemini.registry`.
     
     Args:
         api_key: API key de Google Gemini. Si es None, intenta usar GEMINI_API_KEY del entorno.
@@ -28,19 +51,14 @@ def configure_gemini(api_key: Optional[str] = None):
     if not GEMINI_AVAILABLE:
         raise ImportError("google-generativeai no está instalado. Instala con: pip install google-generativeai")
     
-    if api_key is None:
-        api_key = os.getenv("GEMINI_API_KEY")
-    
-    if not api_key:
-        raise ValueError("API key de Gemini no proporcionada. Define GEMINI_API_KEY en el entorno o pásala como parámetro.")
-    
-    genai.configure(api_key=api_key)
+    return registry.client(resolve_api_key(api_key))
 
 
 def extract_text_from_image(
     image_bytes: bytes,
     api_key: Optional[str] = None,
-    timeout: int = 30
+    timeout: int = 30,
+    mime_type: Optional[str] = None
 ) -> Tuple[str, dict]:
     """
     Extrae texto de una imagen usando Gemini Vision.
@@ -49,6 +67,8 @@ def extract_text_from_image(
         image_bytes: Bytes de la imagen
         api_key: API key de Gemini (opcional si está en entorno)
         timeout: Timeout en segundos
+        mime_type: Si se indica, los bytes ya vienen pre-procesados
+            (ver preprocess.py) y se envían tal cual, sin re-codificar
         
     Returns:
         Tupla de (texto_ocr, metadata)
@@ -59,39 +79,24 @@ def extract_text_from_image(
     if not GEMINI_AVAILABLE:
         raise ImportError("google-generativeai no está instalado")
     
-    # Configurar Gemini
+    # Validar la key (el cliente se reutiliza entre llamadas)
     configure_gemini(api_key)
     
     # Cargar imagen
-    try:
-        image = Image.open(io.BytesIO(image_bytes))
-    except Exception as e:
-        raise ValueError(f"Error al cargar imagen: {e}")
-    
-    # Prompt para OCR (copiado de Hades Ultimate)
-    prompt = """
-Extrae TODO el texto visible en esta imagen de documento de identificación.
-
-INSTRUCCIONES:
-1. Transcribe EXACTAMENTE todo el texto tal como aparece
-2. Mantén el formato original (saltos de línea, espaciado)
-3. Incluye TODAS las fechas exactamente como están escritas
-4. No reformatees ni interpretes nada
-5. Si hay texto en múltiples idiomas, transcríbelo todo
-
-IMPORTANTE: Las fechas deben copiarse EXACTAMENTE como aparecen.
-Ejemplo: Si dice "01/15/2024", escribe "01/15/2024" (NO lo cambies a "15/01/2024")
-
-Formato de salida:
-[Transcripción exacta del documento]
-"""
+    if mime_type:
+        image = {"mime_type": mime_type, "data": image_bytes}
+    else:
+        try:
+            image = Image.open(io.BytesIO(image_bytes))
+        except Exception as e:
+            raise ValueError(f"Error al cargar imagen: {e}")
     
     try:
         # Usar Gemini 2.5 Flash (modelo más reciente)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        response = model.generate_content(
-            [prompt, image],
+        response = generate_content(
+            'gemini-2.5-flash',
+            [OCR_PROMPT, image],
+            api_key=api_key,
             request_options={"timeout": timeout}
         )
         
@@ -104,7 +109,8 @@ Formato de salida:
         metadata = {
             "model": "gemini-1.5-flash",
             "success": True,
-            "char_count": len(ocr_text)
+            "char_count": len(ocr_text),
+            "image_bytes": len(image_bytes)
         }
         
         return ocr_text, metadata
@@ -0,0 +1,167 @@
+"""
+Ejecutor de etapas del análisis como grafo de dependencias (DAG).
+
+Las etapas sin dependencias entre sí (p. ej. OCR y el análisis visual
+forense, que solo necesitan la imagen) se ejecutan en paralelo. Cada etapa
+tiene su propio timeout: si se excede, la etapa se marca como "timeout" y
+las etapas dependientes siguen con resultados parciales.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+# Estados posibles de una etapa
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+
+
+class Stage:
+    """
+    Etapa del análisis.
+
+    Args:
+        name: Nombre único de la etapa
+        fn: Función `fn(results) -> valor`. `results` contiene los valores
+            de las etapas previas que terminaron correctamente.
+        deps: Etapas que deben terminar (con cualquier estado) antes
+        timeout: Segundos máximos de ejecución (None = sin límite)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Dict[str, Any]], Any],
+        deps: Sequence[str] = (),
+        timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+
+
+class StageOutcome:
+    """Resultado de la ejecución de una etapa"""
+
+    def __init__(self, name: str, status: str, value: Any = None,
+                 error: Optional[str] = None, elapsed_ms: float = 0.0):
+        self.name = name
+        self.status = status
+        self.value = value
+        self.error = error
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+    def to_dict(self) -> Dict:
+        data = {"status": self.status, "elapsed_ms": self.elapsed_ms}
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+def _validate(stages: List[Stage]):
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Nombres de etapa duplicados")
+    known = set(names)
+    for stage in stages:
+        missing = [d for d in stage.deps if d not in known]
+        if missing:
+            raise ValueError(f"Etapa '{stage.name}' depende de etapas inexistentes: {missing}")
+
+    # Detección de ciclos (orden topológico)
+    pending = {s.name: set(s.deps) for s in stages}
+    while pending:
+        ready = [n for n, deps in pending.items() if not deps]
+        if not ready:
+            raise ValueError(f"Ciclo de dependencias entre etapas: {sorted(pending)}")
+        for name in ready:
+            del pending[name]
+        for deps in pending.values():
+            deps.difference_update(ready)
+
+
+def run_stages(stages: List[Stage], max_workers: int = 4) -> Dict[str, StageOutcome]:
+    """
+    Ejecuta las etapas respetando dependencias, en paralelo cuando es posible.
+
+    Una etapa que lanza excepción queda en estado "error"; una que excede
+    su timeout queda en "timeout" (el hilo no se puede interrumpir, pero su
+    resultado se descarta). En ambos casos las dependientes se ejecutan
+    igualmente, sin ese valor en `results`.
+
+    Args:
+        stages: Lista de etapas
+        max_workers: Hilos máximos en paralelo
+
+    Returns:
+        Diccionario nombre -> StageOutcome, en el orden de `stages`
+    """
+    _validate(stages)
+
+    results: Dict[str, Any] = {}
+    outcomes: Dict[str, StageOutcome] = {}
+    running = {}  # future -> (stage, started_at)
+
+    def _runnable():
+        in_flight = {stage.name for stage, _ in running.values()}
+        return [
+            s for s in stages
+            if s.name not in outcomes
+            and s.name not in in_flight
+            and all(d in outcomes for d in s.deps)
+        ]
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hades-stage")
+    try:
+        while len(outcomes) < len(stages):
+            for stage in _runnable():
+                # Copia: la etapa ve solo los resultados disponibles al lanzarse
+                future = executor.submit(stage.fn, dict(results))
+                running[future] = (stage, time.perf_counter())
+
+            # Esperar hasta que termine algo o venza el timeout más próximo
+            now = time.perf_counter()
+            deadlines = [
+                started + stage.timeout - now
+                for stage, started in running.values()
+                if stage.timeout is not None
+            ]
+            wait_for = max(0.0, min(deadlines)) if deadlines else None
+            done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            now = time.perf_counter()
+            for future in list(running):
+                stage, started = running[future]
+                elapsed_ms = round((now - started) * 1000, 1)
+
+                if future in done:
+                    del running[future]
+                    try:
+                        value = future.result()
+                        results[stage.name] = value
+                        outcomes[stage.name] = StageOutcome(
+                            stage.name, STATUS_OK, value, elapsed_ms=elapsed_ms
+                        )
+                    except Exception as e:
+                        outcomes[stage.name] = StageOutcome(
+                            stage.name, STATUS_ERROR, error=str(e), elapsed_ms=elapsed_ms
+                        )
+                elif stage.timeout is not None and now - started >= stage.timeout:
+                    del running[future]
+                    future.cancel()
+                    outcomes[stage.name] = StageOutcome(
+                        stage.name, STATUS_TIMEOUT,
+                        error=f"Excedió {stage.timeout}s", elapsed_ms=elapsed_ms
+                    )
+    finally:
+        # No esperar hilos de etapas abandonadas por timeout
+        executor.shutdown(wait=False)
+
+    return {s.name: outcomes[s.name] for s in stages}
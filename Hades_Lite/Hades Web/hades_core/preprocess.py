@@ -0,0 +1,229 @@
+"""
+Pre-procesamiento de imágenes antes de enviarlas a Gemini Vision.
+
+Las fotos de celular (4-12 MP) se enviaban a resolución completa, y el SDK
+de Gemini las re-codifica como WebP sin pérdida: varios MB por llamada, y
+dos veces por documento (OCR y forense). Aquí la imagen se decodifica una
+sola vez, se corrige la orientación EXIF y se generan versiones reducidas
+por etapa, cacheadas para que las etapas concurrentes las reutilicen.
+
+El recorte a la región del documento es heurístico (fondo uniforme) y una
+caja equivocada corta texto o elementos de seguridad sin aviso: solo se
+aplica si se pide (`crop=True`) y queda registrado en `stats()`.
+"""
+
+import io
+import threading
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+
+
+# Lado largo objetivo (px) por etapa. El OCR necesita más detalle que el
+# análisis visual forense.
+DEFAULT_TARGETS = {
+    "ocr": 2048,
+    "forensics": 1536,
+}
+
+# Formato y calidad de las versiones para Gemini. El forense normalmente
+# recibe `ela_copy()` (sin pérdida); su calidad solo aplica si el análisis
+# se configura con forensics_lossless=False.
+DEFAULT_FORMAT = "JPEG"
+DEFAULT_QUALITY = 85
+STAGE_QUALITY = {
+    "ocr": 85,
+    "forensics": 92,
+}
+
+# El recorte solo se aplica si el documento ocupa al menos esta fracción
+# de la imagen y deja margen útil que quitar
+MIN_CROP_AREA = 0.25
+MAX_CROP_AREA = 0.95
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+
+def _document_bbox(image: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Estima la región del documento sobre un fondo relativamente uniforme.
+
+    Compara cada píxel contra el color de fondo (mediana del borde) en una
+    miniatura y devuelve la caja envolvente escalada a la imagen original,
+    o None si no hay un recorte claro.
+    """
+    thumb = image.convert("L")
+    thumb.thumbnail((256, 256))
+    width, height = thumb.size
+    if width < 16 or height < 16:
+        return None
+
+    # Color de fondo: mediana de los píxeles del borde
+    pixels = thumb.load()
+    border = [pixels[x, 0] for x in range(width)] + [pixels[x, height - 1] for x in range(width)]
+    border += [pixels[0, y] for y in range(height)] + [pixels[width - 1, y] for y in range(height)]
+    border.sort()
+    background = border[len(border) // 2]
+
+    diff = ImageChops.difference(thumb, Image.new("L", thumb.size, background))
+    mask = diff.point(lambda v: 255 if v > 40 else 0).filter(ImageFilter.MedianFilter(5))
+    bbox = mask.getbbox()
+    if not bbox:
+        return None
+
+    area = ((bbox[2] - bbox[0]) * (bbox[3] - bbox[1])) / float(width * height)
+    if not (MIN_CROP_AREA <= area <= MAX_CROP_AREA):
+        return None
+
+    # Escalar a la imagen original con un pequeño margen
+    scale_x = image.width / float(width)
+    scale_y = image.height / float(height)
+    pad = 2
+    return (
+        max(0, int((bbox[0] - pad) * scale_x)),
+        max(0, int((bbox[1] - pad) * scale_y)),
+        min(image.width, int((bbox[2] + pad) * scale_x)),
+        min(image.height, int((bbox[3] + pad) * scale_y)),
+    )
+
+
+class PreparedImage:
+    """
+    Imagen decodificada una vez, con versiones por etapa cacheadas.
+
+    Thread-safe: OCR y forense la usan en paralelo.
+    """
+
+    def __init__(
+        self,
+        original_bytes: bytes,
+        image: Image.Image,
+        original_format: Optional[str],
+        original_size: Tuple[int, int],
+        rotated: bool = False,
+        crop_box: Optional[Tuple[int, int, int, int]] = None
+    ):
+        self.original_bytes = original_bytes
+        self.original_format = original_format
+        self.original_size = original_size
+        self.image = image
+        self.rotated = rotated
+        self.crop_box = crop_box
+        self.cropped = crop_box is not None
+        self._renditions: Dict[Tuple, bytes] = {}
+        self._lock = threading.Lock()
+
+    def _resized(self, long_edge: Optional[int]) -> Image.Image:
+        image = self.image
+        if long_edge and max(image.size) > long_edge:
+            image = image.copy()
+            image.thumbnail((long_edge, long_edge), Image.LANCZOS)
+        return image
+
+    def rendition(
+        self,
+        long_edge: Optional[int],
+        fmt: str = DEFAULT_FORMAT,
+        quality: int = DEFAULT_QUALITY
+    ) -> Tuple[bytes, str]:
+        """
+        Versión reducida y re-codificada (cacheada).
+
+        Args:
+            long_edge: Lado largo máximo en píxeles (None = sin reducir)
+            fmt: JPEG, WEBP o PNG
+            quality: Calidad para formatos con pérdida
+
+        Returns:
+            Tupla de (bytes, mime_type)
+        """
+        fmt = fmt.upper()
+        key = (long_edge, fmt, quality)
+        with self._lock:
+            data = self._renditions.get(key)
+            if data is None:
+                image = self._resized(long_edge)
+                if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                bio = io.BytesIO()
+                if fmt == "PNG":
+                    image.save(bio, format=fmt, optimize=True)
+                else:
+                    image.save(bio, format=fmt, quality=quality, optimize=True)
+                data = bio.getvalue()
+                self._renditions[key] = data
+        return data, _MIME_TYPES[fmt]
+
+    def for_stage(self, stage: str, targets: Optional[Dict[str, int]] = None) -> Tuple[bytes, str]:
+        """Versión para una etapa según su resolución objetivo"""
+        targets = {**DEFAULT_TARGETS, **(targets or {})}
+        return self.rendition(targets.get(stage), quality=STAGE_QUALITY.get(stage, DEFAULT_QUALITY))
+
+    def ela_copy(self, long_edge: Optional[int] = None) -> Tuple[bytes, str]:
+        """
+        Copia apta para ELA (Error Level Analysis).
+
+        Si no hubo recorte ni rotación y el original es JPEG, se devuelven
+        los bytes originales (los niveles de error intactos). Si no, un PNG
+        sin pérdida para no introducir artefactos de compresión nuevos.
+        """
+        untouched = not (self.cropped or self.rotated)
+        if untouched and self.original_format == "JPEG" and long_edge is None:
+            return self.original_bytes, "image/jpeg"
+        return self.rendition(long_edge, fmt="PNG")
+
+    def stats(self) -> Dict:
+        """Tamaños original y de cada versión generada (para metadata)"""
+        with self._lock:
+            renditions = {
+                f"{fmt.lower()}_{long_edge or 'full'}": len(data)
+                for (long_edge, fmt, _), data in self._renditions.items()
+            }
+        return {
+            "original_bytes": len(self.original_bytes),
+            "original_size": list(self.original_size),
+            "size": list(self.image.size),
+            "rotated": self.rotated,
+            "cropped": self.cropped,
+            "crop_box": list(self.crop_box) if self.crop_box else None,
+            "renditions": renditions,
+        }
+
+
+def prepare_image(image_bytes: bytes, crop: bool = False) -> PreparedImage:
+    """
+    Decodifica y orienta la imagen del documento (y la recorta si se pide).
+
+    Args:
+        image_bytes: Bytes subidos
+        crop: Recortar a la región del documento si se detecta una caja
+            plausible (entre MIN_CROP_AREA y MAX_CROP_AREA de la imagen)
+
+    Returns:
+        PreparedImage lista para generar versiones por etapa
+
+    Raises:
+        ValueError: Si la imagen no se puede abrir
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        original_format = image.format
+        original_size = image.size
+        rotated = image.getexif().get(0x0112, 1) not in (0, 1)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except Exception as e:
+        raise ValueError(f"Error al cargar imagen: {e}")
+
+    bbox = _document_bbox(image) if crop else None
+    if bbox:
+        image = image.crop(bbox)
+
+    return PreparedImage(
+        image_bytes,
+        image,
+        original_format=original_format,
+        original_size=original_size,
+        rotated=rotated,
+        crop_box=bbox
+    )
@@ -4,10 +4,11 @@ Módulo de traducción automática de documentos.
 Detecta el idioma y traduce a español usando Gemini.
 """
 
-import os
 from typing import Optional, Tuple
 import re
 
+from .cues import language_counts
+
 try:
     import google.generativeai as genai
     GEMINI_AVAILABLE = True
@@ -15,6 +16,8 @@ except ImportError:
     GEMINI_AVAILABLE = False
     genai = None
 
+from .gemini import default_api_key, generate_content
+
 
 def detect_language(text: str) -> str:
     """
@@ -29,33 +32,10 @@ def detect_language(text: str) -> str:
     if not text:
         return "unknown"
     
-    text_lower = text.lower()
-    
-    # Detección simple por palabras clave
-    # Español
-    spanish_keywords = ['nombre', 'apellido', 'fecha', 'nacimiento', 'expedición', 'vencimiento']
-    spanish_count = sum(1 for kw in spanish_keywords if kw in text_lower)
-    
-    # Inglés
-    english_keywords = ['name', 'surname', 'date', 'birth', 'issue', 'expiration', 'license']
-    english_count = sum(1 for kw in english_keywords if kw in text_lower)
-    
-    # Portugués
-    portuguese_keywords = ['nome', 'sobrenome', 'data', 'nascimento', 'emissão', 'validade']
-    portuguese_count = sum(1 for kw in portuguese_keywords if kw in text_lower)
-    
-    # Vietnamita
-    vietnamese_keywords = ['họ', 'tên', 'ngày', 'sinh', 'cấp', 'hết hạn']
-    vietnamese_count = sum(1 for kw in vietnamese_keywords if kw in text_lower)
+    # Detección simple por palabras clave (una pasada, ver cues.py)
+    counts = language_counts(text)
     
     # Determinar idioma por mayor coincidencia
-    counts = {
-        'es': spanish_count,
-        'en': english_count,
-        'pt': portuguese_count,
-        'vi': vietnamese_count
-    }
-    
     max_lang = max(counts, key=counts.get)
     
     # Si no hay suficientes coincidencias, retornar español por defecto
@@ -92,15 +72,10 @@ def translate_to_spanish(
     if source_lang == 'es':
         return text, {"source_lang": "es", "translated": False}
     
-    # Configurar Gemini
-    if api_key is None:
-        api_key = os.getenv("GEMINI_API_KEY")
-    
-    if not api_key:
+    # Verificar API key (explícita o del entorno)
+    if not default_api_key(api_key):
         return text, {"error": "API key no disponible", "translated": False}
     
-    genai.configure(api_key=api_key)
-    
     # Prompt para traducción
     prompt = f"""
 Traduce el siguiente texto de un documento de identificación al español.
@@ -121,9 +96,10 @@ Traducción al español:
 """
     
     try:
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(
+        response = generate_content(
+            'gemini-1.5-flash',
             prompt,
+            api_key=api_key,
             generation_config={"temperature": 0.1, "top_p": 0.9},
             request_options={"timeout": 30}
         )
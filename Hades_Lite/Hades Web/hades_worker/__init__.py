@@ -3,6 +3,23 @@ Hades Worker - Celery worker para procesamiento asíncrono.
 """
 
 from .celery_app import celery_app
-from .tasks import process_image_task, export_to_drive_task
+from .tasks import (
+    analysis_pipeline,
+    ocr_stage_task,
+    forensics_stage_task,
+    process_image_task,
+    finalize_case_task,
+    export_to_drive_task,
+    export_case_task,
+)
 
-__all__ = ["celery_app", "process_image_task", "export_to_drive_task"]
+__all__ = [
+    "celery_app",
+    "analysis_pipeline",
+    "ocr_stage_task",
+    "forensics_stage_task",
+    "process_image_task",
+    "finalize_case_task",
+    "export_to_drive_task",
+    "export_case_task",
+]
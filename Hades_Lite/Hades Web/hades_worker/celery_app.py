@@ -3,8 +3,21 @@ Aplicación de Celery para procesamiento asíncrono.
 """
 
 from celery import Celery
+from celery.schedules import crontab
 from .config import settings
 
+# Colas del análisis: cada etapa con sus propios workers (concurrencia
+# independiente, ver docker-compose.yml). "celery" queda para el cierre de
+# casos y las tareas periódicas.
+QUEUE_OCR = "ocr"
+QUEUE_FORENSICS = "forensics"
+QUEUE_DRIVE = "drive"
+
+# Prioridades (Redis: 0 = máxima). Un análisis individual (POST /jobs) pasa
+# delante de los documentos de un lote en las mismas colas.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 6
+
 # Crear app de Celery
 celery_app = Celery(
     "hades_worker",
@@ -41,6 +54,42 @@ celery_app.conf.update(
     worker_prefetch_multiplier=settings.WORKER_PREFETCH_MULTIPLIER,
     worker_max_tasks_per_child=settings.WORKER_MAX_TASKS_PER_CHILD,
     
+    # Colas: OCR y forense en colas separadas (un timeout de Gemini en una
+    # etapa no retiene workers de la otra) y la exportación a Drive en la
+    # suya, con rate limit y reintentos por cuota
+    task_routes={
+        'hades_worker.ocr_stage': {'queue': QUEUE_OCR},
+        'hades_worker.forensics_stage': {'queue': QUEUE_FORENSICS},
+        'hades_worker.export_to_drive': {'queue': QUEUE_DRIVE},
+        'hades_worker.export_case': {'queue': QUEUE_DRIVE},
+    },
+    
+    # Prioridades en Redis: una lista por nivel y por cola ("ocr", "ocr:3",
+    # ...); el worker vacía primero las de mayor prioridad
+    broker_transport_options={
+        'priority_steps': [0, 3, 6, 9],
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+    },
+    
+    # Tareas periódicas (requiere `celery beat`): limpieza de blobs
+    # huérfanos y rollups del panel de administración
+    beat_schedule={
+        'gc-blobs': {
+            'task': 'hades_worker.gc_blobs',
+            'schedule': 3600.0,
+        },
+        'refresh-rollups': {
+            'task': 'hades_worker.refresh_rollups',
+            'schedule': 120.0,
+        },
+        'rebuild-rollups': {
+            'task': 'hades_worker.refresh_rollups',
+            'schedule': crontab(hour=3, minute=30),
+            'kwargs': {'full': True},
+        },
+    },
+    
     # Logging
     worker_log_format='[%(asctime)s: %(levelname)s/%(processName)s] %(message)s',
     worker_task_log_format='[%(asctime)s: %(levelname)s/%(processName)s][%(task_name)s(%(task_id)s)] %(message)s',
@@ -16,6 +16,13 @@ class WorkerSettings(BaseSettings):
     
     # Gemini
     GEMINI_API_KEY: str
+    ANALYSIS_MODE: str = "multi"  # "multi" o "fused" (una llamada multimodal)
+    # Pool y cuota por key; hades_core.gemini los lee del entorno
+    GEMINI_API_KEYS: str = ""  # Separadas por comas (se suma GEMINI_API_KEY)
+    GEMINI_RPM: int = 0  # 0 = sin límite
+    GEMINI_TPM: int = 0
+    GEMINI_QUOTA_MAX_WAIT: float = 60
+    GEMINI_QUOTA_REDIS_URL: str = ""  # Por defecto REDIS_URL
     
     # Worker
     WORKER_CONCURRENCY: int = 4
@@ -30,6 +37,12 @@ class WorkerSettings(BaseSettings):
     TASK_MAX_RETRIES: int = 3
     TASK_RETRY_DELAY: int = 60  # segundos
     
+    # Exportación a Drive (cola "drive", separada del análisis)
+    DRIVE_RATE_LIMIT: str = "60/m"  # Por proceso de worker (formato de Celery)
+    DRIVE_MAX_RETRIES: int = 8
+    DRIVE_RETRY_BACKOFF: int = 30  # segundos; se duplica en cada reintento
+    DRIVE_RETRY_BACKOFF_MAX: int = 900
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -2,13 +2,18 @@
 Tareas de Celery para procesamiento de documentos.
 """
 
-from celery import Task
+from celery import Task, chain
+from celery.signals import task_postrun, task_prerun, worker_process_init, worker_ready
 from datetime import datetime
+import random
 import sys
+import time
 from pathlib import Path
 from typing import Optional
 
-from .celery_app import celery_app
+from sqlalchemy.orm import scoped_session
+
+from .celery_app import PRIORITY_BULK, PRIORITY_INTERACTIVE, celery_app
 from .config import settings
 
 # Agregar paths para importar módulos
@@ -16,32 +21,189 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 # Importar después de agregar al path
-from hades_core.analyzer import analyze_image
-from hades_api.services.drive import export_result_to_drive
-from hades_api.database import SessionLocal
+from hades_core.analyzer import OCR_STAGES, analyze_image, failed_stages, run_ocr_stages
+from hades_api.services.drive import export_result_to_drive, DriveQuotaError
+from hades_api.services.blob_store import get_blob_store, read_blob, BlobNotFound
+from hades_api.config import settings as api_settings
+from hades_api.database import SessionLocal, engine
 from hades_api.models.job import Job, JobStatus
+from hades_api.models.case import Case, CaseStatus
+from hades_api.models.rollup import RollupState
+from hades_api.services.cases import aggregate_case, case_jobs, case_progress, export_case
+from hades_api.services.job_events import publish_case, publish_job
+from hades_api.services.job_results import full_result, store_result
+from hades_api.services.rollups import refresh_rollups
+from hades_api.services.task_metrics import record_task
+
+
+# Una sesión por proceso (por hilo con --pool=threads), reutilizada entre
+# tareas: cada tarea termina con close(), que devuelve la conexión al pool
+# y vacía el identity map, sin crear ni destruir la sesión
+worker_session = scoped_session(SessionLocal)
+
+
+@worker_process_init.connect
+def _reset_db_pool(**kwargs):
+    """
+    Cada proceso hijo (prefork) abre sus propias conexiones.
+    
+    Las del padre no se cierran (close=False): siguen siendo suyas.
+    """
+    engine.dispose(close=False)
+    worker_session.remove()
+
+
+# Inicio de cada tarea en curso del proceso (task_id -> perf_counter)
+_task_started = {}
+
+
+@task_prerun.connect
+def _task_started_at(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _record_task_metrics(task_id=None, task=None, state=None, **kwargs):
+    """Duración y estado final de cada tarea (GET /metrics de la API)"""
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    queue = (task.request.delivery_info or {}).get("routing_key") or "celery"
+    record_task(task.name, queue, state or "UNKNOWN", time.perf_counter() - started)
 
 
 class DatabaseTask(Task):
     """
     Task base con manejo de sesión de base de datos.
     
-    Asegura que la sesión se cierre correctamente después de cada tarea.
+    La sesión es la del proceso (`worker_session`); se libera después de
+    cada tarea.
     """
-    _db = None
     
     @property
     def db(self):
-        """Obtiene o crea una sesión de DB"""
-        if self._db is None:
-            self._db = SessionLocal()
-        return self._db
+        """Sesión de DB del proceso"""
+        return worker_session()
     
     def after_return(self, *args, **kwargs):
-        """Cierra la sesión después de retornar"""
-        if self._db is not None:
-            self._db.close()
-            self._db = None
+        """Termina la transacción y devuelve la conexión al pool"""
+        worker_session().close()
+
+
+def _analysis_config() -> dict:
+    """Configuración de hades_core igual en las dos etapas del análisis"""
+    return {"auto_translate": True, "mode": settings.ANALYSIS_MODE}
+
+
+def analysis_pipeline(
+    job_id: str,
+    blob_key: str,
+    auto_export: bool = True,
+    user_email: Optional[str] = None,
+    in_batch: bool = False,
+    priority: int = PRIORITY_INTERACTIVE
+):
+    """
+    Cadena de Celery que analiza un documento: OCR (cola "ocr") y después
+    análisis visual, post-proceso y guardado (cola "forensics"). La
+    exportación a Drive se encola al final en la cola "drive".
+    
+    Args:
+        job_id: UUID del job como string
+        blob_key: Clave de la imagen en el almacén de blobs
+        auto_export: Si debe exportar a Drive automáticamente
+        user_email: Email del usuario para exportación
+        in_batch: Parte de un chord de caso (ver forensics_stage_task)
+        priority: PRIORITY_INTERACTIVE o PRIORITY_BULK
+        
+    Returns:
+        Firma de la cadena (`.apply_async()` o dentro de un chord)
+    """
+    return chain(
+        ocr_stage_task.si(job_id=job_id, blob_key=blob_key, in_batch=in_batch).set(priority=priority),
+        forensics_stage_task.s(
+            auto_export=auto_export,
+            user_email=user_email,
+            in_batch=in_batch
+        ).set(priority=priority),
+    )
+
+
+class GeminiStageError(Exception):
+    """Una etapa de Gemini terminó con error o timeout (se reintenta la tarea)"""
+
+
+def _check_stages(stages: dict, names) -> None:
+    """
+    Las etapas de Gemini no lanzan excepción: su fallo queda en el estado.
+    Sin este chequeo el job se guardaría como COMPLETED en AMARILLO.
+    
+    Raises:
+        GeminiStageError: Si alguna etapa de `names` no terminó bien
+    """
+    failed = failed_stages(stages, names)
+    if failed:
+        raise GeminiStageError(
+            "; ".join(f"{name}: {error}" for name, error in failed.items())
+        )
+
+
+def _stage_failed(task, job_id: str, blob_key: str, error: Exception, in_batch: bool):
+    """
+    Manejo de un error en una etapa del análisis.
+    
+    Reintenta la etapa (solo esa: la cadena sigue después) si quedan
+    intentos; si no, marca el job como fallido y borra la imagen.
+    
+    Returns:
+        Dict de fallo si `in_batch` (el cierre del caso se ejecuta igual)
+        
+    Raises:
+        Retry: Si la etapa se reintentará
+        Exception: El error original, fuera de un lote
+    """
+    print(f"[{job_id}] Error en procesamiento: {error}")
+    
+    # Retry si no hemos alcanzado el máximo (sin imagen no tiene sentido)
+    will_retry = not isinstance(error, BlobNotFound) and task.request.retries < task.max_retries
+    
+    # Marcar job como fallido (o de vuelta en cola si se reintentará)
+    try:
+        job = task.db.query(Job).filter(Job.id == job_id).first()
+        if job:
+            job.status = JobStatus.QUEUED if will_retry else JobStatus.FAILED
+            job.error_message = str(error)
+            job.completed_at = None if will_retry else datetime.utcnow()
+            task.db.commit()
+            publish_job(job)
+    except Exception as db_error:
+        print(f"[{job_id}] Error actualizando job fallido: {db_error}")
+    
+    if will_retry:
+        print(f"[{job_id}] Reintentando... (intento {task.request.retries + 1}/{task.max_retries})")
+        raise task.retry(exc=error)
+    
+    # Si ya no hay más reintentos, borrar la imagen y propagar el error
+    print(f"[{job_id}] Falló después de {task.max_retries} reintentos")
+    try:
+        get_blob_store().delete(blob_key)
+    except Exception as blob_error:
+        print(f"[{job_id}] Error borrando blob: {blob_error}")
+    if in_batch:
+        return {"job_id": job_id, "status": "failed", "error": str(error)}
+    raise error
+
+
+def _start_processing(db, job_id: str) -> Job:
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise ValueError(f"Job {job_id} no encontrado en la base de datos")
+    if job.status != JobStatus.PROCESSING:
+        job.status = JobStatus.PROCESSING
+        job.started_at = job.started_at or datetime.utcnow()
+        db.commit()
+        publish_job(job)
+    return job
 
 
 @celery_app.task(
@@ -49,24 +211,75 @@ class DatabaseTask(Task):
     base=DatabaseTask,
     max_retries=settings.TASK_MAX_RETRIES,
     default_retry_delay=settings.TASK_RETRY_DELAY,
-    name='hades_worker.process_image'
+    name='hades_worker.ocr_stage'
 )
-def process_image_task(
+def ocr_stage_task(self, job_id: str, blob_key: str, in_batch: bool = False):
+    """
+    Primera etapa del análisis (cola "ocr"): OCR y traducción con Gemini.
+    Si alguna falla o expira, la tarea se reintenta.
+    
+    La imagen no viaja por el broker: se lee del almacén de blobs. Lo que
+    pasa a la etapa siguiente es el texto y los metadatos de estas etapas
+    (`run_ocr_stages`), unos KB.
+    
+    Args:
+        self: Task instance (bind=True)
+        job_id: UUID del job como string
+        blob_key: Clave de la imagen en el almacén de blobs
+        in_batch: Parte de un chord de caso (ver forensics_stage_task)
+        
+    Returns:
+        Dict para forensics_stage_task, o de fallo si `in_batch`
+    """
+    try:
+        _start_processing(self.db, job_id)
+        print(f"[{job_id}] Iniciando OCR...")
+        
+        image_bytes = read_blob(get_blob_store(), blob_key)
+        partial = run_ocr_stages(
+            image_bytes,
+            gemini_api_key=settings.GEMINI_API_KEY,
+            config=_analysis_config()
+        )
+        _check_stages(partial["stages"], OCR_STAGES)
+        
+        print(f"[{job_id}] OCR completado en {partial['pipeline_ms']} ms")
+        return {"job_id": job_id, "blob_key": blob_key, "partial": partial}
+        
+    except Exception as e:
+        return _stage_failed(self, job_id, blob_key, e, in_batch)
+
+
+@celery_app.task(
+    bind=True,
+    base=DatabaseTask,
+    max_retries=settings.TASK_MAX_RETRIES,
+    default_retry_delay=settings.TASK_RETRY_DELAY,
+    name='hades_worker.forensics_stage'
+)
+def forensics_stage_task(
     self,
-    job_id: str,
-    image_bytes: bytes,
+    ocr_output: dict,
     auto_export: bool = True,
-    user_email: Optional[str] = None
+    user_email: Optional[str] = None,
+    in_batch: bool = False
 ):
     """
-    Tarea de procesamiento de imagen de documento.
+    Segunda etapa del análisis (cola "forensics"): análisis visual con
+    Gemini, país, fechas, extracción y forense; guarda el resultado.
+    
+    Si el análisis visual falla o expira, la tarea se reintenta (el OCR
+    no se repite). Borra la imagen al terminar (con éxito o tras agotar
+    los reintentos).
     
     Args:
         self: Task instance (bind=True)
-        job_id: UUID del job como string
-        image_bytes: Bytes de la imagen
+        ocr_output: Resultado de ocr_stage_task
         auto_export: Si debe exportar a Drive automáticamente
         user_email: Email del usuario para exportación
+        in_batch: Parte de un chord de caso; si falla definitivamente
+            retorna el fallo en vez de propagarlo, para que el cierre del
+            caso se ejecute igual
         
     Returns:
         Dict con resultado del procesamiento
@@ -74,37 +287,32 @@ def process_image_task(
     Raises:
         Exception: Si falla después de todos los reintentos
     """
+    if ocr_output.get("status") == "failed":
+        # El OCR ya falló definitivamente (solo llega aquí dentro de un lote)
+        return ocr_output
+    
+    job_id = ocr_output["job_id"]
+    blob_key = ocr_output["blob_key"]
     try:
-        # 1. Obtener job de la DB
-        job = self.db.query(Job).filter(Job.id == job_id).first()
-        if not job:
-            raise ValueError(f"Job {job_id} no encontrado en la base de datos")
+        job = _start_processing(self.db, job_id)
         
-        # 2. Actualizar estado a PROCESSING
-        job.status = JobStatus.PROCESSING
-        job.started_at = datetime.utcnow()
-        self.db.commit()
-        
-        print(f"[{job_id}] Iniciando análisis de imagen...")
-        
-        # 3. Analizar imagen con hades_core
+        image_bytes = read_blob(get_blob_store(), blob_key)
         result = analyze_image(
             image_bytes,
             gemini_api_key=settings.GEMINI_API_KEY,
-            config={"auto_translate": True}
+            config=_analysis_config(),
+            partial=ocr_output["partial"]
         )
+        _check_stages(result.metadata["stages"], ("vision",))
         
         print(f"[{job_id}] Análisis completado. Semáforo: {result.semaforo}")
         
-        # 4. Convertir resultado a dict
-        result_dict = result.to_dict()
-        
-        # 5. Actualizar job con resultado
+        # Actualizar job con resultado
         job.status = JobStatus.COMPLETED
         job.completed_at = datetime.utcnow()
-        job.result = result_dict
+        store_result(job, result.to_dict())
         
-        # 6. Extraer metadata para búsquedas rápidas
+        # Extraer metadata para búsquedas rápidas
         job.country_detected = result.country_code
         job.semaforo = result.semaforo.value if result.semaforo else None
         job.score = result.score
@@ -112,127 +320,269 @@ def process_image_task(
         job.id_number_extracted = result.id_number
         
         self.db.commit()
+        publish_job(job)
         
         print(f"[{job_id}] Job actualizado en DB")
         
-        # 7. Exportar a Drive (si auto_export)
+        # La imagen ya no hace falta
+        get_blob_store().delete(blob_key)
+        
+        # Exportar a Drive (si auto_export) en la cola "drive": la cuota
+        # de Drive no frena el análisis
+        export_queued = False
         if auto_export and user_email:
             try:
-                print(f"[{job_id}] Exportando a Google Drive...")
-                
-                success, file_id, web_link, error = export_result_to_drive(
-                    result_dict,
-                    user_email,
-                    job_id
-                )
-                
-                if success:
-                    job.exported_to_drive = True
-                    job.drive_file_id = file_id
-                    job.drive_url = web_link
-                    self.db.commit()
-                    print(f"[{job_id}] Exportado a Drive: {file_id}")
-                else:
-                    print(f"[{job_id}] Error exportando a Drive: {error}")
-                    
+                export_to_drive_task.delay(job_id=job_id, user_email=user_email)
+                export_queued = True
+                print(f"[{job_id}] Exportación a Drive encolada")
             except Exception as e:
-                # No fallar la tarea si Drive falla
-                print(f"[{job_id}] Excepción exportando a Drive: {e}")
+                # No fallar la tarea si no se puede encolar
+                print(f"[{job_id}] Excepción encolando exportación a Drive: {e}")
         
-        # 8. Retornar resultado
         return {
             "job_id": job_id,
             "status": "completed",
             "semaforo": job.semaforo,
             "score": job.score,
             "country": job.country_detected,
-            "exported": job.exported_to_drive
+            "export_queued": export_queued
         }
         
     except Exception as e:
-        print(f"[{job_id}] Error en procesamiento: {e}")
-        
-        # Marcar job como fallido
+        return _stage_failed(self, job_id, blob_key, e, in_batch)
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name='hades_worker.process_image')
+def process_image_task(
+    self,
+    job_id: str,
+    blob_key: str,
+    auto_export: bool = True,
+    user_email: Optional[str] = None,
+    in_batch: bool = False
+):
+    """
+    Compatibilidad con mensajes encolados antes de separar las etapas: se
+    reemplaza por `analysis_pipeline` (dentro de un chord, el cierre del
+    caso espera a la cadena).
+    """
+    priority = PRIORITY_BULK if in_batch else PRIORITY_INTERACTIVE
+    return self.replace(analysis_pipeline(job_id, blob_key, auto_export, user_email, in_batch, priority))
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name='hades_worker.finalize_case')
+def finalize_case_task(
+    self,
+    results: list,
+    case_id: str,
+    auto_export: bool = True,
+    user_email: Optional[str] = None
+):
+    """
+    Cierre de un caso (cuerpo del chord de POST /jobs/batch).
+    
+    Se ejecuta cuando terminaron todos los documentos: calcula el semáforo
+    del caso y encola una sola exportación a Drive.
+    
+    Args:
+        self: Task instance (bind=True)
+        results: Resultados de process_image_task (uno por documento)
+        case_id: UUID del caso
+        auto_export: Si debe exportar el caso a Drive
+        user_email: Email del usuario para exportación
+    """
+    case = self.db.query(Case).filter(Case.id == case_id).first()
+    if not case:
+        raise ValueError(f"Caso {case_id} no encontrado en la base de datos")
+    
+    jobs = case_jobs(self.db, case.id, with_result=False)
+    aggregate_case(case, jobs)
+    self.db.commit()
+    
+    print(f"[case {case_id}] Caso cerrado. Estado: {case.status}, semáforo: {case.semaforo}")
+    
+    publish_case(case, case_progress(case, jobs))
+    
+    export_queued = False
+    if auto_export and user_email and case.completed_at and case.status != CaseStatus.FAILED:
         try:
-            job = self.db.query(Job).filter(Job.id == job_id).first()
-            if job:
-                job.status = JobStatus.FAILED
-                job.error_message = str(e)
-                job.completed_at = datetime.utcnow()
-                self.db.commit()
-        except Exception as db_error:
-            print(f"[{job_id}] Error actualizando job fallido: {db_error}")
-        
-        # Retry si no hemos alcanzado el máximo
-        if self.request.retries < self.max_retries:
-            print(f"[{job_id}] Reintentando... (intento {self.request.retries + 1}/{self.max_retries})")
-            raise self.retry(exc=e)
-        
-        # Si ya no hay más reintentos, propagar el error
-        print(f"[{job_id}] Falló después de {self.max_retries} reintentos")
-        raise
+            export_case_task.delay(case_id=case_id, user_email=user_email)
+            export_queued = True
+        except Exception as e:
+            # No fallar la tarea si no se puede encolar
+            print(f"[case {case_id}] Excepción encolando exportación a Drive: {e}")
+    
+    return {
+        "case_id": case_id,
+        "status": case.status.value,
+        "semaforo": case.semaforo,
+        "score": case.score,
+        "export_queued": export_queued
+    }
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name='hades_worker.refresh_rollups')
+def refresh_rollups_task(self, full: bool = False):
+    """
+    Actualiza los rollups del panel de administración.
+    
+    Programada con Celery beat: incremental cada pocos minutos y
+    reconstrucción completa diaria (ver celery_app.py).
+    """
+    summary = refresh_rollups(self.db, full=full)
+    self.db.commit()
+    print(f"[rollups] Actualizados desde {summary['since'] or 'el inicio'}: {summary['rows']} filas")
+    return summary
+
+
+@worker_ready.connect
+def _seed_rollups(**kwargs):
+    """
+    Construcción inicial de los rollups tras un despliegue.
+    
+    Recorre toda la tabla jobs: se encola aquí y no en la primera lectura
+    del panel (ver services/rollups.py).
+    """
+    db = SessionLocal()
+    try:
+        state = db.query(RollupState).filter(RollupState.id == 1).first()
+        if state is None or state.rebuilt_at is None:
+            refresh_rollups_task.delay(full=True)
+            print("[rollups] Construcción inicial encolada")
+    except Exception as e:
+        print(f"[rollups] Error revisando rollups: {e}")
+    finally:
+        db.close()
 
 
-@celery_app.task(name='hades_worker.export_to_drive')
+@celery_app.task(name='hades_worker.gc_blobs')
+def gc_blobs_task():
+    """
+    Borra imágenes huérfanas del almacén de blobs.
+    
+    Normalmente cada tarea borra su blob; esto cubre workers caídos o
+    tareas perdidas. Programada con Celery beat (ver celery_app.py).
+    """
+    max_age = api_settings.BLOB_ORPHAN_TTL_HOURS * 3600
+    deleted = get_blob_store().delete_older_than(max_age)
+    print(f"[gc_blobs] {deleted} blobs huérfanos eliminados")
+    return {"deleted": deleted}
+
+
+def _drive_backoff(retries: int) -> int:
+    """Espera exponencial con jitter para errores de cuota de Drive"""
+    delay = min(settings.DRIVE_RETRY_BACKOFF * (2 ** retries), settings.DRIVE_RETRY_BACKOFF_MAX)
+    return int(delay * random.uniform(0.5, 1.0))
+
+
+@celery_app.task(
+    bind=True,
+    base=DatabaseTask,
+    max_retries=settings.DRIVE_MAX_RETRIES,
+    rate_limit=settings.DRIVE_RATE_LIMIT,
+    name='hades_worker.export_to_drive'
+)
 def export_to_drive_task(
+    self,
     job_id: str,
-    result_dict: dict,
-    user_email: str
+    result_dict: Optional[dict] = None,
+    user_email: Optional[str] = None
 ):
     """
-    Tarea separada para exportar a Drive.
+    Exporta el resultado de un job a Drive (cola "drive").
     
-    Útil para exportación manual o re-exportación.
+    Corre fuera de la cola de análisis con rate limit: los errores de cuota
+    de Drive se reintentan con backoff exponencial sin ocupar workers de
+    análisis.
     
     Args:
+        self: Task instance (bind=True)
         job_id: UUID del job
-        result_dict: Resultado del análisis
-        user_email: Email del usuario
+        result_dict: Resultado del análisis (por defecto se lee de la DB,
+            para no pasar el JSON completo por el broker)
+        user_email: Email del usuario (por defecto el del job)
         
     Returns:
         Dict con resultado de la exportación
     """
+    job = self.db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        return {"job_id": job_id, "success": False, "error": "Job no encontrado"}
+    
+    if job.exported_to_drive:
+        # Reentrega de la tarea (acks_late): no duplicar el archivo
+        return {"job_id": job_id, "success": True, "file_id": job.drive_file_id, "web_link": job.drive_url}
+    
     try:
         print(f"[{job_id}] Iniciando exportación a Drive...")
         
         success, file_id, web_link, error = export_result_to_drive(
-            result_dict,
-            user_email,
-            job_id
+            result_dict if result_dict is not None else full_result(job),
+            user_email or job.user_email or "unknown",
+            job_id,
+            raise_retryable=True
         )
         
-        if success:
-            # Actualizar job en DB
-            db = SessionLocal()
-            try:
-                job = db.query(Job).filter(Job.id == job_id).first()
-                if job:
-                    job.exported_to_drive = True
-                    job.drive_file_id = file_id
-                    job.drive_url = web_link
-                    db.commit()
-                    print(f"[{job_id}] Exportación exitosa: {file_id}")
-            finally:
-                db.close()
-            
-            return {
-                "job_id": job_id,
-                "success": True,
-                "file_id": file_id,
-                "web_link": web_link
-            }
-        else:
-            print(f"[{job_id}] Error en exportación: {error}")
-            return {
-                "job_id": job_id,
-                "success": False,
-                "error": error
-            }
-            
-    except Exception as e:
-        print(f"[{job_id}] Excepción en exportación: {e}")
-        return {
-            "job_id": job_id,
-            "success": False,
-            "error": str(e)
-        }
+    except DriveQuotaError as e:
+        if self.request.retries < self.max_retries:
+            countdown = _drive_backoff(self.request.retries)
+            print(f"[{job_id}] Cuota de Drive, reintentando en {countdown}s: {e}")
+            raise self.retry(exc=e, countdown=countdown)
+        print(f"[{job_id}] Cuota de Drive agotada tras {self.max_retries} reintentos")
+        return {"job_id": job_id, "success": False, "error": str(e)}
+    
+    if not success:
+        print(f"[{job_id}] Error en exportación: {error}")
+        return {"job_id": job_id, "success": False, "error": error}
+    
+    # Actualizar job en DB
+    job.exported_to_drive = True
+    job.drive_file_id = file_id
+    job.drive_url = web_link
+    self.db.commit()
+    print(f"[{job_id}] Exportación exitosa: {file_id}")
+    
+    return {
+        "job_id": job_id,
+        "success": True,
+        "file_id": file_id,
+        "web_link": web_link
+    }
+
+
+@celery_app.task(
+    bind=True,
+    base=DatabaseTask,
+    max_retries=settings.DRIVE_MAX_RETRIES,
+    rate_limit=settings.DRIVE_RATE_LIMIT,
+    name='hades_worker.export_case'
+)
+def export_case_task(self, case_id: str, user_email: Optional[str] = None):
+    """
+    Exporta un caso cerrado a Drive (cola "drive", mismos reintentos que
+    export_to_drive_task).
+    
+    Args:
+        self: Task instance (bind=True)
+        case_id: UUID del caso
+        user_email: Email del usuario (por defecto el del caso)
+    """
+    case = self.db.query(Case).filter(Case.id == case_id).first()
+    if not case:
+        return {"case_id": case_id, "success": False, "error": "Caso no encontrado"}
+    
+    if case.exported_to_drive:
+        return {"case_id": case_id, "success": True, "file_id": case.drive_file_id}
+    
+    try:
+        export_case(case, case_jobs(self.db, case.id), user_email or case.user_email, raise_retryable=True)
+    except DriveQuotaError as e:
+        if self.request.retries < self.max_retries:
+            countdown = _drive_backoff(self.request.retries)
+            print(f"[case {case_id}] Cuota de Drive, reintentando en {countdown}s: {e}")
+            raise self.retry(exc=e, countdown=countdown)
+        print(f"[case {case_id}] Cuota de Drive agotada tras {self.max_retries} reintentos")
+        return {"case_id": case_id, "success": False, "error": str(e)}
+    
+    self.db.commit()
+    return {"case_id": case_id, "success": case.exported_to_drive, "file_id": case.drive_file_id}
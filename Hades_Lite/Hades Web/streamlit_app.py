@@ -1,6 +1,7 @@
 import streamlit as st
 import os
 import sys
+import uuid
 from pathlib import Path
 from datetime import datetime
 import pandas as pd
@@ -17,6 +18,9 @@ from hades_api.config import settings
 from hades_ui.auth_manager import AuthManager
 from hades_api.database import SessionLocal
 from hades_api.models.job import Job, JobStatus
+from hades_api.services.job_results import full_result, list_select, store_result
+from hades_api.services.pagination import keyset_page, split_page
+from hades_api.services.result_cache import analysis_version, content_hash
 from hades_core.analyzer import analyze_image
 
 # Page Config
@@ -107,44 +111,58 @@ def page_analyzer():
         auto_export = st.checkbox("Exportar automáticamente a Google Drive", value=True)
         
         if uploaded_file and st.button("🚀 Iniciar Análisis"):
-            with st.spinner("Analizando documento con Gemini Vision AI..."):
-                try:
-                    # 1. Read bytes
-                    image_bytes = uploaded_file.read()
-                    
-                    # 2. Analyze
-                    api_key = st.session_state.get("gemini_api_key") or settings.GEMINI_API_KEY
-                    if not api_key:
-                        st.error("❌ Gemini API Key no configurada.")
-                        return
+            # getvalue() no consume el archivo: los reruns no lo vuelven a leer
+            image_bytes = uploaded_file.getvalue()
+            sha256 = content_hash(image_bytes)
+            if st.session_state.get("current_hash") == sha256:
+                # Mismo archivo que el último análisis: no volver a llamar a Gemini
+                st.info("ℹ️ Este documento ya fue analizado; se muestra el resultado anterior.")
+            else:
+                with st.spinner("Analizando documento con Gemini Vision AI..."):
+                    try:
+                        api_key = st.session_state.get("gemini_api_key") or settings.GEMINI_API_KEY
+                        if not api_key:
+                            st.error("❌ Gemini API Key no configurada.")
+                            return
+                            
+                        # Mismo config que la API: analysis_version() declara settings.ANALYSIS_MODE
+                        result = analyze_image(
+                            image_bytes,
+                            gemini_api_key=api_key,
+                            config={"auto_translate": True, "mode": settings.ANALYSIS_MODE}
+                        )
+                        result_dict = result.to_dict()
                         
-                    result = analyze_image(image_bytes, gemini_api_key=api_key)
-                    
-                    # 3. Save to DB
-                    db = SessionLocal()
-                    job = Job(
-                        user_id=st.session_state.user_info.get("sub"),
-                        user_email=st.session_state.user_info.get("email"),
-                        user_name=st.session_state.user_info.get("name"),
-                        status=JobStatus.COMPLETED,
-                        result=result.to_dict(),
-                        country_detected=result.country_code,
-                        semaforo=result.semaforo.value if result.semaforo else None,
-                        score=result.score,
-                        name_extracted=result.name,
-                        id_number_extracted=result.id_number,
-                        completed_at=datetime.utcnow()
-                    )
-                    db.add(job)
-                    db.commit()
-                    db.refresh(job)
-                    
-                    st.success(f"✅ Análisis completado para {result.name}")
-                    st.session_state.current_result = result.to_dict()
-                    st.session_state.current_job_id = job.id
-                    
-                except Exception as e:
-                    st.error(f"❌ Error durante el análisis: {str(e)}")
+                        # Guardar en DB (mismo formato que la API)
+                        with SessionLocal() as db:
+                            job = Job(
+                                user_id=st.session_state.user_info.get("sub"),
+                                user_email=st.session_state.user_info.get("email"),
+                                user_name=st.session_state.user_info.get("name"),
+                                status=JobStatus.COMPLETED,
+                                country_detected=result.country_code,
+                                semaforo=result.semaforo.value if result.semaforo else None,
+                                score=result.score,
+                                name_extracted=result.name,
+                                id_number_extracted=result.id_number,
+                                content_hash=sha256,
+                                analysis_version=analysis_version(),
+                                completed_at=datetime.utcnow()
+                            )
+                            store_result(job, result_dict)
+                            db.add(job)
+                            db.commit()
+                            job_id = job.id
+                        
+                        st.success(f"✅ Análisis completado para {result.name}")
+                        st.session_state.current_result = result_dict
+                        st.session_state.current_job_id = job_id
+                        st.session_state.current_hash = sha256
+                        # El historial cacheado ya no incluye este job
+                        load_history_page.clear()
+                        
+                    except Exception as e:
+                        st.error(f"❌ Error durante el análisis: {str(e)}")
 
     with col2:
         if "current_result" in st.session_state:
@@ -169,30 +187,105 @@ def page_analyzer():
             
             st.markdown('</div>', unsafe_allow_html=True)
 
+HISTORY_PAGE_SIZE = 50
+HISTORY_SEMAFOROS = ["verde", "amarillo", "rojo"]
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_history_page(user_id, semaforo=None, country=None, cursor=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Una página del historial (paginación por cursor, como GET /jobs).
+    
+    Cacheada por usuario, filtros y cursor: los reruns de Streamlit (cada
+    clic) no vuelven a consultar la base. Solo carga las columnas de la
+    lista, no el resultado.
+    
+    Returns:
+        (filas para la tabla, cursor de la página siguiente o None)
+    """
+    stmt = list_select().where(Job.user_id == user_id)
+    if semaforo:
+        stmt = stmt.where(Job.semaforo == semaforo)
+    if country:
+        stmt = stmt.where(Job.country_detected == country.upper())
+    with SessionLocal() as db:
+        jobs, next_cursor = split_page(db.execute(keyset_page(stmt, cursor, limit)).scalars().all(), limit)
+        rows = [
+            {
+                "id": str(job.id),
+                "Fecha": job.created_at.strftime("%Y-%m-%d %H:%M") if job.created_at else "",
+                "Nombre": job.name_extracted,
+                "País": job.country_detected,
+                "Semáforo": job.semaforo,
+                "Score": job.score,
+                "Estado": job.status.value if job.status else None,
+            }
+            for job in jobs
+        ]
+    return rows, next_cursor
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_job_detail(user_id, job_id):
+    """Resultado completo de un job del usuario (solo al abrir su detalle)"""
+    with SessionLocal() as db:
+        job = db.query(Job).filter(Job.id == uuid.UUID(job_id), Job.user_id == user_id).first()
+        return full_result(job) if job else None
+
+
 def page_history():
     st.markdown('<h1 class="main-header">📜 Historial de Análisis</h1>', unsafe_allow_html=True)
     
-    db = SessionLocal()
     user_id = st.session_state.user_info.get("sub")
-    jobs = db.query(Job).filter(Job.user_id == user_id).order_by(Job.created_at.desc()).all()
     
-    if not jobs:
-        st.info("Aún no tienes análisis registrados.")
+    col1, col2 = st.columns(2)
+    semaforo = col1.selectbox("Semáforo", HISTORY_SEMAFOROS, index=None, placeholder="Todos")
+    country = col2.text_input("País (código)", max_chars=2).strip() or None
+    
+    # Cursores de las páginas visitadas (para volver atrás); se reinician
+    # al cambiar los filtros
+    filters = (semaforo, country)
+    if st.session_state.get("history_filters") != filters:
+        st.session_state.history_filters = filters
+        st.session_state.history_cursors = [None]
+    cursors = st.session_state.history_cursors
+    
+    try:
+        rows, next_cursor = load_history_page(user_id, semaforo, country, cursors[-1])
+    except ValueError:
+        # Cursor inválido (p. ej. tras un cambio de versión): volver al inicio
+        st.session_state.history_cursors = [None]
+        st.rerun()
+    
+    if not rows:
+        st.info("Aún no tienes análisis registrados." if len(cursors) == 1 and not any(filters)
+                else "No hay análisis con estos filtros.")
         return
-        
-    data = []
-    for job in jobs:
-        data.append({
-            "Fecha": job.created_at.strftime("%Y-%m-%d %H:%M"),
-            "Nombre": job.name_extracted,
-            "País": job.country_detected,
-            "Semáforo": job.semaforo,
-            "Score": job.score,
-            "ID": str(job.id)[:8] + "..."
-        })
-    
-    df = pd.DataFrame(data)
-    st.dataframe(df, use_container_width=True)
+    
+    df = pd.DataFrame(rows)
+    df["ID"] = df["id"].str[:8] + "..."
+    st.dataframe(df.drop(columns=["id"]), use_container_width=True, hide_index=True)
+    
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    if col_prev.button("⬅️ Anterior", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    col_page.caption(f"Página {len(cursors)}")
+    if col_next.button("Siguiente ➡️", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+    
+    # Detalle bajo demanda: solo se lee el resultado del job elegido
+    labels = {row["id"]: f"{row['Fecha']} · {row['Nombre'] or 'Sin nombre'}" for row in rows}
+    job_id = st.selectbox("Ver detalle", list(labels), index=None, format_func=labels.get, placeholder="Selecciona un análisis")
+    if job_id:
+        detail = load_job_detail(user_id, job_id)
+        if detail is None:
+            st.warning("El análisis ya no existe.")
+        else:
+            with st.expander("Resultado", expanded=True):
+                st.json(detail)
+
 
 def page_admin():
     st.markdown('<h1 class="main-header">📊 Dashboard Admin</h1>', unsafe_allow_html=True)
@@ -0,0 +1,33 @@
+"""
+Configuración compartida de los tests.
+
+Se carga antes que los módulos de test: el path del proyecto y las
+variables de entorno quedan listos antes de importar hades_api.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# El engine de la app no se conecta al importar; solo necesita una URL válida
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/hades_test.db")
+for var in ("KEYCLOAK_SERVER_URL", "KEYCLOAK_REALM", "KEYCLOAK_CLIENT_ID", "KEYCLOAK_CLIENT_SECRET"):
+    os.environ.setdefault(var, "test")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def db():
+    """Sesión sobre SQLite en memoria (en lugar de PostgreSQL) con todas las tablas"""
+    from hades_api.database import Base
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
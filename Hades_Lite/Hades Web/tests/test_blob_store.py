@@ -0,0 +1,48 @@
+"""
+Tests para el almacén de blobs (backend local).
+"""
+
+import os
+import time
+
+import pytest
+
+from hades_api.services.blob_store import (
+    BlobNotFound,
+    LocalBlobStore,
+    new_upload_key,
+    read_blob,
+)
+
+
+def test_put_read_delete(tmp_path):
+    """La imagen se guarda, se lee por bloques y se borra"""
+    store = LocalBlobStore(str(tmp_path))
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    key = store.put(new_upload_key("job-1"), data)
+
+    assert read_blob(store, key) == data
+
+    store.delete(key)
+    with pytest.raises(BlobNotFound):
+        read_blob(store, key)
+    store.delete(key)  # idempotente
+
+
+def test_rejects_keys_outside_root(tmp_path):
+    """Una clave no puede escapar del directorio del almacén"""
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+    with pytest.raises(ValueError):
+        store.put("../fuera", b"x")
+
+
+def test_delete_older_than(tmp_path):
+    """La limpieza solo borra blobs huérfanos antiguos"""
+    store = LocalBlobStore(str(tmp_path))
+    old = store.put("uploads/old/a", b"old")
+    new = store.put("uploads/new/b", b"new")
+    past = time.time() - 7200
+    os.utime(tmp_path / old, (past, past))
+
+    assert store.delete_older_than(3600) == 1
+    assert read_blob(store, new) == b"new"
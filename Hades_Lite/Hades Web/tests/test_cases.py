@@ -0,0 +1,57 @@
+"""
+Tests para la agregación de casos (POST /jobs/batch).
+Usa SQLite en memoria en lugar de PostgreSQL.
+"""
+
+from hades_api.models.case import Case, CaseStatus
+from hades_api.models.job import Job, JobStatus
+from hades_api.services.cases import aggregate_case, case_jobs, case_progress
+
+
+def _case(db, *jobs):
+    case = Case(user_id="analyst-1", status=CaseStatus.QUEUED, total_jobs=len(jobs))
+    db.add(case)
+    db.flush()
+    for status, semaforo, score in jobs:
+        db.add(Job(user_id="analyst-1", case_id=case.id, status=status, semaforo=semaforo, score=score))
+    db.commit()
+    return case
+
+
+def test_case_waits_for_all_documents(db):
+    """Mientras falte algún documento el caso sigue en proceso"""
+    case = _case(db, (JobStatus.COMPLETED, "verde", 1), (JobStatus.QUEUED, None, None))
+    jobs = case_jobs(db, case.id)
+
+    assert aggregate_case(case, jobs) is False
+    assert case.status == CaseStatus.PROCESSING
+    assert case_progress(case, jobs)["percent"] == 50
+
+
+def test_case_takes_worst_semaforo(db):
+    """El semáforo del caso es el peor de sus documentos"""
+    case = _case(
+        db,
+        (JobStatus.COMPLETED, "verde", 1),
+        (JobStatus.COMPLETED, "rojo", 8),
+        (JobStatus.COMPLETED, "amarillo", 4),
+    )
+
+    assert aggregate_case(case, case_jobs(db, case.id)) is True
+    assert case.status == CaseStatus.COMPLETED
+    assert case.semaforo == "rojo"
+    assert case.score == 8
+    assert len(case.summary["documents"]) == 3
+
+
+def test_case_partial_and_failed(db):
+    """Un documento fallido deja el caso parcial; todos fallidos, fallido"""
+    partial = _case(db, (JobStatus.COMPLETED, "amarillo", 3), (JobStatus.FAILED, None, None))
+    aggregate_case(partial, case_jobs(db, partial.id))
+    assert partial.status == CaseStatus.PARTIAL
+    assert partial.semaforo == "amarillo"
+
+    failed = _case(db, (JobStatus.FAILED, None, None))
+    aggregate_case(failed, case_jobs(db, failed.id))
+    assert failed.status == CaseStatus.FAILED
+    assert failed.semaforo is None
@@ -0,0 +1,58 @@
+"""
+Tests del detector de país/idioma de una pasada (hades_core/cues.py).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from hades_core.country import detect_country, detect_country_candidates
+from hades_core.cues import CueAutomaton, language_counts, month_language
+from hades_core.translation import detect_language
+from cue_detection import build_corpus, legacy_language_counts, legacy_month_language
+
+
+def test_best_country_wins_over_dict_order():
+    """'pasaporte' es de PH (primero en el dict) y de MX: decide la pista específica"""
+    text = "PASAPORTE\nESTADOS UNIDOS MEXICANOS\nCLAVE DEL PAÍS DE EXPEDICIÓN: MEX"
+    assert detect_country(text) == "MX"
+    candidates = detect_country_candidates(text)
+    assert candidates[0][0] == "MX"
+    assert dict(candidates)["PH"] < dict(candidates)["MX"]
+
+
+def test_country_cues_are_whole_words():
+    """'ine' no coincide dentro de 'online' ni 'usa' dentro de 'causa'"""
+    assert detect_country("apply online, por causa mayor") is None
+    assert detect_country("INE\nCREDENCIAL") == "MX"
+
+
+def test_no_cues():
+    assert detect_country("") is None
+    assert detect_country("12/03/2030") is None
+    assert detect_country_candidates("") == []
+
+
+def test_overlapping_cues_in_automaton():
+    """Las pistas que terminan dentro de otras (sufijos) también se reportan"""
+    automaton = CueAutomaton([
+        ("he", "k", "a", 1.0, False),
+        ("she", "k", "b", 1.0, False),
+        ("hers", "k", "c", 1.0, False),
+        ("his", "k", "d", 1.0, False),
+    ])
+    assert automaton.scan("ushers") == {"k": {"a": 1.0, "b": 1.0, "c": 1.0}}
+
+
+def test_language_unchanged():
+    assert detect_language("NOMBRE: Juan García, FECHA DE NACIMIENTO: 15/01/1990") == "es"
+    assert detect_language("NAME: John Doe, DATE OF BIRTH: 01/15/1990") == "en"
+    assert detect_language("NOME: João Silva, DATA DE NASCIMENTO: 15/01/1990") == "pt"
+    assert detect_language("xyz") == "es"
+    for text, _ in build_corpus(300, seed=5):
+        assert language_counts(text) == legacy_language_counts(text)
+        assert month_language(text) == legacy_month_language(text)
+    assert month_language("VENCE 12 DIC 2030") == "ES"
+    assert month_language("EXP DECEMBER 12 2030") == "EN"
@@ -0,0 +1,66 @@
+"""
+Tests del motor de fechas de una pasada (scan_dates / process_dates_by_type).
+La equivalencia con el motor anterior sobre un corpus grande se verifica con
+benchmarks/dates_engine.py.
+"""
+
+import os
+import sys
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from hades_core.dates.dates import DateType, process_dates_by_type, scan_dates
+from dates_engine import build_corpus, legacy_process_dates_by_type
+
+
+def _snapshot(result):
+    return {key: asdict(info) if info else None for key, info in result.items()}
+
+
+def test_overlapping_patterns_are_one_span():
+    """12-31-2030 coincide con NUM_A y DMY_H: un solo span con ambos patrones"""
+    spans, order = scan_dates("EXPIRES 12-31-2030")
+    assert len(spans) == 1
+    assert spans[0].text == "12-31-2030"
+    assert spans[0].patterns == ["num_a", "dmy_h"]
+    assert len(order) == 2
+
+
+def test_spans_do_not_cross_lines():
+    """Los patrones con espacios no unen fechas de líneas distintas"""
+    spans, _ = scan_dates("01 02\n2020 REF\r\n03 04 2021")
+    assert [(span.text, span.line) for span in spans] == [("03 04 2021", 2)]
+
+
+def test_classification_by_keyword_line():
+    text = (
+        "NOMBRE JUAN PEREZ\n"
+        "FECHA DE NACIMIENTO 12/03/1990\n"
+        "EMISION 2015 VIGENCIA 2025\n"
+        "FECHA DE EXPEDICION 01.02.2015\n"
+        "VENCE 15 de marzo de 2030\n"
+    )
+    result = process_dates_by_type(text, country_hint="MX")
+    assert result["birth"].original == "12/03/1990"
+    assert result["birth"].date_type == DateType.BIRTH
+    assert result["issue"].original == "01.02.2015"
+    assert result["expiration"].original == "15 de marzo de 2030"
+    assert result["expiration"].date_type == DateType.EXPIRATION
+
+
+def test_same_date_for_two_types_are_independent_objects():
+    """Un mismo span analizado una vez no comparte DateInfo entre tipos"""
+    result = process_dates_by_type("EXPIRES 12-31-2030 ISSUED", country_hint="US")
+    assert result["expiration"].original == result["issue"].original == "12-31-2030"
+    assert result["expiration"] is not result["issue"]
+    result["issue"].warnings.append("x")
+    assert result["expiration"].warnings == []
+
+
+def test_matches_legacy_engine_on_corpus():
+    for text, country in build_corpus(500, seed=11):
+        assert _snapshot(process_dates_by_type(text, country)) == _snapshot(
+            legacy_process_dates_by_type(text, country)
+        ), text
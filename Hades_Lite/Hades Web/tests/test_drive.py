@@ -0,0 +1,73 @@
+"""
+Tests para la caché de carpetas y la clasificación de errores de Drive.
+No llama a Google Drive: usa un servicio simulado.
+"""
+
+import json
+
+import pytest
+
+from hades_api.services import drive
+
+pytestmark = pytest.mark.skipif(not drive.GOOGLE_AVAILABLE, reason="google-api-python-client no instalado")
+
+
+class _Request:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class _Files:
+    """files() de Drive: registra las llamadas a list/create"""
+
+    def __init__(self):
+        self.calls = []
+
+    def list(self, **kwargs):
+        self.calls.append("list")
+        return _Request({"files": []})
+
+    def create(self, **kwargs):
+        self.calls.append("create")
+        return _Request({"id": "folder-1"})
+
+
+class _Service:
+    def __init__(self):
+        self._files = _Files()
+
+    def files(self):
+        return self._files
+
+
+def _http_error(status, reason=None):
+    import httplib2
+    content = {"error": {"code": status, "errors": [{"reason": reason}] if reason else []}}
+    return drive.HttpError(httplib2.Response({"status": status}), json.dumps(content).encode())
+
+
+def test_folder_id_is_cached():
+    """La segunda exportación del día no vuelve a listar carpetas"""
+    drive._folder_cache.clear()
+    service = _Service()
+
+    assert drive._get_or_create_folder(service, "2026-01-01", "root") == "folder-1"
+    assert drive._get_or_create_folder(service, "2026-01-01", "root") == "folder-1"
+    assert service.files().calls == ["list", "create"]
+
+    drive._forget_folder("2026-01-01", "root")
+    drive._get_or_create_folder(service, "2026-01-01", "root")
+    assert service.files().calls == ["list", "create", "list", "create"]
+
+
+def test_retryable_errors():
+    """Cuota y errores 5xx se reintentan; permisos y 404 no"""
+    assert drive.is_retryable_error(_http_error(429))
+    assert drive.is_retryable_error(_http_error(503))
+    assert drive.is_retryable_error(_http_error(403, "userRateLimitExceeded"))
+    assert not drive.is_retryable_error(_http_error(403, "insufficientPermissions"))
+    assert not drive.is_retryable_error(_http_error(404))
+    assert not drive.is_retryable_error(ValueError("x"))
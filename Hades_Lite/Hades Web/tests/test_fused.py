@@ -0,0 +1,92 @@
+"""
+Tests para el modo de análisis fusionado (una llamada a Gemini).
+Gemini se simula: se verifica el post-proceso determinista del JSON.
+"""
+
+import io
+import json
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+import hades_core.fused as fused
+from hades_core.gemini import registry
+from hades_core import analyzer
+from hades_core.analyzer import analyze_image
+
+
+FUSED_RESPONSE = {
+    "transcription": "DRIVER LICENSE CALIFORNIA\nNAME JOHN DOE\nEXPIRATION DATE 01/15/2030",
+    "language": "en",
+    "translation_es": "LICENCIA DE CONDUCIR CALIFORNIA\nNOMBRE JOHN DOE\nFECHA DE VENCIMIENTO 01/15/2030",
+    "forensics": {
+        "manipulation_detected": False,
+        "findings": ["Holograma visible"],
+        "analysis": "Documento auténtico, impresión profesional",
+    },
+}
+
+
+class _FakeResponse:
+    text = json.dumps(FUSED_RESPONSE)
+
+    class usage_metadata:
+        prompt_token_count = 900
+        candidates_token_count = 150
+        total_token_count = 1050
+
+
+def _image_bytes():
+    bio = io.BytesIO()
+    Image.new("RGB", (20, 20)).save(bio, format="PNG")
+    return bio.getvalue()
+
+
+def test_fused_mode_single_call():
+    """Una sola llamada produce OCR, traducción y forense"""
+    model = mock.MagicMock()
+    model.generate_content.return_value = _FakeResponse()
+
+    registry.clear()  # Sin modelos cacheados de otros tests
+    with mock.patch.object(fused.genai, "GenerativeModel", return_value=model):
+        result = analyze_image(_image_bytes(), gemini_api_key="test", config={"mode": "fused"})
+    registry.clear()
+
+    assert model.generate_content.call_count == 1
+    assert result.metadata["mode"] == "fused"
+    assert result.metadata["ocr"]["total_tokens"] == 1050
+    assert result.ocr_text.startswith("DRIVER LICENSE")
+    assert result.was_translated
+    assert result.language_detected == "en"
+    assert result.semaforo.value == "verde"
+    assert "Hallazgo: Holograma visible" in result.forensic_result.details
+    assert result.dates["expiration"].display == "01/15/2030"
+
+
+def test_fused_failure_falls_back_to_multi():
+    """Si la llamada fusionada falla, OCR, visión y traducción corren por separado"""
+    model = mock.MagicMock()
+    model.generate_content.side_effect = RuntimeError("cuota agotada")
+    ocr = mock.MagicMock(return_value=(FUSED_RESPONSE["transcription"], {"total_tokens": 500}))
+    vision = mock.MagicMock(return_value=(0, [], "Documento auténtico"))
+    translation = mock.MagicMock(return_value=(FUSED_RESPONSE["translation_es"], {"translated": True}))
+
+    registry.clear()
+    with mock.patch.object(fused.genai, "GenerativeModel", return_value=model), \
+            mock.patch.object(analyzer, "extract_text_from_image", ocr), \
+            mock.patch.object(analyzer, "gemini_vision_forensic_analysis", vision), \
+            mock.patch.object(analyzer, "translate_to_spanish", translation):
+        result = analyze_image(_image_bytes(), gemini_api_key="test", config={"mode": "fused"})
+    registry.clear()
+
+    assert ocr.call_count == vision.call_count == translation.call_count == 1
+    assert result.metadata["mode"] == "multi"
+    assert result.metadata["fallback"] == {"from": "fused", "to": "multi", "reason": "cuota agotada"}
+    assert not result.metadata["partial"]
+    assert result.ocr_text.startswith("DRIVER LICENSE")
+    assert result.was_translated
+    assert result.dates["expiration"].display == "01/15/2030"
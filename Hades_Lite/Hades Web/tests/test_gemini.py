@@ -0,0 +1,145 @@
+"""
+Tests para los clientes de Gemini por key y el reparto de cuota.
+No llaman a la API: se usan reloj y buckets locales simulados.
+"""
+
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from hades_core import gemini
+from hades_core.gemini import GeminiRegistry, KeyPool, LocalBuckets, QuotaExceeded
+
+
+class FakeClock:
+    """Reloj manual; `sleep` avanza el tiempo"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _pool(keys, clock, **kwargs):
+    return KeyPool(keys, buckets=LocalBuckets(clock=clock), sleep=clock.sleep, **kwargs)
+
+
+def test_registry_caches_model_per_key():
+    """Un cliente por key y un modelo por (key, modelo); nunca genai.configure"""
+    registry = GeminiRegistry()
+    with mock.patch.object(gemini.genai, "configure") as configure:
+        a = registry.model("gemini-2.5-flash", "key-a")
+        assert registry.model("gemini-2.5-flash", "key-a") is a
+        b = registry.model("gemini-2.5-flash", "key-b")
+    assert b is not a
+    assert a._client is registry.client("key-a")
+    assert b._client is not a._client
+    configure.assert_not_called()
+
+
+def test_local_buckets_refill():
+    """Se descuentan todos los buckets o ninguno; la espera es la del más lento"""
+    clock = FakeClock()
+    buckets = LocalBuckets(clock=clock)
+    rpm = ("rpm", 2.0, 2 / 60, 1.0)
+
+    assert buckets.take([rpm]) == 0
+    assert buckets.take([rpm]) == 0
+    assert buckets.take([rpm]) == pytest.approx(30.0)
+
+    # Un bucket sin saldo bloquea también al otro
+    tpm = ("tpm", 100.0, 100 / 60, 10.0)
+    assert buckets.take([rpm, tpm]) > 0
+    clock.now += 30
+    assert buckets.take([rpm, tpm]) == 0
+    assert buckets._state["tpm"][0] == pytest.approx(90.0)
+
+
+def test_pool_spreads_across_keys():
+    """Con RPM agotado en una key se usa la siguiente antes de esperar"""
+    clock = FakeClock()
+    pool = _pool(["k1", "k2"], clock, rpm=1)
+
+    assert {pool.acquire(), pool.acquire()} == {"k1", "k2"}
+    assert clock.sleeps == []
+
+    # Ambas agotadas: espera lo que tarda en recargarse una
+    assert pool.acquire() in ("k1", "k2")
+    assert clock.sleeps == [pytest.approx(60.0)]
+
+
+def test_pool_foreign_key_and_quota_exceeded():
+    """La key de un usuario no consume cuota del pool; sin cuota a tiempo falla"""
+    clock = FakeClock()
+    pool = _pool(["k1"], clock, rpm=1, max_wait=0)
+
+    assert pool.acquire(api_key="user-key") == "user-key"
+    assert pool.acquire(api_key="k1") == "k1"
+    with pytest.raises(QuotaExceeded):
+        pool.acquire()
+    with pytest.raises(QuotaExceeded):
+        pool.acquire(api_key="user-key")
+
+
+def test_settle_adjusts_tokens():
+    """Los tokens reales reemplazan a la estimación en el bucket TPM"""
+    clock = FakeClock()
+    pool = _pool(["k1"], clock, tpm=1000)
+
+    pool.acquire(estimated_tokens=400)
+    pool.settle("k1", 400, 900)
+    name = f"hades:gemini:quota:{gemini.key_id('k1')}:tpm"
+    assert pool.buckets._state[name][0] == pytest.approx(100.0)
+
+    # La siguiente llamada de 400 tokens espera a la recarga
+    pool.max_wait = 0
+    with pytest.raises(QuotaExceeded):
+        pool.acquire(estimated_tokens=400)
+
+
+def test_shared_buckets_recover_after_outage():
+    """Con Redis caído se usan buckets locales y se reintenta tras `retry_after`"""
+    clock = FakeClock()
+
+    class FlakyBuckets(LocalBuckets):
+        down = True
+        calls = 0
+
+        def take(self, buckets, force=False):
+            self.calls += 1
+            if self.down:
+                raise ConnectionError("redis caído")
+            return super().take(buckets, force=force)
+
+    shared = FlakyBuckets(clock=clock)
+    pool = KeyPool(["k1"], rpm=100, buckets=shared, sleep=clock.sleep, retry_after=30)
+    with mock.patch.object(gemini.time, "monotonic", clock):
+        assert pool.acquire() == "k1"
+        assert pool.acquire() == "k1"
+        assert shared.calls == 1  # Durante la espera no se insiste con Redis
+
+        shared.down = False
+        clock.now += 30
+        pool.acquire()
+        pool.acquire()
+        assert shared.calls == 3
+    assert pool.buckets is shared
+
+
+def test_env_keys_merge():
+    """GEMINI_API_KEYS y GEMINI_API_KEY forman un solo pool"""
+    env = {"GEMINI_API_KEYS": "a, b", "GEMINI_API_KEY": "b"}
+    with mock.patch.dict(os.environ, env):
+        assert gemini.env_api_keys() == ["a", "b"]
+        assert gemini.default_api_key() == "a"
+        assert gemini.default_api_key("c") == "c"
@@ -0,0 +1,76 @@
+"""
+Regresión del corpus dorado (benchmarks/golden) con respuestas grabadas de
+Gemini: sin red ni API key. Falla si la precisión por campo cae respecto a
+benchmarks/golden_baseline.json.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parent.parent / "benchmarks"
+sys.path.insert(0, str(BENCHMARKS.parent))
+sys.path.insert(0, str(BENCHMARKS))
+
+from golden_corpus import call_kind, compare_reports, run_corpus
+from hades_core.forensics import FORENSIC_PROMPT
+from hades_core.ocr import OCR_PROMPT
+
+
+def test_call_kind_by_prompt():
+    assert call_kind([OCR_PROMPT, object()]) == "ocr"
+    assert call_kind([{"mime_type": "image/png", "data": b""}, {"text": FORENSIC_PROMPT}]) == "vision"
+    assert call_kind("\nTraduce el siguiente texto de un documento...") == "translation"
+    assert call_kind(["otro prompt"]) is None
+
+
+def test_golden_corpus_has_no_regressions():
+    report = run_corpus(BENCHMARKS / "golden", repeat=2)
+    summary = report["summary"]
+
+    # Todas las llamadas a Gemini tienen respuesta grabada
+    assert summary["partial_results"] == 0
+    assert all(row["gemini_calls"] and None not in row["gemini_calls"] for row in report["rows"])
+    assert summary["deterministic"]["docs_per_sec"] > 0
+    assert set(summary["deterministic"]["stage_us_per_doc"]) == {"country", "dates", "extraction", "forensics"}
+
+    with open(BENCHMARKS / "golden_baseline.json", encoding="utf-8") as f:
+        baseline = json.load(f)["summary"]
+    assert compare_reports(summary, baseline) == []
+
+
+def test_report_is_json_serializable():
+    report = run_corpus(BENCHMARKS / "golden", repeat=1)
+    json.dumps(report, default=str)
+
+
+def test_split_analysis_matches_single_call():
+    """OCR y resto del análisis en dos tareas (worker) = una sola llamada"""
+    from golden_corpus import ReplayGemini, image_bytes_for, load_corpus
+    from hades_core.analyzer import analyze_image, run_ocr_stages
+
+    def comparable(result):
+        data = result.to_dict()
+        # Tiempos aparte; "image" solo lista las versiones generadas en cada tarea
+        data["metadata"] = {k: v for k, v in data["metadata"].items()
+                            if k not in ("stages", "pipeline_ms", "analysis_timestamp", "image")}
+        return data
+
+    replay = ReplayGemini()
+    replay.install()
+    try:
+        for entry in load_corpus(BENCHMARKS / "golden"):
+            image = image_bytes_for(entry)
+            replay.load(entry)
+            single = analyze_image(image, gemini_api_key="replay")
+
+            replay.load(entry)
+            # Entre tareas el resultado parcial viaja como JSON por el broker
+            partial = json.loads(json.dumps(run_ocr_stages(image, gemini_api_key="replay")))
+            assert "vision" not in replay.calls
+            split = analyze_image(image, gemini_api_key="replay", partial=partial)
+
+            assert comparable(split) == comparable(single)
+            assert set(split.metadata["stages"]) == set(single.metadata["stages"])
+    finally:
+        replay.uninstall()
@@ -0,0 +1,54 @@
+"""
+Tests para los eventos de estado de jobs y la proyección de estado.
+Usa SQLite en memoria en lugar de PostgreSQL.
+"""
+
+import json
+
+from sqlalchemy import inspect
+
+from hades_api.models.job import Job, JobStatus
+from hades_api.services import job_events
+from hades_api.services.job_events import job_event, sse_message, status_query
+
+
+def test_status_query_skips_result(db):
+    """La proyección de estado no carga la columna `result`"""
+    job = Job(user_id="analyst-1", status=JobStatus.COMPLETED, semaforo="verde", result={"ocr_text": "x" * 1000})
+    db.add(job)
+    db.commit()
+    job_id = job.id
+    db.expunge_all()
+
+    loaded = status_query(db).filter(Job.id == job_id).one()
+    assert "result" in inspect(loaded).unloaded
+    assert loaded.semaforo == "verde"
+
+
+def test_job_event_final_flag():
+    """Completado o fallido es final, salvo que el worker indique reintento"""
+    job = Job(user_id="analyst-1", status=JobStatus.PROCESSING)
+    assert job_event(job)["final"] is False
+
+    job.status = JobStatus.COMPLETED
+    assert job_event(job)["final"] is True
+
+    job.status = JobStatus.FAILED
+    assert job_event(job, final=False)["final"] is False
+
+
+def test_sse_message_format():
+    """Formato text/event-stream: evento, datos JSON y línea en blanco"""
+    message = sse_message({"status": "completed"})
+    assert message.startswith("event: status\ndata: ")
+    assert message.endswith("\n\n")
+    assert json.loads(message.split("data: ", 1)[1]) == {"status": "completed"}
+
+
+def test_publish_without_redis_does_not_raise(monkeypatch):
+    """Publicar es best-effort: sin Redis el job sigue su curso"""
+    monkeypatch.setattr(job_events.settings, "REDIS_URL", "redis://127.0.0.1:1/0")
+    monkeypatch.setattr(job_events, "_client", None)
+
+    job = Job(user_id="analyst-1", status=JobStatus.COMPLETED)
+    assert job_events.publish_job(job) is False
@@ -0,0 +1,94 @@
+"""
+Tests para el almacenamiento del resultado (JSONB + textos separados).
+Usa SQLite en memoria en lugar de PostgreSQL.
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+from hades_api.models.job import Job, JobResultText, JobStatus
+from hades_api.services.job_results import (
+    full_result,
+    list_select,
+    result_filter,
+    split_result,
+    store_result,
+)
+
+
+def _result():
+    """Mismo formato que AnalysisResult.to_dict()"""
+    return {
+        "ocr_text": "INSTITUTO NACIONAL ELECTORAL\nNOMBRE JUAN PEREZ " * 50,
+        "ocr_text_translated": "NATIONAL ELECTORAL INSTITUTE\nNAME JUAN PEREZ " * 50,
+        "language_detected": "es",
+        "was_translated": True,
+        "country": {"code": "MX", "name": "México"},
+        "dates": {"expiration": {"display": "31/12/2020", "is_expired": True}},
+        "extracted_data": {"name": "JUAN PEREZ", "id_number": "123", "id_type": "INE"},
+        "forensics": {"score": 2, "semaforo": "verde", "visual_analysis": "Hologramas presentes. " * 40},
+        "semaforo": "verde",
+        "score": 2,
+        "warnings": [],
+        "metadata": {},
+    }
+
+
+def test_split_keeps_structured_fields():
+    """Los textos largos salen del JSON; el resultado original no se modifica"""
+    result = _result()
+    slim, texts = split_result(result)
+
+    assert set(texts) == {"ocr_text", "ocr_text_translated", "visual_analysis"}
+    assert "ocr_text" not in slim and "visual_analysis" not in slim["forensics"]
+    assert slim["forensics"]["score"] == 2
+    assert slim["extracted_data"]["id_type"] == "INE"
+    assert result == _result()
+
+    # Sin análisis forense no hay nada que separar en forensics
+    slim, texts = split_result({**_result(), "forensics": None})
+    assert slim["forensics"] is None and "visual_analysis" not in texts
+
+
+def test_store_and_full_result_round_trip(db):
+    """El resultado completo se reconstruye igual que se guardó"""
+    job = Job(user_id="analyst-1", status=JobStatus.COMPLETED)
+    db.add(job)
+    store_result(job, _result())
+    db.commit()
+    job_id = job.id
+    db.expunge_all()
+
+    job = db.query(Job).filter(Job.id == job_id).one()
+    assert "ocr_text" not in job.result
+    assert full_result(job) == _result()
+    assert list(full_result(job))[:2] == ["ocr_text", "ocr_text_translated"]
+
+    # Reescribir reutiliza la fila de textos
+    store_result(job, {**_result(), "ocr_text": "OTRO"})
+    db.commit()
+    assert db.query(JobResultText).count() == 1
+    assert full_result(job)["ocr_text"] == "OTRO"
+
+
+def test_list_select_skips_result(db):
+    """Las listas no cargan `result`"""
+    job = Job(user_id="analyst-1", status=JobStatus.COMPLETED)
+    db.add(job)
+    store_result(job, _result())
+    db.commit()
+    db.expunge_all()
+
+    listed = db.execute(list_select()).scalars().one()
+    assert "result" in inspect(listed).unloaded
+    assert "country_detected" not in inspect(listed).unloaded
+    assert "score" not in inspect(listed).unloaded
+
+
+def test_admin_filters_use_jsonb_containment():
+    """Los filtros del panel usan `@>` (índice GIN ix_jobs_result_gin)"""
+    id_type, expired = result_filter(id_type="INE", expired=True)
+    sql = str(id_type.compile(dialect=postgresql.dialect()))
+    assert "@>" in sql
+    assert expired.right.value == {"dates": {"expiration": {"is_expired": True}}}
+    assert result_filter() == []
@@ -0,0 +1,88 @@
+"""
+Tests para la paginación por cursor (keyset) de las listas de jobs.
+Usa SQLite en memoria en lugar de PostgreSQL.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from hades_api.database import ASYNC_DB_AVAILABLE, Base, async_database_url
+from hades_api.models.job import Job, JobStatus
+from hades_api.services.job_results import list_select
+from hades_api.services.pagination import decode_cursor, encode_cursor, fetch_page, keyset_page, split_page
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path}/pagination.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2026, 1, 1)
+    for i in range(25):
+        # Pares con el mismo created_at: el id desempata
+        session.add(Job(user_id="analyst-1", status=JobStatus.COMPLETED, created_at=start + timedelta(minutes=i // 2)))
+    session.add(Job(user_id="analyst-2", status=JobStatus.COMPLETED, created_at=start))
+    session.commit()
+    session.close()
+    engine.dispose()
+    return url
+
+
+def _all_pages(db, limit):
+    pages, cursor = [], None
+    while True:
+        stmt = keyset_page(list_select().where(Job.user_id == "analyst-1"), cursor, limit)
+        page, cursor = split_page(db.execute(stmt).scalars().all(), limit)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    """El cursor es opaco pero conserva (created_at, id)"""
+    job = Job(id=uuid.uuid4(), created_at=datetime(2026, 3, 4, 5, 6, 7, 891011))
+    assert decode_cursor(encode_cursor(job)) == (job.created_at, job.id)
+    with pytest.raises(ValueError):
+        decode_cursor("no-es-un-cursor")
+
+
+def test_pages_cover_every_job_once(db_url):
+    """Las páginas no repiten ni saltan jobs, aunque compartan created_at"""
+    engine = create_engine(db_url)
+    db = sessionmaker(bind=engine)()
+
+    pages = _all_pages(db, limit=10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+
+    listed = [job.id for page in pages for job in page]
+    expected = db.execute(
+        select(Job.id).where(Job.user_id == "analyst-1").order_by(Job.created_at.desc(), Job.id.desc())
+    ).scalars().all()
+    assert listed == expected
+    db.close()
+
+
+@pytest.mark.skipif(not ASYNC_DB_AVAILABLE, reason="Requiere sqlalchemy[asyncio]")
+def test_fetch_page_with_async_session(db_url):
+    """Las rutas paginan con la sesión asíncrona"""
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    async def run():
+        engine = create_async_engine(async_database_url(db_url))
+        async with AsyncSession(engine) as db:
+            stmt = list_select().where(Job.user_id == "analyst-1")
+            first, cursor = await fetch_page(db, stmt, None, 20)
+            rest, end = await fetch_page(db, stmt, cursor, 20)
+        await engine.dispose()
+        return first, rest, end
+
+    first, rest, end = asyncio.run(run())
+    assert (len(first), len(rest), end) == (20, 5, None)
+    assert first[-1].created_at >= rest[0].created_at
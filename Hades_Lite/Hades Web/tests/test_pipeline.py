@@ -0,0 +1,93 @@
+"""
+Tests para el ejecutor de etapas (DAG) del análisis.
+Verifica paralelismo, dependencias y resultados parciales por timeout.
+"""
+
+import io
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from hades_core import analyzer
+from hades_core.pipeline import Stage, run_stages
+
+
+def _sleep_then(value, seconds):
+    def fn(done):
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+def test_independent_stages_run_in_parallel():
+    """OCR y visión corren a la vez: latencia ≈ max, no la suma"""
+    stages = [
+        Stage("ocr", _sleep_then("texto", 0.3)),
+        Stage("vision", _sleep_then("visual", 0.3)),
+    ]
+    start = time.perf_counter()
+    outcomes = run_stages(stages)
+    elapsed = time.perf_counter() - start
+
+    assert outcomes["ocr"].value == "texto"
+    assert outcomes["vision"].value == "visual"
+    assert elapsed < 0.5
+
+
+def test_dependencies_receive_results():
+    """Una etapa ve los valores de sus dependencias"""
+    stages = [
+        Stage("ocr", lambda done: "hola"),
+        Stage("upper", lambda done: done["ocr"].upper(), deps=["ocr"]),
+    ]
+    outcomes = run_stages(stages)
+
+    assert outcomes["upper"].ok
+    assert outcomes["upper"].value == "HOLA"
+
+
+def test_timeout_gives_partial_result():
+    """Una etapa lenta se marca timeout y las dependientes siguen"""
+    stages = [
+        Stage("ocr", lambda done: "texto"),
+        Stage("vision", _sleep_then("visual", 1.0), timeout=0.1),
+        Stage("forensics", lambda done: done.get("vision", "sin visual"), deps=["ocr", "vision"]),
+    ]
+    start = time.perf_counter()
+    outcomes = run_stages(stages)
+
+    assert time.perf_counter() - start < 0.5
+    assert outcomes["vision"].status == "timeout"
+    assert outcomes["forensics"].value == "sin visual"
+
+
+def test_stage_error_is_captured():
+    """Una excepción no aborta el resto del análisis"""
+    def boom(done):
+        raise RuntimeError("fallo OCR")
+
+    outcomes = run_stages([
+        Stage("ocr", boom),
+        Stage("dates", lambda done: done.get("ocr"), deps=["ocr"]),
+    ])
+
+    assert outcomes["ocr"].status == "error"
+    assert "fallo OCR" in outcomes["ocr"].error
+    assert outcomes["dates"].ok and outcomes["dates"].value is None
+
+
+def test_failed_ocr_stages_are_reported():
+    """Un error de Gemini queda en el estado de la etapa, no como excepción"""
+    bio = io.BytesIO()
+    Image.new("RGB", (20, 20)).save(bio, format="PNG")
+
+    with mock.patch.object(analyzer, "extract_text_from_image", side_effect=RuntimeError("cuota")):
+        partial = analyzer.run_ocr_stages(bio.getvalue(), gemini_api_key="test")
+
+    assert analyzer.failed_stages(partial["stages"]) == {"ocr": "cuota"}
+    assert analyzer.failed_stages(partial["stages"], ("translation",)) == {}
@@ -0,0 +1,88 @@
+"""
+Tests para el pre-procesamiento de imágenes antes de Gemini Vision.
+"""
+
+import io
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+from hades_core import analyzer
+from hades_core.preprocess import prepare_image, DEFAULT_TARGETS
+
+
+def _photo(size=(4000, 3000), exif_orientation=None):
+    """Foto simulada: documento claro sobre fondo oscuro"""
+    image = Image.new("RGB", size, (60, 50, 40))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([800, 700, 3200, 2300], fill=(235, 235, 240))
+    draw.text((900, 800), "DRIVER LICENSE 01/15/2030", fill=(0, 0, 0))
+    bio = io.BytesIO()
+    exif = Image.Exif()
+    if exif_orientation:
+        exif[0x0112] = exif_orientation
+    image.save(bio, format="JPEG", quality=95, exif=exif)
+    return bio.getvalue()
+
+
+def test_crop_is_opt_in():
+    """Sin pedirlo no se recorta; el recorte aplicado queda en stats()"""
+    plain = prepare_image(_photo())
+    assert not plain.cropped
+    assert plain.image.size == (4000, 3000)
+    assert plain.stats()["crop_box"] is None
+
+    prepared = prepare_image(_photo(), crop=True)
+    assert prepared.stats()["cropped"]
+    assert prepared.stats()["crop_box"] == list(prepared.crop_box)
+
+
+def test_crop_and_downscale():
+    """Se recorta al documento y cada etapa recibe su resolución"""
+    prepared = prepare_image(_photo(), crop=True)
+    assert prepared.cropped
+    assert prepared.image.size[0] < 2600
+
+    ocr_bytes, mime = prepared.for_stage("ocr")
+    forensic_bytes, _ = prepared.for_stage("forensics")
+    assert mime == "image/jpeg"
+    assert max(Image.open(io.BytesIO(ocr_bytes)).size) <= DEFAULT_TARGETS["ocr"]
+    assert max(Image.open(io.BytesIO(forensic_bytes)).size) <= DEFAULT_TARGETS["forensics"]
+
+
+def test_renditions_are_cached():
+    """La misma versión se genera una sola vez"""
+    prepared = prepare_image(_photo())
+    first, _ = prepared.for_stage("ocr")
+    second, _ = prepared.for_stage("ocr")
+    assert first is second
+
+
+def test_exif_rotation_and_ela_copy():
+    """Orientación EXIF corregida; la copia ELA no re-comprime con pérdida"""
+    plain = prepare_image(_photo(), crop=False)
+    assert plain.ela_copy() == (plain.original_bytes, "image/jpeg")
+
+    rotated = prepare_image(_photo(exif_orientation=6), crop=False)
+    assert rotated.rotated
+    assert rotated.image.size == (3000, 4000)
+    assert rotated.ela_copy()[1] == "image/png"
+
+
+def test_forensics_stage_gets_lossless_copy_by_default():
+    """El análisis visual recibe los bytes originales, no un JPEG re-comprimido"""
+    photo = _photo()
+    vision = mock.MagicMock(return_value=(0, [], ""))
+    with mock.patch.object(analyzer, "GEMINI_AVAILABLE", True), \
+            mock.patch.object(analyzer, "extract_text_from_image", return_value=("", {})), \
+            mock.patch.object(analyzer, "gemini_vision_forensic_analysis", vision):
+        analyzer.analyze_image(photo, gemini_api_key="test")
+        assert vision.call_args.args[0] == photo
+        assert vision.call_args.kwargs["mime_type"] == "image/jpeg"
+
+        analyzer.analyze_image(photo, gemini_api_key="test", config={"forensics_lossless": False})
+        assert vision.call_args.args[0] != photo
@@ -0,0 +1,157 @@
+"""
+Tests para el caché de resultados por contenido de imagen.
+Usa SQLite en memoria en lugar de PostgreSQL.
+"""
+
+import io
+
+from PIL import Image, ImageDraw
+
+from hades_api.config import settings
+from hades_api.models.job import Job, JobStatus
+from hades_api.services.result_cache import (
+    analysis_version,
+    apply_cached_result,
+    cache_stats,
+    content_hash,
+    find_cached_job,
+    hamming_distance,
+    perceptual_hash,
+)
+
+
+def _document(size=(1600, 1000), quality=95):
+    """Documento simulado; `size` reescala la misma imagen"""
+    image = Image.new("RGB", (1600, 1000), (230, 230, 235))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([100, 100, 500, 600], fill=(90, 70, 60))
+    for row in range(8):
+        draw.rectangle([600, 150 + row * 90, 1400 - row * 60, 190 + row * 90], fill=(40, 40, 40))
+    image = image.resize(size)
+    bio = io.BytesIO()
+    image.save(bio, format="JPEG", quality=quality)
+    return bio.getvalue()
+
+
+def _card(id_number, name="JUAN PEREZ LOPEZ", validity="2020-2030"):
+    """Credencial de una misma plantilla; solo cambian los campos"""
+    image = Image.new("RGB", (1600, 1000), (230, 230, 235))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, 1600, 120], fill=(150, 30, 60))
+    draw.rectangle([100, 200, 500, 700], fill=(90, 70, 60))
+    for label, value, y in (("NOMBRE", name, 220), ("CLAVE", id_number, 380), ("VIGENCIA", validity, 540)):
+        draw.text((600, y), label, fill=(80, 80, 80))
+        draw.text((600, y + 40), value, fill=(20, 20, 20))
+    bio = io.BytesIO()
+    image.save(bio, format="JPEG", quality=90)
+    return bio.getvalue()
+
+
+def _completed_job(db, image_bytes, version, user_id="analyst-1", metadata=None):
+    job = Job(
+        user_id=user_id,
+        status=JobStatus.COMPLETED,
+        result={"semaforo": "verde", "metadata": metadata or {}},
+        semaforo="verde",
+        content_hash=content_hash(image_bytes),
+        perceptual_hash=perceptual_hash(image_bytes),
+        analysis_version=version
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_perceptual_hash_survives_recompression():
+    """Recomprimir y reescalar apenas cambia el dHash"""
+    original = perceptual_hash(_document())
+    recompressed = perceptual_hash(_document(size=(800, 500), quality=60))
+    assert content_hash(_document()) != content_hash(_document(quality=60))
+    assert hamming_distance(original, recompressed) <= 6
+
+
+def test_exact_and_near_duplicate_hits(db, monkeypatch):
+    """Mismo SHA-256 o, si está habilitado, dHash cercano reutilizan el job"""
+    version = analysis_version("multi")
+    source = _completed_job(db, _document(), version)
+
+    exact = _document()
+    assert find_cached_job(db, "analyst-1", content_hash(exact), perceptual_hash(exact), version).id == source.id
+
+    # Por defecto solo el duplicado exacto
+    near = _document(size=(800, 500), quality=60)
+    assert find_cached_job(db, "analyst-1", content_hash(near), perceptual_hash(near), version) is None
+
+    monkeypatch.setattr(settings, "DEDUPE_PHASH_MAX_DISTANCE", 6)
+    assert find_cached_job(db, "analyst-1", content_hash(near), perceptual_hash(near), version).id == source.id
+
+    # Otra imagen no reutiliza
+    other = io.BytesIO()
+    Image.new("RGB", (1600, 1000), (20, 60, 120)).save(other, format="JPEG")
+    other = other.getvalue()
+    assert find_cached_job(db, "analyst-1", content_hash(other), perceptual_hash(other), version) is None
+
+    # Otra versión del motor no reutiliza
+    assert find_cached_job(db, "analyst-1", content_hash(exact), perceptual_hash(exact), analysis_version("fused")) is None
+
+
+def test_same_template_documents_are_not_reused(db):
+    """Documentos de la misma plantilla con otros datos no comparten resultado"""
+    version = analysis_version("multi")
+    source = _completed_job(db, _card("PELJ800101HDFRRN09"), version)
+
+    variants = [
+        _card("GOMA910202MDFRRL04"),                      # Otro número
+        _card("PELJ800101HDFRRN09", name="ANA RUIZ MORALES"),  # Otra persona, mismo largo
+        _card("PELJ800101HDFRRN09", validity="2024-2034"),  # Otras fechas
+    ]
+    for card in variants:
+        # Con la misma plantilla el dHash apenas cambia: solo el SHA-256 los distingue
+        assert hamming_distance(source.perceptual_hash, perceptual_hash(card)) <= 6
+        assert find_cached_job(db, "analyst-1", content_hash(card), perceptual_hash(card), version) is None
+
+
+def test_other_users_share_exact_duplicates_only(db, monkeypatch):
+    """La misma imagen de otro analista se reutiliza; un casi-duplicado no"""
+    monkeypatch.setattr(settings, "DEDUPE_PHASH_MAX_DISTANCE", 6)
+    version = analysis_version("multi")
+    source = _completed_job(db, _document(), version, user_id="analyst-1")
+
+    exact = _document()
+    assert find_cached_job(db, "analyst-2", content_hash(exact), perceptual_hash(exact), version).id == source.id
+
+    near = _document(size=(800, 500), quality=60)
+    assert find_cached_job(db, "analyst-2", content_hash(near), perceptual_hash(near), version) is None
+    assert find_cached_job(db, "analyst-1", content_hash(near), perceptual_hash(near), version).id == source.id
+
+
+def test_partial_results_are_not_reused(db, monkeypatch):
+    """Un job con alguna etapa de Gemini fallida no se reutiliza"""
+    monkeypatch.setattr(settings, "DEDUPE_PHASH_MAX_DISTANCE", 6)
+    version = analysis_version("multi")
+    _completed_job(db, _document(), version, metadata={"partial": True})
+
+    exact = _document()
+    near = _document(size=(800, 500), quality=60)
+    assert find_cached_job(db, "analyst-1", content_hash(exact), perceptual_hash(exact), version) is None
+    assert find_cached_job(db, "analyst-1", content_hash(near), perceptual_hash(near), version) is None
+
+    source = _completed_job(db, _document(), version, metadata={"partial": False})
+    assert find_cached_job(db, "analyst-1", content_hash(exact), perceptual_hash(exact), version).id == source.id
+
+
+def test_apply_cached_result_counts_as_hit(db):
+    """El job nuevo queda completado y cuenta en la tasa de aciertos"""
+    version = analysis_version("multi")
+    source = _completed_job(db, _document(), version)
+
+    job = Job(user_id="analyst-2", status=JobStatus.QUEUED, content_hash=source.content_hash)
+    db.add(job)
+    db.commit()
+    apply_cached_result(job, source)
+    db.commit()
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.result["metadata"]["cache"]["source_job_id"] == str(source.id)
+    assert source.result["metadata"] == {}
+    assert cache_stats(db) == {"completed_jobs": 2, "cache_hits": 1, "hit_rate": 0.5}
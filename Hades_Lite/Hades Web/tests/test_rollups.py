@@ -0,0 +1,88 @@
+"""
+Tests para los rollups del panel de administración.
+Usa SQLite en memoria en lugar de PostgreSQL.
+"""
+
+from datetime import datetime, timedelta
+
+from hades_api.models.job import Job, JobStatus
+from hades_api.models.rollup import RollupState
+from hades_api.services.rollups import ensure_fresh, refresh_rollups, rollup_stats, rollup_users
+
+
+def _job(db, status, email="ana@example.com", country="MX", semaforo="verde", score=2,
+         cache_hit=False, completed_at=None):
+    finished = status in (JobStatus.COMPLETED, JobStatus.FAILED)
+    job = Job(
+        user_id=email,
+        user_email=email,
+        user_name=email.split("@")[0],
+        status=status,
+        country_detected=country if status == JobStatus.COMPLETED else None,
+        semaforo=semaforo if status == JobStatus.COMPLETED else None,
+        score=score if status == JobStatus.COMPLETED else None,
+        cache_hit=cache_hit,
+        completed_at=(completed_at or datetime.utcnow()) if finished else None,
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_stats_match_full_table_aggregates(db):
+    """Los rollups dan los mismos números que agregar la tabla jobs"""
+    _job(db, JobStatus.COMPLETED, score=2)
+    _job(db, JobStatus.COMPLETED, country="US", semaforo="rojo", score=8, cache_hit=True,
+         completed_at=datetime.utcnow() - timedelta(days=10))
+    _job(db, JobStatus.COMPLETED, email="luis@example.com", semaforo="amarillo", score=5)
+    _job(db, JobStatus.FAILED, email="luis@example.com")
+    _job(db, JobStatus.PROCESSING)
+
+    refresh_rollups(db)
+    db.commit()
+    stats = rollup_stats(db)
+
+    assert stats["total_jobs"] == 5
+    assert stats["by_status"] == {"completed": 3, "failed": 1, "processing": 1}
+    assert stats["by_country"] == {"MX": 2, "US": 1}
+    assert stats["by_semaforo"] == {"verde": 1, "rojo": 1, "amarillo": 1}
+    assert stats["avg_score"] == 5.0
+    assert stats["result_cache"] == {"completed_jobs": 3, "cache_hits": 1, "hit_rate": 0.3333}
+
+    users = {user["email"]: user for user in rollup_users(db)}
+    assert users["luis@example.com"] == {
+        "email": "luis@example.com", "name": "luis", "total_jobs": 2, "completed": 1, "failed": 1
+    }
+
+
+def test_incremental_refresh_only_recomputes_window(db):
+    """La actualización incremental agrega jobs nuevos sin duplicar días viejos"""
+    _job(db, JobStatus.COMPLETED, completed_at=datetime.utcnow() - timedelta(days=10))
+    refresh_rollups(db)
+    db.commit()
+
+    _job(db, JobStatus.COMPLETED, country="CO")
+    summary = refresh_rollups(db)
+    db.commit()
+
+    assert summary["since"] is not None
+    assert rollup_stats(db)["by_country"] == {"MX": 1, "CO": 1}
+
+
+def test_ensure_fresh_skips_recent_rollups(db):
+    """Rollups recientes no se recalculan en cada lectura del panel"""
+    refresh_rollups(db)
+    db.commit()
+    assert ensure_fresh(db) is False
+
+    db.query(RollupState).one().refreshed_at = datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+    assert ensure_fresh(db) is True
+
+
+def test_ensure_fresh_never_builds_from_scratch(db):
+    """La construcción inicial no se hace dentro de una lectura del panel"""
+    _job(db, JobStatus.COMPLETED)
+    assert ensure_fresh(db) is False
+    assert db.query(RollupState).first() is None
+    assert rollup_stats(db)["by_status"] == {}
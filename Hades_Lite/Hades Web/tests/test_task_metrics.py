@@ -0,0 +1,52 @@
+"""
+Tests para las métricas del worker (GET /metrics).
+Redis se simula con fakeredis (se omiten si no está instalado).
+"""
+
+import pytest
+
+from hades_api.services.task_metrics import collect, queue_keys, record_task, render
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def test_queue_depth_counts_priority_lists():
+    """La profundidad suma las listas de todos los niveles de prioridad"""
+    client = fakeredis.FakeRedis()
+    client.rpush("ocr", "a", "b")
+    client.rpush("ocr:6", "c")
+    client.rpush("forensics:3", "d")
+
+    snapshot = collect(client, queues=["ocr", "forensics", "drive"])
+    assert snapshot["queues"] == {"ocr": 3, "forensics": 1, "drive": 0}
+    assert queue_keys("ocr")[:2] == ["ocr", "ocr:1"]
+
+
+def test_task_durations_render_as_histogram():
+    """Buckets acumulados, suma, conteo y estados en formato Prometheus"""
+    client = fakeredis.FakeRedis()
+    assert record_task("hades_worker.ocr_stage", "ocr", "SUCCESS", 0.4, client=client)
+    assert record_task("hades_worker.ocr_stage", "ocr", "SUCCESS", 7.0, client=client)
+    assert record_task("hades_worker.ocr_stage", "ocr", "RETRY", 400.0, client=client)
+
+    text = render(collect(client, queues=["ocr"]))
+    labels = 'task="hades_worker.ocr_stage",queue="ocr"'
+    assert 'hades_queue_depth{queue="ocr"} 0' in text
+    assert f'hades_task_duration_seconds_bucket{{{labels},le="0.5"}} 1' in text
+    assert f'hades_task_duration_seconds_bucket{{{labels},le="10"}} 2' in text
+    assert f'hades_task_duration_seconds_bucket{{{labels},le="300"}} 2' in text
+    assert f'hades_task_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+    assert f"hades_task_duration_seconds_count{{{labels}}} 3" in text
+    assert f"hades_task_duration_seconds_sum{{{labels}}} 407.4" in text
+    assert f'hades_tasks_total{{{labels},state="RETRY"}} 1' in text
+    assert f'hades_tasks_total{{{labels},state="SUCCESS"}} 2' in text
+    assert text.endswith("\n")
+
+
+def test_record_task_never_raises():
+    """Sin Redis la tarea sigue: registrar devuelve False"""
+    class Broken:
+        def pipeline(self, **kwargs):
+            raise ConnectionError("sin Redis")
+
+    assert record_task("hades_worker.ocr_stage", "ocr", "SUCCESS", 1.0, client=Broken()) is False
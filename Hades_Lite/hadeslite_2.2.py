@@ -9,7 +9,8 @@
 import os, sys, re, io, base64, time, datetime, json, requests, tempfile, unicodedata
 import threading
 import queue
-import gc
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 try:
     import google.generativeai as genai
 except Exception:
@@ -163,7 +164,29 @@ def _clean_ocr_output(texto: str) -> str:
     cleaned = re.sub(r'\[DOCUMENTO\]\s*país:\s*[A-Z]{2}\s*—\s*formato\s*detectado:\s*.*', '', texto, flags=re.IGNORECASE).strip()
     return cleaned
 
+# ===== DETECTOR COMPARTIDO CON HADES WEB (Aho–Corasick, hades_core/cues.py) =====
+# Se carga por ruta (sin importar el paquete hades_core completo). En el
+# ejecutable de PyInstaller va junto a los recursos como cues.py.
+def _load_shared_cues():
+    import importlib.util
+    base = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    for path in (os.path.join(base, "cues.py"), os.path.join(base, "Hades Web", "hades_core", "cues.py")):
+        if not os.path.exists(path):
+            continue
+        try:
+            spec = importlib.util.spec_from_file_location("hades_cues", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+        except Exception as e:
+            print(f"[HADES] Advertencia: No se pudo cargar el detector de país compartido: {e}")
+    return None
+
+_SHARED_CUES = _load_shared_cues()
+
 def _infer_doc_country(texto: str):
+    if _SHARED_CUES is not None:
+        return _SHARED_CUES.best_country(texto or "")
     t = (texto or "").lower()
     for cc, cues in _COUNTRY_CUES.items():
         if any(c in t for c in cues):
@@ -171,6 +194,8 @@ def _infer_doc_country(texto: str):
     return None
 
 def _detect_language_bias(texto: str):
+    if _SHARED_CUES is not None:
+        return _SHARED_CUES.month_language(texto or "")
     t = (texto or "").lower()
     score_es = sum(1 for m in _MONTHS_ES if m in t)
     score_en = sum(1 for m in _MONTHS_EN if m in t)
@@ -787,6 +812,60 @@ def _age_from_mdy(mdy: str):
     except Exception:
         return None
 
+# ====== Imagen para Gemini (compartida OCR / forense) ======
+# Un PNG de foto de cámara pesa 5-15 MB y en el fallback REST viaja en base64.
+# Lado largo acotado + JPEG (o WEBP) de calidad alta basta para leer el texto.
+GEMINI_IMAGE_MAX_EDGE = 2048
+GEMINI_IMAGE_FORMAT = "JPEG"      # "JPEG" o "WEBP"
+GEMINI_IMAGE_QUALITY = 90
+GEMINI_IMAGE_CACHE_SIZE = 32      # Imágenes preparadas en memoria
+
+_IMAGE_MIME = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+_gemini_image_cache = OrderedDict()  # (ruta, mtime_ns, tamaño) -> (bytes, mime)
+_gemini_image_lock = threading.Lock()
+
+def _encode_image_for_gemini(image_path: str) -> tuple[bytes, str]:
+    """Abre, rota por EXIF, reduce el lado largo y recodifica la imagen."""
+    from PIL import Image, ImageOps
+    with Image.open(image_path) as src:
+        orientation = src.getexif().get(0x0112, 1)  # Orientation
+        # Un JPEG que ya cumple se manda tal cual (sin recomprimir: mejor para el forense)
+        if (src.format == GEMINI_IMAGE_FORMAT == "JPEG" and orientation == 1
+                and max(src.size) <= GEMINI_IMAGE_MAX_EDGE):
+            with open(image_path, "rb") as f:
+                return f.read(), _IMAGE_MIME["JPEG"]
+        im = ImageOps.exif_transpose(src)  # auto-rotación por EXIF
+        if max(im.size) > GEMINI_IMAGE_MAX_EDGE:
+            im.thumbnail((GEMINI_IMAGE_MAX_EDGE, GEMINI_IMAGE_MAX_EDGE), Image.LANCZOS)
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        bio = io.BytesIO()
+        if GEMINI_IMAGE_FORMAT == "WEBP":
+            im.save(bio, format="WEBP", quality=GEMINI_IMAGE_QUALITY, method=4)
+        else:
+            # subsampling=0 (4:4:4): bordes de texto nítidos
+            im.save(bio, format="JPEG", quality=GEMINI_IMAGE_QUALITY, subsampling=0)
+        return bio.getvalue(), _IMAGE_MIME[GEMINI_IMAGE_FORMAT]
+
+def _preparar_imagen_gemini(image_path: str) -> tuple[bytes, str]:
+    """
+    (bytes, mime) de la imagen lista para Gemini.
+    Se cachea por ruta + mtime: OCR y análisis forense de la misma imagen
+    la preparan una sola vez; si el archivo cambia se vuelve a preparar.
+    """
+    st = os.stat(image_path)
+    key = (os.path.abspath(image_path), st.st_mtime_ns, st.st_size)
+    with _gemini_image_lock:
+        if key in _gemini_image_cache:
+            _gemini_image_cache.move_to_end(key)
+            return _gemini_image_cache[key]
+    prepared = _encode_image_for_gemini(image_path)
+    with _gemini_image_lock:
+        _gemini_image_cache[key] = prepared
+        while len(_gemini_image_cache) > GEMINI_IMAGE_CACHE_SIZE:
+            _gemini_image_cache.popitem(last=False)
+    return prepared
+
 def gemini_vision_auth_check(image_path: str) -> tuple[int, list[str]]:
     """
     Análisis forense avanzado con Gemini Vision para detectar falsificación.
@@ -796,16 +875,8 @@ def gemini_vision_auth_check(image_path: str) -> tuple[int, list[str]]:
         return 0, []
     
     try:
-        from PIL import Image, ImageOps
-        import io, base64
-        
-        # Cargar y preparar imagen
-        im = Image.open(image_path)
-        im = ImageOps.exif_transpose(im)
-        bio = io.BytesIO()
-        im.save(bio, format="PNG")
-        bio.seek(0)
-        mime = "image/png"
+        # Misma imagen preparada que el OCR (caché por ruta + mtime)
+        image_bytes, mime = _preparar_imagen_gemini(image_path)
         
         # Prompt forense avanzado
         prompt = (
@@ -847,10 +918,11 @@ def gemini_vision_auth_check(image_path: str) -> tuple[int, list[str]]:
         visual_analysis = ""
         if genai is not None:
             try:
+                gemini_quota.acquire()
                 genai.configure(api_key=GEMINI_API_KEY)
                 model = genai.GenerativeModel(GEMINI_MODEL)
                 resp = model.generate_content(
-                    [{"mime_type": mime, "data": bio.getvalue()}, {"text": prompt}],
+                    [{"mime_type": mime, "data": image_bytes}, {"text": prompt}],
                     generation_config={"temperature": temp, "top_p": 0.9, "max_output_tokens": 2048},
                     request_options={"timeout": GEMINI_TIMEOUT_LONG}  # Timeout más largo para análisis forense
                 )
@@ -861,7 +933,8 @@ def gemini_vision_auth_check(image_path: str) -> tuple[int, list[str]]:
         # Fallback REST
         if not visual_analysis:
             try:
-                b64 = base64.b64encode(bio.getvalue()).decode("utf-8")
+                gemini_quota.acquire()
+                b64 = base64.b64encode(image_bytes).decode("utf-8")
                 url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
                 payload = {
                     "contents": [{
@@ -1396,14 +1469,8 @@ def gemini_vision_extract_text(image_path: str) -> str:
     if not GEMINI_API_KEY:
         return "⚠️ Configura GEMINI_API_KEY para usar Visión."
     try:
-        from PIL import Image, ImageOps
-        # --- Pre-proceso de imagen ---
-        im = Image.open(image_path)
-        im = ImageOps.exif_transpose(im) # auto-rotación por EXIF
-        bio = io.BytesIO()
-        im.save(bio, format="PNG") # normalizamos a PNG
-        bio.seek(0)
-        mime = "image/png"
+        # --- Pre-proceso de imagen (compartido con el análisis forense) ---
+        image_bytes, mime = _preparar_imagen_gemini(image_path)
 
         # --- Prompt estilo 'clave-valor' ---
         ## PULIDO: NUEVO PROMPT CLAVE-VALOR
@@ -1419,24 +1486,24 @@ def gemini_vision_extract_text(image_path: str) -> str:
         # --- SDK preferente ---
         if genai is not None:
             try:
+                gemini_quota.acquire()
                 genai.configure(api_key=GEMINI_API_KEY)
                 model = genai.GenerativeModel(GEMINI_MODEL)
                 resp = model.generate_content(
-                    [{"mime_type": mime, "data": bio.getvalue()}, {"text": prompt}],
+                    [{"mime_type": mime, "data": image_bytes}, {"text": prompt}],
                     generation_config={"temperature": temp, "top_p": 0.95, "max_output_tokens": 4096},
                     request_options={"timeout": GEMINI_TIMEOUT_SHORT}  # Timeout más corto
                 )
                 texto = getattr(resp, "text", "") or ""
                 if texto.strip():
-                    im.close()  # Liberar imagen
-                    gc.collect()  # Liberar memoria
                     return texto
             except Exception:
                 pass  # fallback a REST
 
         # --- Fallback REST (mismo prompt/config) ---
         try:
-            b64 = base64.b64encode(bio.getvalue()).decode("utf-8")
+            gemini_quota.acquire()
+            b64 = base64.b64encode(image_bytes).decode("utf-8")
             url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
             payload = {
                 "contents": [{
@@ -1452,10 +1519,6 @@ def gemini_vision_extract_text(image_path: str) -> str:
                              timeout=GEMINI_TIMEOUT_SHORT)  # Timeout más corto
             data = r.json()
             texto = data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "") or ""
-            
-            # Liberar recursos
-            im.close()
-            gc.collect()
             return texto
 
         except requests.Timeout:
@@ -1531,6 +1594,33 @@ GEMINI_TIMEOUT_SHORT = 30   # Para OCR básico
 GEMINI_TIMEOUT_LONG = 45    # Para análisis forense
 DRIVE_TIMEOUT = 20          # Para upload a Drive
 
+# Cuota de la clave de Gemini (llamadas por minuto, SDK o REST)
+GEMINI_MAX_RPM = 10
+GEMINI_CALLS_PER_IMAGE = 2  # OCR + análisis forense
+CARRUSEL_MAX_WORKERS = 4
+
+class GeminiRateLimiter:
+    """Ventana deslizante de 60s compartida por todos los threads que llaman a Gemini"""
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self.lock = threading.Lock()
+        self.calls = deque()
+
+    def acquire(self):
+        """Bloquea hasta que haya cupo para una llamada más"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0] >= 60:
+                    self.calls.popleft()
+                if len(self.calls) < self.rpm:
+                    self.calls.append(now)
+                    return
+                wait = 60 - (now - self.calls[0])
+            time.sleep(wait)
+
+gemini_quota = GeminiRateLimiter(GEMINI_MAX_RPM)
+
 class ThreadedOperation:
     """Ejecuta operaciones pesadas en thread separado para no bloquear UI"""
     def __init__(self):
@@ -1571,6 +1661,47 @@ class ThreadedOperation:
         except queue.Empty:
             return None
 
+class ThreadedBatch(ThreadedOperation):
+    """Aplica una función a varios elementos con un pool acotado de threads.
+    Cada resultado entra a la cola al terminar (orden de finalización):
+    ('success', i, resultado) o ('error', i, mensaje, traceback)"""
+    def __init__(self, max_workers: int):
+        super().__init__()
+        self.max_workers = max(1, max_workers)
+        self.executor = None
+        self.pending = 0
+
+    def run(self, func, items):
+        """Encola todos los elementos; no bloquea"""
+        def wrapper(i, item):
+            if self.is_cancelled():
+                self.result_queue.put(('cancelled', i))
+                return
+            try:
+                self.result_queue.put(('success', i, func(item)))
+            except Exception as e:
+                import traceback
+                self.result_queue.put(('error', i, str(e), traceback.format_exc()))
+
+        self.pending = len(items)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hades-batch")
+        for i, item in enumerate(items):
+            self.executor.submit(wrapper, i, item)
+        self.executor.shutdown(wait=False)
+
+    def get_result(self):
+        """Siguiente resultado terminado o None (no bloquea: se llama desde root.after)"""
+        try:
+            result = self.result_queue.get_nowait()
+        except queue.Empty:
+            return None
+        self.pending -= 1
+        return result
+
+    def is_done(self):
+        """Todos los elementos ya entregaron resultado (o se cancelaron)"""
+        return self.pending <= 0
+
 def registrar_changelog(evento: str):
     ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     os.makedirs("./logs", exist_ok=True)
@@ -2071,6 +2202,9 @@ _show_logo_bg()
 footer = tk.Frame(root, bg=COLOR_PANEL); footer.pack(fill="x")
 btn_analizar = tk.Button(footer, text="🔍 Analizar", bg=COLOR_PURPLE, fg="white", relief="flat", padx=12, pady=10,
                          command=lambda: analizar_carrusel()); btn_analizar.pack(side="left", padx=8, pady=10)
+btn_cancelar = tk.Button(footer, text="⛔ Cancelar", bg=COLOR_RED, fg="white", relief="flat", padx=12, pady=10,
+                         command=lambda: cancelar_carrusel())  # Solo visible durante el carrusel
+progress_bar = ttk.Progressbar(footer, orient="horizontal", mode="determinate", length=220)  # Idem
 btn_ident = tk.Button(footer, text="🪪 Analizar identificación", bg=COLOR_PURPLE, fg=COLOR_TEXT, relief="flat", padx=12, pady=10,
                         command=lambda: analizar_identificacion()); btn_ident.pack(side="left", padx=8, pady=10)
 btn_export = tk.Button(footer, text="💾 Exportar", bg=COLOR_GREEN, fg=COLOR_TEXT, relief="flat", padx=12, pady=10,
@@ -2398,109 +2532,155 @@ def analizar_actual():
     # Exportar directamente a Drive sin pedir feedback
     root.after(0, safe_export_drive)
 
+def _analizar_imagen_carrusel(p: str) -> dict:
+    """Trabajo de un thread del carrusel: OCR + autenticidad de una imagen (sin tocar Tk)."""
+    t0 = time.time()
+    # 1. OCR y Normalización (solo Gemini)
+    texto = gemini_vision_extract_text(p)
+
+    # 2. Extracción de datos esenciales y autenticidad (solo para registro)
+    date_results = _process_all_dates_by_type(texto)
+    datos_esenciales = {
+        "nombre": _extract_name(texto),
+        "fecha_nacimiento_original": _extract_dob(texto)[0],
+        "fecha_nacimiento_sugerida_mdy": date_results.get("fecha_nacimiento_final"),
+        "vigencia_original": texto,
+        "vigencia_sugerida_mdy": date_results.get("fecha_vigencia_final"),
+    }
+    riesgo, detalles, emoji, color = _authenticity_score(texto, p)
+    return {
+        "texto": texto, "date_results": date_results, "datos_esenciales": datos_esenciales,
+        "riesgo": riesgo, "detalles": detalles, "emoji": emoji, "color": color,
+        "dt": round(time.time() - t0, 2),
+    }
+
+def _mostrar_resultado_carrusel(n: int, total: int, p: str, r: dict):
+    """Guarda y pinta en el panel un resultado del carrusel (hilo principal)."""
+    nombre_archivo = Path(p).name
+    _guardar_resultado(nombre_archivo, r["texto"], "carrusel", r["dt"], r["datos_esenciales"], r["riesgo"], r["detalles"])
+
+    # Mostrar encabezado de resultado
+    ocr_text.insert("end", f"\n\nRESULTADO {n}/{total} — {nombre_archivo} ({r['dt']:.2f}s)\n", "header")
+
+    # Mostrar proveedor usado (siempre Gemini ahora)
+    ocr_text.insert("end", f"Analizado con: Gemini\n", "provider_tag")
+
+    # Mostrar semáforo de autenticidad (tag único por resultado)
+    risk_tag = f"risk_tag_{n}"
+    ocr_text.insert("end", f"\n{r['emoji']} Riesgo de falsificación: {r['riesgo'].upper()}\n", risk_tag)
+    if r["color"] == "green":
+        ocr_text.tag_config(risk_tag, foreground=COLOR_GREEN, font=("Segoe UI", 11, "bold"))
+    elif r["color"] == "yellow":
+        ocr_text.tag_config(risk_tag, foreground="#FFD700", font=("Segoe UI", 11, "bold"))
+    else:
+        ocr_text.tag_config(risk_tag, foreground=COLOR_RED, font=("Segoe UI", 11, "bold"))
+    # Mostrar solo mensajes genéricos al usuario
+    if r["detalles"]:
+        ocr_text.insert("end", f"{'; '.join(r['detalles'])}\n", "body_header")
+
+    # Mostrar texto OCR con negritas en valores
+    texto_listo = r["texto"].replace('\\n', '\n')
+    _format_ocr_text_with_normalized_dates(texto_listo, r["date_results"])
+
 def analizar_carrusel():
-    """Analiza TODAS las imágenes y muestra cada resultado en el panel conforme avanza."""
+    """
+    Analiza TODAS las imágenes en un pool de threads acotado por la cuota de Gemini.
+    Cada resultado aparece en el panel en cuanto termina (orden de finalización);
+    la UI nunca se bloquea y el análisis se puede cancelar.
+    """
+    global current_operation
     if not rutas:
         messagebox.showinfo("HADES", "No hay imágenes cargadas."); return
+    if current_operation is not None and not current_operation.is_done():
+        messagebox.showinfo("HADES", "Ya hay un análisis en curso."); return
 
-    total = len(rutas)
+    imagenes = list(rutas)  # Copia: la lista puede cambiar mientras se analiza
+    total = len(imagenes)
     _hide_logo_bg()
     ocr_text.delete("1.0", "end")
-    
+
+    # Más threads que llamadas por minuto solo esperarían en gemini_quota
+    workers = min(CARRUSEL_MAX_WORKERS, total, max(1, GEMINI_MAX_RPM // GEMINI_CALLS_PER_IMAGE))
+
     # Mostrar mensaje inicial
-    ocr_text.insert("end", f"⏳ Procesando {total} imágenes...\n\n", "processing")
+    ocr_text.insert("end", f"⏳ Procesando {total} imágenes ({workers} en paralelo)...\n\n", "processing")
     ocr_text.tag_config("processing", font=("Segoe UI", 11, "bold"), foreground=ACCENT)
-    root.update()  # Actualizar UI # Limpiamos el panel
-    
+
     # Configurar negrita para carrusel
     ocr_text.tag_config("value_bold", font=("Segoe UI", 10, "bold"), foreground=COLOR_TEXT)
     ocr_text.tag_config("header", font=("Segoe UI", 12, "bold"), foreground=ACCENT_2)
     ocr_text.tag_config("essential_header", font=("Segoe UI", 12, "bold"), foreground=ACCENT_2) # Tag para DATOS ESENCIALES
-    ocr_text.tag_config("risk_tag", foreground=COLOR_GREEN, font=("Segoe UI", 10, "bold")) # Por defecto verde
+    ocr_text.tag_config("provider_tag", foreground=COLOR_MUTED, font=("Segoe UI", 9, "italic"))
+    ocr_text.tag_config("body_header", font=("Segoe UI", 10, "bold"), foreground=COLOR_TEXT)
 
-    for i in range(total):
-        p = rutas[i]
-        t0 = time.time()
-        
-        # Actualizar progreso
-        ocr_text.insert("end", f"\n[{i+1}/{total}] Procesando {Path(p).name}...\n", "progress")
-        ocr_text.tag_config("progress", font=("Segoe UI", 10, "italic"), foreground=COLOR_MUTED)
+    # Barra de progreso + cancelar
+    progress_bar.config(maximum=total, value=0)
+    progress_bar.pack(side="left", fill="x", expand=True, padx=8, pady=10)
+    btn_cancelar.config(state="normal")
+    btn_cancelar.pack(side="left", padx=8, pady=10)
+    btn_analizar.config(state="disabled")
+    status.config(text=f"Analizando 0/{total}...")
+
+    batch = ThreadedBatch(workers)
+    current_operation = batch
+    batch.run(_analizar_imagen_carrusel, imagenes)
+    estado = {"hechas": 0, "errores": 0}
+
+    def _terminar():
+        global current_operation
+        current_operation = None
+        progress_bar.pack_forget()
+        btn_cancelar.pack_forget()
+        btn_analizar.config(state="normal")
+        if batch.is_cancelled():
+            ocr_text.insert("end", f"\n\n⛔ Análisis cancelado ({estado['hechas']}/{total} completadas).\n", "processing")
+            status.config(text=f"Cancelado: {estado['hechas']}/{total} imágenes analizadas.")
+        else:
+            status.config(text=f"Carrusel terminado: {estado['hechas']}/{total} imágenes ({estado['errores']} con error).")
         ocr_text.see("end")
-        root.update()  # Mantener UI responsiva
-        
-        try:
-            # 1. OCR y Normalización (solo Gemini)
-            texto = gemini_vision_extract_text(p)
-            texto_normalizado_diag, _pairs, doc_pais, fmt = _normalize_all_dates_with_pairs(texto)
-            
-            # 2. Extracción de datos esenciales y autenticidad (solo para registro)
-            date_results = _process_all_dates_by_type(texto)
-            vigencia_final = date_results.get("fecha_vigencia_final")
-            expedicion_final = date_results.get("fecha_expedicion_final")
-            nacimiento_final = date_results.get("fecha_nacimiento_final")
-            
-            nombre_completo = _extract_name(texto)
-            tipo_id = _extract_id_type(texto, doc_pais)
-            num_id = _extract_id_number(texto, doc_pais)
-            
-            datos_esenciales = {
-                "nombre": nombre_completo,
-                "fecha_nacimiento_original": _extract_dob(texto)[0],
-                "fecha_nacimiento_sugerida_mdy": nacimiento_final,
-                "vigencia_original": texto,
-                "vigencia_sugerida_mdy": vigencia_final,
-            }
-
-            riesgo, detalles, emoji, color = _authenticity_score(texto, p)
-            dt = round(time.time() - t0, 2)
-
-            # 3. Guardar resultados
-            _guardar_resultado(Path(p).name, texto, "carrusel", dt, datos_esenciales, riesgo, detalles)
-
-            # 4. Mostrar en el panel (SOLO OCR y autenticidad)
-            nombre_archivo = Path(p).name
-            doc_pais_actual = _infer_doc_country(texto) # Re-obtener el país por si las claves de GTM/PHL funcionan mejor ahora
-            
-            # Mostrar encabezado de resultado
-            ocr_text.insert("end", f"\n\nRESULTADO {i+1}/{total} — {nombre_archivo}\n", "header")
-            
-            # Mostrar proveedor usado (siempre Gemini ahora)
-            ocr_text.insert("end", f"Analizado con: Gemini\n", "provider_tag")
-            ocr_text.tag_config("provider_tag", foreground=COLOR_MUTED, font=("Segoe UI", 9, "italic"))
-            
-            # Mostrar semáforo de autenticidad (tag único por resultado)
-            risk_tag = f"risk_tag_{i}"
-            ocr_text.insert("end", f"\n{emoji} Riesgo de falsificación: {riesgo.upper()}\n", risk_tag)
-            if color == "green":
-                ocr_text.tag_config(risk_tag, foreground=COLOR_GREEN, font=("Segoe UI", 11, "bold"))
-            elif color == "yellow":
-                ocr_text.tag_config(risk_tag, foreground="#FFD700", font=("Segoe UI", 11, "bold"))
-            else:
-                ocr_text.tag_config(risk_tag, foreground=COLOR_RED, font=("Segoe UI", 11, "bold"))
-            # Mostrar solo mensajes genéricos al usuario
-            if detalles:
-                ocr_text.insert("end", f"{'; '.join(detalles)}\n", "body_header")
-
-            # (Punto 3 - Arreglo [DOCUMENTO])
-            #if doc_pais_actual:
-                #ocr_text.insert("end", f"país: {doc_pais_actual}\n", "essential_value")
+        # Un solo export al finalizar todo el carrusel (si no se canceló)
+        if not batch.is_cancelled():
+            root.after(0, safe_export_drive)
 
-            # Mostrar texto OCR con negritas en valores
-            texto_listo = texto.replace('\\n', '\n')
-            _format_ocr_text_with_normalized_dates(texto_listo, date_results)
-            
+    def _drenar():
+        if batch.is_cancelled():
+            _terminar(); return
+        # Pocos resultados por tick para no congelar la UI al pintar
+        for _ in range(4):
+            item = batch.get_result()
+            if item is None:
+                break
+            kind, i = item[0], item[1]
+            p = imagenes[i]
+            if kind == 'success':
+                estado["hechas"] += 1
+                try:
+                    _mostrar_resultado_carrusel(estado["hechas"], total, p, item[2])
+                except Exception as e:
+                    estado["errores"] += 1
+                    ocr_text.insert("end", f"\n\n❌ Error al mostrar {Path(p).name}: {e}\n")
+            elif kind == 'error':
+                estado["hechas"] += 1
+                estado["errores"] += 1
+                print(f"[HADES] Error en carrusel ({Path(p).name}):\n{item[3]}")
+                ocr_text.insert("end", f"\n\n===== {estado['hechas']}/{total} — {Path(p).name} =====\n"
+                                       f"❌ Error en Visión o procesamiento de {Path(p).name}: {item[2]}\n")
+            progress_bar.config(value=estado["hechas"])
+            status.config(text=f"Analizando {estado['hechas']}/{total}...")
             ocr_text.see("end")
-            root.update_idletasks()
-            
-        except Exception as e:
-            err_msg = f"❌ Error en Visión o procesamiento de {Path(p).name}: {e}"
-            ocr_text.insert("end", f"\n\n===== {i}/{total} — {Path(p).name} =====\n{err_msg}\n")
-            root.update_idletasks()
-            continue
+        if batch.is_done():
+            _terminar()
+        else:
+            root.after(100, _drenar)
 
-    # Un solo feedback al finalizar todo el carrusel (y export a Drive)
-    # Exportar directamente a Drive sin pedir feedback
-    root.after(0, safe_export_drive)
+    root.after(100, _drenar)
+
+def cancelar_carrusel():
+    """Cancela el carrusel en curso: las imágenes pendientes no se envían a Gemini."""
+    if current_operation is not None:
+        current_operation.cancel()
+        btn_cancelar.config(state="disabled")
+        status.config(text="Cancelando... (las imágenes en curso terminan en segundo plano)")
 
 def analizar_identificacion():
     """
@@ -2833,6 +3013,8 @@ def exportar_resultados():
     _do_export(carpeta)
 
 def borrar_todo():
+    if current_operation is not None:
+        cancelar_carrusel()
     rutas.clear(); resultados.clear()
     ocr_text.delete("1.0", "end")
     _show_logo_bg() # Vuelve a mostrar el logo
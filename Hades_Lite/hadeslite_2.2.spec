@@ -12,6 +12,7 @@ added_files = [
     ('Hades_ico.ico', '.'),        # Ícono de la aplicación
     ('keycloak_auth.py', '.'),     # Módulo de autenticación Keycloak
     ('keycloak_config.py', '.'),   # Configuración de Keycloak
+    ('Hades Web/hades_core/cues.py', '.'),  # Detector de país/idioma compartido con Hades Web
 ]
 
 a = Analysis(
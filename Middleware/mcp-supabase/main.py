@@ -4,24 +4,214 @@ Supabase MCP - Lightweight microservice for querying Supabase data via Gemini.
 
 from fastapi import FastAPI, HTTPException, Body, Header
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+import threading
 import os
 import httpx
 from supabase import create_client, Client
 import google.generativeai as genai
 
+from retrieval import TableIndex, build_context
+from rag import KnowledgeStore, format_hits
+
 app = FastAPI(title="Supabase MCP")
+logger = logging.getLogger(__name__)
 
 # Config from environment
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+SUPABASE_MAX_WORKERS = int(os.getenv("SUPABASE_MAX_WORKERS", "8"))
+
+# Retrieval: only the top-K relevant rows reach the prompt
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "10"))
+RETRIEVAL_TOKEN_BUDGET = int(os.getenv("RETRIEVAL_TOKEN_BUDGET", "1500"))
+RETRIEVAL_FILTER_LIMIT = int(os.getenv("RETRIEVAL_FILTER_LIMIT", "200"))
+INDEX_REFRESH_SECONDS = int(os.getenv("INDEX_REFRESH_SECONDS", "300"))
+INDEX_FULL_RESYNC_SECONDS = int(os.getenv("INDEX_FULL_RESYNC_SECONDS", "3600"))
+
+# RAG over agent knowledge sources
+RAG_DOCS_DIR = os.getenv("RAG_DOCS_DIR")
+RAG_RESCAN_SECONDS = int(os.getenv("RAG_RESCAN_SECONDS", "300"))
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+RAG_LATENCY_BUDGET_MS = int(os.getenv("RAG_LATENCY_BUDGET_MS", "800"))
 
 # Initialize Supabase
 supabase: Optional[Client] = None
 if SUPABASE_URL and SUPABASE_KEY:
     supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# The supabase-py client is synchronous: run it on a bounded pool so a slow
+# PostgREST call never blocks the event loop (and the pool caps DB fan-out).
+_db_executor = ThreadPoolExecutor(max_workers=SUPABASE_MAX_WORKERS, thread_name_prefix="supabase")
+
+# Gemini model handles cached per (api_key, web_search). genai.configure is
+# global state, so it only runs when a new handle is created.
+_models: Dict[Tuple[str, bool], "genai.GenerativeModel"] = {}
+_models_lock = threading.Lock()
+
+
+async def run_db(fn, *args):
+    """Run a blocking Supabase call on the DB pool without blocking the loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, fn, *args)
+
+
+def _build_tools(web_search: bool):
+    """Tools list for Gemini (Google Search grounding when enabled)."""
+    if not web_search:
+        return None
+    return [{"google_search_retrieval": {}}]
+
+
+async def generate_async(api_key: str, prompt: str, web_search: bool = False) -> str:
+    """
+    Calls Gemini through the async SDK, reusing a cached model per API key.
+
+    A fresh model binds its async client lazily on the first request, from
+    whatever key is configured at that moment. configure() and the first
+    await run without yielding in between, so each cached handle stays bound
+    to its own key even with concurrent requests using different keys.
+    """
+    cache_key = (api_key, web_search)
+    with _models_lock:
+        model = _models.get(cache_key)
+        is_new = model is None
+        if is_new:
+            model = genai.GenerativeModel(
+                model_name=GEMINI_MODEL,
+                tools=_build_tools(web_search)
+            )
+            _models[cache_key] = model
+    if is_new:
+        genai.configure(api_key=api_key)
+    response = await model.generate_content_async(prompt)
+    return response.text
+
+
+# --- Retrieval layer ---
+_indexes: Dict[str, TableIndex] = {}
+_index_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _fetch_page(table_name: str, updated_column: str):
+    """Builds the paged fetcher TableIndex.refresh uses (runs on the DB pool)."""
+    def fetch(start: int, end: int, updated_since: Optional[str], order_by: List[str]):
+        q = supabase.table(table_name).select("*")
+        if updated_since is not None:
+            q = q.gte(updated_column, updated_since)
+        for column in order_by:
+            q = q.order(column)
+        return q.range(start, end).execute().data or []
+    return fetch
+
+
+async def get_table_index(table_name: str) -> TableIndex:
+    """Returns the table's index, syncing it first when stale."""
+    index = _indexes.get(table_name)
+    if index is None:
+        index = _indexes[table_name] = TableIndex(
+            table_name,
+            refresh_seconds=INDEX_REFRESH_SECONDS,
+            full_resync_seconds=INDEX_FULL_RESYNC_SECONDS,
+        )
+        _index_locks[table_name] = asyncio.Lock()
+
+    if index.is_stale():
+        async with _index_locks[table_name]:
+            if index.is_stale():
+                await run_db(index.refresh, _fetch_page(table_name, index.updated_column))
+    return index
+
+
+async def retrieve_rows(table_name: str, query: str, context: Dict[str, Any]) -> str:
+    """
+    Relevant rows from `table_name` for `query`, serialized within a token budget.
+
+    Context keys (all optional):
+        columns: column projection for the prompt
+        filters: {column: value} equality predicates, pushed down to Supabase
+        top_k / token_budget: override the env defaults
+    """
+    columns = context.get("columns") or None
+    filters = context.get("filters") or {}
+    top_k = int(context.get("top_k") or RETRIEVAL_TOP_K)
+    token_budget = int(context.get("token_budget") or RETRIEVAL_TOKEN_BUDGET)
+
+    if filters:
+        # Explicit predicates: filtered select, then rank the candidates
+        def filtered_select():
+            q = supabase.table(table_name).select(",".join(columns) if columns else "*")
+            for col, val in filters.items():
+                q = q.eq(col, val)
+            return q.limit(RETRIEVAL_FILTER_LIMIT).execute().data or []
+
+        candidates = await run_db(filtered_select)
+        scratch = TableIndex(table_name)
+        scratch.upsert(candidates)
+        rows = scratch.search(query, top_k) or candidates[:top_k]
+    else:
+        index = await get_table_index(table_name)
+        rows = index.search(query, top_k)
+
+    return build_context(rows, columns, token_budget)
+
+# --- RAG knowledge store ---
+knowledge_store = KnowledgeStore()
+
+
+async def _rag_rescan_loop():
+    """Re-indexes changed files in RAG_DOCS_DIR in the background."""
+    while True:
+        try:
+            updated = await asyncio.to_thread(knowledge_store.sync_dir, RAG_DOCS_DIR)
+            if updated:
+                logger.info(f"RAG: re-indexed {updated}")
+        except Exception as e:
+            logger.error(f"RAG: rescan failed: {e}")
+        await asyncio.sleep(RAG_RESCAN_SECONDS)
+
+
+# The event loop only keeps weak references to tasks: hold the rescan task
+_rag_rescan_task: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_rag_rescan():
+    global _rag_rescan_task
+    if RAG_DOCS_DIR and _rag_rescan_task is None:
+        _rag_rescan_task = asyncio.create_task(_rag_rescan_loop())
+
+
+async def retrieve_knowledge(query: str, knowledge_sources) -> str:
+    """
+    Top-K chunks per knowledge source (KnowledgeStore.search limits each
+    source, so one source cannot crowd out the others).
+
+    RAG is optional context: on timeout or any error (e.g. the Gemini
+    embedding call failing) the query continues without it.
+    """
+    try:
+        hits = await asyncio.wait_for(
+            asyncio.to_thread(
+                knowledge_store.search, query, list(knowledge_sources),
+                RAG_TOP_K, RAG_LATENCY_BUDGET_MS
+            ),
+            timeout=RAG_LATENCY_BUDGET_MS / 1000 * 2
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"RAG: retrieval exceeded {RAG_LATENCY_BUDGET_MS} ms budget, continuing without it")
+        return ""
+    except Exception as e:
+        logger.error(f"RAG: retrieval failed, continuing without it: {e}")
+        return ""
+    return format_hits(hits)
+
+
 class MCPRequest(BaseModel):
     query: str
     context: Optional[Dict[str, Any]] = {}
@@ -58,6 +248,7 @@ async def query_supabase(
     if not supabase:
         return MCPResponse(response="Error: Supabase no está configurado.")
 
+    api_key = request.context.get("gemini_api_key") or GEMINI_API_KEY
     if not api_key:
         return MCPResponse(response="Error: No se proporcionó Gemini API Key.")
 
@@ -80,36 +271,18 @@ async def query_supabase(
         rag_context = ""
         
         if knowledge_sources:
-            # Simulate fetching fragments from a 'document_chunks' table filtered by source IDs
-            # In a real scenario: supabase.table('document_chunks').select('*').in_('source_id', knowledge_sources)...
-            rag_context = f"\n\nCONTEXTO ADICIONAL (RAG) de fuentes {knowledge_sources}:\n"
-            rag_context += "[Simulado: El sistema ha recuperado información relevante de los PDFs/Docs configurados]\n"
+            fragments = await retrieve_knowledge(request.query, knowledge_sources)
+            if fragments:
+                rag_context = f"\n\nCONTEXTO ADICIONAL (RAG) de fuentes {knowledge_sources}:\n{fragments}\n"
 
         # --- SQL Aware Data Fetching ---
         table_name = request.context.get("table_name", "inventario") 
-        response = supabase.table(table_name).select("*").limit(50).execute()
-        data = response.data
+        data = await retrieve_rows(table_name, request.query, request.context)
+        if not data:
+            data = "(Sin filas relevantes para esta pregunta)"
 
-        # --- Gemini Interaction ---
-        genai.configure(api_key=api_key)
-        
         # Check for Web Search capability
-        web_search = request.context.get("web_search_enabled", False)
-        tools = []
-        if web_search:
-            # Using the latest Google Search tool naming
-            tools = [tool for tool in [{"google_search_retrieval": {}}]] # Simplified for logic
-            # actual implementation: tools = [genai.Tool(google_search_retrieval=genai.GoogleSearchRetrieval())] 
-            # for now we'll use a string representation or the appropriate SDK constructor if available
-            try:
-                from google.generativeai.types import content_types
-                # If SDK supports it directly: tools = [genai.types.Tool(google_search_retrieval=genai.types.GoogleSearchRetrieval())]
-            except: pass
-
-        model = genai.GenerativeModel(
-            model_name='gemini-2.5-flash',
-            tools=tools if tools else None
-        )
+        web_search = bool(request.context.get("web_search_enabled", False))
         
         # --- COMPLIANCE SYSTEM INSTRUCTIONS ---
         base_instructions = request.context.get("system_prompt", "Eres un asistente experto en análisis de datos.")
@@ -137,7 +310,7 @@ REGLAS ESTRICTAS:
         
         {rag_context}
         
-        DATOS DE LA TABLA '{table_name}':
+        DATOS RELEVANTES DE LA TABLA '{table_name}' (JSON por fila):
         {data}
         
         ---
@@ -151,10 +324,10 @@ REGLAS ESTRICTAS:
         3. Si tienes habilitada la búsqueda web y las reglas lo permiten, úsala para complementar.
         """
         
-        chat_response = model.generate_content(prompt)
+        answer = await generate_async(api_key, prompt, web_search)
         
         return MCPResponse(
-            response=chat_response.text,
+            response=answer,
             confidence=0.95
         )
 
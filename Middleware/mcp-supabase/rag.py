@@ -0,0 +1,357 @@
+"""
+RAG chunk store for agent knowledge sources.
+
+Ingestion: PDF / DOCX / text -> overlapping chunks -> embeddings, persisted
+per source (the source id is the file name, same as the dashboard uses for
+`knowledge_sources`). Each source keeps a flat inner-product index (unit
+vectors, exact search) in `RAG_INDEX_DIR/<source>/`, plus a manifest with
+the file's mtime and SHA-256 so re-indexing only touches changed files.
+
+Usage:
+    python rag.py ingest ../respondio-middleware/docs/Documentos_PDF
+    python rag.py search "disputa" --source "2026 - WhatsApp - Approved Scripts.pdf"
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", os.path.join(os.path.dirname(__file__), "rag_index"))
+RAG_CHUNK_CHARS = int(os.getenv("RAG_CHUNK_CHARS", "900"))
+RAG_CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "150"))
+GEMINI_EMBED_MODEL = os.getenv("GEMINI_EMBED_MODEL", "text-embedding-004")
+
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt", ".md", ".csv"}
+
+EMBED_BATCH = 100
+HASH_DIM = 512
+
+
+# ---------------------------------------------------------------------------
+# Extraction and chunking
+# ---------------------------------------------------------------------------
+
+def extract_text(path: str) -> str:
+    """Plain text of a PDF, DOCX or text file."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        from pypdf import PdfReader
+        reader = PdfReader(path)
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+    if ext == ".docx":
+        import docx  # python-docx
+        document = docx.Document(path)
+        return "\n".join(p.text for p in document.paragraphs)
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def chunk_text(text: str, size: int = RAG_CHUNK_CHARS, overlap: int = RAG_CHUNK_OVERLAP) -> List[str]:
+    """
+    Splits text into ~`size` character chunks on paragraph (then line)
+    boundaries, carrying `overlap` characters of the previous chunk.
+    """
+    text = re.sub(r"[ \t]+", " ", text)
+    units: List[str] = []
+    for para in re.split(r"\n\s*\n", text):
+        para = para.strip()
+        if not para:
+            continue
+        if len(para) <= size:
+            units.append(para)
+            continue
+        # PDF text rarely has blank lines: fall back to lines, then hard cuts
+        for line in para.split("\n"):
+            line = line.strip()
+            while len(line) > size:
+                units.append(line[:size])
+                line = line[size - overlap:]
+            if line:
+                units.append(line)
+
+    chunks: List[str] = []
+    current = ""
+    for unit in units:
+        if current and len(current) + len(unit) + 1 > size:
+            chunks.append(current)
+            tail = current[-overlap:] if overlap else ""
+            # Start the overlap on a word boundary
+            current = tail[tail.find(" ") + 1:] if " " in tail else tail
+        current = f"{current}\n{unit}" if current else unit
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Embedders
+# ---------------------------------------------------------------------------
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class HashingEmbedder:
+    """
+    Dependency-free lexical embedder (feature hashing of word unigrams and
+    bigrams). Used when no Gemini key is configured so RAG still works
+    offline; quality is keyword-level rather than semantic.
+    """
+
+    name = f"hashing-{HASH_DIM}"
+
+    def embed(self, texts: List[str], task_type: str = "RETRIEVAL_DOCUMENT") -> np.ndarray:
+        out = np.zeros((len(texts), HASH_DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            words = re.findall(r"\w+", text.lower())
+            for feat in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                out[i, zlib.crc32(feat.encode("utf-8")) % HASH_DIM] += 1.0
+        return _normalize_rows(out)
+
+
+class GeminiEmbedder:
+    """Gemini embeddings over REST (explicit key per client, no global SDK state)."""
+
+    def __init__(self, api_key: str, model: str = GEMINI_EMBED_MODEL, timeout: float = 30.0):
+        self.api_key = api_key
+        self.model = model
+        self.name = f"gemini-{model}"
+        self._client = httpx.Client(timeout=timeout)
+        self._url = (
+            f"https://generativelanguage.googleapis.com/v1beta/models/{model}:batchEmbedContents"
+        )
+
+    def embed(self, texts: List[str], task_type: str = "RETRIEVAL_DOCUMENT") -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), EMBED_BATCH):
+            batch = texts[start:start + EMBED_BATCH]
+            payload = {
+                "requests": [
+                    {
+                        "model": f"models/{self.model}",
+                        "content": {"parts": [{"text": t}]},
+                        "taskType": task_type,
+                    }
+                    for t in batch
+                ]
+            }
+            resp = self._client.post(self._url, params={"key": self.api_key}, json=payload)
+            resp.raise_for_status()
+            vectors.extend(e["values"] for e in resp.json()["embeddings"])
+        return _normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+
+def default_embedder():
+    """Gemini embeddings when GEMINI_API_KEY is set, hashing fallback otherwise."""
+    api_key = os.getenv("GEMINI_API_KEY")
+    return GeminiEmbedder(api_key) if api_key else HashingEmbedder()
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class KnowledgeStore:
+    """
+    Per-source chunk store with a flat inner-product vector index.
+
+    Vectors are unit-normalized, so the dot product is the cosine similarity.
+    Sources are loaded lazily and kept in memory; a re-ingest swaps the
+    in-memory copy atomically.
+    """
+
+    def __init__(self, index_dir: str = RAG_INDEX_DIR, embedder=None):
+        self.index_dir = index_dir
+        self.embedder = embedder or default_embedder()
+        self._sources: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(index_dir, exist_ok=True)
+
+    def _source_dir(self, source_id: str) -> str:
+        safe = re.sub(r"[^\w.\- ]", "_", source_id)
+        return os.path.join(self.index_dir, safe)
+
+    def _read_manifest(self, source_id: str) -> Optional[dict]:
+        path = os.path.join(self._source_dir(source_id), "manifest.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # --- Ingestion ---------------------------------------------------------
+
+    def ingest_file(self, path: str, source_id: Optional[str] = None, force: bool = False) -> bool:
+        """
+        Indexes one file. Returns False when the stored index is already
+        current (same mtime, or same content hash with a touched mtime).
+        """
+        source_id = source_id or os.path.basename(path)
+        mtime = os.path.getmtime(path)
+        manifest = self._read_manifest(source_id)
+
+        if manifest and not force and manifest.get("embedder") == self.embedder.name:
+            if manifest.get("mtime") == mtime:
+                return False
+            sha = file_sha256(path)
+            if manifest.get("sha256") == sha:
+                manifest["mtime"] = mtime
+                self._write_manifest(source_id, manifest)
+                return False
+        else:
+            sha = file_sha256(path)
+
+        chunks = chunk_text(extract_text(path))
+        if not chunks:
+            logger.warning(f"RAG: no text extracted from {path}")
+            return False
+
+        vectors = self.embedder.embed(chunks, task_type="RETRIEVAL_DOCUMENT")
+
+        target = self._source_dir(source_id)
+        os.makedirs(target, exist_ok=True)
+        np.save(os.path.join(target, "vectors.npy"), vectors)
+        with open(os.path.join(target, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump(chunks, f, ensure_ascii=False)
+        self._write_manifest(source_id, {
+            "source_id": source_id,
+            "path": os.path.abspath(path),
+            "mtime": mtime,
+            "sha256": sha,
+            "embedder": self.embedder.name,
+            "chunks": len(chunks),
+            "indexed_at": time.time(),
+        })
+
+        with self._lock:
+            self._sources[source_id] = (chunks, vectors)
+        logger.info(f"RAG: indexed '{source_id}' ({len(chunks)} chunks)")
+        return True
+
+    def _write_manifest(self, source_id: str, manifest: dict):
+        path = os.path.join(self._source_dir(source_id), "manifest.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    def sync_dir(self, docs_dir: str, force: bool = False) -> List[str]:
+        """Incrementally (re)indexes every supported file in `docs_dir`."""
+        updated = []
+        if not os.path.isdir(docs_dir):
+            return updated
+        for name in sorted(os.listdir(docs_dir)):
+            path = os.path.join(docs_dir, name)
+            if os.path.splitext(name)[1].lower() not in SUPPORTED_EXTENSIONS:
+                continue
+            try:
+                if self.ingest_file(path, force=force):
+                    updated.append(name)
+            except Exception as e:
+                logger.error(f"RAG: failed to index {name}: {e}")
+        return updated
+
+    # --- Query -------------------------------------------------------------
+
+    def _load(self, source_id: str) -> Optional[Tuple[List[str], np.ndarray]]:
+        with self._lock:
+            cached = self._sources.get(source_id)
+        if cached is not None:
+            return cached
+
+        target = self._source_dir(source_id)
+        vectors_path = os.path.join(target, "vectors.npy")
+        if not os.path.exists(vectors_path):
+            return None
+        manifest = self._read_manifest(source_id) or {}
+        if manifest.get("embedder") != self.embedder.name:
+            logger.warning(f"RAG: '{source_id}' was indexed with another embedder, re-ingest it")
+            return None
+        with open(os.path.join(target, "chunks.json"), "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        loaded = (chunks, np.load(vectors_path))
+        with self._lock:
+            self._sources[source_id] = loaded
+        return loaded
+
+    def search(
+        self,
+        query: str,
+        source_ids: List[str],
+        k: int = 4,
+        budget_ms: Optional[float] = None,
+    ) -> List[Tuple[str, float, str]]:
+        """
+        Top-`k` chunks per source as (source_id, score, text), best first.
+
+        When `budget_ms` elapses, remaining sources are skipped and whatever
+        was retrieved so far is returned.
+        """
+        start = time.perf_counter()
+        query_vec = self.embedder.embed([query], task_type="RETRIEVAL_QUERY")[0]
+
+        hits: List[Tuple[str, float, str]] = []
+        for source_id in source_ids:
+            if budget_ms is not None and (time.perf_counter() - start) * 1000 > budget_ms:
+                logger.warning(f"RAG: latency budget exhausted before '{source_id}'")
+                break
+            loaded = self._load(source_id)
+            if loaded is None:
+                continue
+            chunks, vectors = loaded
+            scores = vectors @ query_vec
+            top = np.argsort(-scores)[:k]
+            hits.extend((source_id, float(scores[i]), chunks[i]) for i in top)
+
+        hits.sort(key=lambda h: h[1], reverse=True)
+        return hits
+
+
+def format_hits(hits: List[Tuple[str, float, str]]) -> str:
+    """Prompt block for retrieved chunks."""
+    return "\n\n".join(f"[Fuente: {source}]\n{text}" for source, _, text in hits)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="RAG knowledge store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="Index (or re-index changed) documents")
+    p_ingest.add_argument("path", help="File or directory")
+    p_ingest.add_argument("--force", action="store_true")
+
+    p_search = sub.add_parser("search", help="Query the index")
+    p_search.add_argument("query")
+    p_search.add_argument("--source", action="append", required=True)
+    p_search.add_argument("-k", type=int, default=4)
+
+    args = parser.parse_args()
+    store = KnowledgeStore()
+    if args.command == "ingest":
+        if os.path.isdir(args.path):
+            print(f"Updated: {store.sync_dir(args.path, force=args.force)}")
+        else:
+            print(f"Updated: {store.ingest_file(args.path, force=args.force)}")
+    else:
+        for source, score, text in store.search(args.query, args.source, k=args.k):
+            print(f"--- {source} ({score:.3f})\n{text[:300]}\n")
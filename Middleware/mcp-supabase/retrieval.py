@@ -0,0 +1,262 @@
+"""
+Relevance-filtered retrieval over Supabase tables.
+
+Instead of pasting `select("*").limit(50)` into every prompt, each table is
+mirrored into a small in-memory BM25 index that is refreshed incrementally
+(rows whose `updated_at` moved since the last sync), with a periodic full
+resync to drop rows deleted upstream. A query returns only the top-K relevant
+rows, projected to the requested columns and trimmed to a token budget.
+"""
+
+import json
+import math
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Rough chars-per-token ratio used to enforce the prompt budget
+CHARS_PER_TOKEN = 4
+
+PAGE_SIZE = 1000
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = {
+    # Español
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "de", "del", "al",
+    "que", "en", "y", "o", "por", "para", "con", "sin", "se", "su", "sus",
+    "es", "son", "mi", "me", "lo", "le", "les", "como", "cual", "cuales",
+    "hay", "tiene", "tienen", "cuanto", "cuantos", "cuantas", "quiero",
+    # English
+    "the", "a", "an", "of", "to", "in", "and", "or", "for", "with", "is",
+    "are", "what", "which", "how", "many", "my", "do", "does", "there",
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents so 'Envío' and 'envio' match."""
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _stem(tok: str) -> str:
+    """Minimal plural folding ('tornillos' -> 'tornillo', 'envios' -> 'envio')."""
+    if len(tok) > 4 and tok.endswith("s") and not tok.endswith("ss"):
+        return tok[:-1]
+    return tok
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized, non-stopword tokens."""
+    return [
+        _stem(tok) for tok in _TOKEN_RE.findall(normalize(text))
+        if len(tok) > 1 and tok not in STOPWORDS
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency)."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def serialize_row(row: Dict[str, Any], columns: Optional[Iterable[str]] = None) -> str:
+    """Compact JSON for one row, optionally projected to `columns`."""
+    if columns:
+        row = {c: row.get(c) for c in columns if c in row}
+    return json.dumps(row, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+class TableIndex:
+    """
+    In-memory BM25 index mirroring one Supabase table.
+
+    Rows are keyed by `id_column` when present (falling back to their
+    position), so incremental syncs overwrite updated rows in place.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        id_column: str = "id",
+        updated_column: str = "updated_at",
+        refresh_seconds: int = 300,
+        full_resync_seconds: int = 3600,
+    ):
+        self.table_name = table_name
+        self.id_column = id_column
+        self.updated_column = updated_column
+        self.refresh_seconds = refresh_seconds
+        self.full_resync_seconds = full_resync_seconds
+
+        self.rows: Dict[Any, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[Any, int]] = defaultdict(dict)
+        self._doc_len: Dict[Any, int] = {}
+        self._total_len = 0
+        self._seq = 0
+
+        self.last_refresh = 0.0
+        self.last_full_sync = 0.0
+        self.last_updated_value: Optional[str] = None
+        # Columns of the table (probed once); None until the first refresh
+        self.columns: Optional[set] = None
+
+    # ------------------------------------------------------------------ #
+    # Maintenance
+    # ------------------------------------------------------------------ #
+
+    def is_stale(self) -> bool:
+        return time.time() - self.last_refresh > self.refresh_seconds
+
+    @property
+    def incremental(self) -> bool:
+        """Delta syncs need both columns: `updated_column` to filter, `id_column` to dedupe"""
+        return self.columns is not None and {self.updated_column, self.id_column} <= self.columns
+
+    def order_by(self) -> List[str]:
+        """Stable paging order: (updated_column, id_column), whichever exist"""
+        return [c for c in (self.updated_column, self.id_column) if c in (self.columns or ())]
+
+    def _reset(self):
+        self.rows.clear()
+        self._postings.clear()
+        self._doc_len.clear()
+        self._total_len = 0
+        self._seq = 0
+        self.last_updated_value = None
+
+    def _row_key(self, row: Dict[str, Any]) -> Any:
+        if self.id_column in row:
+            return row[self.id_column]
+        self._seq += 1
+        return ("_pos", self._seq)
+
+    def _remove(self, key: Any):
+        old = self.rows.pop(key, None)
+        if old is None:
+            return
+        for tok in set(tokenize(serialize_row(old))):
+            postings = self._postings.get(tok)
+            if postings:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[tok]
+        self._total_len -= self._doc_len.pop(key, 0)
+
+    def upsert(self, rows: List[Dict[str, Any]]):
+        """Add or replace rows in the index."""
+        for row in rows:
+            key = self._row_key(row)
+            self._remove(key)
+            counts = Counter(tokenize(serialize_row(row)))
+            self.rows[key] = row
+            for tok, tf in counts.items():
+                self._postings[tok][key] = tf
+            length = sum(counts.values())
+            self._doc_len[key] = length
+            self._total_len += length
+
+            updated = row.get(self.updated_column)
+            if updated is not None and (
+                self.last_updated_value is None or str(updated) > self.last_updated_value
+            ):
+                self.last_updated_value = str(updated)
+
+    def refresh(self, fetch_page: Callable[[int, int, Optional[str], List[str]], List[Dict[str, Any]]]):
+        """
+        Syncs the index from Supabase.
+
+        `fetch_page(start, end, updated_since, order_by)` returns one page of
+        rows ordered by `order_by` (range paging needs a stable order or rows
+        repeat/skip between pages); `updated_since` is None for a full load
+        and otherwise an inclusive lower bound.
+
+        The first sync probes the table's columns. A full reload happens on
+        the first sync, every `full_resync_seconds` (drops rows deleted
+        upstream) and always on tables lacking `updated_column` or
+        `id_column`. Other syncs pull rows with `updated_column >=` the newest
+        value seen: `>=` keeps rows sharing the last timestamp, and re-fetched
+        rows overwrite themselves by id.
+        """
+        if self.columns is None:
+            probe = fetch_page(0, 0, None, [])
+            self.columns = set(probe[0]) if probe else None
+
+        now = time.time()
+        full = (
+            not self.incremental
+            or not self.rows
+            or self.last_updated_value is None
+            or now - self.last_full_sync > self.full_resync_seconds
+        )
+        since = None if full else self.last_updated_value
+        order_by = self.order_by()
+
+        pages = []
+        start = 0
+        while True:
+            page = fetch_page(start, start + PAGE_SIZE - 1, since, order_by)
+            if not page:
+                break
+            pages.append(page)
+            if len(page) < PAGE_SIZE:
+                break
+            start += PAGE_SIZE
+
+        # Swap in a full reload only once every page is in
+        if full:
+            self._reset()
+            self.last_full_sync = now
+        for page in pages:
+            self.upsert(page)
+        self.last_refresh = now
+
+    # ------------------------------------------------------------------ #
+    # Query
+    # ------------------------------------------------------------------ #
+
+    def search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Top-K rows by BM25 score (rows sharing no term with the query are skipped)."""
+        terms = tokenize(query)
+        if not terms or not self.rows:
+            return []
+
+        n_docs = len(self.rows)
+        avg_len = (self._total_len / n_docs) if n_docs else 0.0
+        scores: Dict[Any, float] = defaultdict(float)
+
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, tf in postings.items():
+                dl = self._doc_len.get(key, 0)
+                denom = tf + BM25_K1 * (1 - BM25_B + BM25_B * dl / (avg_len or 1))
+                scores[key] += idf * tf * (BM25_K1 + 1) / denom
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [self.rows[key] for key, _ in ranked]
+
+
+def build_context(
+    rows: List[Dict[str, Any]],
+    columns: Optional[Iterable[str]] = None,
+    token_budget: int = 1500,
+) -> str:
+    """Serialize rows (one JSON object per line) until the token budget is spent."""
+    lines = []
+    used = 0
+    for row in rows:
+        line = serialize_row(row, columns)
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines)
@@ -485,27 +485,15 @@ async def clear_cache(
 
 @router.get("/maintenance/health", response_model=HealthResponse)
 async def health_check_detailed(
+    refresh: bool = Query(default=False, description="Probe now instead of using the cached snapshot"),
     _: bool = Depends(verify_admin_credentials)
 ):
-    """Detailed health check"""
+    """Detailed health check with per-dependency latency history"""
+    from .health_monitor import health_monitor
     
-    # Check MCP
-    mcp_healthy = await mcp_client.health_check()
-    mcp_status = "healthy" if mcp_healthy else "unhealthy"
-    
-    # Check Redis
-    redis_status = "healthy" if telemetry_service.enabled else "disabled"
-    
-    # Overall status
-    overall_status = "healthy" if mcp_healthy else "degraded"
-    
-    return HealthResponse(
-        status=overall_status,
-        timestamp=datetime.utcnow(),
-        version=settings.API_VERSION,
-        mcp_status=mcp_status,
-        redis_status=redis_status
-    )
+    if refresh or health_monitor.last_run is None:
+        await health_monitor.probe_all()
+    return health_monitor.health_response()
 
 
 @router.post("/maintenance/test-mcp")
@@ -0,0 +1,101 @@
+"""
+Compliance disclosure tracking (Phase 28, script A1).
+
+Decides whether the initial disclosure must be prepended for a contact.
+The Redis check-and-mark is a single atomic `SET NX EX` (pipelined with
+`TTL`), so concurrent messages from the same contact can no longer both
+see "not sent" and double-disclose. Contacts already disclosed are kept in
+a local TTL cache until their Redis key expires, so the hot path usually
+makes zero Redis calls.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Optional
+from .config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+DISCLOSURE_KEY_PREFIX = "compliance:disclosure:sent:"
+
+
+class DisclosureTracker:
+    """Tracks which contacts already received the initial disclosure today"""
+
+    def __init__(self, redis_client=None):
+        self.redis = redis_client
+        self.enabled = redis_client is not None
+        self.ttl = settings.COMPLIANCE_DISCLOSURE_TTL
+        self.local_max_size = settings.COMPLIANCE_LOCAL_CACHE_SIZE
+
+        # contact_id -> monotonic expiry (insertion-ordered for eviction)
+        self._local: "OrderedDict[str, float]" = OrderedDict()
+
+        # Counters for the admin/metrics views
+        self.local_hits = 0
+        self.redis_checks = 0
+
+    def _is_cached(self, contact_id: str) -> bool:
+        expiry = self._local.get(contact_id)
+        if expiry is None:
+            return False
+        if expiry <= time.monotonic():
+            del self._local[contact_id]
+            return False
+        return True
+
+    def _remember(self, contact_id: str, ttl_seconds: int):
+        """Cache a disclosed contact locally for the remaining TTL"""
+        if ttl_seconds <= 0:
+            return
+        self._local[contact_id] = time.monotonic() + ttl_seconds
+        self._local.move_to_end(contact_id)
+        while len(self._local) > self.local_max_size:
+            self._local.popitem(last=False)
+
+    async def should_disclose(self, contact_id: Optional[str]) -> bool:
+        """
+        Atomically check-and-mark the disclosure for `contact_id`.
+
+        Returns True exactly once per contact per TTL window (across all
+        workers sharing Redis). Without Redis it falls back to the local
+        cache, i.e. once per contact per process.
+        """
+        if not contact_id:
+            return False
+
+        if self._is_cached(contact_id):
+            self.local_hits += 1
+            return False
+
+        if not self.enabled:
+            self._remember(contact_id, self.ttl)
+            return True
+
+        key = f"{DISCLOSURE_KEY_PREFIX}{contact_id}"
+        try:
+            self.redis_checks += 1
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, "true", ex=self.ttl, nx=True)
+                pipe.ttl(key)
+                acquired, remaining = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to check/set disclosure in Redis: {str(e)}")
+            self._remember(contact_id, self.ttl)
+            return True
+
+        self._remember(contact_id, remaining if remaining and remaining > 0 else self.ttl)
+        return bool(acquired)
+
+    def get_stats(self) -> dict:
+        """Local cache statistics"""
+        return {
+            "local_cache_size": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_checks": self.redis_checks,
+        }
+
+
+# Singleton instance
+disclosure_tracker = DisclosureTracker()
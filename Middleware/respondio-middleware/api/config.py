@@ -47,11 +47,20 @@ class Settings(BaseSettings):
     CACHE_TTL: int = 300
     CACHE_MAX_SIZE: int = 1000
     
+    # Compliance disclosure (A1)
+    COMPLIANCE_DISCLOSURE_TTL: int = 86400
+    COMPLIANCE_LOCAL_CACHE_SIZE: int = 50000
+    
     # Circuit Breaker
     CIRCUIT_BREAKER_ENABLED: bool = True
     CIRCUIT_FAILURE_THRESHOLD: int = 5
     CIRCUIT_TIMEOUT: int = 60
     
+    # Health probes (background, cached for /health and /ready)
+    HEALTH_PROBE_INTERVAL: int = 15
+    HEALTH_PROBE_TIMEOUT: float = 2.0
+    HEALTH_HISTORY_SIZE: int = 20
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"  # json or text
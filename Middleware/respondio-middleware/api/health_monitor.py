@@ -0,0 +1,203 @@
+"""
+Background health prober for downstream dependencies (MCP, Redis, Keycloak).
+
+Render/UptimeRobot hit /health constantly; probing the MCP on every hit
+costs a new HTTP client and up to a second per request. Instead, one
+background task probes every dependency on an interval with a pooled
+client and stores the results. /health and /ready read the snapshot.
+Failed MCP probes also feed the circuit breaker, so it opens before user
+traffic pays for retries against a dead MCP.
+"""
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+import httpx
+from .config import settings
+from .models import HealthResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Periodic dependency prober with a cached snapshot"""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        history_size: Optional[int] = None
+    ):
+        self.interval = interval or settings.HEALTH_PROBE_INTERVAL
+        self.timeout = timeout or settings.HEALTH_PROBE_TIMEOUT
+        self.history_size = history_size or settings.HEALTH_HISTORY_SIZE
+
+        self.redis = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # target -> last probe result / recent latencies
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._history: Dict[str, deque] = {}
+        self.last_run: Optional[float] = None
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+
+    def start(self):
+        """Start the background probe loop (idempotent)"""
+        if self._task and not self._task.done():
+            return
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4)
+        )
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"🩺 Health monitor started (interval={self.interval}s)")
+
+    async def stop(self):
+        """Stop the loop and close the pooled client"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Health probe cycle failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    # ------------------------------------------------------------------ #
+    # Probes
+    # ------------------------------------------------------------------ #
+
+    async def probe_all(self):
+        """Probe every configured dependency concurrently"""
+        probes = {"mcp": self._probe_mcp(), "redis": self._probe_redis()}
+        if settings.KC_USE_AUTH and settings.KC_SERVER_URL:
+            probes["keycloak"] = self._probe_keycloak()
+
+        results = await asyncio.gather(*probes.values())
+        for name, (healthy, latency_ms, error) in zip(probes.keys(), results):
+            self._store(name, healthy, latency_ms, error)
+        self.last_run = time.time()
+
+        # Early signal for the circuit breaker
+        from .mcp_client import mcp_client
+        mcp_client.record_probe(self._results["mcp"]["status"] == "healthy")
+
+    async def _timed(self, coro):
+        """Run a probe coroutine -> (healthy, latency_ms, error)"""
+        start = time.perf_counter()
+        try:
+            healthy = bool(await asyncio.wait_for(coro, timeout=self.timeout))
+            error = None if healthy else "unhealthy response"
+        except Exception as e:
+            healthy, error = False, str(e) or type(e).__name__
+        return healthy, round((time.perf_counter() - start) * 1000, 1), error
+
+    async def _get_ok(self, url: str) -> bool:
+        if self._client is not None:
+            response = await self._client.get(url)
+        else:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.get(url)
+        return response.status_code == 200
+
+    async def _probe_mcp(self):
+        from .config_manager import config_manager
+        try:
+            mcp_url = (await config_manager.get_mcp_config()).url
+        except Exception:
+            mcp_url = settings.MCP_URL
+        return await self._timed(self._get_ok(mcp_url.replace("/query", "/health")))
+
+    async def _probe_redis(self):
+        if self.redis is None:
+            return False, 0.0, "disabled"
+        return await self._timed(self.redis.ping())
+
+    async def _probe_keycloak(self):
+        url = (
+            f"{settings.KC_SERVER_URL.rstrip('/')}/realms/{settings.KC_REALM}"
+            "/.well-known/openid-configuration"
+        )
+        return await self._timed(self._get_ok(url))
+
+    def _store(self, name: str, healthy: bool, latency_ms: float, error: Optional[str]):
+        if name == "redis" and error == "disabled":
+            status = "disabled"
+        else:
+            status = "healthy" if healthy else "unhealthy"
+
+        history = self._history.setdefault(name, deque(maxlen=self.history_size))
+        history.append(latency_ms)
+
+        self._results[name] = {
+            "status": status,
+            "latency_ms": latency_ms,
+            "error": error,
+            "checked_at": datetime.utcnow().isoformat(),
+        }
+
+    # ------------------------------------------------------------------ #
+    # Snapshot
+    # ------------------------------------------------------------------ #
+
+    def status_of(self, name: str) -> str:
+        """Cached status for one dependency ('unknown' before the first probe)"""
+        result = self._results.get(name)
+        return result["status"] if result else "unknown"
+
+    @property
+    def staleness_seconds(self) -> Optional[float]:
+        if self.last_run is None:
+            return None
+        return round(time.time() - self.last_run, 3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cached probe results with latency history (no I/O)"""
+        return {
+            name: {**result, "latency_history_ms": list(self._history.get(name, ()))}
+            for name, result in self._results.items()
+        }
+
+    def health_response(self) -> HealthResponse:
+        """HealthResponse built from the cached snapshot"""
+        mcp_status = self.status_of("mcp")
+        redis_status = self.status_of("redis")
+        if redis_status == "unknown":
+            redis_status = "healthy" if self.redis is not None else "disabled"
+        keycloak_status = self.status_of("keycloak")
+
+        # Always 'healthy' if the API runs and MCP is up; 'degraded' otherwise.
+        # This prevents Render from killing the container if MCP is just spinning up.
+        overall_status = "healthy" if mcp_status == "healthy" else "degraded"
+
+        return HealthResponse(
+            status=overall_status,
+            timestamp=datetime.utcnow(),
+            version=settings.API_VERSION,
+            mcp_status=mcp_status,
+            redis_status=redis_status,
+            keycloak_status=None if keycloak_status == "unknown" else keycloak_status,
+            staleness_seconds=self.staleness_seconds,
+            probes=self.snapshot()
+        )
+
+
+# Singleton instance
+health_monitor = HealthMonitor()
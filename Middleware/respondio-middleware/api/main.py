@@ -5,7 +5,6 @@ Main FastAPI application - Middleware for Respond.io to MCP.
 from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import httpx
 import time
 import uuid
 from datetime import datetime
@@ -14,7 +13,8 @@ import json
 import os
 from typing import Optional, List, Dict, Any
 from .shared_logic import get_compliance_scripts
-from shared.redis_client import get_redis_client
+from .compliance import disclosure_tracker
+from .health_monitor import health_monitor
 
 from .models import (
     RespondioRequest,
@@ -79,16 +79,26 @@ async def startup_event():
         config_manager.redis = redis
         config_manager.enabled = True
         
+        # Compliance disclosure tracker reuses the same connection
+        disclosure_tracker.redis = redis
+        disclosure_tracker.enabled = True
+        
+        health_monitor.redis = redis
+        
         logger.info("✅ Redis connected")
     except Exception as e:
         logger.warning(f"⚠️ Redis connection failed: {str(e)}")
         logger.warning("Telemetry and config management will be disabled")
+    
+    # Background dependency probes (cached for /health and /ready)
+    health_monitor.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("👋 Shutting down Respond.io Middleware")
+    await health_monitor.stop()
 
 
 # ============================================================
@@ -141,23 +151,13 @@ async def webhook(
         raise HTTPException(status_code=401, detail="Invalid webhook secret")
     
     # --- PHASE 28: COMPLIANCE INITIAL DISCLOSURE ---
-    needs_disclosure = False
+    # Atomic check-and-mark (SET NX EX); usually served from the local cache
+    needs_disclosure = await disclosure_tracker.should_disclose(request.contact_id)
     disclosure_text = ""
-    try:
-        redis = await get_redis_client()
-        # Key to track if disclosure was sent to this contact today
-        disclosure_key = f"compliance:disclosure:sent:{request.contact_id}"
-        already_sent = await redis.get(disclosure_key)
-        
-        if not already_sent:
-            needs_disclosure = True
-            scripts = get_compliance_scripts()
-            disclosure_text = scripts.get("A1_INITIAL_DISCLOSURE", "")
-            # Mark as sent for 24 hours
-            await redis.set(disclosure_key, "true", ex=86400)
-            logger.info(f"🛡️ Initial Disclosure will be prepended for contact {request.contact_id}")
-    except Exception as e:
-        logger.error(f"Failed to check/set disclosure in Redis: {str(e)}")
+    if needs_disclosure:
+        scripts = get_compliance_scripts()
+        disclosure_text = scripts.get("A1_INITIAL_DISCLOSURE", "")
+        logger.info(f"🛡️ Initial Disclosure will be prepended for contact {request.contact_id}")
 
     try:
         # Check if an agent is specified in metadata (useful for dashboard testing)
@@ -306,50 +306,20 @@ async def webhook(
 async def health_check():
     """
     Health check endpoint optimized for Render.
-    Responds quickly even if downstream services are slow.
+    Serves the background prober's cached snapshot, so it never waits on
+    downstream services.
     """
-    start_time = time.time()
-    
-    # Check MCP health with strict 1s timeout
-    mcp_healthy = False
-    try:
-        # We manually call the mcp health check with a shorter timeout here 
-        # to ensure Render/UptimeRobot don't time out on the API itself
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                settings.MCP_URL.replace("/query", "/health"),
-                timeout=1.0
-            )
-            mcp_healthy = response.status_code == 200
-    except Exception as e:
-        logger.warning(f"Health check: MCP connection failed or timed out: {str(e)}")
-        mcp_healthy = False
-
-    mcp_status = "healthy" if mcp_healthy else "unhealthy"
-    
-    # Check Redis health (based on initialization in startup_event)
-    redis_status = "healthy" if telemetry_service.enabled else "disabled"
-    
-    # Overall status: Always return 'healthy' if the API is running, 
-    # but specify 'degraded' in the body if MCP is down.
-    # This prevents Render from killing the container if MCP is just spinning up.
-    overall_status = "healthy" if mcp_healthy else "degraded"
-    
-    latency_ms = int((time.time() - start_time) * 1000)
-    
-    return HealthResponse(
-        status=overall_status,
-        timestamp=datetime.utcnow(),
-        version=settings.API_VERSION,
-        mcp_status=mcp_status,
-        redis_status=redis_status
-    )
+    return health_monitor.health_response()
 
 
 @app.get("/ready")
 async def readiness_check():
     """Readiness check for Kubernetes/Cloud Run"""
-    return {"status": "ready"}
+    return {
+        "status": "ready",
+        "staleness_seconds": health_monitor.staleness_seconds,
+        "probes": health_monitor.snapshot()
+    }
 
 
 # ============================================================
@@ -93,6 +93,19 @@ class MCPClient:
             
             asyncio.create_task(fire_cb_alert())
     
+    def record_probe(self, healthy: bool):
+        """
+        Feed a background health probe result into the circuit breaker.
+        
+        Failed probes count as failures so the breaker opens before user
+        traffic pays for retries. A healthy probe is ignored: /health being
+        up says nothing about /query, so it must not reset failures from
+        real traffic nor close an open breaker (recovery goes through the
+        usual CIRCUIT_TIMEOUT half-open path).
+        """
+        if not healthy and not self.circuit_open:
+            self._record_failure()
+    
     async def query(
         self, 
         user_text: str, 
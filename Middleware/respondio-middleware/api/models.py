@@ -273,3 +273,6 @@ class HealthResponse(BaseModel):
     version: str = Field(default="1.0.0", description="Versión del servicio")
     mcp_status: Optional[str] = Field(None, description="Estado del MCP")
     redis_status: Optional[str] = Field(None, description="Estado de Redis")
+    keycloak_status: Optional[str] = Field(None, description="Estado de Keycloak")
+    staleness_seconds: Optional[float] = Field(None, description="Segundos desde el último sondeo")
+    probes: Optional[Dict[str, Any]] = Field(None, description="Resultado e historial de latencia por dependencia")
@@ -25,6 +25,18 @@ class TestHealthEndpoints:
         assert "status" in data
         assert data["status"] in ["healthy", "degraded", "unhealthy"]
     
+    def test_health_does_not_probe_downstream(self, client):
+        """/health serves the cached snapshot without opening HTTP clients"""
+        from unittest.mock import patch
+        
+        with patch('httpx.AsyncClient', side_effect=AssertionError("probe on /health")):
+            response = client.get("/health")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert "staleness_seconds" in data
+        assert "probes" in data
+    
     def test_ready_endpoint(self, client):
         """Test /ready endpoint"""
         response = client.get("/ready")
@@ -0,0 +1,87 @@
+"""
+Unit tests for the compliance disclosure tracker
+"""
+
+import pytest
+import asyncio
+from unittest.mock import MagicMock
+import fakeredis.aioredis
+from api.compliance import DisclosureTracker, DISCLOSURE_KEY_PREFIX
+
+
+@pytest.fixture
+def redis_client():
+    """Create fake async Redis"""
+    return fakeredis.aioredis.FakeRedis()
+
+
+@pytest.fixture
+def tracker(redis_client):
+    """Create tracker bound to fake Redis"""
+    return DisclosureTracker(redis_client)
+
+
+@pytest.mark.asyncio
+class TestDisclosureTracker:
+    """Test disclosure check-and-mark"""
+
+    async def test_first_message_discloses_once(self, tracker, redis_client):
+        """First message discloses, following ones do not"""
+        assert await tracker.should_disclose("contact_1") is True
+        assert await tracker.should_disclose("contact_1") is False
+
+        ttl = await redis_client.ttl(f"{DISCLOSURE_KEY_PREFIX}contact_1")
+        assert 0 < ttl <= tracker.ttl
+
+    async def test_concurrent_messages_disclose_once(self, redis_client):
+        """Concurrent messages from the same contact disclose exactly once"""
+        # Separate trackers simulate separate workers (no shared local cache)
+        trackers = [DisclosureTracker(redis_client) for _ in range(10)]
+        results = await asyncio.gather(*(t.should_disclose("contact_2") for t in trackers))
+
+        assert results.count(True) == 1
+
+    async def test_local_cache_skips_redis(self, tracker):
+        """Already-disclosed contacts are answered without Redis"""
+        await tracker.should_disclose("contact_3")
+        checks = tracker.redis_checks
+
+        for _ in range(5):
+            assert await tracker.should_disclose("contact_3") is False
+
+        assert tracker.redis_checks == checks
+        assert tracker.local_hits == 5
+
+    async def test_disclosed_by_other_worker(self, tracker, redis_client):
+        """A key set elsewhere is respected and cached locally"""
+        await redis_client.set(f"{DISCLOSURE_KEY_PREFIX}contact_4", "true", ex=600)
+
+        assert await tracker.should_disclose("contact_4") is False
+        assert tracker.get_stats()["local_cache_size"] == 1
+
+    async def test_redis_error_still_discloses(self):
+        """Redis failures err on the side of disclosing"""
+        broken = MagicMock()
+        broken.pipeline.side_effect = ConnectionError("down")
+        tracker = DisclosureTracker(broken)
+
+        assert await tracker.should_disclose("contact_5") is True
+        assert await tracker.should_disclose("contact_5") is False
+
+    async def test_without_redis_uses_local_cache(self):
+        """No Redis: disclose once per process"""
+        tracker = DisclosureTracker()
+
+        assert await tracker.should_disclose("contact_6") is True
+        assert await tracker.should_disclose("contact_6") is False
+
+    async def test_local_cache_is_bounded(self):
+        """Oldest entries are evicted past the size limit"""
+        tracker = DisclosureTracker()
+        tracker.local_max_size = 3
+
+        for i in range(5):
+            await tracker.should_disclose(f"c{i}")
+
+        assert tracker.get_stats()["local_cache_size"] == 3
+        assert await tracker.should_disclose("c0") is True
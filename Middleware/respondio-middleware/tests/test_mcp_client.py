@@ -3,8 +3,9 @@ Unit tests for MCP client
 """
 
 import pytest
-import asyncio
+import time
 from unittest.mock import AsyncMock, patch, MagicMock
+from api.config import settings
 from api.mcp_client import MCPClient
 from api.models import ResponseStatus
 
@@ -75,7 +76,7 @@ class TestMCPClient:
         # Set low threshold for testing
         mcp_client.failure_count = 5
         mcp_client.circuit_open = True
-        mcp_client.circuit_open_time = asyncio.get_event_loop().time()
+        mcp_client.circuit_open_time = time.time()
         
         # Query should return fallback immediately
         response, status, latency, retries = await mcp_client.query("Test query")
@@ -84,6 +85,21 @@ class TestMCPClient:
         assert "temporalmente no disponible" in response.lower()
         assert retries == 0
     
+    async def test_circuit_breaker_rejects_right_after_opening(self, mcp_client):
+        """A breaker opened by failures rejects calls until CIRCUIT_TIMEOUT passes"""
+        # The alert email is fired as a background task; drop it
+        with patch('asyncio.create_task', side_effect=lambda coro: coro.close()):
+            for _ in range(settings.CIRCUIT_FAILURE_THRESHOLD):
+                mcp_client._record_failure()
+        assert mcp_client.circuit_open is True
+        
+        response, status, latency, retries = await mcp_client.query("Test query")
+        assert status == ResponseStatus.ERROR
+        assert retries == 0
+        
+        mcp_client.circuit_open_time = time.time() - settings.CIRCUIT_TIMEOUT - 1
+        assert mcp_client._check_circuit() is False
+    
     async def test_health_check_success(self, mcp_client):
         """Test successful health check"""
         with patch('httpx.AsyncClient') as mock_client:
@@ -106,3 +122,19 @@ class TestMCPClient:
             
             is_healthy = await mcp_client.health_check()
             assert is_healthy is False
+    
+    async def test_healthy_probe_does_not_reset_breaker(self, mcp_client):
+        """A green /health probe neither resets failures nor closes the breaker"""
+        mcp_client.failure_count = 3
+        mcp_client.record_probe(True)
+        assert mcp_client.failure_count == 3
+        
+        mcp_client.circuit_open = True
+        mcp_client.circuit_open_time = time.time()
+        mcp_client.record_probe(True)
+        assert mcp_client.circuit_open is True
+    
+    async def test_failed_probe_counts_as_failure(self, mcp_client):
+        """Failed probes feed the breaker like failed calls"""
+        mcp_client.record_probe(False)
+        assert mcp_client.failure_count == 1